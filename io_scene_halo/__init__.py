@@ -38,25 +38,35 @@ bl_info = {
     "support": 'COMMUNITY',
     "category": "Import-Export"}
 
-from . import global_ui
-from . import file_ass
-from . import file_jma
-from . import file_jmi
-from . import file_jms
-from . import file_qua
-from . import file_wrl
-from . import misc
+try:
+    import bpy
 
-modules = [
-    global_ui,
-    file_ass,
-    file_jma,
-    file_jmi,
-    file_jms,
-    file_qua,
-    file_wrl,
-    misc
-]
+except ImportError:
+    # Worker processes such as the batch importer's parse pool only load the parts of the package that don't need Blender
+    bpy = None
+
+if bpy:
+    from .global_functions import skeleton_index
+    from . import global_ui
+    from . import file_ass
+    from . import file_jma
+    from . import file_jmi
+    from . import file_jms
+    from . import file_qua
+    from . import file_wrl
+    from . import misc
+
+    modules = [
+        skeleton_index,
+        global_ui,
+        file_ass,
+        file_jma,
+        file_jmi,
+        file_jms,
+        file_qua,
+        file_wrl,
+        misc
+    ]
 
 def register():
     for module in modules:
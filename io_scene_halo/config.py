@@ -1,3 +1,6 @@
+import os
+import sys
+
 URL = "https://github.com/General-101/Halo-Asset-Blender-Development-Toolset/issues/new"
 EMAIL = "halo-asset-toolset@protonmail.com"
 
@@ -5,3 +8,21 @@ ENABLE_DEBUG = False
 ENABLE_DEBUGGING_PM = False
 ENABLE_PROFILING = False
 ENABLE_CRASH_REPORT = True
+
+def get_user_cache_directory():
+    if sys.platform == 'win32':
+        cache_root = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+
+    elif sys.platform == 'darwin':
+        cache_root = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+
+    else:
+        cache_root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+    return os.path.join(cache_root, "halo_asset_blender_toolset", "asset_cache")
+
+ASSET_CACHE_DIRECTORY = get_user_cache_directory()
+ASSET_CACHE_MAX_SIZE = 512 * 1024 * 1024
+
+# Assets at least this large are parsed through a memory mapped token index instead of being read into memory
+MEMORY_MAP_THRESHOLD = 64 * 1024 * 1024
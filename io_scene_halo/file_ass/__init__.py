@@ -355,6 +355,12 @@ class ExportASS(Operator, ExportHelper):
         default = True,
         )
 
+    incremental_export: BoolProperty(
+        name ="Incremental Export",
+        description = "Compare each file against the export manifest in its folder and leave it untouched when its contents did not change",
+        default = False,
+        )
+
     use_edge_angle: BoolProperty(
         name ="Use Edge Angle",
         description = "Split edges with high angle between faces.",
@@ -443,6 +449,7 @@ class ExportASS(Operator, ExportHelper):
             parser.add_argument('-arg13', '--scale_enum', dest='scale_enum', type=str, default="0")
             parser.add_argument('-arg14', '--scale_float', dest='scale_float', type=float, default=1.0)
             parser.add_argument('-arg15', '--console', dest='console', action='store_true', default=True)
+            parser.add_argument('-arg16', '--incremental_export', dest='incremental_export', action='store_true')
             args = parser.parse_known_args(argv)[0]
             print('filepath: ', args.filepath)
             print('ass_version: ', args.ass_version)
@@ -459,6 +466,7 @@ class ExportASS(Operator, ExportHelper):
             print('scale_enum: ', args.scale_enum)
             print('scale_float: ', args.scale_float)
             print('console: ', args.console)
+            print('incremental_export: ', args.incremental_export)
             self.filepath = args.filepath
             self.ass_version = args.ass_version
             self.game_version = args.game_version
@@ -474,8 +482,9 @@ class ExportASS(Operator, ExportHelper):
             self.scale_enum = args.scale_enum
             self.scale_float = args.scale_float
             self.console = args.console
+            self.incremental_export = args.incremental_export
 
-        return global_functions.run_code("export_ass.write_file(*keywords, self.game_version)")
+        return global_functions.run_code("export_ass.write_file(*keywords, self.game_version, self.incremental_export)")
 
     def draw(self, context):
         scene = context.scene
@@ -554,6 +563,9 @@ class ExportASS(Operator, ExportHelper):
         row.label(text='Use Edge Split:')
         row.prop(self, "edge_split", text='')
         row = col.row()
+        row.label(text='Incremental Export:')
+        row.prop(self, "incremental_export", text='')
+        row = col.row()
         row.label(text='Use Scene Export Settings:')
         row.prop(scene_ass, "use_scene_properties", text='')
         if self.edge_split == True:
@@ -587,6 +599,32 @@ class ImportASS(Operator, ImportHelper):
     bl_label = "Import ASS"
     filename_ext = '.ASS'
 
+    weld_vertices: BoolProperty(
+        name ="Weld Vertices",
+        description = "Merge triangle corners that share position, normal, UVs, color and weights into one vertex instead of giving every triangle its own vertices",
+        default = False,
+        )
+
+    weld_distance: FloatProperty(
+        name ="Weld Distance",
+        description = "Snap positions to a grid this size before welding so corners slightly apart still merge. 0 only merges identical positions",
+        default = 0.0,
+        min = 0.0,
+        precision = 4,
+        )
+
+    use_asset_cache: BoolProperty(
+        name ="Use Asset Cache",
+        description = "Keep the parsed file in a cache so importing it again skips parsing while the file is unchanged",
+        default = False,
+        )
+
+    verify_cache_hash: BoolProperty(
+        name ="Verify Cache Hash",
+        description = "Hash the file contents to validate a cached result instead of only checking file size and modification time",
+        default = False,
+        )
+
     filter_glob: StringProperty(
         default="*.ass",
         options={'HIDDEN'},
@@ -598,11 +636,23 @@ class ImportASS(Operator, ImportHelper):
             argv = sys.argv[sys.argv.index('--') + 1:]
             parser = argparse.ArgumentParser()
             parser.add_argument('-arg1', '--filepath', dest='filepath', metavar='FILE', required = True)
+            parser.add_argument('-arg2', '--use_asset_cache', dest='use_asset_cache', action='store_true')
+            parser.add_argument('-arg3', '--verify_cache_hash', dest='verify_cache_hash', action='store_true')
+            parser.add_argument('-arg4', '--weld_vertices', dest='weld_vertices', action='store_true')
+            parser.add_argument('-arg5', '--weld_distance', dest='weld_distance', type=float, default=0.0)
             args = parser.parse_known_args(argv)[0]
             print('filepath: ', args.filepath)
+            print('use_asset_cache: ', args.use_asset_cache)
+            print('verify_cache_hash: ', args.verify_cache_hash)
+            print('weld_vertices: ', args.weld_vertices)
+            print('weld_distance: ', args.weld_distance)
             self.filepath = args.filepath
+            self.use_asset_cache = args.use_asset_cache
+            self.verify_cache_hash = args.verify_cache_hash
+            self.weld_vertices = args.weld_vertices
+            self.weld_distance = args.weld_distance
 
-        return global_functions.run_code("import_ass.load_file(context, self.filepath, self.report)")
+        return global_functions.run_code("import_ass.load_file(context, self.filepath, self.report, self.use_asset_cache, self.verify_cache_hash, self.weld_vertices, self.weld_distance)")
 
 def menu_func_export(self, context):
     self.layout.operator(ExportASS.bl_idname, text='Halo Amalgam Scene Specification (.ass)')
@@ -31,7 +31,7 @@ import socket
 from decimal import *
 from math import degrees
 from getpass import getuser
-from ..global_functions import mesh_processing, global_functions
+from ..global_functions import mesh_processing, global_functions, export_manifest
 
 def get_material_strings(material, version):
     material_strings = []
@@ -231,8 +231,8 @@ class ASSScene(global_functions.HaloAsset):
 
         limit_value = 0.001
 
-        region_list = []
-        permutation_list = []
+        region_list = global_functions.IndexRegistry()
+        permutation_list = global_functions.IndexRegistry()
 
         object_list = list(context.scene.objects)
 
@@ -241,7 +241,7 @@ class ASSScene(global_functions.HaloAsset):
         self.materials = []
         self.objects = []
         self.instances = []
-        material_list = []
+        material_list = global_functions.IndexRegistry()
         armature = None
         geometry_list = []
         linked_object_list = []
@@ -346,7 +346,9 @@ class ASSScene(global_functions.HaloAsset):
                     geometry_list.append((obj_mesh_data, obj_data, 'EMPTY'))
                     instance_list.append(obj_data)
 
+        instance_list = global_functions.NodeHierarchy(instance_list)
         self.instances.append(ASSScene.Instance(name='Scene Root', local_transform=ASSScene.Transform(), pivot_transform=ASSScene.Transform()))
+        transform_caches = {}
         for idx, geometry in enumerate(geometry_list):
             verts = []
             triangles = []
@@ -403,7 +405,12 @@ class ASSScene(global_functions.HaloAsset):
             if not parent == None:
                 parent_id = instance_list.index(parent)
 
-            geo_matrix = global_functions.get_matrix(original_geo, original_geo, True, armature, instance_list, is_bone, version, 'ASS', False, custom_scale, False)
+            transform_cache = transform_caches.get(armature)
+            if transform_cache is None:
+                transform_cache = global_functions.TransformCache(armature, instance_list, version, 'ASS', custom_scale, False)
+                transform_caches[armature] = transform_cache
+
+            geo_matrix = transform_cache.get_matrix(original_geo, original_geo, True, is_bone, False)
             geo_dimensions = global_functions.get_dimensions(geo_matrix, original_geo, version, None, False, is_bone, 'ASS', custom_scale)
             rotation = (geo_dimensions.quaternion[0], geo_dimensions.quaternion[1], geo_dimensions.quaternion[2], geo_dimensions.quaternion[3])
             translation = (geo_dimensions.position[0], geo_dimensions.position[1], geo_dimensions.position[2])
@@ -446,11 +453,9 @@ class ASSScene(global_functions.HaloAsset):
                         face_set = original_geo.face_maps[0].name.split()
                         lod, permutation, region = global_functions.material_definition_parser(False, face_set, default_region, default_permutation)
 
-                        if not permutation in permutation_list:
-                            permutation_list.append(permutation)
+                        permutation_list.add(permutation)
 
-                        if not region in region_list:
-                            region_list.append(region)
+                        region_list.add(region)
 
                     radius = geo_dimensions.object_radius
                     face = original_geo.data.polygons[0]
@@ -468,11 +473,9 @@ class ASSScene(global_functions.HaloAsset):
                         face_set = original_geo.face_maps[0].name.split()
                         lod, permutation, region = global_functions.material_definition_parser(False, face_set, default_region, default_permutation)
 
-                        if not permutation in permutation_list:
-                            permutation_list.append(permutation)
+                        permutation_list.add(permutation)
 
-                        if not region in region_list:
-                            region_list.append(region)
+                        region_list.add(region)
 
                     face = original_geo.data.polygons[0]
                     extents = [geo_dimensions.dimension[0], geo_dimensions.dimension[1], geo_dimensions.dimension[2]]
@@ -490,11 +493,9 @@ class ASSScene(global_functions.HaloAsset):
                         face_set = original_geo.face_maps[0].name.split()
                         lod, permutation, region = global_functions.material_definition_parser(False, face_set, default_region, default_permutation)
 
-                        if not permutation in permutation_list:
-                            permutation_list.append(permutation)
+                        permutation_list.add(permutation)
 
-                        if not region in region_list:
-                            region_list.append(region)
+                        region_list.add(region)
 
                     face = original_geo.data.polygons[0]
                     height = geo_dimensions.pill_height
@@ -509,29 +510,42 @@ class ASSScene(global_functions.HaloAsset):
                     if xref_path != "":
                         xref_name = original_geo.name
 
-                    vertex_groups = original_geo.vertex_groups.keys()
-                    original_geo_matrix = global_functions.get_matrix(original_geo, original_geo, False, armature, instance_list, False, version, "ASS", False, custom_scale, False)
+                    original_geo_matrix = transform_cache.get_matrix(original_geo, original_geo, False, False, False)
+                    mesh_data = mesh_processing.MeshExportData(evaluted_mesh, "ASS", original_geo_matrix, version, custom_scale)
+                    vertex_weights = mesh_processing.get_vertex_node_sets(*mesh_processing.get_export_vertex_weights(evaluted_mesh, armature, original_geo, instance_list, "ASS"))
+                    loop_vertices = mesh_data.loop_vertices.tolist()
+                    translations = mesh_data.translations.tolist()
+                    normals = mesh_data.normals.tolist()
+                    uv_sets = mesh_data.uvs.tolist()
+                    colors = mesh_data.colors.tolist()
+                    material_indices = mesh_data.material_indices.tolist()
+                    face_map_indices = None
+                    if not mesh_data.face_map_indices is None:
+                        face_map_indices = mesh_data.face_map_indices.tolist()
+
+                    face_material_indices = {}
                     for idx, face in enumerate(evaluted_mesh.polygons):
-                        if evaluted_mesh.face_maps.active and len(original_geo.face_maps) > 0:
-                            face_map_idx = evaluted_mesh.face_maps.active.data[idx].value
+                        if not face_map_indices is None and len(original_geo.face_maps) > 0:
+                            face_map_idx = face_map_indices[idx]
                             if not face_map_idx == -1:
                                 face_set = mesh_processing.process_mesh_export_face_set(default_permutation, default_region, game_version, original_geo, face_map_idx)
-                                if not region in region_list:
-                                    region_list.append(region)
-
-                                region_index = region_list.index(region)
+                                region_index = region_list.add(region)
                                 if not game_version == 'haloce':
-                                    if not permutation in permutation_list:
-                                        permutation_list.append(permutation)
+                                    permutation_list.add(permutation)
 
                         permutation = face_set[1]
                         region = face_set[2]
 
-                        material = global_functions.get_material(game_version, original_geo, face, evaluted_mesh, lod, region, permutation)
-                        material_index = -1
-                        if not material == -1:
-                            material_list = global_functions.gather_materials(game_version, material, material_list, "ASS")
-                            material_index = material_list.index(material)
+                        face_material_key = (material_indices[idx], lod, region, permutation)
+                        material_index = face_material_indices.get(face_material_key)
+                        if material_index is None:
+                            material = global_functions.get_material(game_version, original_geo, face, evaluted_mesh, lod, region, permutation)
+                            material_index = -1
+                            if not material == -1:
+                                material_list = global_functions.gather_materials(game_version, material, material_list, "ASS")
+                                material_index = material_list.index(material)
+
+                            face_material_indices[face_material_key] = material_index
 
                         v0 = (idx * 3)
                         v1 = (idx * 3) + 1
@@ -539,13 +553,14 @@ class ASSScene(global_functions.HaloAsset):
 
                         triangles.append(ASSScene.Triangle(region_index, material_index, v0, v1, v2))
                         for loop_index in face.loop_indices:
-                            vert = evaluted_mesh.vertices[evaluted_mesh.loops[loop_index].vertex_index]
+                            mesh_vertex_index = loop_vertices[loop_index]
 
                             region = region_index
-                            scaled_translation, normal = mesh_processing.process_mesh_export_vert(vert, "ASS", original_geo_matrix, version, custom_scale)
-                            uv_set = mesh_processing.process_mesh_export_uv(evaluted_mesh, "ASS", loop_index, version)
-                            color = mesh_processing.process_mesh_export_color(evaluted_mesh, loop_index)
-                            node_influence_count, node_set, node_index_list = mesh_processing.process_mesh_export_weights(vert, armature, original_geo, vertex_groups, instance_list, "ASS")
+                            scaled_translation = translations[mesh_vertex_index]
+                            normal = normals[mesh_vertex_index]
+                            uv_set = uv_sets[loop_index]
+                            color = colors[loop_index]
+                            node_influence_count, node_set, node_index_list = vertex_weights[mesh_vertex_index]
 
                             verts.append(ASSScene.Vertex(node_influence_count, node_set, region, scaled_translation, normal, color, uv_set))
 
@@ -574,18 +589,7 @@ class ASSScene(global_functions.HaloAsset):
             obj.hide_set(property_value[0])
             obj.hide_viewport = property_value[1]
 
-def write_file(context, filepath, report, ass_version, ass_version_h2, ass_version_h3, hidden_geo, folder_structure, apply_modifiers, triangulate_faces, edge_split, use_edge_angle, use_edge_sharp, split_angle, clean_normalize_weights, scale_enum, scale_float, console, game_version):
-
-    custom_scale = global_functions.set_scale(scale_enum, scale_float)
-    version = global_functions.get_version(ass_version, None, ass_version_h2, ass_version_h3, game_version, console)
-
-    ass_scene = ASSScene(context, report, version, game_version, apply_modifiers, triangulate_faces, edge_split, use_edge_angle, use_edge_sharp, split_angle, clean_normalize_weights, hidden_geo, custom_scale)
-
-    filename = os.path.basename(filepath)
-    root_directory = global_functions.get_directory(context, game_version, "render", folder_structure, "0", False, filepath)
-
-    file = open(root_directory + os.sep + filename, 'w', encoding='utf_8')
-
+def write_scene_data(file, ass_scene, version):
     file.write(
         ';### HEADER ###' +
         '\n%s' % (version) +
@@ -813,7 +817,27 @@ def write_file(context, filepath, report, ass_version, ass_version_h2, ass_versi
         for node_index in node_index_list:
             file.write('%s\n' % node_index)
 
-    file.close()
+def write_file(context, filepath, report, ass_version, ass_version_h2, ass_version_h3, hidden_geo, folder_structure, apply_modifiers, triangulate_faces, edge_split, use_edge_angle, use_edge_sharp, split_angle, clean_normalize_weights, scale_enum, scale_float, console, game_version, incremental_export=False):
+
+    custom_scale = global_functions.set_scale(scale_enum, scale_float)
+    version = global_functions.get_version(ass_version, None, ass_version_h2, ass_version_h3, game_version, console)
+
+    ass_scene = ASSScene(context, report, version, game_version, apply_modifiers, triangulate_faces, edge_split, use_edge_angle, use_edge_sharp, split_angle, clean_normalize_weights, hidden_geo, custom_scale)
+
+    filename = os.path.basename(filepath)
+    root_directory = global_functions.get_directory(context, game_version, "render", folder_structure, "0", False, filepath)
+
+    manifest = None
+    if incremental_export:
+        manifest = export_manifest.ExportManifest()
+
+    with export_manifest.open_export_file(root_directory + os.sep + filename, manifest) as file:
+        write_scene_data(file, ass_scene, version)
+
+    if not manifest is None:
+        manifest.save()
+        manifest.report_stats(report)
+
     report({'INFO'}, "Export completed successfully")
     return {'FINISHED'}
 
@@ -25,11 +25,9 @@
 # ##### END MIT LICENSE BLOCK #####
 
 import bpy
-import bmesh
 
 from math import radians
-from mathutils import Matrix
-from ..global_functions import mesh_processing, global_functions
+from ..global_functions import mesh_processing, global_functions, asset_cache
 
 class ASSAsset(global_functions.HaloAsset):
     class Transform:
@@ -109,6 +107,8 @@ class ASSAsset(global_functions.HaloAsset):
             self.light_aspect_ratio = light_aspect_ratio
 
     class Vertex:
+        __slots__ = ('node_influence_count', 'node_set', 'translation', 'normal', 'color', 'uv_set')
+
         def __init__(self, node_influence_count=0, node_set=None, translation=None, normal=None, color=None, uv_set=None):
             self.node_influence_count = node_influence_count
             self.node_set = node_set
@@ -118,6 +118,8 @@ class ASSAsset(global_functions.HaloAsset):
             self.uv_set = uv_set
 
     class Triangle:
+        __slots__ = ('material_index', 'v0', 'v1', 'v2')
+
         def __init__(self, material_index=-1, v0=-1, v1=-1, v2=-1):
             self.material_index = material_index
             self.v0 = v0
@@ -151,198 +153,206 @@ class ASSAsset(global_functions.HaloAsset):
 
         return ASSAsset.Transform(rotation, translation, scale)
 
-    def __init__(self, filepath):
-        super().__init__(filepath)
-        self.version = int(self.next())
-        version_list = [1, 2, 3, 4, 5, 6, 7]
-        if not self.version in version_list:
-            raise global_functions.AssetParseError("Importer does not support this ASS version")
-
-        self.skip(4) # skip header
-        self.materials = []
-        self.objects = []
-        self.instances = []
-        material_count = int(self.next())
-        used_material_names = []
-        for idx, material in enumerate(range(material_count)):
-            name = self.next().strip('\"')
-            scene_name = name
-            file_name = ""
-            if self.version >= 3:
-                if scene_name in used_material_names:
-                    file_name = name
-                    duplicate_name = None
-                    loop_count = 1
-                    while duplicate_name == None:
-                        while_name = name + "." + str(loop_count).zfill(3)
-                        if not while_name in used_material_names:
-                            duplicate_name = while_name
-
-                        loop_count += 1
-
-                    scene_name = duplicate_name
-
-            used_material_names.append(scene_name)
-            material_effect = self.next().strip('\"')
-            material_strings = []
-            if self.version >= 4:
-                material_string_count = int(self.next())
-                for string in range(material_string_count):
-                    material_strings.append(self.next().strip('\"'))
-
-            self.materials.append(ASSAsset.Material(scene_name, file_name, None, None, None, None, None, material_effect, material_strings))
-
-        object_count = int(self.next())
-        for object in range(object_count):
-            vertices = []
-            node_index_list = []
-            triangles = []
-            geo_class = self.next().strip('\"')
-            xref_path = self.next().strip('\"')
-            xref_name = self.next().strip('\"')
-            material_index = -1
-            radius = 2
-            extents = [1.0, 1.0, 1.0]
-            height = 1
-            light_properties = None
-            if geo_class == 'SPHERE':
-                material_index = int(self.next())
-                radius = float(self.next())
-
-            elif geo_class == 'BOX':
-                material_index = int(self.next())
-                extents = self.next_vector()
-
-            elif geo_class == 'PILL':
-                material_index = int(self.next())
-                height = float(self.next())
-                radius = float(self.next())
-
-            elif geo_class == 'MESH':
-                vert_count = int(self.next())
-                for vert in range(vert_count):
-                    node_set = []
-                    uv_set = []
-                    color = None
-                    translation = self.next_vector()
-                    normal = self.next_vector()
-                    if self.version >= 6:
-                        color = self.next_vector()
-                    node_influence_count = int(self.next())
-                    for node in range(node_influence_count):
-                        node_index = int(self.next())
-                        if not node_index in node_index_list:
-                            node_index_list.append(node_index)
-
-                        node_weight = float(self.next())
-                        node_set.append([node_index, node_weight])
-
-                    uv_count = int(self.next())
-                    for uv in range(uv_count):
-                        tex_u_value = self.next()
-                        tex_v_value = self.next()
-                        tex_w_value = None
-                        tex_w = None
-
-                        try:
-                            tex_u = float(tex_u_value)
-                        except ValueError:
-                            tex_u = float(tex_u_value.rsplit('.', 1)[0])
-
-                        try:
-                            tex_v = float(tex_v_value)
-                        except ValueError:
-                            tex_v = float(tex_v_value.rsplit('.', 1)[0])
-
-                        if self.version >= 7:
-                            tex_w_value = self.next()
+    def __init__(self, filepath, memory_map=None):
+        super().__init__(filepath, memory_map)
+        try:
+            self.version = int(self.next())
+            version_list = [1, 2, 3, 4, 5, 6, 7]
+            if not self.version in version_list:
+                raise global_functions.AssetParseError("Importer does not support this ASS version")
+
+            self.skip(4) # skip header
+            self.materials = []
+            self.objects = []
+            self.instances = []
+            material_count = int(self.next())
+            used_material_names = []
+            for idx, material in enumerate(range(material_count)):
+                name = self.next().strip('\"')
+                scene_name = name
+                file_name = ""
+                if self.version >= 3:
+                    if scene_name in used_material_names:
+                        file_name = name
+                        duplicate_name = None
+                        loop_count = 1
+                        while duplicate_name == None:
+                            while_name = name + "." + str(loop_count).zfill(3)
+                            if not while_name in used_material_names:
+                                duplicate_name = while_name
+
+                            loop_count += 1
+
+                        scene_name = duplicate_name
+
+                used_material_names.append(scene_name)
+                material_effect = self.next().strip('\"')
+                material_strings = []
+                if self.version >= 4:
+                    material_string_count = int(self.next())
+                    for string in range(material_string_count):
+                        material_strings.append(self.next().strip('\"'))
+
+                self.materials.append(ASSAsset.Material(scene_name, file_name, None, None, None, None, None, material_effect, material_strings))
+
+            object_count = int(self.next())
+            for object in range(object_count):
+                vertices = global_functions.VertexBuffer(3, self.version >= 7)
+                node_index_list = []
+                triangles = global_functions.TriangleBuffer()
+                geo_class = self.next().strip('\"')
+                xref_path = self.next().strip('\"')
+                xref_name = self.next().strip('\"')
+                material_index = -1
+                radius = 2
+                extents = [1.0, 1.0, 1.0]
+                height = 1
+                light_properties = None
+                if geo_class == 'SPHERE':
+                    material_index = int(self.next())
+                    radius = float(self.next())
+
+                elif geo_class == 'BOX':
+                    material_index = int(self.next())
+                    extents = self.next_vector()
+
+                elif geo_class == 'PILL':
+                    material_index = int(self.next())
+                    height = float(self.next())
+                    radius = float(self.next())
+
+                elif geo_class == 'MESH':
+                    vert_count = int(self.next())
+                    for vert in range(vert_count):
+                        node_set = []
+                        uv_set = []
+                        color = None
+                        translation = self.next_vector()
+                        normal = self.next_vector()
+                        if self.version >= 6:
+                            color = self.next_vector()
+                        node_influence_count = int(self.next())
+                        for node in range(node_influence_count):
+                            node_index = int(self.next())
+                            if not node_index in node_index_list:
+                                node_index_list.append(node_index)
+
+                            node_weight = float(self.next())
+                            node_set.append([node_index, node_weight])
+
+                        uv_count = int(self.next())
+                        for uv in range(uv_count):
+                            tex_u_value = self.next()
+                            tex_v_value = self.next()
+                            tex_w_value = None
+                            tex_w = None
 
                             try:
-                                tex_w = float(tex_w_value)
+                                tex_u = float(tex_u_value)
                             except ValueError:
-                                tex_w = float(tex_w_value.rsplit('.', 1)[0])
+                                tex_u = float(tex_u_value.rsplit('.', 1)[0])
 
-                        uv_set.append([tex_u, tex_v, tex_w])
+                            try:
+                                tex_v = float(tex_v_value)
+                            except ValueError:
+                                tex_v = float(tex_v_value.rsplit('.', 1)[0])
 
-                    vertices.append(ASSAsset.Vertex(node_influence_count, node_set, translation, normal, color, uv_set))
+                            if self.version >= 7:
+                                tex_w_value = self.next()
 
-                triangle_count = int(self.next())
-                for triangle in range(triangle_count):
-                    material_index = int(self.next())
-                    v0 = int(self.next())
-                    v1 = int(self.next())
-                    v2 = int(self.next())
-
-                    triangles.append(ASSAsset.Triangle(material_index, v0, v1, v2))
-
-            elif geo_class == 'GENERIC_LIGHT':
-                light_type = self.next().strip('\"')
-                light_color = self.next_vector()
-                intensity = float(self.next())
-                hotspot_size = float(self.next())
-                hotspot_falloff_size = float(self.next())
-                uses_near_attenuation = int(self.next())
-                near_attenuation_start = float(self.next())
-                near_attenuation_end = float(self.next())
-                uses_far_attenuation = int(self.next())
-                far_attenuation_start = float(self.next())
-                far_attenuation_end = float(self.next())
-                light_shape = int(self.next())
-                light_aspect_ratio = float(self.next())
-
-                light_properties = ASSAsset.Light(light_type, light_color, intensity, hotspot_size, hotspot_falloff_size, uses_near_attenuation, near_attenuation_start, near_attenuation_end, uses_far_attenuation, far_attenuation_start, far_attenuation_end, light_shape, light_aspect_ratio)
+                                try:
+                                    tex_w = float(tex_w_value)
+                                except ValueError:
+                                    tex_w = float(tex_w_value.rsplit('.', 1)[0])
 
-            else:
-                print("Bad object")
-
-            self.objects.append(ASSAsset.Object(geo_class,
-                                                xref_path,
-                                                xref_name,
-                                                material_index,
-                                                radius,
-                                                extents,
-                                                height,
-                                                vertices,
-                                                triangles,
-                                                light_properties,
-                                                node_index_list
-                                                ))
-
-        name_list = []
-        instance_count = int(self.next())
-        for instance in range(instance_count):
-            object_index = int(self.next())
-            bone_influence_count = 0
-            if not object_index == -1:
-                object_element = self.objects[object_index]
-                bone_influence_count = len(object_element.node_index_list)
+                            uv_set.append([tex_u, tex_v, tex_w])
 
-            name = self.next().strip('\"')
-            if name in name_list:
-                true_name = '%s_%s' % (name, instance)
+                        vertices.append(ASSAsset.Vertex(node_influence_count, node_set, translation, normal, color, uv_set))
 
-            else:
-                true_name = name
+                    triangle_count = int(self.next())
+                    for triangle in range(triangle_count):
+                        material_index = int(self.next())
+                        v0 = int(self.next())
+                        v1 = int(self.next())
+                        v2 = int(self.next())
 
-            name_list.append(name)
-            unique_id = int(self.next())
-            parent_id = int(self.next())
-            inheritance_flag = int(self.next())
-            if self.version == 1:
-                local_transform = self.next_transform_legacy()
-                pivot_transform = self.next_transform_legacy()
+                        triangles.append(ASSAsset.Triangle(material_index, v0, v1, v2))
 
-            else:
-                local_transform = self.next_transform()
-                pivot_transform = self.next_transform()
+                    vertices.finalize()
+                    triangles.finalize()
+
+                elif geo_class == 'GENERIC_LIGHT':
+                    light_type = self.next().strip('\"')
+                    light_color = self.next_vector()
+                    intensity = float(self.next())
+                    hotspot_size = float(self.next())
+                    hotspot_falloff_size = float(self.next())
+                    uses_near_attenuation = int(self.next())
+                    near_attenuation_start = float(self.next())
+                    near_attenuation_end = float(self.next())
+                    uses_far_attenuation = int(self.next())
+                    far_attenuation_start = float(self.next())
+                    far_attenuation_end = float(self.next())
+                    light_shape = int(self.next())
+                    light_aspect_ratio = float(self.next())
 
-            if bone_influence_count > 0:
-                self.skip(bone_influence_count)
+                    light_properties = ASSAsset.Light(light_type, light_color, intensity, hotspot_size, hotspot_falloff_size, uses_near_attenuation, near_attenuation_start, near_attenuation_end, uses_far_attenuation, far_attenuation_start, far_attenuation_end, light_shape, light_aspect_ratio)
 
-            self.instances.append(ASSAsset.Instance(true_name, object_index, unique_id, parent_id, inheritance_flag, local_transform, pivot_transform))
+                else:
+                    print("Bad object")
+
+                self.objects.append(ASSAsset.Object(geo_class,
+                                                    xref_path,
+                                                    xref_name,
+                                                    material_index,
+                                                    radius,
+                                                    extents,
+                                                    height,
+                                                    vertices,
+                                                    triangles,
+                                                    light_properties,
+                                                    node_index_list
+                                                    ))
+
+            name_list = []
+            instance_count = int(self.next())
+            for instance in range(instance_count):
+                object_index = int(self.next())
+                bone_influence_count = 0
+                if not object_index == -1:
+                    object_element = self.objects[object_index]
+                    bone_influence_count = len(object_element.node_index_list)
 
-        if self.left() != 0: # is something wrong with the parser?
-            raise RuntimeError("%s elements left after parse end" % self.left())
+                name = self.next().strip('\"')
+                if name in name_list:
+                    true_name = '%s_%s' % (name, instance)
+
+                else:
+                    true_name = name
+
+                name_list.append(name)
+                unique_id = int(self.next())
+                parent_id = int(self.next())
+                inheritance_flag = int(self.next())
+                if self.version == 1:
+                    local_transform = self.next_transform_legacy()
+                    pivot_transform = self.next_transform_legacy()
+
+                else:
+                    local_transform = self.next_transform()
+                    pivot_transform = self.next_transform()
+
+                if bone_influence_count > 0:
+                    self.skip(bone_influence_count)
+
+                self.instances.append(ASSAsset.Instance(true_name, object_index, unique_id, parent_id, inheritance_flag, local_transform, pivot_transform))
+
+            if self.left() != 0: # is something wrong with the parser?
+                raise RuntimeError("%s elements left after parse end" % self.left())
+
+        finally:
+            # Release the memory mapped source file when parsing stops early
+            self.close()
 
 def set_ass_material_properties(ass_mat, mat):
     material_effect = ass_mat.material_effect
@@ -415,12 +425,12 @@ def set_primitive_material(object_material_index, ass_file, mesh):
         if mesh.materials:
             mesh.materials[0] = bpy.data.materials[mat.name]
 
-def load_file(context, filepath, report):
-    ass_file = ASSAsset(filepath)
+def load_file(context, filepath, report, use_asset_cache=False, verify_cache_hash=False, weld_vertices=False, weld_distance=0.0):
+    ass_file = asset_cache.load_asset(ASSAsset, filepath, (), use_asset_cache, verify_cache_hash)
 
     collection = context.collection
     random_color_gen = global_functions.RandomColorGenerator() # generates a random sequence of colors
-    mesh_vertex_groups = []
+    template_meshes = mesh_processing.TemplateMeshes()
 
     mesh_processing.deselect_objects(context)
 
@@ -474,6 +484,10 @@ def load_file(context, filepath, report):
 
                     if geo_class == 'GENERIC_LIGHT':
                         object_data = bpy.data.lights.new(instance.name, light_type)
+                    elif geo_class == 'PILL':
+                        object_data = template_meshes.copy('CAPSULES', "%s" % idx)
+                    elif geo_class == 'SPHERE' or geo_class == 'BOX':
+                        object_data = template_meshes.copy(geo_class, "%s" % idx)
                     else:
                         object_data = bpy.data.meshes.new("%s" % idx)
 
@@ -511,63 +525,31 @@ def load_file(context, filepath, report):
                     elif geo_class == 'PILL':
                         set_primitive_material(object_material_index, ass_file, object_data)
 
-                        bm = bmesh.new()
-                        bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=False, segments=12, diameter1=1, diameter2=1, depth=2)
-                        bm.transform(Matrix.Translation((0, 0, 1)))
-                        bm.to_mesh(object_data)
-                        bm.free()
-
                         object_mesh.data.ass_jms.Object_Type = 'CAPSULES'
                         object_dimension = object_radius * 2
                         object_mesh.dimensions = (object_dimension, object_dimension, (object_dimension + object_height))
 
-                        mesh_processing.select_object(context, object_mesh)
-                        bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
-                        mesh_processing.deselect_objects(context)
+                        mesh_processing.apply_object_scale(object_mesh)
 
                     elif geo_class == 'SPHERE':
                         set_primitive_material(object_material_index, ass_file, object_data)
 
-                        bm = bmesh.new()
-                        bmesh.ops.create_uvsphere(bm, u_segments=32, v_segments=16, diameter=1)
-                        bm.to_mesh(object_data)
-                        bm.free()
-
                         object_mesh.data.ass_jms.Object_Type = 'SPHERE'
                         object_dimension = object_radius * 2
                         object_mesh.dimensions = (object_dimension, object_dimension, object_dimension)
 
-                        mesh_processing.select_object(context, object_mesh)
-                        bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
-                        mesh_processing.deselect_objects(context)
+                        mesh_processing.apply_object_scale(object_mesh)
 
                     elif geo_class == 'BOX':
                         set_primitive_material(object_material_index, ass_file, object_data)
 
-                        bm = bmesh.new()
-                        bmesh.ops.create_cube(bm, size=1.0)
-                        bm.to_mesh(object_data)
-                        bm.free()
-
                         object_mesh.data.ass_jms.Object_Type = 'BOX'
                         object_mesh.dimensions = ((object_extents[0] * 2), (object_extents[1] * 2), (object_extents[2] * 2))
 
-                        mesh_processing.select_object(context, object_mesh)
-                        bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
-                        mesh_processing.deselect_objects(context)
+                        mesh_processing.apply_object_scale(object_mesh)
 
                     elif geo_class == 'MESH':
-                        bm, vert_normal_list = mesh_processing.process_mesh_import_data('halo3', ass_file, object_element, object_mesh, random_color_gen, 'ASS')
-
-                        bm.to_mesh(object_data)
-                        bm.free()
-                        object_mesh.data.normals_split_custom_set(vert_normal_list)
-                        object_mesh.data.use_auto_smooth = True
-
-                        for vertex_groups in mesh_vertex_groups:
-                            for group in vertex_groups:
-                                if not group in object_mesh.vertex_groups:
-                                    object_mesh.vertex_groups.new(name = group)
+                        mesh_processing.build_mesh_import_data('halo3', ass_file, object_element, object_mesh, random_color_gen, 'ASS', weld_vertices, weld_distance)
 
                     mesh_list.append(object_data)
 
@@ -626,6 +608,10 @@ def load_file(context, filepath, report):
                 if parent_unique_id >= -1 and parent_parent_id >= -1:
                     object_list[idx].parent = object_list[parent_index]
 
+    template_meshes.remove_templates()
+
+    if use_asset_cache:
+        asset_cache.report_cache_stats(report)
 
     report({'INFO'}, "Import completed successfully")
     return {'FINISHED'}
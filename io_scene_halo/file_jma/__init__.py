@@ -827,6 +827,18 @@ class ImportJMA(Operator, ImportHelper):
         description="Select a path to a JMS containing the secondary skeleton. Will be used for rest position",
         )
 
+    use_asset_cache: BoolProperty(
+        name ="Use Asset Cache",
+        description = "Keep the parsed file in a cache so importing it again skips parsing while the file is unchanged",
+        default = False,
+        )
+
+    verify_cache_hash: BoolProperty(
+        name ="Verify Cache Hash",
+        description = "Hash the file contents to validate a cached result instead of only checking file size and modification time",
+        default = False,
+        )
+
     filter_glob: StringProperty(
         default="*.jma;*.jmm;*.jmt;*.jmo;*.jmr;*.jmrx;*.jmh;*.jmz;*.jmw",
         options={'HIDDEN'},
@@ -843,6 +855,8 @@ class ImportJMA(Operator, ImportHelper):
             parser.add_argument('-arg4', '--fix_rotations', dest='fix_rotations', action='store_true')
             parser.add_argument('-arg5', '--jms_path_a', dest='jms_path_a', type=str, default="")
             parser.add_argument('-arg6', '--jms_path_b', dest='jms_path_b', type=str, default="")
+            parser.add_argument('-arg7', '--use_asset_cache', dest='use_asset_cache', action='store_true')
+            parser.add_argument('-arg8', '--verify_cache_hash', dest='verify_cache_hash', action='store_true')
             args = parser.parse_known_args(argv)[0]
             print('filepath: ', args.filepath)
             print('game_version: ', args.game_version)
@@ -850,14 +864,18 @@ class ImportJMA(Operator, ImportHelper):
             print('fix_rotations: ', args.fix_rotations)
             print('jms_path_a: ', args.jms_path_a)
             print('jms_path_b: ', args.jms_path_b)
+            print('use_asset_cache: ', args.use_asset_cache)
+            print('verify_cache_hash: ', args.verify_cache_hash)
             self.filepath = args.filepath
             self.game_version = args.game_version
             self.fix_parents = args.fix_parents
             self.fix_rotations = args.fix_rotations
             self.jms_path_a = args.jms_path_a
             self.jms_path_b = args.jms_path_b
+            self.use_asset_cache = args.use_asset_cache
+            self.verify_cache_hash = args.verify_cache_hash
 
-        return global_functions.run_code("import_jma.load_file(context, self.filepath, self.report, self.fix_parents, self.game_version, self.jms_path_a, self.jms_path_b, self.fix_rotations)")
+        return global_functions.run_code("import_jma.load_file(context, self.filepath, self.report, self.fix_parents, self.game_version, self.jms_path_a, self.jms_path_b, self.fix_rotations, self.use_asset_cache, self.verify_cache_hash)")
 
     def draw(self, context):
         scene = context.scene
@@ -894,6 +912,17 @@ class ImportJMA(Operator, ImportHelper):
             row.label(text='Secondary JMS:')
             row.prop(self, "jms_path_b", text='')
 
+        box = layout.box()
+        box.label(text="Asset Cache:")
+        col = box.column(align=True)
+        row = col.row()
+        row.label(text='Use Asset Cache:')
+        row.prop(self, "use_asset_cache", text='')
+        if self.use_asset_cache:
+            row = col.row()
+            row.label(text='Verify Cache Hash:')
+            row.prop(self, "verify_cache_hash", text='')
+
 def menu_func_export(self, context):
     self.layout.operator(ExportJMA.bl_idname, text="Halo Jointed Model Animation (.jma)")
 
@@ -71,44 +71,32 @@ class JMAScene(global_functions.HaloAsset):
         self.biped_controller_transforms = []
         self.nodes = []
 
-        sorted_list = global_functions.sort_list(node_list, armature, game_version, version, False)
-        joined_list = sorted_list[0]
-        reversed_joined_list = sorted_list[1]
+        joined_list = global_functions.get_node_hierarchy(node_list, armature, game_version, version, False)
 
         blend_scene = global_functions.BlendScene(0, armature_count, 0, 0, 0, 0, armature, node_list, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None)
         global_functions.validate_halo_jma_scene(game_version, version, blend_scene, object_list, extension)
 
         self.node_checksum = 0
-        for node in joined_list:
+        for node_idx, node in enumerate(joined_list):
             name = node.name
-            find_child_node = global_functions.get_child(node, reversed_joined_list)
-            find_sibling_node = global_functions.get_sibling(armature, node, reversed_joined_list)
-            first_child_node = -1
-            first_sibling_node = -1
-            parent_node = -1
-            if not find_child_node == None:
-                first_child_node = joined_list.index(find_child_node)
-
-            if not find_sibling_node == None:
-                first_sibling_node = joined_list.index(find_sibling_node)
-
-            if not node.parent == None:
-                parent_node = joined_list.index(node.parent)
+            first_child_node = joined_list.first_child_indices[node_idx]
+            first_sibling_node = joined_list.next_sibling_indices[node_idx]
+            parent_node = joined_list.parent_indices[node_idx]
 
             self.nodes.append(JMAScene.Node(name, parent_node, first_child_node, first_sibling_node))
 
         if generate_checksum:
             self.node_checksum = global_functions.node_hierarchy_checksum(self.nodes, self.nodes[0], self.node_checksum)
 
-        for frame in range(first_frame, last_frame):
+        transform_cache = global_functions.TransformCache(armature, joined_list, version, 'JMA', custom_scale, fix_rotations)
+        is_bone = False
+        if armature:
+            is_bone = True
+
+        for frame in global_functions.sample_frames(context, first_frame, last_frame, (transform_cache,)):
             transforms_for_frame = []
             for node in joined_list:
-                context.scene.frame_set(frame)
-                is_bone = False
-                if armature:
-                    is_bone = True
-
-                bone_matrix = global_functions.get_matrix(node, node, True, armature, joined_list, True, version, 'JMA', False, custom_scale, fix_rotations)
+                bone_matrix = transform_cache.get_matrix(node, node, True, True, False)
                 mesh_dimensions = global_functions.get_dimensions(bone_matrix, node, version, None, False, is_bone, 'JMA', custom_scale)
                 rotation = (mesh_dimensions.quaternion[0], mesh_dimensions.quaternion[1], mesh_dimensions.quaternion[2], mesh_dimensions.quaternion[3])
                 translation = (mesh_dimensions.position[0], mesh_dimensions.position[1], mesh_dimensions.position[2])
@@ -120,9 +108,9 @@ class JMAScene(global_functions.HaloAsset):
 
         #H2 specific biped controller data bool value.
         if version > 16394 and biped_controller:
-            for frame in range(self.transform_count):
-                context.scene.frame_set(frame)
-                armature_matrix = global_functions.get_matrix(armature, armature, True, None, joined_list, False, version, 'JMA', False, custom_scale, fix_rotations)
+            armature_transform_cache = global_functions.TransformCache(None, joined_list, version, 'JMA', custom_scale, fix_rotations)
+            for frame in global_functions.sample_frames(context, 0, self.transform_count, (armature_transform_cache,)):
+                armature_matrix = armature_transform_cache.get_matrix(armature, armature, True, False, False)
                 mesh_dimensions = global_functions.get_dimensions(armature_matrix, armature, version, None, False, False, 'JMA', custom_scale)
 
                 rotation = (mesh_dimensions.quaternion[0], mesh_dimensions.quaternion[1], mesh_dimensions.quaternion[2], mesh_dimensions.quaternion[3])
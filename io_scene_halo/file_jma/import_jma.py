@@ -31,7 +31,7 @@ from math import radians
 from enum import Flag, auto
 from mathutils import Matrix
 from ..file_jms import import_jms
-from ..global_functions import mesh_processing, global_functions
+from ..global_functions import mesh_processing, global_functions, asset_cache, skeleton_index
 
 class JMAAsset(global_functions.HaloAsset):
     """
@@ -80,86 +80,91 @@ class JMAAsset(global_functions.HaloAsset):
 
         return JMAAsset.Transform(translation, rotation, scale)
 
-    def __init__(self, filepath, game_version, report):
-        super().__init__(filepath)
-        extension = global_functions.get_true_extension(filepath, None, True)
-        self.broken_skeleton = False
-        self.node_checksum = -1
-        self.version = int(self.next())
-        version_list = (16390,16391,16392,16393,16394,16395)
-        if not self.version in version_list:
-            raise global_functions.AssetParseError("Importer does not support this " + extension + " version")
+    def __init__(self, filepath, game_version, report, memory_map=None):
+        super().__init__(filepath, memory_map)
+        try:
+            extension = global_functions.get_true_extension(filepath, None, True)
+            self.broken_skeleton = False
+            self.node_checksum = -1
+            self.version = int(self.next())
+            version_list = (16390,16391,16392,16393,16394,16395)
+            if not self.version in version_list:
+                raise global_functions.AssetParseError("Importer does not support this " + extension + " version")
+
+            self.game_version = game_version
+            if game_version == 'auto':
+                self.game_version = global_functions.get_game_version(self.version, 'JMA')
+
+            if self.version >= 16394:
+                self.node_checksum = int(self.next())
+
+            transform_count = int(self.next())
+            self.frame_rate = float(self.next())
+            actor_count = int(self.next())
+            self.actor_name = self.next()
+            self.frame_count = transform_count
+
+            if actor_count != 1:
+                raise global_functions.AssetParseError(extension + " actor count must be 1!")
+
+            node_count = int(self.next())
+            if self.version < 16394:
+                self.node_checksum = int(self.next())
+
+            self.nodes = []
+            self.transforms = []
+            if self.version >= 16394:
+                for _ in range(node_count):
+                    name = self.next()
+                    parent = int(self.next())
+                    self.nodes.append(JMAAsset.Node(name, parent=parent))
+
+            elif self.version >= 16392:
+                for _ in range(node_count):
+                    name = self.next()
+                    child = int(self.next())
+                    sibling = int(self.next())
+                    self.nodes.append(JMAAsset.Node(name, child=child, sibling=sibling))
+
+            elif self.version == 16391:
+                for _ in range(node_count):
+                  self.nodes.append(JMAAsset.Node(self.next()))
 
-        self.game_version = game_version
-        if game_version == 'auto':
-            self.game_version = global_functions.get_game_version(self.version, 'JMA')
-
-        if self.version >= 16394:
-            self.node_checksum = int(self.next())
-
-        transform_count = int(self.next())
-        self.frame_rate = float(self.next())
-        actor_count = int(self.next())
-        self.actor_name = self.next()
-        self.frame_count = transform_count
-
-        if actor_count != 1:
-            raise global_functions.AssetParseError(extension + " actor count must be 1!")
-
-        node_count = int(self.next())
-        if self.version < 16394:
-            self.node_checksum = int(self.next())
-
-        self.nodes = []
-        self.transforms = []
-        if self.version >= 16394:
-            for _ in range(node_count):
-                name = self.next()
-                parent = int(self.next())
-                self.nodes.append(JMAAsset.Node(name, parent=parent))
-
-        elif self.version >= 16392:
-            for _ in range(node_count):
-                name = self.next()
-                child = int(self.next())
-                sibling = int(self.next())
-                self.nodes.append(JMAAsset.Node(name, child=child, sibling=sibling))
-
-        elif self.version == 16391:
-            for _ in range(node_count):
-              self.nodes.append(JMAAsset.Node(self.next()))
+            else:
+                self.node_count = node_count
 
-        else:
-            self.node_count = node_count
+            for _ in range(transform_count):
+                transforms_for_frame = []
 
-        for _ in range(transform_count):
-            transforms_for_frame = []
+                for node_idx in range(node_count):
+                    transforms_for_frame.append(self.next_transform())
 
-            for node_idx in range(node_count):
-                transforms_for_frame.append(self.next_transform())
+                self.transforms.append(transforms_for_frame)
 
-            self.transforms.append(transforms_for_frame)
+            self.biped_controller_frame_type = JMAAsset.BipedControllerFrameType.DISABLE
+            if self.version == 16395:
+                self.biped_controller_transforms = []
+                biped_controller_enabled = int(self.next())
+                if biped_controller_enabled > 0:
+                    # different animation file types use the data differently
+                    if extension == 'jma':
+                        self.biped_controller_frame_type = JMAAsset.BipedControllerFrameType.JMA
 
-        self.biped_controller_frame_type = JMAAsset.BipedControllerFrameType.DISABLE
-        if self.version == 16395:
-            self.biped_controller_transforms = []
-            biped_controller_enabled = int(self.next())
-            if biped_controller_enabled > 0:
-                # different animation file types use the data differently
-                if extension == 'jma':
-                    self.biped_controller_frame_type = JMAAsset.BipedControllerFrameType.JMA
+                    elif extension == 'jmt':
+                        self.biped_controller_frame_type = JMAAsset.BipedControllerFrameType.JMT
 
-                elif extension == 'jmt':
-                    self.biped_controller_frame_type = JMAAsset.BipedControllerFrameType.JMT
+                    elif extension == 'jmrx':
+                        self.biped_controller_frame_type = JMAAsset.BipedControllerFrameType.JMRX
 
-                elif extension == 'jmrx':
-                    self.biped_controller_frame_type = JMAAsset.BipedControllerFrameType.JMRX
+                    for _ in range(transform_count):
+                        self.biped_controller_transforms.append(self.next_transform())
 
-                for _ in range(transform_count):
-                    self.biped_controller_transforms.append(self.next_transform())
+            if self.left() != 0: # is something wrong with the parser?
+                raise RuntimeError("%s elements left after parse end" % self.left())
 
-        if self.left() != 0: # is something wrong with the parser?
-            raise RuntimeError("%s elements left after parse end" % self.left())
+        finally:
+            # Release the memory mapped source file when parsing stops early
+            self.close()
 
         # update node graph
         if self.version >= 16394:
@@ -431,57 +436,43 @@ def jms_file_check(jms_a_file, jms_b_file, jma_nodes):
 
     return jms_a_nodes, jms_b_nodes, warning
 
-def load_file(context, filepath, report, fix_parents, game_version, jms_path_a, jms_path_b, fix_rotations):
+def load_file(context, filepath, report, fix_parents, game_version, jms_path_a, jms_path_b, fix_rotations, use_asset_cache=False, verify_cache_hash=False):
     jms_a_file = None
     jms_b_file = None
 
-    jma_file = JMAAsset(filepath, game_version, report)
+    jma_file = asset_cache.load_asset(JMAAsset, filepath, (game_version, report), use_asset_cache, verify_cache_hash)
     if path.exists(bpy.path.abspath(jms_path_a)):
-        jms_a_file = import_jms.JMSAsset(bpy.path.abspath(jms_path_a), "auto")
+        jms_a_file = asset_cache.load_asset(import_jms.JMSAsset, bpy.path.abspath(jms_path_a), ("auto",), use_asset_cache, verify_cache_hash)
 
     if path.exists(bpy.path.abspath(jms_path_a)) and path.exists(bpy.path.abspath(jms_path_b)):
-        jms_b_file = import_jms.JMSAsset(bpy.path.abspath(jms_path_b), "auto")
+        jms_b_file = asset_cache.load_asset(import_jms.JMSAsset, bpy.path.abspath(jms_path_b), ("auto",), use_asset_cache, verify_cache_hash)
 
     collection = context.collection
     scene = context.scene
     view_layer = context.view_layer
     armature = None
-    object_list = list(scene.objects)
+    scene_armatures = [obj for obj in scene.objects if obj.type == 'ARMATURE']
+    if jma_file.version == 16390:
+        for obj in scene_armatures:
+            if len(obj.data.bones) == jma_file.node_count:
+                armature = obj
+                break
+
+    else:
+        armature, partial_match = skeleton_index.skeleton_index.find_armature(scene_armatures, jma_file.nodes)
+        if partial_match:
+            scene_nodes = skeleton_index.skeleton_index.get_entry(partial_match).names
+            for jma_node in jma_file.nodes:
+                if not jma_node.name in scene_nodes:
+                    report({'WARNING'}, "Node '%s' not found in an existing armature" % jma_node.name)
+
+    if armature:
+        mesh_processing.select_object(context, armature)
 
-    scene_nodes = []
     jma_nodes = []
-    for obj in object_list:
-        if armature is None:
-            if obj.type == 'ARMATURE':
-                is_armature_good = False
-                if jma_file.version == 16390:
-                    if len(obj.data.bones) == jma_file.node_count:
-                        is_armature_good = True
-
-                else:
-                    exist_count = 0
-                    armature_bone_list = list(obj.data.bones)
-                    for node in armature_bone_list:
-                        for jma_node in jma_file.nodes:
-                            if node.name == jma_node.name:
-                                scene_nodes.append(node.name)
-                                exist_count += 1
-
-                    if exist_count == len(jma_file.nodes):
-                        is_armature_good = True
-
-                if is_armature_good:
-                    armature = obj
-                    mesh_processing.select_object(context, armature)
-
     for jma_node in jma_file.nodes:
         jma_nodes.append(jma_node.name)
 
-    if len(scene_nodes) > 0:
-        for jma_node in jma_nodes:
-            if not jma_node in scene_nodes:
-                report({'WARNING'}, "Node '%s' not found in an existing armature" % jma_node)
-
     if armature == None:
         parent_id_class = global_functions.ParentIDFix()
         jms_a_nodes, jms_b_nodes, warning = jms_file_check(jms_a_file, jms_b_file, jma_nodes)
@@ -578,6 +569,9 @@ def load_file(context, filepath, report, fix_parents, game_version, jms_path_a,
 
     scene.frame_set(1)
     bpy.ops.object.mode_set(mode = 'OBJECT')
+    if use_asset_cache:
+        asset_cache.report_cache_stats(report)
+
     report({'INFO'}, "Import completed successfully")
     return {'FINISHED'}
 
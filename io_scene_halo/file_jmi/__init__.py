@@ -519,6 +519,18 @@ class ExportJMI(Operator, ExportHelper):
         default = False,
         )
 
+    write_concurrently: BoolProperty(
+        name ="Write Files Concurrently",
+        description = "Write the JMS files for each world node in background processes while the next one is being built",
+        default = False,
+        )
+
+    incremental_export: BoolProperty(
+        name ="Incremental Export",
+        description = "Compare each file against the export manifest in its folder and leave it untouched when its contents did not change",
+        default = False,
+        )
+
     use_scene_properties: BoolProperty(
         name ="Use scene properties",
         description = "Use the options set in the scene or uncheck this to override",
@@ -629,6 +641,8 @@ class ExportJMI(Operator, ExportHelper):
             parser.add_argument('-arg16', '--scale_enum', dest='scale_enum', type=str, default="0")
             parser.add_argument('-arg17', '--scale_float', dest='scale_float', type=float, default=1.0)
             parser.add_argument('-arg18', '--console', dest='console', action='store_true', default=True)
+            parser.add_argument('-arg19', '--write_concurrently', dest='write_concurrently', action='store_true')
+            parser.add_argument('-arg20', '--incremental_export', dest='incremental_export', action='store_true')
             args = parser.parse_known_args(argv)[0]
             print('filepath: ', args.filepath)
             print('game_version: ', args.game_version)
@@ -649,6 +663,8 @@ class ExportJMI(Operator, ExportHelper):
             print('scale_enum: ', args.scale_enum)
             print('scale_float: ', args.scale_float)
             print('console: ', args.console)
+            print('write_concurrently: ', args.write_concurrently)
+            print('incremental_export: ', args.incremental_export)
             self.filepath = args.filepath
             self.game_version = args.game_version
             self.jmi_version = args.jmi_version
@@ -668,8 +684,10 @@ class ExportJMI(Operator, ExportHelper):
             self.scale_enum = args.scale_enum
             self.scale_float = args.scale_float
             self.console = args.console
+            self.write_concurrently = args.write_concurrently
+            self.incremental_export = args.incremental_export
 
-        return global_functions.run_code("export_jmi.write_file(context, self.filepath, self.report, self.jmi_version, self.jmi_version_ce, self.jmi_version_h2, self.jmi_version_h3, self.apply_modifiers, self.triangulate_faces, self.folder_type, self.edge_split, self.use_edge_angle, self.use_edge_sharp, self.split_angle, self.clean_normalize_weights, self.scale_enum, self.scale_float, self.console, self.hidden_geo, self.export_render, self.export_collision, self.export_physics, self.game_version, self.fix_rotations)")
+        return global_functions.run_code("export_jmi.write_file(context, self.filepath, self.report, self.jmi_version, self.jmi_version_ce, self.jmi_version_h2, self.jmi_version_h3, self.apply_modifiers, self.triangulate_faces, self.folder_type, self.edge_split, self.use_edge_angle, self.use_edge_sharp, self.split_angle, self.clean_normalize_weights, self.scale_enum, self.scale_float, self.console, self.hidden_geo, self.export_render, self.export_collision, self.export_physics, self.game_version, self.fix_rotations, self.write_concurrently, self.incremental_export)")
 
     def draw(self, context):
         scene = context.scene
@@ -764,6 +782,12 @@ class ExportJMI(Operator, ExportHelper):
         row.label(text='Use Edge Split:')
         row.prop(self, "edge_split", text='')
         row = col.row()
+        row.label(text='Write Files Concurrently:')
+        row.prop(self, "write_concurrently", text='')
+        row = col.row()
+        row.label(text='Incremental Export:')
+        row.prop(self, "incremental_export", text='')
+        row = col.row()
         row.label(text='Use Scene Export Settings:')
         row.prop(scene_jmi, "use_scene_properties", text='')
 
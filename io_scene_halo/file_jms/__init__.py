@@ -24,6 +24,7 @@
 #
 # ##### END MIT LICENSE BLOCK #####
 
+import os
 import bpy
 import sys
 import argparse
@@ -37,12 +38,14 @@ from bpy_extras.io_utils import (
 
 from bpy.types import (
         Operator,
+        OperatorFileListElement,
         Panel,
         PropertyGroup
         )
 
 from bpy.props import (
         BoolProperty,
+        CollectionProperty,
         EnumProperty,
         FloatProperty,
         PointerProperty,
@@ -243,6 +246,15 @@ class JMS_SceneProps(Panel):
         row.label(text='Fix Rotations:')
         row.prop(scene_jms, "fix_rotations", text='')
         row = col.row()
+        row.label(text='Weld Vertices:')
+        row.prop(scene_jms, "weld_vertices", text='')
+        row = col.row()
+        row.label(text='Write Files Concurrently:')
+        row.prop(scene_jms, "write_concurrently", text='')
+        row = col.row()
+        row.label(text='Incremental Export:')
+        row.prop(scene_jms, "incremental_export", text='')
+        row = col.row()
         row.label(text='Use As Default Export Settings:')
         row.prop(scene_jms, "use_scene_properties", text='')
         if scene_jms.folder_structure == True and not scene_jms.game_version == 'haloce':
@@ -427,6 +439,24 @@ class JMS_ScenePropertiesGroup(PropertyGroup):
         default = False,
         )
 
+    weld_vertices: BoolProperty(
+        name ="Weld Vertices",
+        description = "Share vertices between triangles when their position, normal, UVs, color and node weights match at the precision the file is written at",
+        default = False,
+        )
+
+    write_concurrently: BoolProperty(
+        name ="Write Files Concurrently",
+        description = "Write the render, collision and physics files in background processes while the next file is being built",
+        default = False,
+        )
+
+    incremental_export: BoolProperty(
+        name ="Incremental Export",
+        description = "Compare each file against the export manifest in its folder and leave it untouched when its contents did not change",
+        default = False,
+        )
+
     use_scene_properties: BoolProperty(
         name ="Use scene properties",
         description = "Use the options set in the scene or uncheck this to override",
@@ -658,6 +688,24 @@ class ExportJMS(Operator, ExportHelper):
         default = False,
         )
 
+    weld_vertices: BoolProperty(
+        name ="Weld Vertices",
+        description = "Share vertices between triangles when their position, normal, UVs, color and node weights match at the precision the file is written at",
+        default = False,
+        )
+
+    write_concurrently: BoolProperty(
+        name ="Write Files Concurrently",
+        description = "Write the render, collision and physics files in background processes while the next file is being built",
+        default = False,
+        )
+
+    incremental_export: BoolProperty(
+        name ="Incremental Export",
+        description = "Compare each file against the export manifest in its folder and leave it untouched when its contents did not change",
+        default = False,
+        )
+
     use_scene_properties: BoolProperty(
         name ="Use scene properties",
         description = "Use the options set in the scene or uncheck this to override",
@@ -771,6 +819,9 @@ class ExportJMS(Operator, ExportHelper):
             parser.add_argument('-arg21', '--scale_enum', dest='scale_enum', type=str, default="0")
             parser.add_argument('-arg22', '--scale_float', dest='scale_float', type=float, default=1.0)
             parser.add_argument('-arg23', '--console', dest='console', action='store_true', default=True)
+            parser.add_argument('-arg24', '--weld_vertices', dest='weld_vertices', action='store_true')
+            parser.add_argument('-arg25', '--write_concurrently', dest='write_concurrently', action='store_true')
+            parser.add_argument('-arg26', '--incremental_export', dest='incremental_export', action='store_true')
             args = parser.parse_known_args(argv)[0]
             print('filepath: ', args.filepath)
             print('game_version: ', args.game_version)
@@ -795,6 +846,9 @@ class ExportJMS(Operator, ExportHelper):
             print('scale_enum: ', args.scale_enum)
             print('scale_float: ', args.scale_float)
             print('console: ', args.console)
+            print('weld_vertices: ', args.weld_vertices)
+            print('write_concurrently: ', args.write_concurrently)
+            print('incremental_export: ', args.incremental_export)
             self.filepath = args.filepath
             self.game_version = args.game_version
             self.jms_version = args.jms_version
@@ -818,8 +872,11 @@ class ExportJMS(Operator, ExportHelper):
             self.scale_enum = args.scale_enum
             self.scale_float = args.scale_float
             self.console = args.console
+            self.weld_vertices = args.weld_vertices
+            self.write_concurrently = args.write_concurrently
+            self.incremental_export = args.incremental_export
 
-        return global_functions.run_code("export_jms.command_queue(context, self.filepath, self.report, self.jms_version, self.jms_version_ce, self.jms_version_h2, self.jms_version_h3, self.generate_checksum, self.folder_structure, self.folder_type, self.apply_modifiers, self.triangulate_faces, self.fix_rotations, self.edge_split, self.use_edge_angle, self.use_edge_sharp, self.split_angle, self.clean_normalize_weights, self.scale_enum, self.scale_float, self.console, self.permutation_ce, self.level_of_detail_ce, self.hidden_geo, self.export_render, self.export_collision, self.export_physics, self.game_version, None)")
+        return global_functions.run_code("export_jms.command_queue(context, self.filepath, self.report, self.jms_version, self.jms_version_ce, self.jms_version_h2, self.jms_version_h3, self.generate_checksum, self.folder_structure, self.folder_type, self.apply_modifiers, self.triangulate_faces, self.fix_rotations, self.edge_split, self.use_edge_angle, self.use_edge_sharp, self.split_angle, self.clean_normalize_weights, self.scale_enum, self.scale_float, self.console, self.permutation_ce, self.level_of_detail_ce, self.hidden_geo, self.export_render, self.export_collision, self.export_physics, self.game_version, None, self.weld_vertices, self.write_concurrently, None, self.incremental_export)")
 
     def draw(self, context):
         scene = context.scene
@@ -856,6 +913,9 @@ class ExportJMS(Operator, ExportHelper):
             self.use_edge_sharp = scene_jms.use_edge_sharp
             self.scale_enum = scene_jms.scale_enum
             self.scale_float = scene_jms.scale_float
+            self.weld_vertices = scene_jms.weld_vertices
+            self.write_concurrently = scene_jms.write_concurrently
+            self.incremental_export = scene_jms.incremental_export
 
         box = layout.box()
         box.label(text="Game Version:")
@@ -938,6 +998,18 @@ class ExportJMS(Operator, ExportHelper):
         row.label(text='Fix Rotation:')
         row.prop(self, "fix_rotations", text='')
         row = col.row()
+        row.enabled = is_enabled
+        row.label(text='Weld Vertices:')
+        row.prop(self, "weld_vertices", text='')
+        row = col.row()
+        row.enabled = is_enabled
+        row.label(text='Write Files Concurrently:')
+        row.prop(self, "write_concurrently", text='')
+        row = col.row()
+        row.enabled = is_enabled
+        row.label(text='Incremental Export:')
+        row.prop(self, "incremental_export", text='')
+        row = col.row()
         row.label(text='Use Scene Export Settings:')
         row.prop(scene_jms, "use_scene_properties", text='')
         if self.folder_structure == True and not self.game_version == 'haloce':
@@ -1008,6 +1080,32 @@ class ImportJMS(Operator, ImportHelper):
         default = False,
         )
 
+    weld_vertices: BoolProperty(
+        name ="Weld Vertices",
+        description = "Merge triangle corners that share position, normal, UVs, color and weights into one vertex instead of giving every triangle its own vertices",
+        default = False,
+        )
+
+    weld_distance: FloatProperty(
+        name ="Weld Distance",
+        description = "Snap positions to a grid this size before welding so corners slightly apart still merge. 0 only merges identical positions",
+        default = 0.0,
+        min = 0.0,
+        precision = 4,
+        )
+
+    use_asset_cache: BoolProperty(
+        name ="Use Asset Cache",
+        description = "Keep the parsed file in a cache so importing it again skips parsing while the file is unchanged",
+        default = False,
+        )
+
+    verify_cache_hash: BoolProperty(
+        name ="Verify Cache Hash",
+        description = "Hash the file contents to validate a cached result instead of only checking file size and modification time",
+        default = False,
+        )
+
     filter_glob: StringProperty(
         default="*.jms;*.jmp",
         options={'HIDDEN'},
@@ -1023,19 +1121,31 @@ class ImportJMS(Operator, ImportHelper):
             parser.add_argument('-arg3', '--reuse_armature', dest='reuse_armature', action='store_true')
             parser.add_argument('-arg4', '--fix_parents', dest='fix_parents', action='store_true')
             parser.add_argument('-arg5', '--fix_rotations', dest='fix_rotations', action='store_true')
+            parser.add_argument('-arg6', '--use_asset_cache', dest='use_asset_cache', action='store_true')
+            parser.add_argument('-arg7', '--verify_cache_hash', dest='verify_cache_hash', action='store_true')
+            parser.add_argument('-arg8', '--weld_vertices', dest='weld_vertices', action='store_true')
+            parser.add_argument('-arg9', '--weld_distance', dest='weld_distance', type=float, default=0.0)
             args = parser.parse_known_args(argv)[0]
             print('filepath: ', args.filepath)
             print('game_version: ', args.game_version)
             print('reuse_armature: ', args.reuse_armature)
             print('fix_parents: ', args.fix_parents)
             print('fix_rotations: ', args.fix_rotations)
+            print('use_asset_cache: ', args.use_asset_cache)
+            print('verify_cache_hash: ', args.verify_cache_hash)
+            print('weld_vertices: ', args.weld_vertices)
+            print('weld_distance: ', args.weld_distance)
             self.filepath = args.filepath
             self.game_version = args.game_version
             self.reuse_armature = args.reuse_armature
             self.fix_parents = args.fix_parents
             self.fix_rotations = args.fix_rotations
+            self.use_asset_cache = args.use_asset_cache
+            self.verify_cache_hash = args.verify_cache_hash
+            self.weld_vertices = args.weld_vertices
+            self.weld_distance = args.weld_distance
 
-        return global_functions.run_code("import_jms.load_file(context, self.filepath, self.report, self.game_version, self.reuse_armature, self.fix_parents, self.fix_rotations)")
+        return global_functions.run_code("import_jms.load_file(context, self.filepath, self.report, self.game_version, self.reuse_armature, self.fix_parents, self.fix_rotations, self.use_asset_cache, self.verify_cache_hash, self.weld_vertices, self.weld_distance)")
 
     def draw(self, context):
         layout = self.layout
@@ -1060,12 +1170,146 @@ class ImportJMS(Operator, ImportHelper):
         row = col.row()
         row.label(text='Fix Rotations:')
         row.prop(self, "fix_rotations", text='')
+        row = col.row()
+        row.label(text='Weld Vertices:')
+        row.prop(self, "weld_vertices", text='')
+        if self.weld_vertices:
+            row = col.row()
+            row.label(text='Weld Distance:')
+            row.prop(self, "weld_distance", text='')
+
+        box = layout.box()
+        box.label(text="Asset Cache:")
+        col = box.column(align=True)
+        row = col.row()
+        row.label(text='Use Asset Cache:')
+        row.prop(self, "use_asset_cache", text='')
+        if self.use_asset_cache:
+            row = col.row()
+            row.label(text='Verify Cache Hash:')
+            row.prop(self, "verify_cache_hash", text='')
+
+class ImportJMSBatch(Operator, ImportHelper):
+    """Import several JMS files into one armature"""
+    bl_idname = "import_scene.jms_batch"
+    bl_label = "Import JMS Batch"
+    filename_ext = '.JMS'
+    files: CollectionProperty(
+        type=OperatorFileListElement,
+        options={'HIDDEN', 'SKIP_SAVE'},
+        )
+
+    directory: StringProperty(
+        subtype='DIR_PATH',
+        options={'HIDDEN'},
+        )
+
+    game_version: EnumProperty(
+        name="Game:",
+        description="What game was the model file made for",
+        default="auto",
+        items=[ ('auto', "Auto", "Attempt to guess the game this JMS was intended for. Will default to Halo CE if this fails"),
+                ('haloce', "Halo CE", "Import a JMS intended for Halo Custom Edition or Halo 1 MCC"),
+                ('halo2', "Halo 2", "Import a JMS intended for Halo 2 Vista or Halo 2 MCC"),
+                ('halo3', "Halo 3", "Import a JMS intended for Halo 3 MCC"),
+            ]
+        )
+
+    fix_parents: BoolProperty(
+        name ="Force node parents",
+        description = "Force thigh bones to use pelvis and clavicles to use spine1. Used to match node import behavior used by Halo 2, Halo 3, and Halo 3 ODST",
+        default = True,
+        )
+
+    fix_rotations: BoolProperty(
+        name ="Fix Rotations",
+        description = "Set rotations to match what you would visually see in 3DS Max. Rotates bones by 90 degrees on a local Z axis to match how Blender handles rotations",
+        default = False,
+        )
+
+    weld_vertices: BoolProperty(
+        name ="Weld Vertices",
+        description = "Merge triangle corners that share position, normal, UVs, color and weights into one vertex instead of giving every triangle its own vertices",
+        default = False,
+        )
+
+    weld_distance: FloatProperty(
+        name ="Weld Distance",
+        description = "Snap positions to a grid this size before welding so corners slightly apart still merge. 0 only merges identical positions",
+        default = 0.0,
+        min = 0.0,
+        precision = 4,
+        )
+
+    filter_glob: StringProperty(
+        default="*.jms;*.jmp",
+        options={'HIDDEN'},
+        )
+
+    def execute(self, context):
+        from io_scene_halo.file_jms import import_jms
+        filepaths = [os.path.join(self.directory, file.name) for file in self.files if file.name]
+        if '--' in sys.argv:
+            argv = sys.argv[sys.argv.index('--') + 1:]
+            parser = argparse.ArgumentParser()
+            parser.add_argument('-arg1', '--filepaths', dest='filepaths', metavar='FILE', nargs='+', required = True)
+            parser.add_argument('-arg2', '--game_version', dest='game_version', type=str, default="halo2")
+            parser.add_argument('-arg3', '--fix_parents', dest='fix_parents', action='store_true')
+            parser.add_argument('-arg4', '--fix_rotations', dest='fix_rotations', action='store_true')
+            parser.add_argument('-arg5', '--weld_vertices', dest='weld_vertices', action='store_true')
+            parser.add_argument('-arg6', '--weld_distance', dest='weld_distance', type=float, default=0.0)
+            args = parser.parse_known_args(argv)[0]
+            print('filepaths: ', args.filepaths)
+            print('game_version: ', args.game_version)
+            print('fix_parents: ', args.fix_parents)
+            print('fix_rotations: ', args.fix_rotations)
+            print('weld_vertices: ', args.weld_vertices)
+            print('weld_distance: ', args.weld_distance)
+            filepaths = args.filepaths
+            self.game_version = args.game_version
+            self.fix_parents = args.fix_parents
+            self.fix_rotations = args.fix_rotations
+            self.weld_vertices = args.weld_vertices
+            self.weld_distance = args.weld_distance
+
+        if not filepaths:
+            filepaths = [self.filepath]
+
+        return global_functions.run_code("import_jms.load_files(context, filepaths, self.report, self.game_version, self.fix_parents, self.fix_rotations, self.weld_vertices, self.weld_distance)")
+
+    def draw(self, context):
+        layout = self.layout
+        box = layout.box()
+        box.label(text="Game Version:")
+        col = box.column(align=True)
+        row = col.row()
+        row.prop(self, "game_version", text='')
+
+        box = layout.box()
+        box.label(text="Import Options:")
+        col = box.column(align=True)
+        if self.game_version == 'auto' or self.game_version == 'halo2' or self.game_version == 'halo3':
+            row = col.row()
+            row.label(text='Force node parents:')
+            row.prop(self, "fix_parents", text='')
+
+        row = col.row()
+        row.label(text='Fix Rotations:')
+        row.prop(self, "fix_rotations", text='')
+        row = col.row()
+        row.label(text='Weld Vertices:')
+        row.prop(self, "weld_vertices", text='')
+        if self.weld_vertices:
+            row = col.row()
+            row.label(text='Weld Distance:')
+            row.prop(self, "weld_distance", text='')
 
 def menu_func_export(self, context):
     self.layout.operator(ExportJMS.bl_idname, text="Halo Jointed Model Skeleton (.jms)")
 
 def menu_func_import(self, context):
     self.layout.operator(ImportJMS.bl_idname, text="Halo Jointed Model Skeleton (.jms)")
+    self.layout.operator(ImportJMSBatch.bl_idname, text="Halo Jointed Model Skeleton Batch (.jms)")
 
 classeshalo = (
     JMS_MarkerPropertiesGroup,
@@ -1075,6 +1319,7 @@ classeshalo = (
     JMS_PhysicsPropertiesGroup,
     JMS_PhysicsProps,
     ImportJMS,
+    ImportJMSBatch,
     ExportJMS
 )
 
@@ -26,315 +26,37 @@
 
 import os
 import bpy
+import sys
+import multiprocessing
+import numpy as np
 
 from decimal import *
 from math import degrees
 from random import seed, randint
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from mathutils import Vector, Matrix
-from ..global_functions import mesh_processing, global_functions
-
-class JMSScene(global_functions.HaloAsset):
-    class Node:
-        def __init__(self, name, children=None, child=-1, sibling=-1, parent=-1, rotation=None, translation=None):
-            self.name = name
-            self.children = children
-            self.child = child
-            self.sibling = sibling
-            self.parent = parent
-            self.rotation = rotation
-            self.translation = translation
-
-    class Material:
-        def __init__(self, name, texture_path=None, slot=None, lod=None, permutation=None, region=None):
-            self.name = name
-            self.texture_path = texture_path
-            self.slot = slot
-            self.lod = lod
-            self.permutation = permutation
-            self.region = region
-
-    class Marker:
-        def __init__(self, name, region=-1, parent=-1, rotation=None, translation=None, scale=0.0):
-            self.name = name
-            self.region = region
-            self.parent = parent
-            self.rotation = rotation
-            self.translation = translation
-            self.scale = scale
-
-    class XREF:
-        def __init__(self, path, name):
-            self.path = path
-            self.name = name
-
-    class XREF_Marker:
-        def __init__(self, name, unique_identifier=-1, index=-1, rotation=None, translation=None):
-            self.name = name
-            self.unique_identifier = unique_identifier
-            self.index = index
-            self.rotation = rotation
-            self.translation = translation
-
-    class Region:
-        def __init__(self, name):
-            self.name = name
-
-    class Vertex:
-        def __init__(self,
-                     node_influence_count=0,
-                     node_set=None,
-                     region=-1,
-                     translation=None,
-                     normal=None,
-                     color=None,
-                     uv_set=None
-                     ):
-
-            self.node_influence_count = node_influence_count
-            self.node_set = node_set
-            self.region = region
-            self.translation = translation
-            self.normal = normal
-            self.color = color
-            self.uv_set = uv_set
-
-    class Triangle:
-        def __init__(self, region=-1, material_index=-1, v0=-1, v1=-1, v2=-1):
-            self.region = region
-            self.material_index = material_index
-            self.v0 = v0
-            self.v1 = v1
-            self.v2 = v2
-
-    class Sphere:
-        def __init__(self, name, parent_index=-1, material_index=-1, rotation=None, translation=None, scale=0.0):
-            self.name = name
-            self.parent_index = parent_index
-            self.material_index = material_index
-            self.rotation = rotation
-            self.translation = translation
-            self.scale = scale
-
-    class Box:
-        def __init__(self, name, parent_index=-1, material_index=-1, rotation=None, translation=None, width=0.0, length=0.0, height=0.0):
-            self.name = name
-            self.parent_index = parent_index
-            self.material_index = material_index
-            self.rotation = rotation
-            self.translation = translation
-            self.width = width
-            self.length = length
-            self.height = height
-
-    class Capsule:
-        def __init__(self, name, parent_index=-1, material_index=-1, rotation=None, translation=None, height=0.0, radius=0.0):
-            self.name = name
-            self.parent_index = parent_index
-            self.material_index = material_index
-            self.rotation = rotation
-            self.translation = translation
-            self.height = height
-            self.radius = radius
-
-    class Convex_Shape:
-        def __init__(self, name, parent_index=-1, material_index=-1, rotation=None, translation=None, verts=None):
-            self.name = name
-            self.parent_index = parent_index
-            self.material_index = material_index
-            self.rotation = rotation
-            self.translation = translation
-            self.verts = verts
-
-    class Ragdoll:
-        def __init__(self,
-                     name,
-                     attached_index=-1,
-                     referenced_index=-1,
-                     attached_rotation=None,
-                     attached_translation=None,
-                     referenced_rotation=None,
-                     referenced_translation=None,
-                     min_twist=0.0,
-                     max_twist=0.0,
-                     min_cone=0.0,
-                     max_cone=0.0,
-                     min_plane=0.0,
-                     max_plane=0.0,
-                     friction_limit=0.0
-                     ):
-
-            self.name = name
-            self.attached_index = attached_index
-            self.referenced_index = referenced_index
-            self.attached_rotation = attached_rotation
-            self.attached_translation = attached_translation
-            self.referenced_rotation = referenced_rotation
-            self.referenced_translation = referenced_translation
-            self.min_twist = min_twist
-            self.max_twist = max_twist
-            self.min_cone = min_cone
-            self.max_cone = max_cone
-            self.min_plane = min_plane
-            self.max_plane = max_plane
-            self.friction_limit = friction_limit
-
-    class Hinge:
-        def __init__(self, name, body_a_index=-1, body_b_index=-1, body_a_rotation=None, body_a_translation=None, body_b_rotation=None, body_b_translation=None, is_limited=0, friction_limit=0.0, min_angle=0.0, max_angle=0.0):
-            self.name = name
-            self.body_a_index = body_a_index
-            self.body_b_index = body_b_index
-            self.body_a_rotation = body_a_rotation
-            self.body_a_translation = body_a_translation
-            self.body_b_rotation = body_b_rotation
-            self.body_b_translation = body_b_translation
-            self.is_limited = is_limited
-            self.friction_limit = friction_limit
-            self.min_angle = min_angle
-            self.max_angle = max_angle
-
-    class Car_Wheel:
-        def __init__(self, name, chassis_index=-1, wheel_index=-1, chassis_rotation=None, chassis_translation=None, wheel_rotation=None, wheel_translation=None, suspension_rotation=None, suspension_translation=None, suspension_min_limit=0.0, suspension_max_limit=0.0, friction_limit=0.0, velocity=0.0, gain=0.0):
-            self.name = name
-            self.chassis_index = chassis_index
-            self.wheel_index = wheel_index
-            self.chassis_rotation = chassis_rotation
-            self.chassis_translation = chassis_translation
-            self.wheel_rotation = wheel_rotation
-            self.wheel_translation = wheel_translation
-            self.suspension_rotation = suspension_rotation
-            self.suspension_translation = suspension_translation
-            self.suspension_min_limit = suspension_min_limit
-            self.suspension_max_limit = suspension_max_limit
-            self.friction_limit = friction_limit
-            self.velocity = velocity
-            self.gain = gain
-
-    class Point_to_Point:
-        def __init__(self, name, body_a_index=-1, body_b_index=-1, body_a_rotation=None, body_a_translation=None, body_b_rotation=None, body_b_translation=None, constraint_type=0, x_min_limit=0.0, x_max_limit=0.0, y_min_limit=0.0, y_max_limit=0.0, z_min_limit=0.0, z_max_limit=0.0, spring_length=0.0):
-            self.name = name
-            self.body_a_index = body_a_index
-            self.body_b_index = body_b_index
-            self.body_a_rotation = body_a_rotation
-            self.body_a_translation = body_a_translation
-            self.body_b_rotation = body_b_rotation
-            self.body_b_translation = body_b_translation
-            self.constraint_type = constraint_type
-            self.x_min_limit = x_min_limit
-            self.x_max_limit = x_max_limit
-            self.y_min_limit = y_min_limit
-            self.y_max_limit = y_max_limit
-            self.z_min_limit = z_min_limit
-            self.z_max_limit = z_max_limit
-            self.spring_length = spring_length
-
-    class Prismatic:
-        def __init__(self, name, body_a_index=-1, body_b_index=-1, body_a_rotation=None, body_a_translation=None, body_b_rotation=None, body_b_translation=None, is_limited=0, suspension_max_limit=0.0, friction_limit=0.0, min_limit=0.0, max_limit=0.0):
-            self.name = name
-            self.body_a_index = body_a_index
-            self.body_b_index = body_b_index
-            self.body_a_rotation = body_a_rotation
-            self.body_a_translation = body_a_translation
-            self.body_b_rotation = body_b_rotation
-            self.body_b_translation = body_b_translation
-            self.is_limited = is_limited
-            self.friction_limit = friction_limit
-            self.min_limit = min_limit
-            self.max_limit = max_limit
-
-    class Bounding_Sphere:
-        def __init__(self, translation=None, scale=0.0):
-            self.translation = translation
-            self.scale = scale
-
-    class Skylight:
-        def __init__(self, direction=None, radiant_intensity=None, solid_angle=0.0):
-            self.direction = direction
-            self.radiant_intensity = radiant_intensity
-            self.solid_angle = solid_angle
-
-    def __init__(self, version, game_version, generate_checksum, fix_rotations, model_type, blend_scene, custom_scale):
+from ..global_functions import mesh_processing, global_functions, export_manifest, jms_writer
+
+class JMSScene(jms_writer.JMSSceneData):
+    def __init__(self, version, game_version, generate_checksum, fix_rotations, model_type, blend_scene, custom_scale, weld_vertices=False, scene_snapshot=None):
+        super().__init__()
         default_region = mesh_processing.get_default_region_permutation_name(game_version)
         default_permutation = mesh_processing.get_default_region_permutation_name(game_version)
-        region_list = ['unnamed']
-        permutation_list = []
-        self.nodes = []
-        self.materials = []
-        self.markers = []
-        self.xref_instances = []
-        self.xref_markers = []
-        self.regions = []
+        region_list = global_functions.IndexRegistry(['unnamed'])
+        permutation_list = global_functions.IndexRegistry()
         self.geometry_list = []
         self.original_geometry_list = []
-        self.triangles = []
-        self.vertices = []
-        self.spheres = []
-        self.boxes = []
-        self.capsules = []
-        self.convex_shapes = []
-        self.ragdolls = []
-        self.hinges = []
-        self.car_wheels = []
-        self.point_to_points = []
-        self.prismatics = []
-        self.bounding_spheres = []
-        self.skylights = []
-
-        material_list = []
-
-        sorted_list = global_functions.sort_list(blend_scene.node_list, blend_scene.armature, game_version, version, False)
-        joined_list = sorted_list[0]
-        reversed_joined_list = sorted_list[1]
-        self.node_checksum = 0
-        for node in joined_list:
-            is_bone = False
-            if blend_scene.armature:
-                is_bone = True
-
-            find_child_node = global_functions.get_child(node, reversed_joined_list)
-            find_sibling_node = global_functions.get_sibling(blend_scene.armature, node, reversed_joined_list)
-
-            first_child_node = -1
-            first_sibling_node = -1
-            parent_node = -1
-
-            if not find_child_node == None:
-                first_child_node = joined_list.index(find_child_node)
-            if not find_sibling_node == None:
-                first_sibling_node = joined_list.index(find_sibling_node)
-            if not node.parent == None and not node.parent.name.startswith('!'):
-                parent_node = joined_list.index(node.parent)
-
-            bone_matrix = global_functions.get_matrix(node, node, True, blend_scene.armature, joined_list, True, version, 'JMS', False, custom_scale, fix_rotations)
-            mesh_dimensions = global_functions.get_dimensions(bone_matrix, node, version, None, False, is_bone, 'JMS', custom_scale)
-
-            name = node.name
-            child = first_child_node
-            sibling = first_sibling_node
-            parent = parent_node
-
-            current_node_children = []
-            children = []
-            for child_node in node.children:
-                if child_node in joined_list:
-                    current_node_children.append(child_node.name)
-
-            current_node_children.sort()
 
-            if is_bone:
-                for child_node in current_node_children:
-                    children.append(joined_list.index(blend_scene.armature.data.bones[child_node]))
+        material_list = global_functions.IndexRegistry()
 
-            else:
-                for child_node in current_node_children:
-                    children.append(joined_list.index(bpy.data.objects[child_node]))
+        if scene_snapshot is None:
+            scene_snapshot = JMSSceneSnapshot(version, game_version, generate_checksum, fix_rotations, blend_scene, custom_scale)
 
-            rotation = (mesh_dimensions.quaternion[0], mesh_dimensions.quaternion[1], mesh_dimensions.quaternion[2], mesh_dimensions.quaternion[3])
-            translation = (mesh_dimensions.position[0], mesh_dimensions.position[1], mesh_dimensions.position[2])
-
-            self.nodes.append(JMSScene.Node(name, children, child, sibling, parent, rotation, translation))
-
-        if generate_checksum:
-            self.node_checksum = global_functions.node_hierarchy_checksum(self.nodes, self.nodes[0], self.node_checksum)
+        joined_list = scene_snapshot.joined_list
+        transform_cache = scene_snapshot.transform_cache
+        self.nodes = scene_snapshot.nodes
+        self.node_checksum = scene_snapshot.node_checksum
 
         all_marker_list = blend_scene.marker_list
         if model_type == "render":
@@ -356,37 +78,20 @@ class JMSScene(global_functions.HaloAsset):
 
             region_idx = -1
 
-            parent_idx = global_functions.get_parent(blend_scene.armature, marker, joined_list, 0)
-            marker_matrix = global_functions.get_matrix(marker, marker, True, blend_scene.armature, joined_list, False, version, 'JMS', False, custom_scale, fix_rotations)
-            mesh_dimensions = global_functions.get_dimensions(marker_matrix, marker, version, None, False, False, 'JMS', custom_scale)
-
-            rotation = (mesh_dimensions.quaternion[0], mesh_dimensions.quaternion[1], mesh_dimensions.quaternion[2], mesh_dimensions.quaternion[3])
-            translation = (mesh_dimensions.position[0], mesh_dimensions.position[1], mesh_dimensions.position[2])
-            scale = (mesh_dimensions.object_radius)
-
+            parent_idx, rotation, translation, scale = scene_snapshot.get_marker_transform(marker)
             if marker.type == 'EMPTY':
-                scale = (mesh_dimensions.scale[0])
                 if not marker.marker.marker_region == '':
-                    if not marker.marker.marker_region in region_list:
-                        region_list.append(marker.marker.marker_region)
-
-                    region_idx = region_list.index(marker.marker.marker_region)
+                    region_idx = region_list.add(marker.marker.marker_region)
 
             elif marker.type == 'MESH':
                 if marker.face_maps.active:
                     region_face_map_name = marker.face_maps[0].name
-                    if not region_face_map_name in region_list:
-                        region_list.append(region_face_map_name)
-
-                    region_idx = region_list.index(region_face_map_name)
+                    region_idx = region_list.add(region_face_map_name)
 
                 elif not marker.marker.marker_region == '':
-                    if not marker.marker.marker_region in region_list:
-                        region_list.append(marker.marker.marker_region)
-
-                    region_idx = region_list.index(marker.marker.marker_region)
+                    region_idx = region_list.add(marker.marker.marker_region)
 
-            self.markers.append(JMSScene.Marker(marker_name, region_idx, parent_idx[0], rotation, translation, scale))
+            self.markers.append(JMSScene.Marker(marker_name, region_idx, parent_idx, rotation, translation, scale))
 
         if model_type == "render":
             for xref_path in blend_scene.instance_xref_paths:
@@ -401,7 +106,7 @@ class JMSScene(global_functions.HaloAsset):
                 name = int_markers.name
                 unique_identifier = starting_ID - idx
                 index = blend_scene.instance_xref_paths.index(int_markers.data.ass_jms.XREF_path)
-                int_markers_matrix = global_functions.get_matrix(int_markers, int_markers, False, blend_scene.armature, joined_list, False, version, 'JMS', False, custom_scale, fix_rotations)
+                int_markers_matrix = transform_cache.get_matrix(int_markers, int_markers, False, False, False)
                 mesh_dimensions = global_functions.get_dimensions(int_markers_matrix, int_markers, version, None, False, False, 'JMS', custom_scale)
 
                 rotation = (mesh_dimensions.quaternion[0], mesh_dimensions.quaternion[1], mesh_dimensions.quaternion[2], mesh_dimensions.quaternion[3])
@@ -410,7 +115,7 @@ class JMSScene(global_functions.HaloAsset):
                 self.xref_markers.append(JMSScene.XREF_Marker(name, unique_identifier, index, rotation, translation))
 
             for bound_sphere in blend_scene.bounding_sphere_list:
-                bound_sphere_matrix = global_functions.get_matrix(bound_sphere, bound_sphere, False, blend_scene.armature, joined_list, False, version, 'JMS', False, custom_scale, fix_rotations)
+                bound_sphere_matrix = transform_cache.get_matrix(bound_sphere, bound_sphere, False, False, False)
                 mesh_dimensions = global_functions.get_dimensions(bound_sphere_matrix, bound_sphere, version, None, False, False, 'JMS', custom_scale)
                 translation = (mesh_dimensions.position[0], mesh_dimensions.position[1], mesh_dimensions.position[2])
                 scale = mesh_dimensions.object_radius
@@ -432,60 +137,67 @@ class JMSScene(global_functions.HaloAsset):
             if model_type == "collision":
                 geometry_list = blend_scene.collision_geometry_list
 
+            decimal_places = 6
+            if version > 8209:
+                decimal_places = 10
+
+            vertex_count = 0
             for idx, geometry in enumerate(geometry_list):
                 evaluted_mesh = geometry[0]
                 original_geo = geometry[1]
-                vertex_groups = original_geo.vertex_groups.keys()
-                original_geo_matrix = global_functions.get_matrix(original_geo, original_geo, False, blend_scene.armature, joined_list, False, version, "JMS", False, custom_scale, fix_rotations)
-                for idx, face in enumerate(evaluted_mesh.polygons):
-                    face_set = (None, default_permutation, default_region)
+                original_geo_matrix = transform_cache.get_matrix(original_geo, original_geo, False, False, False)
+                mesh_data = mesh_processing.MeshExportData(evaluted_mesh, "JMS", original_geo_matrix, version, custom_scale)
+                node_counts, node_indices, node_weights = mesh_processing.get_export_vertex_weights(evaluted_mesh, blend_scene.armature, original_geo, joined_list, "JMS")
+                face_classes = []
+                for first_face_index, material_slot_index, face_map_idx in mesh_data.face_classes:
+                    lod = None
+                    permutation = default_permutation
+                    region = default_region
                     region_index = -1
                     if game_version == 'haloce':
                         region_index = region_list.index(default_region)
 
-                    lod = face_set[0]
-                    permutation = face_set[1]
-                    region = face_set[2]
-                    if evaluted_mesh.face_maps.active and len(original_geo.face_maps) > 0:
-                        face_map_idx = evaluted_mesh.face_maps.active.data[idx].value
-                        if not face_map_idx == -1:
-                            face_set = mesh_processing.process_mesh_export_face_set(default_permutation, default_region, game_version, original_geo, face_map_idx)
-                            lod = face_set[0]
-                            permutation = face_set[1]
-                            region = face_set[2]
-                            if not region in region_list:
-                                region_list.append(region)
-
-                            region_index = region_list.index(region)
-                            if not game_version == 'haloce':
-                                if not permutation in permutation_list:
-                                    permutation_list.append(permutation)
+                    if not face_map_idx == -1 and len(original_geo.face_maps) > 0:
+                        lod, permutation, region = mesh_processing.process_mesh_export_face_set(default_permutation, default_region, game_version, original_geo, face_map_idx)
+                        region_index = region_list.add(region)
+                        if not game_version == 'haloce':
+                            permutation_list.add(permutation)
 
+                    face = evaluted_mesh.polygons[first_face_index]
                     material = global_functions.get_material(game_version, original_geo, face, evaluted_mesh, lod, region, permutation)
                     material_index = -1
                     if not material == -1:
                         material_list = global_functions.gather_materials(game_version, material, material_list, "JMS")
                         material_index = material_list.index(material)
 
-                    vert_count = len(self.vertices)
-                    v0 = vert_count
-                    v1 = vert_count + 1
-                    v2 = vert_count + 2
-
-                    self.triangles.append(JMSScene.Triangle(region_index, material_index, v0, v1, v2))
-                    for loop_index in face.loop_indices:
-                        vert = evaluted_mesh.vertices[evaluted_mesh.loops[loop_index].vertex_index]
-
-                        region = region_index
-                        scaled_translation, normal = mesh_processing.process_mesh_export_vert(vert, "JMS", original_geo_matrix, version, custom_scale)
-                        uv_set = mesh_processing.process_mesh_export_uv(evaluted_mesh, "JMS", loop_index, version)
-                        color = mesh_processing.process_mesh_export_color(evaluted_mesh, loop_index)
-                        node_influence_count, node_set, node_index_list = mesh_processing.process_mesh_export_weights(vert, blend_scene.armature, original_geo, vertex_groups, joined_list, "JMS")
-
-                        self.vertices.append(JMSScene.Vertex(node_influence_count, node_set, region, scaled_translation, normal, color, uv_set))
+                    face_classes.append((region_index, material_index))
+
+                # Every loop becomes a vertex in face order and every face a triangle over its first three loops
+                face_classes = np.array(face_classes, dtype=np.int32).reshape(-1, 2)
+                face_regions = face_classes[mesh_data.face_class_indices, 0]
+                face_materials = face_classes[mesh_data.face_class_indices, 1]
+                face_loops = mesh_data.face_loops
+                loop_vertices = mesh_data.loop_vertices[face_loops]
+                uvs = mesh_data.uvs[face_loops]
+                self.vertices.append(face_regions[mesh_data.loop_faces],
+                                     mesh_data.translations[loop_vertices],
+                                     mesh_data.normals[loop_vertices],
+                                     node_counts[loop_vertices],
+                                     node_indices[loop_vertices],
+                                     node_weights[loop_vertices],
+                                     np.full(len(face_loops), uvs.shape[1], dtype=np.int32),
+                                     uvs,
+                                     mesh_data.colors[face_loops])
+
+                first_vertices = vertex_count + mesh_data.face_loop_starts
+                self.triangles.append(face_regions, face_materials, np.column_stack((first_vertices, first_vertices + 1, first_vertices + 2)))
+                vertex_count += len(face_loops)
 
                 original_geo.to_mesh_clear()
 
+            if weld_vertices:
+                self.triangles.remap_vertices(self.vertices.weld(decimal_places))
+
         if model_type == "physics":
             for spheres in blend_scene.sphere_list:
                 name = spheres.name.split('$', 1)[1]
@@ -498,11 +210,9 @@ class JMSScene(global_functions.HaloAsset):
                     face_set = spheres.face_maps[0].name.split()
                     lod, permutation, region = global_functions.material_definition_parser(False, face_set, default_region, default_permutation)
 
-                    if not permutation in permutation_list:
-                        permutation_list.append(permutation)
+                    permutation_list.add(permutation)
 
-                    if not region in region_list:
-                        region_list.append(region)
+                    region_list.add(region)
 
                 material = global_functions.get_material(game_version, spheres, face, mesh_sphere, lod, region, permutation)
                 material_index = -1
@@ -510,8 +220,8 @@ class JMSScene(global_functions.HaloAsset):
                     material_list = global_functions.gather_materials(game_version, material, material_list, 'JMS')
                     material_index = material_list.index(material)
 
-                parent_index = global_functions.get_parent(blend_scene.armature, spheres, joined_list, -1)
-                sphere_matrix = global_functions.get_matrix(spheres, spheres, True, blend_scene.armature, joined_list, False, version, 'JMS', False, custom_scale, fix_rotations)
+                parent_index = transform_cache.get_parent(spheres, -1)
+                sphere_matrix = transform_cache.get_matrix(spheres, spheres, True, False, False)
                 mesh_dimensions = global_functions.get_dimensions(sphere_matrix, spheres, version, None, False, False, 'JMS', custom_scale)
 
                 rotation = (mesh_dimensions.quaternion[0], mesh_dimensions.quaternion[1], mesh_dimensions.quaternion[2], mesh_dimensions.quaternion[3])
@@ -533,11 +243,9 @@ class JMSScene(global_functions.HaloAsset):
                     face_set = boxes.face_maps[0].name.split()
                     lod, permutation, region = global_functions.material_definition_parser(False, face_set, default_region, default_permutation)
 
-                    if not permutation in permutation_list:
-                        permutation_list.append(permutation)
+                    permutation_list.add(permutation)
 
-                    if not region in region_list:
-                        region_list.append(region)
+                    region_list.add(region)
 
                 material = global_functions.get_material(game_version, boxes, face, mesh_boxes, lod, region, permutation)
                 material_index = -1
@@ -545,8 +253,8 @@ class JMSScene(global_functions.HaloAsset):
                     material_list = global_functions.gather_materials(game_version, material, material_list, 'JMS')
                     material_index = material_list.index(material)
 
-                parent_index = global_functions.get_parent(blend_scene.armature, boxes, joined_list, -1)
-                box_matrix = global_functions.get_matrix(boxes, boxes, True, blend_scene.armature, joined_list, False, version, 'JMS', False, custom_scale, fix_rotations)
+                parent_index = transform_cache.get_parent(boxes, -1)
+                box_matrix = transform_cache.get_matrix(boxes, boxes, True, False, False)
                 mesh_dimensions = global_functions.get_dimensions(box_matrix, boxes, version, None, False, False, 'JMS', custom_scale)
 
                 rotation = (mesh_dimensions.quaternion[0], mesh_dimensions.quaternion[1], mesh_dimensions.quaternion[2], mesh_dimensions.quaternion[3])
@@ -570,11 +278,9 @@ class JMSScene(global_functions.HaloAsset):
                     face_set = capsule.face_maps[0].name.split()
                     lod, permutation, region = global_functions.material_definition_parser(False, face_set, default_region, default_permutation)
 
-                    if not permutation in permutation_list:
-                        permutation_list.append(permutation)
+                    permutation_list.add(permutation)
 
-                    if not region in region_list:
-                        region_list.append(region)
+                    region_list.add(region)
 
                 material = global_functions.get_material(game_version, capsule, face, mesh_capsule, lod, region, permutation)
                 material_index = -1
@@ -582,8 +288,8 @@ class JMSScene(global_functions.HaloAsset):
                     material_list = global_functions.gather_materials(game_version, material, material_list, 'JMS')
                     material_index = material_list.index(material)
 
-                parent_index = global_functions.get_parent(blend_scene.armature, capsule, joined_list, -1)
-                capsule_matrix = global_functions.get_matrix(capsule, capsule, True, blend_scene.armature, joined_list, False, version, 'JMS', False, custom_scale, fix_rotations)
+                parent_index = transform_cache.get_parent(capsule, -1)
+                capsule_matrix = transform_cache.get_matrix(capsule, capsule, True, False, False)
                 mesh_dimensions = global_functions.get_dimensions(capsule_matrix, capsule, version, None, False, False, 'JMS', custom_scale)
 
                 rotation = (mesh_dimensions.quaternion[0], mesh_dimensions.quaternion[1], mesh_dimensions.quaternion[2], mesh_dimensions.quaternion[3])
@@ -609,11 +315,9 @@ class JMSScene(global_functions.HaloAsset):
                     face_set = original_geo.face_maps[0].name.split()
                     lod, permutation, region = global_functions.material_definition_parser(False, face_set, default_region, default_permutation)
 
-                    if not permutation in permutation_list:
-                        permutation_list.append(permutation)
+                    permutation_list.add(permutation)
 
-                    if not region in region_list:
-                        region_list.append(region)
+                    region_list.add(region)
 
                 material = global_functions.get_material(game_version, original_geo, face, evaluated_geo, lod, region, permutation)
                 material_index = -1
@@ -621,8 +325,8 @@ class JMSScene(global_functions.HaloAsset):
                     material_list = global_functions.gather_materials(game_version, material, material_list, 'JMS')
                     material_index = material_list.index(material)
 
-                parent_index = global_functions.get_parent(blend_scene.armature, original_geo, joined_list, -1)
-                convex_matrix = global_functions.get_matrix(original_geo, original_geo, True, blend_scene.armature, joined_list, False, version, 'JMS', False, custom_scale, fix_rotations)
+                parent_index = transform_cache.get_parent(original_geo, -1)
+                convex_matrix = transform_cache.get_matrix(original_geo, original_geo, True, False, False)
                 mesh_dimensions = global_functions.get_dimensions(convex_matrix, original_geo, version, None, False, False, 'JMS', custom_scale)
 
                 rotation = (mesh_dimensions.quaternion[0], mesh_dimensions.quaternion[1], mesh_dimensions.quaternion[2], mesh_dimensions.quaternion[3])
@@ -658,10 +362,10 @@ class JMSScene(global_functions.HaloAsset):
                     body_b_name = body_b_obj.name.split('$', 1)[1]
 
                 name = 'ragdoll:%s:%s' % (body_a_name, body_b_name)
-                attached_index = global_functions.get_parent(blend_scene.armature, body_a_obj, joined_list, -1)
-                referenced_index = global_functions.get_parent(blend_scene.armature, body_b_obj, joined_list, -1)
-                body_a_matrix = global_functions.get_matrix(ragdoll, body_a_obj, True, blend_scene.armature, joined_list, False, version, 'JMS', True, custom_scale, fix_rotations)
-                body_b_matrix = global_functions.get_matrix(ragdoll, body_b_obj, True, blend_scene.armature, joined_list, False, version, 'JMS', True, custom_scale, fix_rotations)
+                attached_index = transform_cache.get_parent(body_a_obj, -1)
+                referenced_index = transform_cache.get_parent(body_b_obj, -1)
+                body_a_matrix = transform_cache.get_matrix(ragdoll, body_a_obj, True, False, True)
+                body_b_matrix = transform_cache.get_matrix(ragdoll, body_b_obj, True, False, True)
                 body_a_dimensions = global_functions.get_dimensions(body_a_matrix, body_a_obj, version, None, False, False, 'JMS', custom_scale)
                 body_b_dimensions = global_functions.get_dimensions(body_b_matrix, body_b_obj, version, None, False, False, 'JMS', custom_scale)
                 is_limited_x = int(ragdoll.rigid_body_constraint.use_limit_ang_x)
@@ -705,10 +409,10 @@ class JMSScene(global_functions.HaloAsset):
                     body_b_name = body_b_obj.name.split('$', 1)[1]
 
                 name = 'hinge:%s:%s' % (body_a_name, body_b_name)
-                body_a_index = global_functions.get_parent(blend_scene.armature, body_a_obj, joined_list, -1)
-                body_b_index = global_functions.get_parent(blend_scene.armature, body_b_obj, joined_list, -1)
-                body_a_matrix = global_functions.get_matrix(hinge, body_a_obj, True, blend_scene.armature, joined_list, False, version, 'JMS', True, custom_scale, fix_rotations)
-                body_b_matrix = global_functions.get_matrix(hinge, body_b_obj, True, blend_scene.armature, joined_list, False, version, 'JMS', True, custom_scale, fix_rotations)
+                body_a_index = transform_cache.get_parent(body_a_obj, -1)
+                body_b_index = transform_cache.get_parent(body_b_obj, -1)
+                body_a_matrix = transform_cache.get_matrix(hinge, body_a_obj, True, False, True)
+                body_b_matrix = transform_cache.get_matrix(hinge, body_b_obj, True, False, True)
                 body_a_dimensions = global_functions.get_dimensions(body_a_matrix, body_a_obj, version, None, False, False, 'JMS', custom_scale)
                 body_b_dimensions = global_functions.get_dimensions(body_b_matrix, body_b_obj, version, None, False, False, 'JMS', custom_scale)
                 friction_limit = 0
@@ -741,10 +445,10 @@ class JMSScene(global_functions.HaloAsset):
                     wheel_name = wheel_obj.name.split('$', 1)[1]
 
                 name = 'hinge:%s:%s' % (chassis_name, wheel_name)
-                chassis_index = global_functions.get_parent(blend_scene.armature, chassis_obj, joined_list, -1)
-                wheel_index = global_functions.get_parent(blend_scene.armature, wheel_obj, joined_list, -1)
-                chassis_matrix = global_functions.get_matrix(hinge, chassis_obj, True, blend_scene.armature, joined_list, False, version, 'JMS', True, custom_scale, fix_rotations)
-                wheel_matrix = global_functions.get_matrix(hinge, wheel_obj, True, blend_scene.armature, joined_list, False, version, 'JMS', True, custom_scale, fix_rotations)
+                chassis_index = transform_cache.get_parent(chassis_obj, -1)
+                wheel_index = transform_cache.get_parent(wheel_obj, -1)
+                chassis_matrix = transform_cache.get_matrix(hinge, chassis_obj, True, False, True)
+                wheel_matrix = transform_cache.get_matrix(hinge, wheel_obj, True, False, True)
                 chassis_dimensions = global_functions.get_dimensions(chassis_matrix, chassis_obj, version, None, False, False, 'JMS', custom_scale)
                 wheel_dimensions = global_functions.get_dimensions(wheel_matrix, wheel_obj, version, None, False, False, 'JMS', custom_scale)
                 suspension_min_limit = 0
@@ -775,15 +479,15 @@ class JMSScene(global_functions.HaloAsset):
                 body_b_matrix = Matrix.Translation((0, 0, 0))
                 if body_a_obj:
                     body_a_name = body_a_obj.name.split('$', 1)[1]
-                    body_a_matrix = global_functions.get_matrix(point_to_point, body_a_obj, True, blend_scene.armature, joined_list, False, version, 'JMS', True, custom_scale, fix_rotations)
+                    body_a_matrix = transform_cache.get_matrix(point_to_point, body_a_obj, True, False, True)
 
                 if body_b_obj:
                     body_b_name = body_b_obj.name.split('$', 1)[1]
-                    body_b_matrix = global_functions.get_matrix(point_to_point, body_b_obj, True, blend_scene.armature, joined_list, False, version, 'JMS', True, custom_scale, fix_rotations)
+                    body_b_matrix = transform_cache.get_matrix(point_to_point, body_b_obj, True, False, True)
 
                 name = 'point_to_point:%s:%s' % (body_a_name, body_b_name)
-                body_a_index = global_functions.get_parent(blend_scene.armature, body_a_obj, joined_list, -1)
-                body_b_index = global_functions.get_parent(blend_scene.armature, body_b_obj, joined_list, -1)
+                body_a_index = transform_cache.get_parent(body_a_obj, -1)
+                body_b_index = transform_cache.get_parent(body_b_obj, -1)
                 body_a_dimensions = global_functions.get_dimensions(body_a_matrix, point_to_point, version, None, False, False, 'JMS', custom_scale)
                 body_b_dimensions = global_functions.get_dimensions(body_b_matrix, point_to_point, version, None, False, False, 'JMS', custom_scale)
                 constraint_type = int(point_to_point.jms.jms_spring_type)
@@ -828,10 +532,10 @@ class JMSScene(global_functions.HaloAsset):
                     body_b_name = wheel_obj.name.split('$', 1)[1]
 
                 name = 'hinge:%s:%s' % (body_a_name, body_b_name)
-                body_a_index = global_functions.get_parent(blend_scene.armature, body_a_obj, joined_list, -1)
-                body_b_index = global_functions.get_parent(blend_scene.armature, body_b_obj, joined_list, -1)
-                body_a_matrix = global_functions.get_matrix(prismatic, body_a_obj, True, blend_scene.armature, joined_list, False, version, 'JMS', True, custom_scale, fix_rotations)
-                body_b_matrix = global_functions.get_matrix(prismatic, body_b_obj, True, blend_scene.armature, joined_list, False, version, 'JMS', True, custom_scale, fix_rotations)
+                body_a_index = transform_cache.get_parent(body_a_obj, -1)
+                body_b_index = transform_cache.get_parent(body_b_obj, -1)
+                body_a_matrix = transform_cache.get_matrix(prismatic, body_a_obj, True, False, True)
+                body_b_matrix = transform_cache.get_matrix(prismatic, body_b_obj, True, False, True)
                 body_a_dimensions = global_functions.get_dimensions(body_a_matrix, body_a_obj, version, None, False, False, 'JMS', custom_scale)
                 body_b_dimensions = global_functions.get_dimensions(body_b_matrix, body_b_obj, version, None, False, False, 'JMS', custom_scale)
                 is_limited = 0
@@ -898,824 +602,158 @@ class JMSScene(global_functions.HaloAsset):
 
             self.materials.append(JMSScene.Material(name, texture_path, slot, lod, permutation, region))
 
-def write_file(context, filepath, report, version, game_version, generate_checksum, fix_rotations, folder_structure, folder_type, permutation_ce, level_of_detail_ce, model_type, blend_scene, jmi, custom_scale):
-    jms_scene = JMSScene(version, game_version, generate_checksum, fix_rotations, model_type, blend_scene, custom_scale)
+class JMSSceneSnapshot():
+    """Scene data that is the same in the render, collision and physics files of one export. Evaluated once and shared by every JMSScene"""
+    def __init__(self, version, game_version, generate_checksum, fix_rotations, blend_scene, custom_scale):
+        self.version = version
+        self.custom_scale = custom_scale
+        self.joined_list = global_functions.get_node_hierarchy(blend_scene.node_list, blend_scene.armature, game_version, version, False)
+        self.nodes = []
+        self.node_checksum = 0
+        self.marker_transforms = {}
+        self.transform_cache = global_functions.TransformCache(blend_scene.armature, self.joined_list, version, 'JMS', custom_scale, fix_rotations)
 
-    if version > 8209:
-        decimal_1 = '\n%0.10f'
-        decimal_2 = '\n%0.10f\t%0.10f'
-        decimal_3 = '\n%0.10f\t%0.10f\t%0.10f'
-        decimal_4 = '\n%0.10f\t%0.10f\t%0.10f\t%0.10f'
+        joined_list = self.joined_list
+        transform_cache = self.transform_cache
+        for node_idx, node in enumerate(joined_list):
+            is_bone = False
+            if blend_scene.armature:
+                is_bone = True
 
-    else:
-        decimal_1 = '\n%0.6f'
-        decimal_2 = '\n%0.6f\t%0.6f'
-        decimal_3 = '\n%0.6f\t%0.6f\t%0.6f'
-        decimal_4 = '\n%0.6f\t%0.6f\t%0.6f\t%0.6f'
+            bone_matrix = transform_cache.get_matrix(node, node, True, True, False)
+            mesh_dimensions = global_functions.get_dimensions(bone_matrix, node, version, None, False, is_bone, 'JMS', custom_scale)
 
-    filename = global_functions.get_filename(game_version, permutation_ce, level_of_detail_ce, folder_structure, model_type, False, filepath)
-    root_directory = global_functions.get_directory(context, game_version, model_type, folder_structure, folder_type, jmi, filepath)
+            name = node.name
+            child = joined_list.first_child_indices[node_idx]
+            sibling = joined_list.next_sibling_indices[node_idx]
+            parent = joined_list.parent_indices[node_idx]
+            children = joined_list.children_indices[node_idx]
 
-    print(root_directory)
-    print(filename)
-    file = open(root_directory + os.sep + filename, 'w', encoding='utf_8')
+            rotation = (mesh_dimensions.quaternion[0], mesh_dimensions.quaternion[1], mesh_dimensions.quaternion[2], mesh_dimensions.quaternion[3])
+            translation = (mesh_dimensions.position[0], mesh_dimensions.position[1], mesh_dimensions.position[2])
 
-    if version >= 8205:
-        version_bounds = '8197-8210'
-        if game_version == 'halo3mcc':
-            version_bounds = '8197-8213'
+            self.nodes.append(JMSScene.Node(name, children, child, sibling, parent, rotation, translation))
 
-        file.write(
-            ';### VERSION ###' +
-            '\n%s' % (version) +
-            '\n;\t<%s>\n' % (version_bounds)
-            )
+        if generate_checksum:
+            self.node_checksum = global_functions.node_hierarchy_checksum(self.nodes, self.nodes[0], self.node_checksum)
 
-    else:
-        file.write(
-            '%s' % (version) +
-            '\n%s' % (jms_scene.node_checksum)
-            )
-
-        if version >= 8203 and version <= 8204:
-            file.write(
-                '\n;' +
-                '\n;###Frames###'
-                )
-
-        file.write(
-            '\n%s' % (len(jms_scene.nodes))
-            )
-
-    if version >= 8205:
-        file.write(
-            '\n;### NODES ###' +
-            '\n%s' % (len(jms_scene.nodes)) +
-            '\n;\t<name>' +
-            '\n;\t<parent node index>' +
-            '\n;\t<default rotation <i,j,k,w>>' +
-            '\n;\t<default translation <x,y,z>>\n'
-        )
-
-    for idx, node in enumerate(jms_scene.nodes):
-        if version >= 8205:
-            file.write(
-                '\n;NODE %s' % (idx) +
-                '\n%s' % (node.name) +
-                '\n%s' % (node.parent) +
-                decimal_4 % (node.rotation) +
-                decimal_3 % (node.translation) +
-                '\n'
-            )
+    def get_marker_transform(self, marker):
+        """Parent index, rotation, translation and scale of a marker, markers shared by several files are only evaluated once"""
+        marker_transform = self.marker_transforms.get(marker.name)
+        if marker_transform is None:
+            parent_idx = self.transform_cache.get_parent(marker, 0)
+            marker_matrix = self.transform_cache.get_matrix(marker, marker, True, False, False)
+            mesh_dimensions = global_functions.get_dimensions(marker_matrix, marker, self.version, None, False, False, 'JMS', self.custom_scale)
 
-        else:
-            file.write(
-                '\n%s' % (node.name) +
-                '\n%s' % (node.child) +
-                '\n%s' % (node.sibling) +
-                decimal_4 % (node.rotation) +
-                decimal_3 % (node.translation)
-            )
-
-    if version >= 8205:
-        file.write(
-            '\n;### MATERIALS ###' +
-            '\n%s' % (len(jms_scene.materials)) +
-            '\n;\t<name>' +
-            '\n;\t<(Material Slot Index) LOD Permutation Region>\n'
-        )
+            rotation = (mesh_dimensions.quaternion[0], mesh_dimensions.quaternion[1], mesh_dimensions.quaternion[2], mesh_dimensions.quaternion[3])
+            translation = (mesh_dimensions.position[0], mesh_dimensions.position[1], mesh_dimensions.position[2])
+            scale = (mesh_dimensions.object_radius)
+            if marker.type == 'EMPTY':
+                scale = (mesh_dimensions.scale[0])
 
-    else:
-        if version >= 8203 and version <= 8204:
-            file.write(
-                '\n;' +
-                '\n;###Materials###'
-                )
-
-        file.write(
-            '\n%s' % (len(jms_scene.materials))
-        )
-
-    for idx, material in enumerate(jms_scene.materials):
-        if game_version == 'haloce':
-            file.write(
-                '\n%s' % (material.name) +
-                '\n%s' % (material.texture_path)
-            )
+            marker_transform = (parent_idx[0], rotation, translation, scale)
+            self.marker_transforms[marker.name] = marker_transform
 
-        else:
-            material_definition = '(%s)' % (material.slot)
-            if not material.lod == None:
-                material_definition += ' %s' % (material.lod)
-            if not material.permutation == '':
-                material_definition += ' %s' % (material.permutation)
-            if not material.region == '':
-                material_definition += ' %s' % (material.region)
-            if version >= 8205:
-                file.write(
-                    '\n;MATERIAL %s' % (idx) +
-                    '\n%s' % (material.name) +
-                    '\n%s\n' % (material_definition)
-                )
+        return marker_transform
 
-            else:
-                file.write('\n%s' % (material.name))
-                if version >= 8203 and version <= 8204:
-                    file.write('\n%s' % (material.texture_path))
-                file.write('\n%s' % (material_definition))
-
-    if version >= 8205:
-        file.write(
-            '\n;### MARKERS ###' +
-            '\n%s' % (len(jms_scene.markers)) +
-            '\n;\t<name>' +
-            '\n;\t<node index>' +
-            '\n;\t<rotation <i,j,k,w>>' +
-            '\n;\t<translation <x,y,z>>' +
-            '\n;\t<radius>\n'
-        )
+class JMSWriteQueue():
+    """Formats and writes finished JMS scenes in worker processes, so one file is serialized while the next scene is evaluated and several files are serialized at once. Writes in process when no pool can be started"""
+    def __init__(self, max_workers=None):
+        self.pool = None
+        self.pool_error = None
+        self.pending_writes = []
+        self.process_writes = 0
+        self.in_process_writes = 0
+        # Older Blender builds report the Blender binary as sys.executable, spawning that would start Blender instead of Python
+        executable_name = os.path.basename(sys.executable)
+        if executable_name.lower().startswith('python'):
+            self.pool = ProcessPoolExecutor(max_workers, multiprocessing.get_context('spawn'))
 
-    else:
-        if version >= 8203 and version <= 8204:
-            file.write(
-                '\n;' +
-                '\n;###Markers###'
-                )
-
-        file.write(
-            '\n%s' % (len(jms_scene.markers))
-        )
-
-    for idx, marker in enumerate(jms_scene.markers):
-        if version >= 8205:
-            file.write(
-                '\n;MARKER %s' % (idx)
-            )
-
-        file.write('\n%s' % (marker.name))
-
-        if version >= 8198 and version <= 8204:
-            file.write('\n%s' % (marker.region))
-
-        file.write(
-            '\n%s' % (marker.parent) +
-            decimal_4 % (marker.rotation) +
-            decimal_3 % (marker.translation)
-        )
-
-        if version >= 8200:
-            file.write(decimal_1 % (marker.scale))
-
-        if version >= 8205:
-            file.write('\n')
-
-    if version >= 8203 and version <= 8204:
-        file.write(
-            '\n;' +
-            '\n;###Instances###'
-            )
-
-    if version >= 8203:
-        if version >= 8206:
-            file.write(
-                '\n;### INSTANCE XREF PATHS ###' +
-                '\n%s' % (len(jms_scene.xref_instances)) +
-                '\n;\t<path to asset file>' +
-                '\n;\t<name>\n'
-            )
-
-        elif version == 8205:
-            file.write(
-                '\n;### INSTANCE XREF PATHS ###' +
-                '\n%s' % (len(jms_scene.xref_instances)) +
-                '\n;\t<name>\n'
-            )
-
-        elif version >= 8203 and version <= 8204:
-            file.write(
-                '\n;' +
-                '\n;###Instance xref paths###' +
-                '\n%s' % (len(jms_scene.xref_instances))
-                )
-
-        for idx, xref_instance in enumerate(jms_scene.xref_instances):
-            if version >= 8205:
-                file.write(
-                    '\n;XREF %s' % (idx) +
-                    '\n%s' % (xref_instance.path) +
-                    '\n%s\n' % (xref_instance.name)
-                )
-            else:
-                file.write(
-                    '\n%s' % (xref_instance.path) +
-                    '\n%s\n' % (xref_instance.name)
-                )
-
-        if version >= 8205:
-            file.write(
-                '\n;### INSTANCE MARKERS ###' +
-                '\n%s' % (len(jms_scene.xref_markers)) +
-                '\n;\t<name>' +
-                '\n;\t<unique identifier>' +
-                '\n;\t<path index>' +
-                '\n;\t<rotation <i,j,k,w>>' +
-                '\n;\t<translation <x,y,z>>\n'
-            )
-
-        elif version >= 8203 and version <= 8204:
-            file.write(
-                '\n;' +
-                '\n;###Instance markers###' +
-                '\n%s' % (len(jms_scene.xref_markers))
-                )
-
-        for idx, xref_marker in enumerate(jms_scene.xref_markers):
-            if version >= 8205:
-                file.write(
-                    '\n;XREF OBJECT %s' % (idx) +
-                    '\n%s' % (xref_marker.name) +
-                    '\n%s' % (xref_marker.unique_identifier) +
-                    '\n%s' % (xref_marker.index) +
-                    decimal_4 % (xref_marker.rotation) +
-                    decimal_3 % (xref_marker.translation) +
-                    '\n'
-                )
-            else:
-                file.write(
-                    '\n%s' % (xref_marker.name) +
-                    '\n%s' % (xref_marker.unique_identifier) +
-                    '\n%s' % (xref_marker.index) +
-                    decimal_4 % (xref_marker.rotation) +
-                    decimal_3 % (xref_marker.translation) +
-                    '\n'
-                )
-
-    if version >= 8203 and version <= 8204:
-        file.write(
-            '\n;' +
-            '\n;###Skin data###'
-            )
-
-    if version <= 8204:
-        if version >= 8203 and version <= 8204:
-            file.write(
-                '\n;' +
-                '\n;###Regions###'
-                )
-
-        file.write(
-            '\n%s' % (len(jms_scene.regions))
-        )
-
-        for region in jms_scene.regions:
-            file.write(
-                '\n%s' % (region.name)
-            )
-
-    if version >= 8205:
-        file.write(
-            '\n;### VERTICES ###' +
-            '\n%s' % (len(jms_scene.vertices)) +
-            '\n;\t<position>' +
-            '\n;\t<normal>' +
-            '\n;\t<node influences count>' +
-            '\n;\t\t<index>' +
-            '\n;\t\t<weight>' +
-            '\n;\t<texture coordinate count>' +
-            '\n;\t\t<texture coordinates <u,v>>\n'
-        )
-
-        if version >= 8211:
-            file.write(
-                ';\t<vertex color <r,g,b>>\n'
-            )
-    else:
-        if version >= 8203 and version <= 8204:
-            file.write(
-                '\n;' +
-                '\n;###Vertices###'
-                )
-
-        file.write(
-            '\n%s' % (len(jms_scene.vertices))
-        )
-
-    for idx, vertex in enumerate(jms_scene.vertices):
-        if version >= 8205:
-            file.write(
-                '\n;VERTEX %s' % (idx) +
-                decimal_3 % (vertex.translation[0], vertex.translation[1], vertex.translation[2]) +
-                decimal_3 % (vertex.normal[0], vertex.normal[1], vertex.normal[2]) +
-                '\n%s' % (len(vertex.node_set))
-            )
-            for node in vertex.node_set:
-                node_index = node[0]
-                node_weight = node[1]
-                file.write(
-                    '\n%s' % (node_index) +
-                    decimal_1 % (node_weight)
-                )
-
-            file.write('\n%s' % (len(vertex.uv_set)))
-
-            for uv in vertex.uv_set:
-                tex_u = uv[0]
-                tex_v = uv[1]
-                file.write(decimal_2 % (tex_u, tex_v))
-
-            if version >= 8211:
-                file.write(
-                    decimal_3 % (vertex.color[0], vertex.color[1], vertex.color[2])
-                )
-            file.write('\n')
+        else:
+            self.pool_error = "%s is not a Python interpreter" % executable_name
+
+    def stop_pool(self, error):
+        self.pool_error = "%s: %s" % (type(error).__name__, error)
+        self.pool.shutdown(wait=False)
+        self.pool = None
+
+    def write_in_process(self, scene_data, output_path, version, game_version, manifest):
+        write_scene(scene_data, output_path, version, game_version, manifest)
+        self.in_process_writes += 1
+
+    def submit(self, jms_scene, output_path, version, game_version, manifest=None):
+        scene_data = jms_scene.freeze()
+        if not self.pool is None:
+            try:
+                pending_write = self.pool.submit(jms_writer.write_scene_file, scene_data, output_path, not manifest is None, version, game_version)
+                self.pending_writes.append((pending_write, scene_data, output_path, version, game_version, manifest))
+                return
+
+            except (OSError, BrokenProcessPool) as error:
+                self.stop_pool(error)
+
+        self.write_in_process(scene_data, output_path, version, game_version, manifest)
+
+    def close(self):
+        """Shut the worker processes down once every queued file is finished. Safe to call more than once"""
+        if not self.pool is None:
+            self.pool.shutdown(wait=True)
+
+    def join(self):
+        """Wait for every queued file, commit incremental exports through their manifest and raise the first error a write ran into. Files lost to a broken pool are written again in process"""
+        first_error = None
+        for pending_write, scene_data, output_path, version, game_version, manifest in self.pending_writes:
+            try:
+                written_file = pending_write.result()
+                self.process_writes += 1
+                if not manifest is None:
+                    temp_path, file_hash = written_file
+                    manifest.commit(os.path.abspath(output_path), file_hash, temp_path)
+
+            except BrokenProcessPool as error:
+                if not self.pool is None:
+                    self.stop_pool(error)
+
+                self.write_in_process(scene_data, output_path, version, game_version, manifest)
+
+            except Exception as error:
+                if first_error is None:
+                    first_error = error
+
+        self.pending_writes = []
+        self.close()
+        if not first_error is None:
+            raise first_error
+
+        return self.process_writes + self.in_process_writes
+
+    def report_stats(self, report):
+        if self.pool_error is None:
+            report({'INFO'}, "Wrote %s files in worker processes" % self.process_writes)
 
         else:
-            uv_0 = vertex.uv_set[0]
-            tex_u_0 = uv_0[0]
-            tex_v_0 = uv_0[1]
-
-            uv_1 = None
-            tex_u_1 = 0.0
-            tex_v_1 = 0.0
-            if len(vertex.uv_set) > 1:
-                uv_1 = vertex.uv_set[1]
-                tex_u_1 = uv_1[0]
-                tex_v_1 = uv_1[1]
-
-            uv_2 = None
-            tex_u_2 = 0.0
-            tex_v_2 = 0.0
-            if len(vertex.uv_set) > 2:
-                uv_2 = vertex.uv_set[2]
-                tex_u_2 = uv_2[0]
-                tex_v_2 = uv_2[1]
-
-            uv_3 = None
-            tex_u_3 = 0.0
-            tex_v_3 = 0.0
-            if len(vertex.uv_set) > 3:
-                uv_3 = vertex.uv_set[3]
-                tex_u_3 = uv_3[0]
-                tex_v_3 = uv_3[1]
-
-            if version < 8198:
-                file.write(
-                    '\n%s' % (vertex.region)
-                )
-
-            node0 = (int(-1), float(0.0))
-            if len(vertex.node_set) > 0:
-                node0 = vertex.node_set[0]
-
-            node1 = (int(-1), float(0.0))
-            if len(vertex.node_set) > 1:
-                node1 = vertex.node_set[1]
-
-            node2 = (int(-1), float(0.0))
-            if len(vertex.node_set) > 2:
-                node2 = vertex.node_set[2]
-
-            node3 = (int(-1), float(0.0))
-            if len(vertex.node_set) > 3:
-                node3 = vertex.node_set[3]
-
-            node0_index = node0[0]
-            node0_weight = node0[1]
-
-            node1_index = node1[0]
-            node1_weight = node1[1]
-
-            node2_index = node2[0]
-            node2_weight = node2[1]
-
-            node3_index = node3[0]
-            node3_weight = node3[1]
-
-            if version < 8202:
-                if not node1_index == -1:
-                    node1_weight = 1.0 - node0_weight
-
-                if node1_weight == 0:
-                    node1_index = -1
-
-                if node1_weight == 1:
-                    node0_index = node1[0]
-                    node1_index = -1
-                    node1_weight = 0.0
-
-            if version >= 8204:
-                file.write(
-                    '\n%s' % (node0_index) +
-                    decimal_1 % (node0_weight) +
-                    decimal_3 % (vertex.translation[0], vertex.translation[1], vertex.translation[2]) +
-                    decimal_3 % (vertex.normal[0], vertex.normal[1], vertex.normal[2]) +
-                    '\n%s' % (node1_index) +
-                    decimal_1 % (node1_weight) +
-                    '\n%s' % (node2_index) +
-                    decimal_1 % (node2_weight) +
-                    '\n%s' % (node3_index) +
-                    decimal_1 % (node3_weight)
-                )
-            else:
-                file.write(
-                    '\n%s' % (node0_index) +
-                    decimal_3 % (vertex.translation[0], vertex.translation[1], vertex.translation[2]) +
-                    decimal_3 % (vertex.normal[0], vertex.normal[1], vertex.normal[2]) +
-                    '\n%s' % (node1_index) +
-                    decimal_1 % (node1_weight)
-                )
-
-            if version >= 8200:
-                if version >= 8203 and version <= 8204:
-                    file.write(
-                        decimal_2 % (tex_u_0, tex_v_0) +
-                        decimal_2 % (tex_u_1, tex_v_1) +
-                        decimal_2 % (tex_u_2, tex_v_2) +
-                        decimal_2 % (tex_u_3, tex_v_3)
-                    )
-
-                else:
-                    file.write(
-                        decimal_1 % (tex_u_0) +
-                        decimal_1 % (tex_v_0)
-                    )
+            report({'INFO'}, "Wrote %s files in worker processes and %s in process, the process pool was unavailable (%s)" % (self.process_writes, self.in_process_writes, self.pool_error))
 
-            else:
-                file.write(decimal_2 % (tex_u_0, tex_v_0))
+def write_file(context, filepath, report, version, game_version, generate_checksum, fix_rotations, folder_structure, folder_type, permutation_ce, level_of_detail_ce, model_type, blend_scene, jmi, custom_scale, weld_vertices=False, scene_snapshot=None, write_queue=None, manifest=None):
+    jms_scene = JMSScene(version, game_version, generate_checksum, fix_rotations, model_type, blend_scene, custom_scale, weld_vertices, scene_snapshot)
 
-            if version >= 8199:
-                unused_flag = 0
-                file.write('\n%s' % (unused_flag))
+    filename = global_functions.get_filename(game_version, permutation_ce, level_of_detail_ce, folder_structure, model_type, False, filepath)
+    root_directory = global_functions.get_directory(context, game_version, model_type, folder_structure, folder_type, jmi, filepath)
 
-    if version >= 8205:
-        file.write(
-            '\n;### TRIANGLES ###' +
-            '\n%s' % (len(jms_scene.triangles)) +
-            '\n;\t<material index>' +
-            '\n;\t<vertex indices <v0,v1,v2>>\n'
-        )
+    output_path = root_directory + os.sep + filename
+    if write_queue is None:
+        write_scene(jms_scene, output_path, version, game_version, manifest)
+        report({'INFO'}, "Export completed successfully")
 
     else:
-        if version >= 8203 and version <= 8204:
-            file.write(
-                '\n;' +
-                '\n;###Faces###'
-                )
-
-        file.write(
-            '\n%s' % (len(jms_scene.triangles))
-        )
-
-    for idx, triangle in enumerate(jms_scene.triangles):
-        if version >= 8205:
-            file.write(
-                '\n;TRIANGLE %s' % (idx) +
-                '\n%s' % (triangle.material_index) +
-                '\n%s\t%s\t%s\n' % (triangle.v0, triangle.v1, triangle.v2)
-            )
+        write_queue.submit(jms_scene, output_path, version, game_version, manifest)
 
-        else:
-            if version >= 8198:
-                file.write('\n%s' % (triangle.region))
-
-            file.write(
-                '\n%s' % (triangle.material_index) +
-                '\n%s\t%s\t%s' % (triangle.v0, triangle.v1, triangle.v2)
-            )
-
-    if version <= 8204:
-        file.write('\n')
-
-    if version >= 8206:
-        file.write(
-            '\n;### SPHERES ###' +
-            '\n%s' % (len(jms_scene.spheres)) +
-            '\n;\t<name>' +
-            '\n;\t<parent>' +
-            '\n;\t<material>' +
-            '\n;\t<rotation <i,j,k,w>>' +
-            '\n;\t<translation <x,y,z>>' +
-            '\n;\t<radius>\n'
-        )
-
-        #write sphere
-        for idx, sphere in enumerate(jms_scene.spheres):
-            file.write(
-                '\n;SPHERE %s' % (idx) +
-                '\n%s' % (sphere.name) +
-                '\n%s' % (sphere.parent_index) +
-                '\n%s' % (sphere.material_index) +
-                decimal_4 % (sphere.rotation) +
-                decimal_3 % (sphere.translation) +
-                decimal_1 % (sphere.scale) +
-                '\n'
-            )
-
-        #write boxes
-        file.write(
-            '\n;### BOXES ###' +
-            '\n%s' % (len(jms_scene.boxes)) +
-            '\n;\t<name>' +
-            '\n;\t<parent>' +
-            '\n;\t<material>' +
-            '\n;\t<rotation <i,j,k,w>>' +
-            '\n;\t<translation <x,y,z>>' +
-            '\n;\t<width (x)>' +
-            '\n;\t<length (y)>' +
-            '\n;\t<height (z)>\n'
-        )
-
-        for idx, box in enumerate(jms_scene.boxes):
-            file.write(
-                '\n;BOXES %s' % (idx) +
-                '\n%s' % (box.name) +
-                '\n%s' % (box.parent_index) +
-                '\n%s' % (box.material_index) +
-                decimal_4 % (box.rotation) +
-                decimal_3 % (box.translation) +
-                decimal_1 % (box.width) +
-                decimal_1 % (box.length) +
-                decimal_1 % (box.height) +
-                '\n'
-            )
-
-        #write capsules
-        file.write(
-            '\n;### CAPSULES ###' +
-            '\n%s' % (len(jms_scene.capsules)) +
-            '\n;\t<name>' +
-            '\n;\t<parent>' +
-            '\n;\t<material>' +
-            '\n;\t<rotation <i,j,k,w>>' +
-            '\n;\t<translation <x,y,z>>' +
-            '\n;\t<height>' +
-            '\n;\t<radius>\n'
-             )
-
-        for idx, capsule in enumerate(jms_scene.capsules):
-            file.write(
-                '\n;CAPSULES %s' % (idx) +
-                '\n%s' % (capsule.name) +
-                '\n%s' % (capsule.parent_index) +
-                '\n%s' % (capsule.material_index) +
-                decimal_4 % (capsule.rotation) +
-                decimal_3 % (capsule.translation) +
-                decimal_1 % (capsule.height) +
-                decimal_1 % (capsule.radius) +
-                '\n'
-            )
-
-        #write convex shapes
-        file.write(
-            '\n;### CONVEX SHAPES ###' +
-            '\n%s' % (len(jms_scene.convex_shapes)) +
-            '\n;\t<name>' +
-            '\n;\t<parent>' +
-            '\n;\t<material>' +
-            '\n;\t<rotation <i,j,k,w>>' +
-            '\n;\t<translation <x,y,z>>' +
-            '\n;\t<vertex count>' +
-            '\n;\t<...vertices>\n'
-        )
-
-        for idx, convex_shape in enumerate(jms_scene.convex_shapes):
-            file.write(
-                '\n;CONVEX %s' % (idx) +
-                '\n%s' % (convex_shape.name) +
-                '\n%s' % (convex_shape.parent_index) +
-                '\n%s' % (convex_shape.material_index) +
-                decimal_4 % (convex_shape.rotation) +
-                decimal_3 % (convex_shape.translation) +
-                '\n%s' % (len(convex_shape.verts))
-            )
-
-            for vertex in convex_shape.verts:
-                file.write(decimal_3 % (vertex.translation))
-
-            file.write('\n')
-
-        #write rag dolls
-        file.write(
-            '\n;### RAGDOLLS ###' +
-            '\n%s' % (len(jms_scene.ragdolls)) +
-            '\n;\t<name>' +
-            '\n;\t<attached index>' +
-            '\n;\t<referenced index>' +
-            '\n;\t<attached transform>' +
-            '\n;\t<reference transform>' +
-            '\n;\t<min twist>' +
-            '\n;\t<max twist>' +
-            '\n;\t<min cone>' +
-            '\n;\t<max cone>' +
-            '\n;\t<min plane>' +
-            '\n;\t<max plane>\n'
-        )
-
-        if version == 8213:
-            file.write(';\t<friction limit>\n')
-        for idx, ragdoll in enumerate(jms_scene.ragdolls):
-            file.write(
-                '\n;RAGDOLL %s' % (idx) +
-                '\n%s' % (ragdoll.name) +
-                '\n%s' % (ragdoll.attached_index) +
-                '\n%s' % (ragdoll.referenced_index) +
-                decimal_4 % (ragdoll.attached_rotation) +
-                decimal_3 % (ragdoll.attached_translation) +
-                decimal_4 % (ragdoll.referenced_rotation) +
-                decimal_3 % (ragdoll.referenced_translation) +
-                decimal_1 % (ragdoll.min_twist) +
-                decimal_1 % (ragdoll.max_twist) +
-                decimal_1 % (ragdoll.min_cone) +
-                decimal_1 % (ragdoll.max_cone) +
-                decimal_1 % (ragdoll.min_plane) +
-                decimal_1 % (ragdoll.max_plane)
-            )
-
-            if version == 8213:
-                file.write(decimal_1 % (ragdoll.friction_limit))
-            file.write('\n')
-
-        #write hinges
-        file.write(
-            '\n;### HINGES ###' +
-            '\n%s' % (len(jms_scene.hinges)) +
-            '\n;\t<name>' +
-            '\n;\t<body A index>' +
-            '\n;\t<body B index>' +
-            '\n;\t<body A transform>' +
-            '\n;\t<body B transform>' +
-            '\n;\t<is limited>' +
-            '\n;\t<friction limit>' +
-            '\n;\t<min angle>' +
-            '\n;\t<max angle>\n'
-        )
-
-        for idx, hinge in enumerate(jms_scene.hinges):
-            file.write(
-                '\n;HINGE %s' % (idx) +
-                '\n%s' % (hinge.name) +
-                '\n%s' % (hinge.body_a_index) +
-                '\n%s' % (hinge.body_b_index) +
-                decimal_4 % (hinge.body_a_rotation) +
-                decimal_3 % (hinge.body_a_translation) +
-                decimal_4 % (hinge.body_b_rotation) +
-                decimal_3 % (hinge.body_b_translation) +
-                '\n%s' % (hinge.is_limited) +
-                decimal_1 % (hinge.friction_limit) +
-                decimal_1 % (hinge.min_angle) +
-                decimal_1 % (hinge.max_angle) +
-                '\n'
-            )
-
-        if version > 8209:
-            #write car wheel
-            file.write(
-                '\n;### CAR WHEEL ###' +
-                '\n%s' % (len(jms_scene.car_wheels)) +
-                '\n;\t<name>' +
-                '\n;\t<chassis index>' +
-                '\n;\t<wheel index>' +
-                '\n;\t<chassis transform>' +
-                '\n;\t<wheel transform>' +
-                '\n;\t<suspension transform>' +
-                '\n;\t<suspension min limit>' +
-                '\n;\t<suspension max limit>' +
-                '\n;\t<friction limit>' +
-                '\n;\t<velocity>' +
-                '\n;\t<gain>\n'
-            )
-
-            for idx, car_wheel in enumerate(jms_scene.car_wheels):
-                file.write(
-                    '\n;CAR WHEEL %s' % (idx) +
-                    '\n%s' % (car_wheel.name) +
-                    '\n%s' % (car_wheel.chassis_index) +
-                    '\n%s' % (car_wheel.wheel_index) +
-                    decimal_4 % (car_wheel.chassis_rotation) +
-                    decimal_3 % (car_wheel.chassis_translation) +
-                    decimal_4 % (car_wheel.wheel_rotation) +
-                    decimal_3 % (car_wheel.wheel_translation) +
-                    decimal_4 % (car_wheel.suspension_rotation) +
-                    decimal_3 % (car_wheel.suspension_translation) +
-                    decimal_1 % (car_wheel.suspension_min_limit) +
-                    decimal_1 % (car_wheel.suspension_max_limit) +
-                    decimal_1 % (car_wheel.friction_limit) +
-                    decimal_1 % (car_wheel.velocity) +
-                    decimal_1 % (car_wheel.gain) +
-                    '\n'
-                )
-
-            #write point to point
-            file.write(
-                '\n;### POINT TO POINT ###' +
-                '\n%s' % (len(jms_scene.point_to_points)) +
-                '\n;\t<name>' +
-                '\n;\t<body A index>' +
-                '\n;\t<body B index>' +
-                '\n;\t<body A transform>' +
-                '\n;\t<body B transform>' +
-                '\n;\t<constraint type>' +
-                '\n;\t<x min limit>' +
-                '\n;\t<x max limit>' +
-                '\n;\t<y min limit>' +
-                '\n;\t<y max limit>' +
-                '\n;\t<z min limit>' +
-                '\n;\t<z max limit>' +
-                '\n;\t<spring length>\n'
-            )
-
-            for idx, point_to_point in enumerate(jms_scene.point_to_points):
-                file.write(
-                    '\n;POINT_TO_POINT %s' % (idx) +
-                    '\n%s' % (point_to_point.name) +
-                    '\n%s' % (point_to_point.body_a_index) +
-                    '\n%s' % (point_to_point.body_b_index) +
-                    decimal_4 % (point_to_point.body_b_rotation) +
-                    decimal_3 % (point_to_point.body_b_translation) +
-                    decimal_4 % (point_to_point.body_a_rotation) +
-                    decimal_3 % (point_to_point.body_a_translation) +
-                    '\n%s' % (point_to_point.constraint_type) +
-                    decimal_1 % (point_to_point.x_min_limit) +
-                    decimal_1 % (point_to_point.x_max_limit) +
-                    decimal_1 % (point_to_point.y_min_limit) +
-                    decimal_1 % (point_to_point.y_max_limit) +
-                    decimal_1 % (point_to_point.z_min_limit) +
-                    decimal_1 % (point_to_point.z_max_limit) +
-                    decimal_1 % (point_to_point.spring_length) +
-                    '\n'
-                )
-
-            #write prismatic
-            file.write(
-                '\n;### PRISMATIC ###' +
-                '\n%s' % (len(jms_scene.prismatics)) +
-                '\n;\t<name>' +
-                '\n;\t<body A index>' +
-                '\n;\t<body B index>' +
-                '\n;\t<body A transform>' +
-                '\n;\t<body B transform>' +
-                '\n;\t<is limited>' +
-                '\n;\t<friction limit>' +
-                '\n;\t<min limit>' +
-                '\n;\t<max limit>\n'
-            )
-
-            for idx, prismatic in enumerate(jms_scene.prismatics):
-                file.write(
-                    '\n;PRISMATIC %s' % (idx) +
-                    '\n%s' % (prismatic.name) +
-                    '\n%s' % (prismatic.body_a_index) +
-                    '\n%s' % (prismatic.body_b_index) +
-                    decimal_4 % (prismatic.body_a_rotation) +
-                    decimal_3 % (prismatic.body_a_translation) +
-                    decimal_4 % (prismatic.body_b_rotation) +
-                    decimal_3 % (prismatic.body_b_translation) +
-                    '\n%s' % (prismatic.is_limited) +
-                    decimal_1 % (prismatic.friction_limit) +
-                    decimal_1 % (prismatic.min_limit) +
-                    decimal_1 % (prismatic.max_limit) +
-                    '\n'
-                )
-
-        if version >= 8209:
-            #write bounding sphere
-            file.write(
-                '\n;### BOUNDING SPHERE ###' +
-                '\n%s' % (len(jms_scene.bounding_spheres)) +
-                '\n;\t<translation <x,y,z>>' +
-                '\n;\t<radius>\n'
-            )
-
-            for idx, bounding_sphere in enumerate(jms_scene.bounding_spheres):
-                file.write(
-                    '\n;BOUNDING SPHERE %s' % (idx) +
-                    decimal_3 % (bounding_sphere.translation) +
-                    decimal_1 % (bounding_sphere.scale) +
-                    '\n'
-                )
-
-        if version >= 8212:
-            #write skylight
-            file.write(
-                '\n;### SKYLIGHT ###' +
-                '\n%s' % (len(jms_scene.skylights)) +
-                '\n;\t<direction <x,y,z>>' +
-                '\n;\t<radiant intensity <x,y,z>>' +
-                '\n;\t<solid angle>\n'
-            )
-
-            for idx, light in enumerate(jms_scene.skylights):
-                file.write(
-                    '\n;SKYLIGHT %s' % (idx) +
-                    decimal_3 % light.direction +
-                    decimal_3 % light.radiant_intensity +
-                    decimal_1 % light.solid_angle +
-                    '\n'
-                )
-    report({'INFO'}, "Export completed successfully")
-    file.close()
-
-def command_queue(context, filepath, report, jms_version, jms_version_ce, jms_version_h2, jms_version_h3, generate_checksum, folder_structure, folder_type, apply_modifiers, triangulate_faces, fix_rotations, edge_split, use_edge_angle, use_edge_sharp, split_angle, clean_normalize_weights, scale_enum, scale_float, console, permutation_ce, level_of_detail_ce, hidden_geo, export_render, export_collision, export_physics, game_version, world_nodes):
+def write_scene(jms_scene, output_path, version, game_version, manifest=None):
+    """Write a JMSScene to disk in this process"""
+    with export_manifest.open_export_file(output_path, manifest) as file:
+        jms_writer.write_scene_data(file, jms_scene, version, game_version)
+
+def command_queue(context, filepath, report, jms_version, jms_version_ce, jms_version_h2, jms_version_h3, generate_checksum, folder_structure, folder_type, apply_modifiers, triangulate_faces, fix_rotations, edge_split, use_edge_angle, use_edge_sharp, split_angle, clean_normalize_weights, scale_enum, scale_float, console, permutation_ce, level_of_detail_ce, hidden_geo, export_render, export_collision, export_physics, game_version, world_nodes, weld_vertices=False, write_concurrently=False, write_queue=None, incremental_export=False, manifest=None):
     object_properties = []
     node_prefix_tuple = ('b ', 'b_', 'bone', 'frame', 'bip01')
     limit_value = 0.001
@@ -1910,25 +948,50 @@ def command_queue(context, filepath, report, jms_version, jms_version_ce, jms_ve
 
     global_functions.validate_halo_jms_scene(game_version, version, blend_scene, object_list, jmi)
 
-    if export_render and blend_scene.render_count > 0:
-        model_type = "render"
+    scene_snapshot = JMSSceneSnapshot(version, game_version, generate_checksum, fix_rotations, blend_scene, custom_scale)
+    owns_write_queue = False
+    if write_queue is None and write_concurrently:
+        write_queue = JMSWriteQueue()
+        owns_write_queue = True
+
+    owns_manifest = False
+    if manifest is None and incremental_export:
+        manifest = export_manifest.ExportManifest()
+        owns_manifest = True
+
+    try:
+        if export_render and blend_scene.render_count > 0:
+            model_type = "render"
+
+            write_file(context, filepath, report, version, game_version, generate_checksum, fix_rotations, folder_structure, folder_type, permutation_ce, level_of_detail_ce, model_type, blend_scene, jmi, custom_scale, weld_vertices, scene_snapshot, write_queue, manifest)
+
+        if export_collision and blend_scene.collision_count > 0:
+            model_type = "collision"
+
+            write_file(context, filepath, report, version, game_version, generate_checksum, fix_rotations, folder_structure, folder_type, permutation_ce, level_of_detail_ce, model_type, blend_scene, jmi, custom_scale, weld_vertices, scene_snapshot, write_queue, manifest)
 
-        write_file(context, filepath, report, version, game_version, generate_checksum, fix_rotations, folder_structure, folder_type, permutation_ce, level_of_detail_ce, model_type, blend_scene, jmi, custom_scale)
+        if export_physics and blend_scene.physics_count > 0:
+            model_type = "physics"
 
-    if export_collision and blend_scene.collision_count > 0:
-        model_type = "collision"
+            write_file(context, filepath, report, version, game_version, generate_checksum, fix_rotations, folder_structure, folder_type, permutation_ce, level_of_detail_ce, model_type, blend_scene, jmi, custom_scale, weld_vertices, scene_snapshot, write_queue, manifest)
 
-        write_file(context, filepath, report, version, game_version, generate_checksum, fix_rotations, folder_structure, folder_type, permutation_ce, level_of_detail_ce, model_type, blend_scene, jmi, custom_scale)
+        for idx, obj in enumerate(object_list):
+            property_value = object_properties[idx]
+            obj.hide_set(property_value[0])
+            obj.hide_viewport = property_value[1]
 
-    if export_physics and blend_scene.physics_count > 0:
-        model_type = "physics"
+        if owns_write_queue:
+            write_queue.join()
+            write_queue.report_stats(report)
+            report({'INFO'}, "Export completed successfully")
 
-        write_file(context, filepath, report, version, game_version, generate_checksum, fix_rotations, folder_structure, folder_type, permutation_ce, level_of_detail_ce, model_type, blend_scene, jmi, custom_scale)
+    finally:
+        if owns_write_queue:
+            write_queue.close()
 
-    for idx, obj in enumerate(object_list):
-        property_value = object_properties[idx]
-        obj.hide_set(property_value[0])
-        obj.hide_viewport = property_value[1]
+    if owns_manifest:
+        manifest.save()
+        manifest.report_stats(report)
 
     return {'FINISHED'}
 
@@ -27,10 +27,11 @@
 from io import TextIOWrapper
 import bpy
 import bmesh
+import numpy as np
 
 from math import radians
 from mathutils import Vector, Matrix
-from ..global_functions import mesh_processing, global_functions
+from ..global_functions import mesh_processing, global_functions, asset_cache, asset_reader, skeleton_index
 
 class JMSAsset(global_functions.HaloAsset):
     class Transform:
@@ -83,6 +84,8 @@ class JMSAsset(global_functions.HaloAsset):
             self.name = name
 
     class Vertex:
+        __slots__ = ('node_influence_count', 'node_set', 'region', 'translation', 'normal', 'color', 'uv_set')
+
         def __init__(self,
                      node_influence_count=0,
                      node_set=None, region=-1,
@@ -101,6 +104,8 @@ class JMSAsset(global_functions.HaloAsset):
             self.uv_set = uv_set
 
     class Triangle:
+        __slots__ = ('region', 'material_index', 'v0', 'v1', 'v2')
+
         def __init__(self, region=-1, material_index=-1, v0=-1, v1=-1, v2=-1):
             self.region = region
             self.material_index = material_index
@@ -261,229 +266,247 @@ class JMSAsset(global_functions.HaloAsset):
 
         return JMSAsset.Transform(translation, rotation, None)
 
-    def __init__(self, filepath, game_version):
-        super().__init__(filepath)
-        default_region = mesh_processing.get_default_region_permutation_name(game_version)
-        default_permutation = mesh_processing.get_default_region_permutation_name(game_version)
-        if not isinstance(filepath, TextIOWrapper):
-            extension = global_functions.get_true_extension(filepath, None, True)
-        else:
-            extension = "JMS"
-        self.version = int(self.next())
-        self.game_version = game_version
-        if game_version == 'auto':
-            self.game_version = global_functions.get_game_version(self.version, 'JMS')
-
-        version_list = (8197,
-                        8198,
-                        8199,
-                        8200,
-                        8201,
-                        8202,
-                        8203,
-                        8204,
-                        8205,
-                        8206,
-                        8207,
-                        8208,
-                        8209,
-                        8210,
-                        8211,
-                        8212,
-                        8213
-                        )
-
-        if not self.version in version_list:
-            raise global_functions.AssetParseError("Importer does not support this " + extension + " version")
-
-        if self.version < 8205:
-            self.skip(1) # skip the node checksum
-
-        node_count = int(self.next())
-        self.nodes = []
-        transforms_for_frame = []
-        self.transforms = []
-        self.materials = []
-        self.markers = []
-        self.xref_paths = []
-        self.xref_instance_markers = []
-        self.used_regions = []
-        self.regions = []
-        self.vertices = []
-        self.triangles = []
-        self.spheres = []
-        self.boxes = []
-        self.capsules = []
-        self.convex_shapes = []
-        self.ragdolls = []
-        self.hinges = []
-        self.car_wheels = []
-        self.point_to_points = []
-        self.prismatics = []
-        self.bounding_spheres = []
-        self.skylights = []
-        if self.version >= 8205:
-            for _ in range(node_count):
-                name = self.next()
-                parent = int(self.next())
-                self.nodes.append(JMSAsset.Node(name, parent=parent))
-                transforms_for_frame.append(self.next_transform())
+    def gather_pairs(self, block, offsets, counts, width):
+        """Gather a variable length run of value pairs per record into two padded columns"""
+        slots = np.arange(max(int(counts.max()), width))
+        valid = slots < counts[:, None]
+        pair_offsets = np.where(valid, offsets[:, None] + (slots * 2), 0)
+
+        return np.where(valid, block[pair_offsets], -1.0), np.where(valid, block[pair_offsets + 1], 0.0)
+
+    def read_vertex_block(self, vertex_count):
+        """Parse the 8205+ vertex records in one pass, returns the number of vertices read"""
+        color_count = 0
+        if self.version >= 8211:
+            color_count = 3
+
+        # Only the influence and UV counts are read per record to find where each one starts, everything else is converted in bulk
+        start = self._index
+        position = start
+        record_offsets = []
+        influence_counts = []
+        uv_counts = []
+        try:
+            for vertex in range(vertex_count):
+                node_influence_count = int(self._elements[position + 6])
+                uv_count = int(self._elements[position + 7 + (node_influence_count * 2)])
+                record_offsets.append(position - start)
+                influence_counts.append(node_influence_count)
+                uv_counts.append(uv_count)
+                position += 8 + (node_influence_count * 2) + (uv_count * 2) + color_count
+
+            block = np.array(self._elements[start:position], dtype=np.float64)
+
+        except (IndexError, ValueError):
+            return 0
+
+        if not len(block) == position - start:
+            return 0
+
+        record_offsets = np.array(record_offsets, dtype=np.int64)
+        influence_counts = np.array(influence_counts, dtype=np.int64)
+        uv_counts = np.array(uv_counts, dtype=np.int64)
+        uv_offsets = record_offsets + 8 + (influence_counts * 2)
+        translations = block[record_offsets[:, None] + np.arange(3)]
+        normals = block[record_offsets[:, None] + np.arange(3, 6)]
+        node_indices, node_weights = self.gather_pairs(block, record_offsets + 7, influence_counts, self.vertices.max_influences)
+        uv_u, uv_v = self.gather_pairs(block, uv_offsets, uv_counts, 1)
+        colors = None
+        if color_count:
+            colors = block[(uv_offsets + (uv_counts * 2))[:, None] + np.arange(3)]
+
+        uvs = np.stack((uv_u, uv_v), axis=2)
+        self.vertices.extend(influence_counts, influence_counts, node_indices, node_weights, None, translations, normals, colors, uv_counts, uvs)
+        self._index = position
+
+        return vertex_count
+
+    def read_triangle_block(self, triangle_count):
+        """Parse the triangle records in one pass, returns the number of triangles read"""
+        stride = 4
+        if self.version >= 8198 and self.version < 8205:
+            stride = 5
+
+        tokens = self._elements[self._index:self._index + (stride * triangle_count)]
+        if not len(tokens) == stride * triangle_count:
+            return 0
+
+        try:
+            block = np.array(tokens, dtype=np.int32).reshape(triangle_count, stride)
+
+        except ValueError:
+            return 0
+
+        regions = None
+        if stride == 5:
+            regions = block[:, 0]
+            self.used_regions += regions.tolist()
+
+        self.triangles.extend(regions, block[:, stride - 4], block[:, stride - 3:])
+        self._index += stride * triangle_count
+
+        return triangle_count
+
+    def __init__(self, filepath, game_version, memory_map=None, elements=None):
+        super().__init__(filepath, memory_map, elements)
+        try:
+            default_region = mesh_processing.get_default_region_permutation_name(game_version)
+            default_permutation = mesh_processing.get_default_region_permutation_name(game_version)
+            if not isinstance(filepath, TextIOWrapper):
+                extension = global_functions.get_true_extension(filepath, None, True)
+            else:
+                extension = "JMS"
+            self.version = int(self.next())
+            self.game_version = game_version
+            if game_version == 'auto':
+                self.game_version = global_functions.get_game_version(self.version, 'JMS')
+
+            version_list = (8197,
+                            8198,
+                            8199,
+                            8200,
+                            8201,
+                            8202,
+                            8203,
+                            8204,
+                            8205,
+                            8206,
+                            8207,
+                            8208,
+                            8209,
+                            8210,
+                            8211,
+                            8212,
+                            8213
+                            )
+
+            if not self.version in version_list:
+                raise global_functions.AssetParseError("Importer does not support this " + extension + " version")
+
+            if self.version < 8205:
+                self.skip(1) # skip the node checksum
+
+            node_count = int(self.next())
+            self.nodes = []
+            transforms_for_frame = []
+            self.transforms = []
+            self.materials = []
+            self.markers = []
+            self.xref_paths = []
+            self.xref_instance_markers = []
+            self.used_regions = []
+            self.regions = []
+            self.vertices = global_functions.VertexBuffer()
+            self.triangles = global_functions.TriangleBuffer()
+            self.spheres = []
+            self.boxes = []
+            self.capsules = []
+            self.convex_shapes = []
+            self.ragdolls = []
+            self.hinges = []
+            self.car_wheels = []
+            self.point_to_points = []
+            self.prismatics = []
+            self.bounding_spheres = []
+            self.skylights = []
+            if self.version >= 8205:
+                for _ in range(node_count):
+                    name = self.next()
+                    parent = int(self.next())
+                    self.nodes.append(JMSAsset.Node(name, parent=parent))
+                    transforms_for_frame.append(self.next_transform())
 
-        else:
-            for _ in range(node_count):
-                name = self.next()
-                child = int(self.next())
-                sibling = int(self.next())
-                self.nodes.append(JMSAsset.Node(name, child=child, sibling=sibling))
-                transforms_for_frame.append(self.next_transform())
-
-        self.transforms.append(transforms_for_frame)
-        material_count = int(self.next())
-        for material in range(material_count):
-            name = self.next()
-            if self.version >= 8203 and self.version <= 8204:
-                texture_definition = self.next()
-
-            material_definition = self.next()
-            if self.game_version == 'haloce':
-                self.materials.append(JMSAsset.Material(name, material_definition, None, None, None, None))
-
-            elif self.game_version == 'halo2' or self.game_version == 'halo3':
-                material_definition_items = material_definition.split()
-                lod, permutation, region = global_functions.material_definition_parser(True, material_definition_items, default_region, default_permutation)
-
-                self.materials.append(JMSAsset.Material(name, None, material, lod, permutation, region))
-
-        marker_count = int(self.next())
-        for marker in range(marker_count):
-            name = self.next()
-            region = -1
-            if self.version >= 8198 and self.version < 8205:
-                region = int(self.next())
-
-            parent = int(self.next())
-            rotation = self.next_quaternion()
-            translation = self.next_vector()
-            scale = 1
-            if self.version >= 8200:
-                scale = float(self.next())
-
-            self.markers.append(JMSAsset.Marker(name, region, parent, rotation, translation, scale))
-
-        if self.version >= 8201:
-            xref_path_count = int(self.next())
-            for xref in range(xref_path_count):
-                xref_path = self.next()
-                xref_name = None
-                if self.version >= 8208:
-                    xref_name = self.next()
-
-                self.xref_paths.append(JMSAsset.XREF_Path(xref_path, xref_name))
-
-            instance_markers_count = int(self.next())
-            for xref in range(instance_markers_count):
+            else:
+                for _ in range(node_count):
+                    name = self.next()
+                    child = int(self.next())
+                    sibling = int(self.next())
+                    self.nodes.append(JMSAsset.Node(name, child=child, sibling=sibling))
+                    transforms_for_frame.append(self.next_transform())
+
+            self.transforms.append(transforms_for_frame)
+            material_count = int(self.next())
+            for material in range(material_count):
                 name = self.next()
-                unique_identifier = None
-                if self.version >= 8203:
-                    unique_identifier = int(self.next())
+                if self.version >= 8203 and self.version <= 8204:
+                    texture_definition = self.next()
 
-                path_index = int(self.next())
-                rotation = self.next_quaternion()
-                translation = self.next_vector()
-                self.xref_instance_markers.append(JMSAsset.XREF_Instance_Marker(name, path_index, unique_identifier, rotation, translation))
-
-        if self.version < 8205:
-            region_count = int(self.next())
-            for region in range(region_count):
-                name = self.next()
-                if name == "__unnamed":
-                    name = "unnamed"
+                material_definition = self.next()
+                if self.game_version == 'haloce':
+                    self.materials.append(JMSAsset.Material(name, material_definition, None, None, None, None))
 
-                self.regions.append(JMSAsset.Region(name))
+                elif self.game_version == 'halo2' or self.game_version == 'halo3':
+                    material_definition_items = material_definition.split()
+                    lod, permutation, region = global_functions.material_definition_parser(True, material_definition_items, default_region, default_permutation)
 
-        vertex_count = int(self.next())
-        for vertex in range(vertex_count):
-            node_set = []
-            uv_set = []
-            region = None
-            color = None
-            if self.version >= 8205:
-                translation = self.next_vector()
-                normal = self.next_vector()
-                node_influence_count = int(self.next())
-                for node in range(node_influence_count):
-                    node_index = int(self.next())
-                    node_weight = float(self.next())
-                    node_set.append([node_index, node_weight])
-
-                uv_count = int(self.next())
-                for uv in range(uv_count):
-                    tex_u_value   = self.next()
-                    tex_v_value   = self.next()
-                    try:
-                        tex_u = float(tex_u_value)
-
-                    except ValueError:
-                        tex_u = float(tex_u_value.rsplit('.', 1)[0])
-
-                    try:
-                        tex_v = float(tex_v_value)
-
-                    except ValueError:
-                        tex_v = float(tex_v_value.rsplit('.', 1)[0])
-
-                    u = tex_u
-                    v = tex_v
-                    uv_set.append([u, v])
-                if self.version >= 8211:
-                    color = self.next_vector()
+                    self.materials.append(JMSAsset.Material(name, None, material, lod, permutation, region))
 
-            else:
-                node_influence_count = 0
-                if self.version == 8197:
+            marker_count = int(self.next())
+            for marker in range(marker_count):
+                name = self.next()
+                region = -1
+                if self.version >= 8198 and self.version < 8205:
                     region = int(self.next())
-                    self.used_regions.append(region)
-
-                node_0_index = int(self.next())
-                if self.version == 8204:
-                    node_0_weight = float(self.next())
 
+                parent = int(self.next())
+                rotation = self.next_quaternion()
                 translation = self.next_vector()
-                normal = self.next_vector()
-                node_1_index = int(self.next())
-                node_1_weight = float(self.next())
-                node_2_index = -1
-                node_3_index = -1
-                if self.version == 8204:
-                    node_2_index = int(self.next())
-                    node_2_weight = float(self.next())
-                    node_3_index = int(self.next())
-                    node_3_weight = float(self.next())
-
-                if self.version >= 8204:
-                    node_set.append([node_0_index, node_0_weight])
-
-                else:
-                    node_set.append([node_0_index, 1])
-
-                node_set.append([node_1_index, node_1_weight])
-                if self.version >= 8204:
-                    node_set.append([node_2_index, node_2_weight])
-                    node_set.append([node_3_index, node_3_weight])
-
-                if not node_0_index == -1:
-                    node_influence_count += 1
-
-                if not node_1_index == -1:
-                    node_influence_count += 1
-
-                if not node_2_index == -1:
-                    node_influence_count += 1
-
-                if not node_3_index == -1:
-                    node_influence_count += 1
-
+                scale = 1
+                if self.version >= 8200:
+                    scale = float(self.next())
+
+                self.markers.append(JMSAsset.Marker(name, region, parent, rotation, translation, scale))
+
+            if self.version >= 8201:
+                xref_path_count = int(self.next())
+                for xref in range(xref_path_count):
+                    xref_path = self.next()
+                    xref_name = None
+                    if self.version >= 8208:
+                        xref_name = self.next()
+
+                    self.xref_paths.append(JMSAsset.XREF_Path(xref_path, xref_name))
+
+                instance_markers_count = int(self.next())
+                for xref in range(instance_markers_count):
+                    name = self.next()
+                    unique_identifier = None
+                    if self.version >= 8203:
+                        unique_identifier = int(self.next())
+
+                    path_index = int(self.next())
+                    rotation = self.next_quaternion()
+                    translation = self.next_vector()
+                    self.xref_instance_markers.append(JMSAsset.XREF_Instance_Marker(name, path_index, unique_identifier, rotation, translation))
+
+            if self.version < 8205:
+                region_count = int(self.next())
+                for region in range(region_count):
+                    name = self.next()
+                    if name == "__unnamed":
+                        name = "unnamed"
+
+                    self.regions.append(JMSAsset.Region(name))
+
+            vertex_count = int(self.next())
+            block_vertex_count = 0
+            if self.version >= 8205 and vertex_count > 0:
+                block_vertex_count = self.read_vertex_block(vertex_count)
+
+            for vertex in range(block_vertex_count, vertex_count):
+                node_set = []
+                uv_set = []
+                region = None
+                color = None
                 if self.version >= 8205:
+                    translation = self.next_vector()
+                    normal = self.next_vector()
+                    node_influence_count = int(self.next())
+                    for node in range(node_influence_count):
+                        node_index = int(self.next())
+                        node_weight = float(self.next())
+                        node_set.append([node_index, node_weight])
+
                     uv_count = int(self.next())
                     for uv in range(uv_count):
                         tex_u_value   = self.next()
@@ -503,265 +526,344 @@ class JMSAsset(global_functions.HaloAsset):
                         u = tex_u
                         v = tex_v
                         uv_set.append([u, v])
+                    if self.version >= 8211:
+                        color = self.next_vector()
 
                 else:
-                    tex_0_u_value = self.next()
-                    tex_0_v_value = self.next()
-                    if self.version >= 8203:
-                        tex_1_u_value = self.next()
-                        tex_1_v_value = self.next()
-                        tex_2_u_value = self.next()
-                        tex_2_v_value = self.next()
-                        tex_3_u_value = self.next()
-                        tex_3_v_value = self.next()
+                    node_influence_count = 0
+                    if self.version == 8197:
+                        region = int(self.next())
+                        self.used_regions.append(region)
+
+                    node_0_index = int(self.next())
+                    if self.version == 8204:
+                        node_0_weight = float(self.next())
+
+                    translation = self.next_vector()
+                    normal = self.next_vector()
+                    node_1_index = int(self.next())
+                    node_1_weight = float(self.next())
+                    node_2_index = -1
+                    node_3_index = -1
+                    if self.version == 8204:
+                        node_2_index = int(self.next())
+                        node_2_weight = float(self.next())
+                        node_3_index = int(self.next())
+                        node_3_weight = float(self.next())
+
+                    if self.version >= 8204:
+                        node_set.append([node_0_index, node_0_weight])
 
-                    try:
-                        tex_0_u = float(tex_0_u_value)
+                    else:
+                        node_set.append([node_0_index, 1])
 
-                    except ValueError:
-                        tex_0_u = float(tex_0_u_value.rsplit('.', 1)[0])
+                    node_set.append([node_1_index, node_1_weight])
+                    if self.version >= 8204:
+                        node_set.append([node_2_index, node_2_weight])
+                        node_set.append([node_3_index, node_3_weight])
 
-                    try:
-                        tex_0_v = float(tex_0_v_value)
+                    if not node_0_index == -1:
+                        node_influence_count += 1
 
-                    except ValueError:
-                        tex_0_v = float(tex_0_v_value.rsplit('.', 1)[0])
+                    if not node_1_index == -1:
+                        node_influence_count += 1
 
-                    if self.version >= 8203:
-                        try:
-                            tex_1_u = float(tex_1_u_value)
+                    if not node_2_index == -1:
+                        node_influence_count += 1
 
-                        except ValueError:
-                            tex_1_u = float(tex_1_u_value.rsplit('.', 1)[0])
+                    if not node_3_index == -1:
+                        node_influence_count += 1
 
-                        try:
-                            tex_1_v = float(tex_1_v_value)
+                    if self.version >= 8205:
+                        uv_count = int(self.next())
+                        for uv in range(uv_count):
+                            tex_u_value   = self.next()
+                            tex_v_value   = self.next()
+                            try:
+                                tex_u = float(tex_u_value)
 
-                        except ValueError:
-                            tex_1_v = float(tex_1_v_value.rsplit('.', 1)[0])
+                            except ValueError:
+                                tex_u = float(tex_u_value.rsplit('.', 1)[0])
 
-                        try:
-                            tex_2_u = float(tex_2_u_value)
+                            try:
+                                tex_v = float(tex_v_value)
 
-                        except ValueError:
-                            tex_2_u = float(tex_2_u_value.rsplit('.', 1)[0])
+                            except ValueError:
+                                tex_v = float(tex_v_value.rsplit('.', 1)[0])
 
-                        try:
-                            tex_2_v = float(tex_2_v_value)
+                            u = tex_u
+                            v = tex_v
+                            uv_set.append([u, v])
 
-                        except ValueError:
-                            tex_2_v = float(tex_2_v_value.rsplit('.', 1)[0])
+                    else:
+                        tex_0_u_value = self.next()
+                        tex_0_v_value = self.next()
+                        if self.version >= 8203:
+                            tex_1_u_value = self.next()
+                            tex_1_v_value = self.next()
+                            tex_2_u_value = self.next()
+                            tex_2_v_value = self.next()
+                            tex_3_u_value = self.next()
+                            tex_3_v_value = self.next()
 
                         try:
-                            tex_3_u = float(tex_3_u_value)
+                            tex_0_u = float(tex_0_u_value)
 
                         except ValueError:
-                            tex_3_u = float(tex_3_u_value.rsplit('.', 1)[0])
+                            tex_0_u = float(tex_0_u_value.rsplit('.', 1)[0])
 
                         try:
-                            tex_3_v = float(tex_3_v_value)
+                            tex_0_v = float(tex_0_v_value)
 
                         except ValueError:
-                            tex_3_v = float(tex_3_v_value.rsplit('.', 1)[0])
+                            tex_0_v = float(tex_0_v_value.rsplit('.', 1)[0])
 
-                    if self.version >= 8203:
-                        uv_set.append([tex_0_u, tex_0_v])
-                        uv_set.append([tex_1_u, tex_1_v])
-                        uv_set.append([tex_2_u, tex_2_v])
-                        uv_set.append([tex_3_u, tex_3_v])
+                        if self.version >= 8203:
+                            try:
+                                tex_1_u = float(tex_1_u_value)
 
-                    else:
-                        uv_set.append([tex_0_u, tex_0_v])
-
-                flags = None
-                if self.version >= 8199:
-                    flags = self.skip(1) #Unused int or boolean value. Don't know which but definitely not a float
-
-            self.vertices.append(JMSAsset.Vertex(node_influence_count, node_set, region, translation, normal, color, uv_set))
-
-        triangle_count = int(self.next())
-        for triangle in range(triangle_count):
-            region = None
-            if self.version >= 8198 and self.version < 8205:
-                region = int(self.next())
-                self.used_regions.append(region)
-
-            material_index = int(self.next())
-            v0 = int(self.next())
-            v1 = int(self.next())
-            v2 = int(self.next())
-            self.triangles.append(JMSAsset.Triangle(region, material_index, v0, v1, v2))
-
-        if self.version >= 8206:
-            sphere_count = int(self.next())
-            for sphere in range(sphere_count):
-                name = self.next()
-                parent_index = int(self.next())
-                material_index = None
-                if self.version >= 8207:
-                    material_index = int(self.next())
+                            except ValueError:
+                                tex_1_u = float(tex_1_u_value.rsplit('.', 1)[0])
 
-                rotation = self.next_quaternion()
-                translation = self.next_vector()
-                radius = float(self.next())
-                self.spheres.append(JMSAsset.Sphere(name, parent_index, material_index, rotation, translation, radius))
+                            try:
+                                tex_1_v = float(tex_1_v_value)
 
-            boxes_count = int(self.next())
-            for box in range(boxes_count):
-                name = self.next()
-                parent_index = int(self.next())
-                material_index = None
-                if self.version >= 8207:
-                    material_index = int(self.next())
+                            except ValueError:
+                                tex_1_v = float(tex_1_v_value.rsplit('.', 1)[0])
 
-                rotation = self.next_quaternion()
-                translation = self.next_vector()
-                width = float(self.next())
-                length = float(self.next())
-                height = float(self.next())
-                self.boxes.append(JMSAsset.Box(name, parent_index, material_index, rotation, translation, width, length, height))
+                            try:
+                                tex_2_u = float(tex_2_u_value)
 
-            capsules_count = int(self.next())
-            for capsules in range(capsules_count):
-                name = self.next()
-                parent_index = int(self.next())
-                material_index = None
-                if self.version >= 8207:
-                    material_index = int(self.next())
+                            except ValueError:
+                                tex_2_u = float(tex_2_u_value.rsplit('.', 1)[0])
 
-                rotation = self.next_quaternion()
-                translation = self.next_vector()
-                height = float(self.next())
-                radius = float(self.next())
-                self.capsules.append(JMSAsset.Capsule(name, parent_index, material_index, rotation, translation, height, radius))
+                            try:
+                                tex_2_v = float(tex_2_v_value)
 
-            convex_shape_count = int(self.next())
-            for convex_shape in range(convex_shape_count):
-                vert = []
-                name = self.next()
-                parent_index = int(self.next())
-                material_index = None
-                if self.version >= 8207:
-                    material_index = int(self.next())
+                            except ValueError:
+                                tex_2_v = float(tex_2_v_value.rsplit('.', 1)[0])
 
-                rotation = self.next_quaternion()
-                translation = self.next_vector()
-                vertex_count = int(self.next())
-                for vertex in range(vertex_count):
-                    vert.append(self.next_vector())
+                            try:
+                                tex_3_u = float(tex_3_u_value)
 
-                self.convex_shapes.append(JMSAsset.Convex_Shape(name, parent_index, material_index, rotation, translation, vert))
+                            except ValueError:
+                                tex_3_u = float(tex_3_u_value.rsplit('.', 1)[0])
 
-            ragdoll_count  = int(self.next())
-            for ragdoll in range(ragdoll_count):
-                name = self.next()
-                attached_index = int(self.next())
-                referenced_index = int(self.next())
-                attached_rotation = self.next_quaternion()
-                attached_translation = self.next_vector()
-                referenced_rotation = self.next_quaternion()
-                referenced_translation = self.next_vector()
-                min_twist = float(self.next())
-                max_twist = float(self.next())
-                min_cone = float(self.next())
-                max_cone = float(self.next())
-                min_plane = float(self.next())
-                max_plane = float(self.next())
-                friction_limit = None
-                if self.version >= 8213:
+                            try:
+                                tex_3_v = float(tex_3_v_value)
+
+                            except ValueError:
+                                tex_3_v = float(tex_3_v_value.rsplit('.', 1)[0])
+
+                        if self.version >= 8203:
+                            uv_set.append([tex_0_u, tex_0_v])
+                            uv_set.append([tex_1_u, tex_1_v])
+                            uv_set.append([tex_2_u, tex_2_v])
+                            uv_set.append([tex_3_u, tex_3_v])
+
+                        else:
+                            uv_set.append([tex_0_u, tex_0_v])
+
+                    flags = None
+                    if self.version >= 8199:
+                        flags = self.skip(1) #Unused int or boolean value. Don't know which but definitely not a float
+
+                self.vertices.append(JMSAsset.Vertex(node_influence_count, node_set, region, translation, normal, color, uv_set))
+
+            triangle_count = int(self.next())
+            block_triangle_count = 0
+            if triangle_count > 0:
+                block_triangle_count = self.read_triangle_block(triangle_count)
+
+            for triangle in range(block_triangle_count, triangle_count):
+                region = None
+                if self.version >= 8198 and self.version < 8205:
+                    region = int(self.next())
+                    self.used_regions.append(region)
+
+                material_index = int(self.next())
+                v0 = int(self.next())
+                v1 = int(self.next())
+                v2 = int(self.next())
+                self.triangles.append(JMSAsset.Triangle(region, material_index, v0, v1, v2))
+
+            self.vertices.finalize()
+            self.triangles.finalize()
+
+            if self.version >= 8206:
+                sphere_count = int(self.next())
+                for sphere in range(sphere_count):
+                    name = self.next()
+                    parent_index = int(self.next())
+                    material_index = None
+                    if self.version >= 8207:
+                        material_index = int(self.next())
+
+                    rotation = self.next_quaternion()
+                    translation = self.next_vector()
+                    radius = float(self.next())
+                    self.spheres.append(JMSAsset.Sphere(name, parent_index, material_index, rotation, translation, radius))
+
+                boxes_count = int(self.next())
+                for box in range(boxes_count):
+                    name = self.next()
+                    parent_index = int(self.next())
+                    material_index = None
+                    if self.version >= 8207:
+                        material_index = int(self.next())
+
+                    rotation = self.next_quaternion()
+                    translation = self.next_vector()
+                    width = float(self.next())
+                    length = float(self.next())
+                    height = float(self.next())
+                    self.boxes.append(JMSAsset.Box(name, parent_index, material_index, rotation, translation, width, length, height))
+
+                capsules_count = int(self.next())
+                for capsules in range(capsules_count):
+                    name = self.next()
+                    parent_index = int(self.next())
+                    material_index = None
+                    if self.version >= 8207:
+                        material_index = int(self.next())
+
+                    rotation = self.next_quaternion()
+                    translation = self.next_vector()
+                    height = float(self.next())
+                    radius = float(self.next())
+                    self.capsules.append(JMSAsset.Capsule(name, parent_index, material_index, rotation, translation, height, radius))
+
+                convex_shape_count = int(self.next())
+                for convex_shape in range(convex_shape_count):
+                    vert = []
+                    name = self.next()
+                    parent_index = int(self.next())
+                    material_index = None
+                    if self.version >= 8207:
+                        material_index = int(self.next())
+
+                    rotation = self.next_quaternion()
+                    translation = self.next_vector()
+                    vertex_count = int(self.next())
+                    for vertex in range(vertex_count):
+                        vert.append(self.next_vector())
+
+                    self.convex_shapes.append(JMSAsset.Convex_Shape(name, parent_index, material_index, rotation, translation, vert))
+
+                ragdoll_count  = int(self.next())
+                for ragdoll in range(ragdoll_count):
+                    name = self.next()
+                    attached_index = int(self.next())
+                    referenced_index = int(self.next())
+                    attached_rotation = self.next_quaternion()
+                    attached_translation = self.next_vector()
+                    referenced_rotation = self.next_quaternion()
+                    referenced_translation = self.next_vector()
+                    min_twist = float(self.next())
+                    max_twist = float(self.next())
+                    min_cone = float(self.next())
+                    max_cone = float(self.next())
+                    min_plane = float(self.next())
+                    max_plane = float(self.next())
+                    friction_limit = None
+                    if self.version >= 8213:
+                        friction_limit = float(self.next())
+
+                    self.ragdolls.append(JMSAsset.Ragdoll(name, attached_index, referenced_index, attached_rotation, attached_translation, referenced_rotation, referenced_translation, min_twist, max_twist, min_cone, max_cone, min_plane, max_plane, friction_limit))
+
+                hinge_count  = int(self.next())
+                for hinge in range(hinge_count):
+                    name = self.next()
+                    body_a_index = int(self.next())
+                    body_b_index = int(self.next())
+                    body_a_rotation = self.next_quaternion()
+                    body_a_translation = self.next_vector()
+                    body_b_rotation = self.next_quaternion()
+                    body_b_translation = self.next_vector()
+                    is_limited = int(self.next())
+                    friction_limit = float(self.next())
+                    min_angle = float(self.next())
+                    max_angle = float(self.next())
+
+                    self.hinges.append(JMSAsset.Hinge(name, body_a_index, body_b_index, body_a_rotation, body_a_translation, body_b_rotation, body_b_translation, is_limited, friction_limit, min_angle, max_angle))
+
+            if self.version >= 8210:
+                car_wheel_count  = int(self.next())
+                for car_wheel in range(car_wheel_count):
+                    name = self.next()
+                    chassis_index = int(self.next())
+                    wheel_index = int(self.next())
+                    wheel_rotation = self.next_quaternion()
+                    wheel_translation = self.next_vector()
+                    suspension_rotation = self.next_quaternion()
+                    suspension_translation = self.next_vector()
+                    suspension_min_limit = float(self.next())
+                    suspension_max_limit = float(self.next())
+                    friction_limit = float(self.next())
+                    velocity = float(self.next())
+                    gain = float(self.next())
+
+                    self.car_wheels.append(JMSAsset.Car_Wheel(name, chassis_index, wheel_index, wheel_rotation, wheel_translation, suspension_rotation, suspension_translation, suspension_min_limit, suspension_max_limit, friction_limit, velocity, gain))
+
+                point_to_point_count = int(self.next())
+                for point_to_point in range(point_to_point_count):
+                    name = self.next()
+                    body_a_index = int(self.next())
+                    body_b_index = int(self.next())
+                    body_a_rotation = self.next_quaternion()
+                    body_a_translation = self.next_vector()
+                    body_b_rotation = self.next_quaternion()
+                    body_b_translation = self.next_vector()
+                    constraint_type = int(self.next())
+                    x_min_limit = float(self.next())
+                    x_max_limit = float(self.next())
+                    y_min_limit = float(self.next())
+                    y_max_limit = float(self.next())
+                    z_min_limit = float(self.next())
+                    z_max_limit = float(self.next())
+                    spring_length = float(self.next())
+
+                    self.point_to_points.append(JMSAsset.Point_to_Point(name, body_a_index, body_b_index, body_a_rotation, body_a_translation, body_b_rotation, body_b_translation, constraint_type, x_min_limit, x_max_limit, y_min_limit, y_max_limit, z_min_limit, z_max_limit, spring_length))
+
+                prismatic_count = int(self.next())
+                for prismatic in range(prismatic_count):
+                    name = self.next()
+                    body_a_index = int(self.next())
+                    body_b_index = int(self.next())
+                    body_a_rotation = self.next_quaternion()
+                    body_a_translation = self.next_vector()
+                    body_b_rotation = self.next_quaternion()
+                    body_b_translation = self.next_vector()
+                    is_limited = int(self.next())
                     friction_limit = float(self.next())
+                    min_limit = float(self.next())
+                    max_limit = float(self.next())
 
-                self.ragdolls.append(JMSAsset.Ragdoll(name, attached_index, referenced_index, attached_rotation, attached_translation, referenced_rotation, referenced_translation, min_twist, max_twist, min_cone, max_cone, min_plane, max_plane, friction_limit))
+                    self.prismatics.append(JMSAsset.Prismatic(name, body_a_index, body_b_index, body_a_rotation, body_a_translation, body_b_rotation, body_b_translation, is_limited, friction_limit, min_limit, max_limit))
 
-            hinge_count  = int(self.next())
-            for hinge in range(hinge_count):
-                name = self.next()
-                body_a_index = int(self.next())
-                body_b_index = int(self.next())
-                body_a_rotation = self.next_quaternion()
-                body_a_translation = self.next_vector()
-                body_b_rotation = self.next_quaternion()
-                body_b_translation = self.next_vector()
-                is_limited = int(self.next())
-                friction_limit = float(self.next())
-                min_angle = float(self.next())
-                max_angle = float(self.next())
-
-                self.hinges.append(JMSAsset.Hinge(name, body_a_index, body_b_index, body_a_rotation, body_a_translation, body_b_rotation, body_b_translation, is_limited, friction_limit, min_angle, max_angle))
-
-        if self.version >= 8210:
-            car_wheel_count  = int(self.next())
-            for car_wheel in range(car_wheel_count):
-                name = self.next()
-                chassis_index = int(self.next())
-                wheel_index = int(self.next())
-                wheel_rotation = self.next_quaternion()
-                wheel_translation = self.next_vector()
-                suspension_rotation = self.next_quaternion()
-                suspension_translation = self.next_vector()
-                suspension_min_limit = float(self.next())
-                suspension_max_limit = float(self.next())
-                friction_limit = float(self.next())
-                velocity = float(self.next())
-                gain = float(self.next())
-
-                self.car_wheels.append(JMSAsset.Car_Wheel(name, chassis_index, wheel_index, wheel_rotation, wheel_translation, suspension_rotation, suspension_translation, suspension_min_limit, suspension_max_limit, friction_limit, velocity, gain))
-
-            point_to_point_count = int(self.next())
-            for point_to_point in range(point_to_point_count):
-                name = self.next()
-                body_a_index = int(self.next())
-                body_b_index = int(self.next())
-                body_a_rotation = self.next_quaternion()
-                body_a_translation = self.next_vector()
-                body_b_rotation = self.next_quaternion()
-                body_b_translation = self.next_vector()
-                constraint_type = int(self.next())
-                x_min_limit = float(self.next())
-                x_max_limit = float(self.next())
-                y_min_limit = float(self.next())
-                y_max_limit = float(self.next())
-                z_min_limit = float(self.next())
-                z_max_limit = float(self.next())
-                spring_length = float(self.next())
-
-                self.point_to_points.append(JMSAsset.Point_to_Point(name, body_a_index, body_b_index, body_a_rotation, body_a_translation, body_b_rotation, body_b_translation, constraint_type, x_min_limit, x_max_limit, y_min_limit, y_max_limit, z_min_limit, z_max_limit, spring_length))
-
-            prismatic_count = int(self.next())
-            for prismatic in range(prismatic_count):
-                name = self.next()
-                body_a_index = int(self.next())
-                body_b_index = int(self.next())
-                body_a_rotation = self.next_quaternion()
-                body_a_translation = self.next_vector()
-                body_b_rotation = self.next_quaternion()
-                body_b_translation = self.next_vector()
-                is_limited = int(self.next())
-                friction_limit = float(self.next())
-                min_limit = float(self.next())
-                max_limit = float(self.next())
-
-                self.prismatics.append(JMSAsset.Prismatic(name, body_a_index, body_b_index, body_a_rotation, body_a_translation, body_b_rotation, body_b_translation, is_limited, friction_limit, min_limit, max_limit))
-
-        if self.version >= 8209:
-            bounding_sphere_count = int(self.next())
-            for bounding_sphere in range(bounding_sphere_count):
-                translation = self.next_vector()
-                radius = float(self.next())
+            if self.version >= 8209:
+                bounding_sphere_count = int(self.next())
+                for bounding_sphere in range(bounding_sphere_count):
+                    translation = self.next_vector()
+                    radius = float(self.next())
+
+                    self.bounding_spheres.append(JMSAsset.Bounding_Sphere(translation, radius))
 
-                self.bounding_spheres.append(JMSAsset.Bounding_Sphere(translation, radius))
+            if self.version >= 8212:
+                skylight_count = int(self.next())
+                for skylight in range(skylight_count):
+                    direction = self.next_vector()
+                    radiant_intensity = self.next_vector()
+                    solid_angle = float(self.next())
 
-        if self.version >= 8212:
-            skylight_count = int(self.next())
-            for skylight in range(skylight_count):
-                direction = self.next_vector()
-                radiant_intensity = self.next_vector()
-                solid_angle = float(self.next())
+                    self.skylights.append(JMSAsset.Skylight(direction, radiant_intensity, solid_angle))
 
-                self.skylights.append(JMSAsset.Skylight(direction, radiant_intensity, solid_angle))
+            if self.left() != 0: # is something wrong with the parser?
+                raise RuntimeError("%s elements left after parse end" % self.left())
 
-        if self.left() != 0: # is something wrong with the parser?
-            raise RuntimeError("%s elements left after parse end" % self.left())
+        finally:
+            # Release the memory mapped source file when parsing stops early
+            self.close()
 
         # update node graph
         if self.version >= 8205:
@@ -869,35 +971,42 @@ def set_parent_id_class(jms_file, parent_id_class):
             else:
                 parent_id_class.clavicle1 = idx
 
-def load_file(context, filepath, report, game_version, reuse_armature, fix_parents, fix_rotations):
-    jms_file = JMSAsset(filepath, game_version)
+def load_file(context, filepath, report, game_version, reuse_armature, fix_parents, fix_rotations, use_asset_cache=False, verify_cache_hash=False, weld_vertices=False, weld_distance=0.0):
+    jms_file = asset_cache.load_asset(JMSAsset, filepath, (game_version,), use_asset_cache, verify_cache_hash)
+    build_scene(context, jms_file, filepath, reuse_armature, fix_parents, fix_rotations, weld_vertices, weld_distance)
+    if use_asset_cache:
+        asset_cache.report_cache_stats(report)
 
+    return {'FINISHED'}
+
+def load_files(context, filepaths, report, game_version, fix_parents, fix_rotations, weld_vertices=False, weld_distance=0.0):
+    elements_list, pool_error = asset_reader.read_elements_batch(filepaths)
+    for filepath, elements in zip(filepaths, elements_list):
+        jms_file = JMSAsset(filepath, game_version, elements=elements)
+        build_scene(context, jms_file, filepath, True, fix_parents, fix_rotations, weld_vertices, weld_distance)
+
+    if pool_error is None:
+        report({'INFO'}, "Imported %s JMS files, tokenized in worker processes" % len(filepaths))
+
+    else:
+        report({'INFO'}, "Imported %s JMS files, tokenized in process because the process pool was not used (%s)" % (len(filepaths), pool_error))
+
+    return {'FINISHED'}
+
+def build_scene(context, jms_file, filepath, reuse_armature, fix_parents, fix_rotations, weld_vertices=False, weld_distance=0.0):
     collection = context.collection
     scene = context.scene
-    armature = None
-    object_list = list(scene.objects)
     region_permutation_list = []
     game_version = jms_file.game_version
     version = jms_file.version
     object_name = bpy.path.basename(filepath).rsplit('.', 1)[0]
     random_color_gen = global_functions.RandomColorGenerator() # generates a random sequence of colors
+    template_meshes = mesh_processing.TemplateMeshes()
 
     mesh_processing.deselect_objects(context)
 
-    for obj in object_list:
-        if armature is None:
-            if obj.type == 'ARMATURE':
-                exist_count = 0
-                armature_bone_list = []
-                armature_bone_list = list(obj.data.bones)
-                for node in armature_bone_list:
-                    for jms_node in jms_file.nodes:
-                        if node.name == jms_node.name:
-                            exist_count += 1
-
-                if exist_count == len(jms_file.nodes):
-                    armature = obj
-
+    scene_armatures = [obj for obj in scene.objects if obj.type == 'ARMATURE']
+    armature = skeleton_index.skeleton_index.find_armature(scene_armatures, jms_file.nodes)[0]
     if armature == None or not reuse_armature:
         parent_id_class = global_functions.ParentIDFix()
 
@@ -912,6 +1021,9 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
 
         generate_jms_skeleton(jms_file, armature, parent_id_class, fix_rotations)
 
+    # Objects below are parented directly from the pose bone matrices so evaluate the pose once up front
+    context.view_layer.update()
+
     for used_regions in jms_file.used_regions:
         name = jms_file.regions[used_regions].name
         if jms_file.game_version == 'haloce':
@@ -941,30 +1053,20 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         if context.scene.objects.get('#%s' % marker_obj.name):
             marker_name_override = marker_obj.name
 
-        mesh = bpy.data.meshes.new(object_name_prefix)
+        mesh = template_meshes.get_shared('SPHERE', object_name_prefix, 'MARKER')
         object_mesh = bpy.data.objects.new(object_name_prefix, mesh)
         collection.objects.link(object_mesh)
 
         object_mesh.marker.name_override = marker_name_override
 
-        bm = bmesh.new()
-        bmesh.ops.create_uvsphere(bm, u_segments=32, v_segments=16, diameter=1)
-        bm.to_mesh(mesh)
-        bm.free()
-
         if not marker_region_index == -1:
             object_mesh.face_maps.new(name=jms_file.regions[marker_region_index].name)
 
-        mesh_processing.select_object(context, object_mesh)
-        mesh_processing.select_object(context, armature)
+        parent_bone = None
         if not parent_idx == -1:
-            bpy.ops.object.mode_set(mode='EDIT')
-            armature.data.edit_bones.active = armature.data.edit_bones[jms_file.nodes[parent_idx].name]
-            bpy.ops.object.mode_set(mode='OBJECT')
-            bpy.ops.object.parent_set(type='BONE', keep_transform=True)
+            parent_bone = jms_file.nodes[parent_idx].name
 
-        else:
-            bpy.ops.object.parent_set(type='ARMATURE', keep_transform=True)
+        mesh_processing.set_object_parent(object_mesh, armature, parent_bone)
 
         matrix_translate = Matrix.Translation(marker_obj.translation)
         matrix_rotation = marker_obj.rotation.to_matrix().to_4x4()
@@ -981,30 +1083,23 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         object_mesh.data.ass_jms.Object_Type = 'SPHERE'
         object_dimension = radius * 2
         object_mesh.dimensions = (object_dimension, object_dimension, object_dimension)
-        object_mesh.select_set(False)
-        armature.select_set(False)
 
     for xref_marker in jms_file.xref_instance_markers:
         xref_name = xref_marker.name
+        xref_path = None
+        if version >= 8205:
+            xref_idx = xref_marker.path_index
+            xref_path = jms_file.xref_paths[xref_idx].path
 
-        mesh = bpy.data.meshes.new(xref_name)
+        mesh = template_meshes.get_shared('BOX', xref_name, ('XREF', xref_path))
         object_mesh = bpy.data.objects.new(xref_name, mesh)
         collection.objects.link(object_mesh)
 
-        bm = bmesh.new()
-        bmesh.ops.create_cube(bm, size=1.0)
-        bm.to_mesh(mesh)
-        bm.free()
-
         object_mesh.data.ass_jms.Object_Type = 'BOX'
-        if version >= 8205:
-            xref_idx = xref_marker.path_index
-            xref_path = jms_file.xref_paths[xref_idx].path
+        if not xref_path is None:
             object_mesh.data.ass_jms.XREF_path = xref_path
 
-        mesh_processing.select_object(context, object_mesh)
-        mesh_processing.select_object(context, armature)
-        bpy.ops.object.parent_set(type='ARMATURE', keep_transform=True)
+        mesh_processing.set_object_parent(object_mesh, armature)
 
         matrix_translate = Matrix.Translation(xref_marker.translation)
         matrix_rotation = xref_marker.rotation.to_matrix().to_4x4()
@@ -1012,8 +1107,6 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         transform_matrix = matrix_translate @ matrix_rotation
 
         object_mesh.matrix_world = transform_matrix
-        object_mesh.select_set(False)
-        armature.select_set(False)
 
     #generate mesh object
     if not len(jms_file.vertices) == 0:
@@ -1029,11 +1122,7 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         mesh = bpy.data.meshes.new(object_name)
         object_mesh = bpy.data.objects.new(object_name, mesh)
         collection.objects.link(object_mesh)
-        bm, vert_normal_list = mesh_processing.process_mesh_import_data(game_version, jms_file, None, object_mesh, random_color_gen, 'JMS')
-        bm.to_mesh(mesh)
-        bm.free()
-        object_mesh.data.normals_split_custom_set(vert_normal_list)
-        object_mesh.data.use_auto_smooth = True
+        mesh_processing.build_mesh_import_data(game_version, jms_file, None, object_mesh, random_color_gen, 'JMS', weld_vertices, weld_distance)
         object_mesh.parent = armature
         mesh_processing.add_modifier(context, object_mesh, False, None, armature)
 
@@ -1044,26 +1133,19 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         radius = sphere.radius
 
         object_name_prefix = '$%s' % name
+        material_name = None
+        if not material_index == -1:
+            material_name = jms_file.materials[material_index].scene_name
 
-        mesh = bpy.data.meshes.new(object_name_prefix)
+        mesh = template_meshes.get_shared('SPHERE', object_name_prefix, ('PHYSICS', material_name))
         object_mesh = bpy.data.objects.new(object_name_prefix, mesh)
         collection.objects.link(object_mesh)
 
-        bm = bmesh.new()
-        bmesh.ops.create_uvsphere(bm, u_segments=32, v_segments=16, diameter=1)
-        bm.to_mesh(mesh)
-        bm.free()
-
-        mesh_processing.select_object(context, object_mesh)
-        mesh_processing.select_object(context, armature)
+        parent_bone = None
         if not parent_idx == -1:
-            bpy.ops.object.mode_set(mode='EDIT')
-            armature.data.edit_bones.active = armature.data.edit_bones[jms_file.nodes[parent_idx].name]
-            bpy.ops.object.mode_set(mode='OBJECT')
-            bpy.ops.object.parent_set(type='BONE', keep_transform=True)
+            parent_bone = jms_file.nodes[parent_idx].name
 
-        else:
-            bpy.ops.object.parent_set(type='ARMATURE', keep_transform=True)
+        mesh_processing.set_object_parent(object_mesh, armature, parent_bone)
 
         matrix_translate = Matrix.Translation(sphere.translation)
         matrix_rotation = sphere.rotation.to_matrix().to_4x4()
@@ -1098,8 +1180,6 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         object_mesh.data.ass_jms.Object_Type = 'SPHERE'
         object_dimension = radius * 2
         object_mesh.dimensions = (object_dimension, object_dimension, object_dimension)
-        object_mesh.select_set(False)
-        armature.select_set(False)
 
     for box in jms_file.boxes:
         parent_idx = box.parent_index
@@ -1110,26 +1190,19 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         height = box.height
 
         object_name_prefix = '$%s' % name
+        material_name = None
+        if not material_index == -1:
+            material_name = jms_file.materials[material_index].scene_name
 
-        mesh = bpy.data.meshes.new(object_name_prefix)
+        mesh = template_meshes.get_shared('BOX', object_name_prefix, ('PHYSICS', material_name))
         object_mesh = bpy.data.objects.new(object_name_prefix, mesh)
         collection.objects.link(object_mesh)
 
-        bm = bmesh.new()
-        bmesh.ops.create_cube(bm, size=1.0)
-        bm.to_mesh(mesh)
-        bm.free()
-
-        mesh_processing.select_object(context, object_mesh)
-        mesh_processing.select_object(context, armature)
+        parent_bone = None
         if not parent_idx == -1:
-            bpy.ops.object.mode_set(mode='EDIT')
-            armature.data.edit_bones.active = armature.data.edit_bones[jms_file.nodes[parent_idx].name]
-            bpy.ops.object.mode_set(mode='OBJECT')
-            bpy.ops.object.parent_set(type='BONE', keep_transform=True)
+            parent_bone = jms_file.nodes[parent_idx].name
 
-        else:
-            bpy.ops.object.parent_set(type='ARMATURE', keep_transform=True)
+        mesh_processing.set_object_parent(object_mesh, armature, parent_bone)
 
         matrix_translate = Matrix.Translation(box.translation)
         matrix_rotation = box.rotation.to_matrix().to_4x4()
@@ -1164,8 +1237,6 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
 
         object_mesh.data.ass_jms.Object_Type = 'BOX'
         object_mesh.dimensions = (width, length, height)
-        object_mesh.select_set(False)
-        armature.select_set(False)
 
     for capsule in jms_file.capsules:
         parent_idx = capsule.parent_index
@@ -1175,27 +1246,19 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         radius = capsule.radius
 
         object_name_prefix = '$%s' % name
+        material_name = None
+        if not material_index == -1:
+            material_name = jms_file.materials[material_index].scene_name
 
-        mesh = bpy.data.meshes.new(object_name_prefix)
+        mesh = template_meshes.get_shared('CAPSULES', object_name_prefix, ('PHYSICS', material_name))
         object_mesh = bpy.data.objects.new(object_name_prefix, mesh)
         collection.objects.link(object_mesh)
 
-        bm = bmesh.new()
-        bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=False, segments=12, diameter1=1, diameter2=1, depth=2)
-        bm.transform(Matrix.Translation((0, 0, 1)))
-        bm.to_mesh(mesh)
-        bm.free()
-
-        mesh_processing.select_object(context, object_mesh)
-        mesh_processing.select_object(context, armature)
+        parent_bone = None
         if not parent_idx == -1:
-            bpy.ops.object.mode_set(mode='EDIT')
-            armature.data.edit_bones.active = armature.data.edit_bones[jms_file.nodes[parent_idx].name]
-            bpy.ops.object.mode_set(mode='OBJECT')
-            bpy.ops.object.parent_set(type='BONE', keep_transform=True)
+            parent_bone = jms_file.nodes[parent_idx].name
 
-        else:
-            bpy.ops.object.parent_set(type='ARMATURE', keep_transform=True)
+        mesh_processing.set_object_parent(object_mesh, armature, parent_bone)
 
         matrix_translate = Matrix.Translation(capsule.translation)
         matrix_rotation = capsule.rotation.to_matrix().to_4x4()
@@ -1230,8 +1293,6 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         object_mesh.data.ass_jms.Object_Type = 'CAPSULES'
         object_dimension = radius * 2
         object_mesh.dimensions = (object_dimension, object_dimension, (object_dimension + height))
-        object_mesh.select_set(False)
-        armature.select_set(False)
 
 
     for convex_shape in jms_file.convex_shapes:
@@ -1253,16 +1314,11 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         bm.to_mesh(mesh)
         bm.free()
 
-        mesh_processing.select_object(context, object_mesh)
-        mesh_processing.select_object(context, armature)
+        parent_bone = None
         if not parent_idx == -1:
-            bpy.ops.object.mode_set(mode='EDIT')
-            armature.data.edit_bones.active = armature.data.edit_bones[jms_file.nodes[parent_idx].name]
-            bpy.ops.object.mode_set(mode='OBJECT')
-            bpy.ops.object.parent_set(type='BONE', keep_transform=True)
+            parent_bone = jms_file.nodes[parent_idx].name
 
-        else:
-            bpy.ops.object.parent_set(type='ARMATURE', keep_transform=True)
+        mesh_processing.set_object_parent(object_mesh, armature, parent_bone)
 
         matrix_translate = Matrix.Translation(convex_shape.translation)
         matrix_rotation = convex_shape.rotation.to_matrix().to_4x4()
@@ -1320,9 +1376,7 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         object_empty.empty_display_size = 2
         object_empty.empty_display_type = 'ARROWS'
 
-        mesh_processing.select_object(context, object_empty)
-        mesh_processing.select_object(context, armature)
-        bpy.ops.object.parent_set(type='ARMATURE', keep_transform=True)
+        mesh_processing.set_object_parent(object_empty, armature)
         matrix_translate = Matrix.Translation(ragdoll.attached_translation)
         matrix_rotation = ragdoll.attached_rotation.to_matrix().to_4x4()
 
@@ -1335,8 +1389,6 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
                 transform_matrix = pose_bone.matrix @ transform_matrix
 
         object_empty.matrix_world = transform_matrix
-        object_empty.select_set(False)
-        armature.select_set(False)
 
     for hinge in jms_file.hinges:
         name = hinge.name
@@ -1356,9 +1408,7 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         object_empty.empty_display_size = 2
         object_empty.empty_display_type = 'ARROWS'
 
-        mesh_processing.select_object(context, object_empty)
-        mesh_processing.select_object(context, armature)
-        bpy.ops.object.parent_set(type='ARMATURE', keep_transform=True)
+        mesh_processing.set_object_parent(object_empty, armature)
         matrix_translate = Matrix.Translation(hinge.body_a_translation)
         matrix_rotation = hinge.body_a_rotation.to_matrix().to_4x4()
 
@@ -1371,8 +1421,6 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
                 transform_matrix = pose_bone.matrix @ transform_matrix
 
         object_empty.matrix_world = transform_matrix
-        object_empty.select_set(False)
-        armature.select_set(False)
 
     for car_wheel in jms_file.car_wheels:
         name = car_wheel.name
@@ -1392,9 +1440,7 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         object_empty.empty_display_size = 2
         object_empty.empty_display_type = 'ARROWS'
 
-        mesh_processing.select_object(context, object_empty)
-        mesh_processing.select_object(context, armature)
-        bpy.ops.object.parent_set(type='ARMATURE', keep_transform=True)
+        mesh_processing.set_object_parent(object_empty, armature)
         matrix_translate = Matrix.Translation(car_wheel.wheel_translation)
         matrix_rotation = car_wheel.wheel_rotation.to_matrix().to_4x4()
 
@@ -1407,8 +1453,6 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
                 transform_matrix = pose_bone.matrix @ transform_matrix
 
         object_empty.matrix_world = transform_matrix
-        object_empty.select_set(False)
-        armature.select_set(False)
 
     for point_to_point in jms_file.point_to_points:
         name = point_to_point.name
@@ -1428,9 +1472,7 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         object_empty.empty_display_size = 2
         object_empty.empty_display_type = 'ARROWS'
 
-        mesh_processing.select_object(context, object_empty)
-        mesh_processing.select_object(context, armature)
-        bpy.ops.object.parent_set(type='ARMATURE', keep_transform=True)
+        mesh_processing.set_object_parent(object_empty, armature)
         matrix_translate = Matrix.Translation(point_to_point.body_a_translation)
         matrix_rotation = point_to_point.body_a_rotation.to_matrix().to_4x4()
 
@@ -1443,8 +1485,6 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
                 transform_matrix = pose_bone.matrix @ transform_matrix
 
         object_empty.matrix_world = transform_matrix
-        object_empty.select_set(False)
-        armature.select_set(False)
 
     for prismatic in jms_file.prismatics:
         name = prismatic.name
@@ -1464,9 +1504,7 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         object_empty.empty_display_size = 2
         object_empty.empty_display_type = 'ARROWS'
 
-        mesh_processing.select_object(context, object_empty)
-        mesh_processing.select_object(context, armature)
-        bpy.ops.object.parent_set(type='ARMATURE', keep_transform=True)
+        mesh_processing.set_object_parent(object_empty, armature)
         matrix_translate = Matrix.Translation(prismatic.body_a_translation)
         matrix_rotation = prismatic.body_a_rotation.to_matrix().to_4x4()
 
@@ -1479,25 +1517,16 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
                 transform_matrix = pose_bone.matrix @ transform_matrix
 
         object_empty.matrix_world = transform_matrix
-        object_empty.select_set(False)
-        armature.select_set(False)
 
     for idx, bounding_sphere in enumerate(jms_file.bounding_spheres):
         name = 'bounding_sphere_%s' % idx
         radius = bounding_sphere.radius
 
-        mesh = bpy.data.meshes.new(name)
+        mesh = template_meshes.get_shared('SPHERE', name, 'BOUNDING_SPHERE')
         object_mesh = bpy.data.objects.new(name, mesh)
         collection.objects.link(object_mesh)
 
-        bm = bmesh.new()
-        bmesh.ops.create_uvsphere(bm, u_segments=32, v_segments=16, diameter=1)
-        bm.to_mesh(mesh)
-        bm.free()
-
-        mesh_processing.select_object(context, object_mesh)
-        mesh_processing.select_object(context, armature)
-        bpy.ops.object.parent_set(type='ARMATURE', keep_transform=True)
+        mesh_processing.set_object_parent(object_mesh, armature)
 
         matrix_translate = Matrix.Translation(bounding_sphere.translation)
 
@@ -1508,8 +1537,6 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         object_mesh.data.ass_jms.bounding_radius = True
         object_dimension = radius * 2
         object_mesh.dimensions = (object_dimension, object_dimension, object_dimension)
-        object_mesh.select_set(False)
-        armature.select_set(False)
 
     for idx, skylight in enumerate(jms_file.skylights):
         name = 'skylight_%s' % idx
@@ -1522,14 +1549,9 @@ def load_file(context, filepath, report, game_version, reuse_armature, fix_paren
         object_mesh.data.color = (skylight.radiant_intensity)
         object_mesh.data.energy = (skylight.solid_angle)
 
-        mesh_processing.select_object(context, object_mesh)
-        mesh_processing.select_object(context, armature)
-        bpy.ops.object.parent_set(type='ARMATURE', keep_transform=True)
+        mesh_processing.set_object_parent(object_mesh, armature)
 
-        object_mesh.select_set(False)
-        armature.select_set(False)
-
-    return {'FINISHED'}
+    template_meshes.remove_templates()
 
 if __name__ == '__main__':
     bpy.ops.import_scene.jms()
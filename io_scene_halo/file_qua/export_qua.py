@@ -125,6 +125,7 @@ class QUAScene(global_functions.HaloAsset):
                 if name[0:1] == '+':
                     extra_cameras.append(obj)
 
+        transform_cache = global_functions.TransformCache(None, None, version, 'QUA', 1, False)
         if ubercam:
             for action in bpy.data.actions:
                 action_prefix = action.name.split(' ', 1)[0]
@@ -135,10 +136,8 @@ class QUAScene(global_functions.HaloAsset):
                     first_frame = round(action.fcurves[0].keyframe_points[0].co[0])
                     last_frame = round(action.fcurves[0].keyframe_points[-1].co[0]) + 1
                     ubercam.animation_data.action = action
-                    for frame in range(first_frame, last_frame):
-                        context.scene.frame_set(frame)
-
-                        camera_matrix = global_functions.get_matrix(ubercam, ubercam, False, None, None, False, version, 'QUA', False, 1)
+                    for frame in global_functions.sample_frames(context, first_frame, last_frame, (transform_cache,)):
+                        camera_matrix = transform_cache.get_matrix(ubercam, ubercam, False, False, False)
                         mesh_dimensions = global_functions.get_dimensions(camera_matrix, ubercam, version, None, False, False, 'QUA', 1)
                         position = (mesh_dimensions.position[0], mesh_dimensions.position[1], mesh_dimensions.position[2])
 
@@ -176,10 +175,8 @@ class QUAScene(global_functions.HaloAsset):
                         first_frame = round(action.fcurves[0].keyframe_points[0].co[0])
                         last_frame = round(action.fcurves[0].keyframe_points[-1].co[0]) + 1
                         extra_camera_obj.animation_data.action = action
-                        for frame in range(first_frame, last_frame):
-                            context.scene.frame_set(frame)
-
-                            camera_matrix = global_functions.get_matrix(ubercam, ubercam, False, None, None, False, version, 'QUA', False, 1)
+                        for frame in global_functions.sample_frames(context, first_frame, last_frame, (transform_cache,)):
+                            camera_matrix = transform_cache.get_matrix(ubercam, ubercam, False, False, False)
                             mesh_dimensions = global_functions.get_dimensions(camera_matrix, ubercam, version, None, False, False, 'QUA', 1)
                             position = (mesh_dimensions.position[0], mesh_dimensions.position[1], mesh_dimensions.position[2])
 
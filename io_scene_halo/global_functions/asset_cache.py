@@ -0,0 +1,325 @@
+# ##### BEGIN MIT LICENSE BLOCK #####
+#
+# MIT License
+#
+# Copyright (c) 2020 Steven Garcia
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# ##### END MIT LICENSE BLOCK #####
+
+import os
+import json
+import hashlib
+import numpy as np
+
+from enum import Enum
+from mathutils import Vector, Quaternion, Matrix, Euler
+from .. import config
+from . import global_functions
+
+CACHE_VERSION = 2
+
+class CacheDecodeError(Exception):
+    pass
+
+class AssetCache:
+    """Stores parsed JMS/JMA/ASS assets as .npz files so unchanged source files skip parsing on the next import"""
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, asset_class, filepath, args=(), verify_hash=False):
+        """Return a parsed asset, reading it from the cache when the source file is unchanged. Warnings the parser reported are replayed on a hit"""
+        filepath = os.path.abspath(filepath)
+        file_stat = os.stat(filepath)
+        file_hash = None
+        if verify_hash:
+            file_hash = get_file_hash(filepath)
+
+        # Only plain values are part of the key, callbacks such as report() change between calls
+        key_args = [arg for arg in args if isinstance(arg, (str, int, float, bool))]
+        key_string = "%s|%s.%s|%s|%s|%s|%s" % (CACHE_VERSION, asset_class.__module__, asset_class.__qualname__, os.path.normcase(filepath), file_stat.st_size, file_stat.st_mtime_ns, key_args)
+        cache_path = os.path.join(self.directory, "%s.npz" % hashlib.sha1(key_string.encode('utf-8')).hexdigest())
+
+        # Callbacks are the report() functions passed through to the parser
+        reports = [arg for arg in args if callable(arg)]
+        cached_entry = self.read(cache_path, file_hash, asset_class)
+        if cached_entry is None:
+            self.misses += 1
+            reported_messages = []
+            recording_args = []
+            for arg in args:
+                if callable(arg):
+                    arg = get_recording_report(arg, reported_messages)
+
+                recording_args.append(arg)
+
+            asset = asset_class(filepath, *recording_args)
+            self.write(cache_path, asset, file_hash, reported_messages)
+
+        else:
+            self.hits += 1
+            asset, reported_messages = cached_entry
+            for report_type, message in reported_messages:
+                for report in reports:
+                    report(set(report_type), message)
+
+        return asset
+
+    def read(self, cache_path, file_hash, asset_class):
+        if not os.path.isfile(cache_path):
+            return None
+
+        try:
+            with np.load(cache_path) as cache_file:
+                header = json.loads(cache_file['graph'].tobytes().decode('utf-8'))
+                if not header['version'] == CACHE_VERSION:
+                    return None
+
+                if not file_hash is None and not header['hash'] == file_hash:
+                    return None
+
+                # Only the asset class and its own records can be rebuilt, a cache file naming anything else is a miss
+                if not header['asset']['object'] == get_class_path(asset_class):
+                    return None
+
+                arrays = [cache_file['array_%s' % idx] for idx in range(header['array_count'])]
+                asset = decode_value(header['asset'], arrays, {}, get_allowed_classes(asset_class))
+                reported_messages = header['reports']
+
+        except Exception:
+            return None
+
+        asset._elements = []
+        os.utime(cache_path)
+
+        return asset, reported_messages
+
+    def write(self, cache_path, asset, file_hash, reported_messages):
+        arrays = []
+        try:
+            fields = {}
+            for field_name, field_value in get_fields(asset).items():
+                if not field_name == '_elements':
+                    fields[field_name] = field_value
+
+            encoded_asset = {'object': get_class_path(type(asset)), 'id': 0, 'fields': encode_value(fields, arrays, {id(asset): 0})}
+            header = json.dumps({'version': CACHE_VERSION, 'hash': file_hash, 'array_count': len(arrays), 'reports': reported_messages, 'asset': encoded_asset})
+
+        except TypeError:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        cache_arrays = {'graph': np.frombuffer(header.encode('utf-8'), dtype=np.uint8)}
+        for idx, array in enumerate(arrays):
+            cache_arrays['array_%s' % idx] = array
+
+        temp_path = "%s.tmp.npz" % cache_path[:-4]
+        try:
+            np.savez(temp_path, **cache_arrays)
+            os.replace(temp_path, cache_path)
+
+        except OSError:
+            return
+
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used cache files until the cache fits in max_size"""
+        cache_files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith('.npz'):
+                entry_stat = entry.stat()
+                cache_files.append((entry_stat.st_mtime, entry_stat.st_size, entry.path))
+
+        cache_size = sum(cache_file[1] for cache_file in cache_files)
+        for mtime, size, path in sorted(cache_files):
+            if cache_size <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+                cache_size -= size
+
+            except OSError:
+                pass
+
+def get_file_hash(filepath):
+    file_hash = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
+def get_recording_report(report, reported_messages):
+    def recording_report(report_type, message):
+        reported_messages.append([sorted(report_type), message])
+        return report(report_type, message)
+
+    return recording_report
+
+def get_class_path(value_class):
+    return [value_class.__module__, value_class.__qualname__]
+
+def get_nested_classes(value_class, allowed_classes):
+    allowed_classes[tuple(get_class_path(value_class))] = value_class
+    for value in vars(value_class).values():
+        if isinstance(value, type) and value.__qualname__.startswith(value_class.__qualname__ + '.'):
+            get_nested_classes(value, allowed_classes)
+
+def get_allowed_classes(asset_class):
+    """Classes decode_value() may rebuild for an asset: the asset, its nested record classes and enums and the columnar buffers"""
+    allowed_classes = {}
+    for value_class in (asset_class, global_functions.VertexBuffer, global_functions.TriangleBuffer):
+        get_nested_classes(value_class, allowed_classes)
+
+    return allowed_classes
+
+def get_class(class_path, allowed_classes):
+    value_class = allowed_classes.get(tuple(class_path))
+    if value_class is None:
+        raise CacheDecodeError("%s.%s is not an asset class" % tuple(class_path))
+
+    return value_class
+
+def get_fields(value):
+    fields = dict(getattr(value, '__dict__', {}))
+    for value_class in type(value).__mro__:
+        for slot in getattr(value_class, '__slots__', ()):
+            if hasattr(value, slot):
+                fields[slot] = getattr(value, slot)
+
+    return fields
+
+def encode_value(value, arrays, object_ids):
+    """Convert a parsed asset into JSON friendly values, numpy arrays are stored separately"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+
+    if isinstance(value, np.generic):
+        return value.item()
+
+    if isinstance(value, Vector):
+        return {'vector': list(value)}
+
+    if isinstance(value, Quaternion):
+        return {'quaternion': list(value)}
+
+    if isinstance(value, Euler):
+        return {'euler': [list(value), value.order]}
+
+    if isinstance(value, Matrix):
+        return {'matrix': [list(row) for row in value]}
+
+    if isinstance(value, list):
+        return [encode_value(item, arrays, object_ids) for item in value]
+
+    if isinstance(value, tuple):
+        return {'tuple': [encode_value(item, arrays, object_ids) for item in value]}
+
+    if isinstance(value, dict):
+        return {'dict': [[encode_value(key, arrays, object_ids), encode_value(item, arrays, object_ids)] for key, item in value.items()]}
+
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            raise TypeError("Object arrays can not be cached")
+
+        arrays.append(value)
+        return {'array': len(arrays) - 1}
+
+    if isinstance(value, Enum):
+        return {'enum': get_class_path(type(value)), 'value': value.value}
+
+    if callable(value) or not hasattr(value, '__dict__') and not hasattr(type(value), '__slots__'):
+        raise TypeError("%s can not be cached" % type(value).__name__)
+
+    value_id = object_ids.get(id(value))
+    if not value_id is None:
+        return {'ref': value_id}
+
+    value_id = len(object_ids)
+    object_ids[id(value)] = value_id
+
+    return {'object': get_class_path(type(value)), 'id': value_id, 'fields': encode_value(get_fields(value), arrays, object_ids)}
+
+def decode_value(value, arrays, objects, allowed_classes):
+    """Rebuild a value written by encode_value(). Objects are limited to allowed_classes, anything else raises CacheDecodeError"""
+    if isinstance(value, list):
+        return [decode_value(item, arrays, objects, allowed_classes) for item in value]
+
+    if not isinstance(value, dict):
+        return value
+
+    if 'tuple' in value:
+        return tuple(decode_value(item, arrays, objects, allowed_classes) for item in value['tuple'])
+
+    if 'dict' in value:
+        return {decode_value(key, arrays, objects, allowed_classes): decode_value(item, arrays, objects, allowed_classes) for key, item in value['dict']}
+
+    if 'array' in value:
+        return arrays[value['array']]
+
+    if 'vector' in value:
+        return Vector(value['vector'])
+
+    if 'quaternion' in value:
+        return Quaternion(value['quaternion'])
+
+    if 'euler' in value:
+        return Euler(value['euler'][0], value['euler'][1])
+
+    if 'matrix' in value:
+        return Matrix(value['matrix'])
+
+    if 'enum' in value:
+        enum_class = get_class(value['enum'], allowed_classes)
+        if not issubclass(enum_class, Enum):
+            raise CacheDecodeError("%s is not an enum" % enum_class.__qualname__)
+
+        return enum_class(value['value'])
+
+    if 'ref' in value:
+        return objects[value['ref']]
+
+    value_class = get_class(value['object'], allowed_classes)
+    decoded_object = value_class.__new__(value_class)
+    objects[value['id']] = decoded_object
+    for field_name, field_value in value['fields']['dict']:
+        if not isinstance(field_name, str) or field_name.startswith('__'):
+            raise CacheDecodeError("Invalid field name %r" % (field_name,))
+
+        setattr(decoded_object, field_name, decode_value(field_value, arrays, objects, allowed_classes))
+
+    return decoded_object
+
+asset_cache = AssetCache(config.ASSET_CACHE_DIRECTORY, config.ASSET_CACHE_MAX_SIZE)
+
+def load_asset(asset_class, filepath, args=(), use_cache=False, verify_hash=False):
+    """Construct asset_class(filepath, *args), going through the asset cache when it is enabled"""
+    if not use_cache:
+        return asset_class(filepath, *args)
+
+    return asset_cache.load(asset_class, filepath, args, verify_hash)
+
+def report_cache_stats(report):
+    report({'INFO'}, "Asset cache: %s hits, %s misses" % (asset_cache.hits, asset_cache.misses))
@@ -0,0 +1,152 @@
+# ##### BEGIN MIT LICENSE BLOCK #####
+#
+# MIT License
+#
+# Copyright (c) 2020 Steven Garcia
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# ##### END MIT LICENSE BLOCK #####
+
+import os
+import re
+import sys
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Nothing in this module may depend on Blender so it can be loaded by the worker processes of read_elements_batch()
+
+comment_regex = re.compile("[^\"]*;(?!.*\")")
+
+def detect_encoding(header_bytes, file_size):
+    """Guess the encoding of an asset from its first bytes and its total size"""
+    UTF_8_BOM = b'\xef\xbb\xbf'
+    UTF_16_BE_BOM = b'\xfe\xff'
+    UTF_16_LE_BOM = b'\xff\xfe'
+    encoding = None
+    # first check the boms
+    if header_bytes.startswith(UTF_8_BOM):
+        encoding = 'utf-8-sig'
+
+    elif header_bytes.startswith(UTF_16_BE_BOM) or header_bytes.startswith(UTF_16_LE_BOM):
+        encoding = 'utf-16'
+
+    else:
+        if file_size % 2: # can't be USC-2/UTF-16 if the number of bytes is odd
+            encoding = 'utf-8'
+
+        else:
+            # get the first half a kilobyte
+            sample_bytes = header_bytes[:0x200]
+
+            even_zeros = sample_bytes[0::2].count(0)
+            odd_zeros = sample_bytes[1::2].count(0)
+
+            ## if there are no null bytes we assume we are dealing with a utf-8 file
+            ## if there are null bytes, assume utf-16 and guess endianness based on where the null bytes are
+            if even_zeros == 0 and odd_zeros == 0:
+                encoding = 'utf-8'
+
+            elif odd_zeros > even_zeros:
+                encoding = 'utf-16-le'
+
+            else:
+                encoding = 'utf-16-be'
+
+    return encoding
+
+def read_asset_text(filepath):
+    """Read an asset file with a single binary read and decode it with the detected encoding"""
+    with open(filepath, 'rb') as file:
+        data = file.read()
+
+    encoding = detect_encoding(data[:0x200], len(data))
+    if encoding == 'utf-8' and data.isascii():
+        text = data.decode('ascii')
+
+    else:
+        text = data.decode(encoding)
+
+    # Match the universal newline handling of text mode
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+
+    return text
+
+def tokenize(text):
+    """Split a decoded asset buffer into its list of elements in a single pass"""
+    elements = []
+    for line in text.split("\n"):
+        if not ";" in line:
+            elements += [element for element in line.strip().split("\t") if element]
+            continue
+
+        for element in line.strip().split("\t"):
+            if element != '':
+                comment_match = comment_regex.search(element)
+                if comment_match is None:
+                    elements.append(element)
+                else:
+                    processed_element = element[: comment_match.end() - 1]
+                    if processed_element != '':
+                        elements.append(element)
+                    break # ignore the rest of the line if we found a comment
+
+    return elements
+
+def read_elements(filepath):
+    """Read and tokenize an asset file"""
+    return tokenize(read_asset_text(filepath))
+
+def read_joined_elements(filepath):
+    """Read and tokenize an asset file in a worker of read_elements_batch(). No element holds a newline, so the elements travel back as one newline joined string, which pickles several times faster than a list"""
+    return "\n".join(read_elements(filepath))
+
+def split_elements(joined_elements):
+    if not joined_elements:
+        return []
+
+    return joined_elements.split("\n")
+
+def read_elements_batch(filepaths, max_workers=None):
+    """Tokenize several asset files in a process pool. Returns the element lists, and None when the pool ran or the reason the files were read in process instead"""
+    pool_error = None
+    executable_name = os.path.basename(sys.executable)
+    if len(filepaths) < 2:
+        pool_error = "only one file"
+
+    elif (os.cpu_count() or 1) < 2:
+        # With one CPU the workers can't run alongside each other, the pool only adds process start up and the transfer of the elements
+        pool_error = "only one CPU"
+
+    elif not executable_name.lower().startswith('python'):
+        # Older Blender builds report the Blender binary as sys.executable, spawning that would start Blender instead of Python
+        pool_error = "%s is not a Python interpreter" % executable_name
+
+    else:
+        try:
+            with ProcessPoolExecutor(max_workers, multiprocessing.get_context('spawn')) as executor:
+                return [split_elements(joined_elements) for joined_elements in executor.map(read_joined_elements, filepaths)], None
+
+        except (OSError, BrokenProcessPool) as error:
+            pool_error = "%s: %s" % (type(error).__name__, error)
+
+    return [read_elements(filepath) for filepath in filepaths], pool_error
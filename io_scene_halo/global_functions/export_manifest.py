@@ -0,0 +1,150 @@
+# ##### BEGIN MIT LICENSE BLOCK #####
+#
+# MIT License
+#
+# Copyright (c) 2020 Steven Garcia
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# ##### END MIT LICENSE BLOCK #####
+
+import os
+import json
+import hashlib
+import threading
+
+MANIFEST_FILENAME = ".halo_export_manifest.json"
+MANIFEST_VERSION = 1
+
+class ExportManifest:
+    """Remembers a content hash for every exported file so an unchanged export leaves the file on disk untouched"""
+    class ExportFile:
+        def __init__(self, export_manifest, output_path):
+            self.export_manifest = export_manifest
+            self.output_path = output_path
+            self.temp_path = "%s.tmp" % output_path
+            self.file_hash = hashlib.blake2b(digest_size=16)
+            self.file = open(self.temp_path, 'w', encoding='utf_8')
+
+        def write(self, text):
+            self.file_hash.update(text.encode('utf-8'))
+            self.file.write(text)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc_value, traceback):
+            if exc_type is None:
+                self.close()
+
+            else:
+                self.discard()
+
+        def close(self):
+            """Commit the finished file. Without a manifest it stays in its temporary file for whoever holds the manifest to commit"""
+            self.file.close()
+            if not self.export_manifest is None:
+                self.export_manifest.commit(self.output_path, self.file_hash.hexdigest(), self.temp_path)
+
+        def discard(self):
+            """Drop the temporary file of an export that failed part way through, the target is left as it was"""
+            self.file.close()
+            os.remove(self.temp_path)
+
+    def __init__(self):
+        self.directories = {}
+        self.lock = threading.Lock()
+        self.written = 0
+        self.skipped = 0
+
+    def open(self, output_path):
+        """Return a file-like object that streams the output to a temporary file until close() decides whether it replaces the target"""
+        return self.ExportFile(self, os.path.abspath(output_path))
+
+    def get_directory_manifest(self, directory):
+        directory_manifest = self.directories.get(directory)
+        if directory_manifest is None:
+            directory_manifest = {}
+            manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+            try:
+                with open(manifest_path, 'r', encoding='utf_8') as manifest_file:
+                    manifest_data = json.load(manifest_file)
+
+                if manifest_data.get('version') == MANIFEST_VERSION:
+                    directory_manifest = manifest_data['files']
+
+            except (OSError, ValueError, KeyError):
+                pass
+
+            self.directories[directory] = directory_manifest
+
+        return directory_manifest
+
+    def commit(self, output_path, file_hash, temp_path):
+        directory, filename = os.path.split(output_path)
+        with self.lock:
+            directory_manifest = self.get_directory_manifest(directory)
+            file_entry = directory_manifest.get(filename)
+
+        if not file_entry is None and file_entry['hash'] == file_hash and is_file_unchanged(output_path, file_entry):
+            os.remove(temp_path)
+            with self.lock:
+                self.skipped += 1
+
+            return
+
+        os.replace(temp_path, output_path)
+        file_stat = os.stat(output_path)
+        with self.lock:
+            directory_manifest[filename] = {'hash': file_hash, 'size': file_stat.st_size, 'mtime': file_stat.st_mtime_ns}
+            self.written += 1
+
+    def save(self):
+        """Write the manifest of every directory that received an export"""
+        for directory, directory_manifest in self.directories.items():
+            manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+            temp_path = "%s.tmp" % manifest_path
+            try:
+                with open(temp_path, 'w', encoding='utf_8') as manifest_file:
+                    json.dump({'version': MANIFEST_VERSION, 'files': directory_manifest}, manifest_file, indent=1, sort_keys=True)
+
+                os.replace(temp_path, manifest_path)
+
+            except OSError:
+                pass
+
+    def report_stats(self, report):
+        report({'INFO'}, "Incremental export: %s files written, %s unchanged files skipped" % (self.written, self.skipped))
+
+def is_file_unchanged(output_path, file_entry):
+    """The file on disk still has to be the one the manifest recorded, otherwise it was edited or replaced since"""
+    try:
+        file_stat = os.stat(output_path)
+
+    except OSError:
+        return False
+
+    return file_stat.st_size == file_entry['size'] and file_stat.st_mtime_ns == file_entry['mtime']
+
+def open_export_file(output_path, export_manifest=None):
+    """Open an export file for writing, going through the manifest when the export is incremental. Use it in a with statement so a failed export cleans up after itself"""
+    if export_manifest is None:
+        return open(output_path, 'w', encoding='utf_8')
+
+    return export_manifest.open(output_path)
@@ -29,12 +29,20 @@ import os
 from typing import Any
 import bpy
 import sys
+import numpy as np
 import colorsys
 import re
+import mmap
+
+from array import array
 
 from decimal import *
 from math import radians
 from mathutils import Vector, Quaternion, Matrix
+from . import asset_reader
+from .. import config
+
+FIX_ROTATION_MATRIX = Matrix.Rotation(radians(90.0), 4, 'Z').freeze()
 
 class JmsDimensions:
     def __init__(self, quaternion, position, scale, dimension, object_radius, pill_height):
@@ -125,106 +133,59 @@ def unhide_all_collections(context):
     for collection_hide in bpy.data.collections:
         collection_hide.hide_viewport = False
 
-def get_child(bone, bone_list):
-    set_node = None
-    for node in bone_list:
-        if bone == node.parent and not set_node:
-            set_node = node
-
-    return set_node
-
-def get_sibling(armature, bone, bone_list):
-    sibling_list = []
-    set_sibling = None
-    for node in bone_list:
-        if bone.parent == node.parent:
-            sibling_list.append(node)
-
-    if len(sibling_list) <= 1:
-        set_sibling = None
-
-    else:
-        sibling_node = sibling_list.index(bone)
-        next_sibling_node = sibling_node + 1
-        if next_sibling_node >= len(sibling_list):
-            set_sibling = None
-
-        else:
-            if armature:
-                set_sibling = armature.data.bones['%s' % sibling_list[next_sibling_node].name]
-
-            else:
-                set_sibling = bpy.data.objects['%s' % sibling_list[next_sibling_node].name]
-
-    return set_sibling
-
 def sort_by_layer(node_list, armature):
-    layer_count = []
+    """Order nodes breadth first from the root. Each depth layer is sorted by name as a whole, children of different parents are mixed together. The second list has every layer in reverse name order"""
+    # Every root and every distinct parent counts as a layer, roots only count as one layer when a root node is not listed first
     layer_root = []
-    root_list = []
-    children_list = []
-    reversed_children_list = []
-    joined_list = []
-    reversed_joined_list = []
-    sort_list = []
-    reversed_sort_list = []
+    layer_parents = set()
+    layer_count = 0
+    first_layer_root = None
+    child_nodes = {}
     for node in node_list:
         if node.parent == None and not node.name[0:1] == '!' or node.parent.name[0:1] == '!' and node.parent.parent == None:
-            layer_count.append(None)
             layer_root.append(node)
+            layer_count += 1
+            if first_layer_root == None:
+                first_layer_root = True
 
         else:
-            if not node.parent in layer_count:
-                layer_count.append(node.parent)
-
-    for layer in layer_count:
-        joined_list = root_list + children_list
-        reversed_joined_list = root_list + reversed_children_list
-        layer_index = layer_count.index(layer)
-        if layer_index == 0:
-            if armature:
-                root_list.append(armature.data.bones[0])
+            if not node.parent in layer_parents:
+                layer_parents.add(node.parent)
+                layer_count += 1
+                if first_layer_root == None:
+                    first_layer_root = False
 
-            else:
-                root_list.append(layer_root[0])
+        if not node.parent == None:
+            child_nodes.setdefault(node.parent, []).append(node)
 
-        else:
-            for node in node_list:
-                if armature:
-                    if node.parent != None:
-                        if armature.data.bones['%s' % node.parent.name] in joined_list and not node in children_list:
-                            sort_list.append(node.name)
-                            reversed_sort_list.append(node.name)
+    if layer_count == 0:
+        return ([], [])
 
-                else:
-                    if node.parent != None:
-                        if node.parent in joined_list and not node in children_list:
-                            sort_list.append(node.name)
-                            reversed_sort_list.append(node.name)
-
-            sort_list.sort()
-            reversed_sort_list.sort()
-            reversed_sort_list.reverse()
-            for sort in sort_list:
-                if armature:
-                    if not armature.data.bones['%s' % sort] in children_list:
-                        children_list.append(armature.data.bones['%s' % sort])
+    root_count = 1
+    if first_layer_root:
+        root_count = len(layer_root)
 
-                else:
-                    if not bpy.data.objects[sort] in children_list:
-                        children_list.append(bpy.data.objects[sort])
+    if armature:
+        root_node = armature.data.bones[0]
 
-            for sort in reversed_sort_list:
-                if armature:
-                    if not armature.data.bones['%s' % sort] in reversed_children_list:
-                        reversed_children_list.append(armature.data.bones['%s' % sort])
+    else:
+        root_node = layer_root[0]
 
-                else:
-                    if not bpy.data.objects[sort] in reversed_children_list:
-                        reversed_children_list.append(bpy.data.objects[sort])
+    joined_list = [root_node] * root_count
+    reversed_joined_list = [root_node] * root_count
+    current_layer = [root_node]
+    for layer in range(layer_count - root_count):
+        next_layer = []
+        for parent_node in current_layer:
+            next_layer += child_nodes.get(parent_node, ())
+
+        if not next_layer:
+            break
 
-        joined_list = root_list + children_list
-        reversed_joined_list = root_list + reversed_children_list
+        next_layer.sort(key=lambda node: node.name)
+        joined_list += next_layer
+        reversed_joined_list += reversed(next_layer)
+        current_layer = next_layer
 
     return (joined_list, reversed_joined_list)
 
@@ -265,57 +226,141 @@ def sort_list(node_list, armature, game_version, version, animation):
 
     return sorted_list
 
-def test_encoding(filepath):
-    UTF_8_BOM = b'\xef\xbb\xbf'
-    UTF_16_BE_BOM = b'\xfe\xff'
-    UTF_16_LE_BOM = b'\xff\xfe'
-    data = open(filepath, 'rb')
-    file_size = os.path.getsize(filepath)
-    BOM = data.read(3)
-    encoding = None
-    # first check the boms
-    if BOM.startswith(UTF_8_BOM):
-        encoding = 'utf-8-sig'
-
-    elif BOM.startswith(UTF_16_BE_BOM) or BOM.startswith(UTF_16_LE_BOM):
-        encoding = 'utf-16'
-
-    else:
-        if file_size % 2: # can't be USC-2/UTF-16 if the number of bytes is odd
-            encoding = 'utf-8'
-
-        else:
-            # get the first half a kilobyte
-            data.seek(0)
-            sample_bytes = data.read(0x200)
-
-            even_zeros = 0
-            odd_zeros = 0
-
-            for idx, byte in enumerate(sample_bytes):
-                if byte != 0:
-                    continue
+class NodeHierarchy():
+    """Sorted node list with constant time index, child, sibling and parent lookups. Works anywhere the joined list from sort_list() is expected"""
+    def __init__(self, joined_list, reversed_joined_list=None):
+        if reversed_joined_list is None:
+            reversed_joined_list = joined_list
+
+        self.joined_list = joined_list
+        self.reversed_joined_list = reversed_joined_list
+        self.node_indices = {}
+        self.name_indices = {}
+        for idx, node in enumerate(joined_list):
+            self.node_indices.setdefault(node, idx)
+            if not node is None:
+                self.name_indices.setdefault(node.name, idx)
+
+        # The first child and next sibling come from the reversed list, matching the order the exported hierarchy has always used
+        first_children = {}
+        sibling_lists = {}
+        for node in reversed_joined_list:
+            if not node is None:
+                first_children.setdefault(node.parent, node)
+                sibling_lists.setdefault(node.parent, []).append(node)
+
+        child_lists = {}
+        for node in self.node_indices:
+            if not node is None and node.parent in self.node_indices:
+                child_lists.setdefault(node.parent, []).append(node)
+
+        next_siblings = {}
+        for sibling_list in sibling_lists.values():
+            for sibling_idx in range(len(sibling_list) - 1):
+                next_siblings[sibling_list[sibling_idx]] = sibling_list[sibling_idx + 1]
+
+        self.first_child_indices = []
+        self.next_sibling_indices = []
+        self.parent_indices = []
+        self.children_indices = []
+        for node in joined_list:
+            first_child_index = -1
+            next_sibling_index = -1
+            parent_index = -1
+            children_indices = []
+            if not node is None:
+                first_child_index = self.get_index(first_children.get(node))
+                next_sibling_index = self.get_index(next_siblings.get(node))
+                parent_index = self.get_index(node.parent)
+                child_nodes = sorted(child_lists.get(node, ()), key=lambda child_node: child_node.name)
+                children_indices = [self.node_indices[child_node] for child_node in child_nodes]
+
+            self.first_child_indices.append(first_child_index)
+            self.next_sibling_indices.append(next_sibling_index)
+            self.parent_indices.append(parent_index)
+            self.children_indices.append(children_indices)
+
+    def __len__(self):
+        return len(self.joined_list)
+
+    def __iter__(self):
+        return iter(self.joined_list)
+
+    def __getitem__(self, idx):
+        return self.joined_list[idx]
+
+    def __contains__(self, node):
+        return node in self.node_indices
+
+    def index(self, node):
+        node_index = self.node_indices.get(node)
+        if node_index is None:
+            raise ValueError("%s is not in the node list" % node)
+
+        return node_index
+
+    def get_index(self, node, default=-1):
+        if node is None:
+            return default
+
+        return self.node_indices.get(node, default)
+
+    def get_name_index(self, name, default=-1):
+        return self.name_indices.get(name, default)
+
+def get_node_hierarchy(node_list, armature, game_version, version, animation):
+    return NodeHierarchy(*sort_list(node_list, armature, game_version, version, animation))
+
+class IndexRegistry():
+    """Insertion ordered list of regions, permutations or materials with constant time membership and index lookups"""
+    def __init__(self, items=()):
+        self.items = []
+        self.indices = {}
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, idx):
+        return self.items[idx]
+
+    def __contains__(self, item):
+        return get_registry_key(item) in self.indices
+
+    def add(self, item):
+        """Register item if it is new and return its index"""
+        key = get_registry_key(item)
+        idx = self.indices.get(key)
+        if idx is None:
+            idx = len(self.items)
+            self.indices[key] = idx
+            self.items.append(item)
+
+        return idx
+
+    def index(self, item):
+        idx = self.indices.get(get_registry_key(item))
+        if idx is None:
+            raise ValueError("%s is not in registry" % (item,))
+
+        return idx
+
+def get_registry_key(item):
+    # Halo 2 and 3 materials are [material, lod, region, permutation] lists
+    if isinstance(item, list):
+        return tuple(item)
 
-                if idx % 2:
-                    odd_zeros += 1
+    return item
 
-                else:
-                    even_zeros += 1
-
-            ## if there are no null bytes we assume we are dealing with a utf-8 file
-            ## if there are null bytes, assume utf-16 and guess endianness based on where the null bytes are
-            if even_zeros == 0 and odd_zeros == 0:
-                encoding = 'utf-8'
-
-            elif odd_zeros > even_zeros:
-                encoding = 'utf-16-le'
-
-            else:
-                encoding = 'utf-16-be'
-
-    data.close()
+def test_encoding(filepath):
+    with open(filepath, 'rb') as data:
+        header_bytes = data.read(0x200)
 
-    return encoding
+    return asset_reader.detect_encoding(header_bytes, os.path.getsize(filepath))
 
 def get_version(file_version_console, file_version_ce, file_version_h2, file_version_h3, game_version, console):
 
@@ -348,99 +393,124 @@ def get_true_extension(filepath, extension, is_import):
 
     return true_extension
 
-def get_matrix(obj_a, obj_b, is_local, armature, joined_list, is_node, version, file_type, constraint, custom_scale, fix_rotation):
-    object_matrix = Matrix.Translation((0, 0, 0))
-    if fix_rotation:
-        if is_node:
-            if armature:
-                pose_bone = armature.pose.bones['%s' % (obj_a.name)]
-                object_matrix = pose_bone.matrix @ Matrix.Rotation(radians(90.0), 4, 'Z')
-                if pose_bone.parent and not version >= get_version_matrix_check(file_type):
-                    #Files at or above 8205 use absolute transform instead of local transform for nodes
-                    object_matrix = (pose_bone.parent.matrix @ Matrix.Rotation(radians(90.0), 4, 'Z')).inverted() @ pose_bone.matrix @ Matrix.Rotation(radians(90.0), 4, 'Z')
+class TransformCache():
+    """Per export cache of world and inverted world matrices so siblings and repeated lookups share the work. Call clear() after every frame change"""
+    def __init__(self, armature, joined_list, version, file_type, custom_scale, fix_rotation):
+        self.armature = armature
+        self.joined_list = joined_list
+        self.file_type = file_type
+        self.custom_scale = custom_scale
+        self.fix_rotation = fix_rotation
+        #Files at or above 8205 use absolute transform instead of local transform for nodes
+        self.local_nodes = not version >= get_version_matrix_check(file_type)
+        self.world_matrices = {}
+        self.inverted_matrices = {}
+        self.parents = {}
+
+    def clear(self):
+        self.world_matrices.clear()
+        self.inverted_matrices.clear()
+
+    def get_world_matrix(self, item, is_pose_bone=False):
+        world_matrix = self.world_matrices.get(item)
+        if world_matrix is None:
+            if is_pose_bone:
+                world_matrix = item.matrix
 
             else:
-                object_matrix = obj_a.matrix_world @ Matrix.Rotation(radians(90.0), 4, 'Z')
-                if obj_a.parent and not version >= get_version_matrix_check(file_type):
-                    #Files at or above 8205 use absolute transform instead of local transform for nodes
-                    object_matrix = (obj_a.parent.matrix_world @ Matrix.Rotation(radians(90.0), 4, 'Z')).inverted() @ obj_a.matrix_world @ Matrix.Rotation(radians(90.0), 4, 'Z')
+                world_matrix = item.matrix_world
 
-        else:
-            if armature:
-                object_matrix = obj_a.matrix_world @ Matrix.Rotation(radians(90.0), 4, 'Z')
-                bone_test = armature.data.bones.get(obj_b.parent_bone)
-                if obj_b.parent_bone and is_local and bone_test:
-                    parent_object = get_parent(armature, obj_b, joined_list, -1)
-                    pose_bone = armature.pose.bones['%s' % (parent_object[1].name)]
-                    if constraint:
-                        object_matrix = (obj_a.matrix_world @ Matrix.Rotation(radians(90.0), 4, 'Z')).inverted() @ pose_bone.matrix @ Matrix.Rotation(radians(90.0), 4, 'Z')
+            if self.fix_rotation:
+                world_matrix = world_matrix @ FIX_ROTATION_MATRIX
 
-                    else:
-                        object_matrix = (pose_bone.matrix @ Matrix.Rotation(radians(90.0), 4, 'Z')).inverted() @ obj_a.matrix_world @ Matrix.Rotation(radians(90.0), 4, 'Z')
+            self.world_matrices[item] = world_matrix
 
-            else:
-                object_matrix = obj_a.matrix_world @ Matrix.Rotation(radians(90.0), 4, 'Z')
-                if obj_b.parent and is_local:
-                    parent_object = get_parent(armature, obj_b, joined_list, -1)
-                    if constraint:
-                        object_matrix = (obj_a.matrix_world @ Matrix.Rotation(radians(90.0), 4, 'Z')).inverted() @ parent_object[1].matrix_world @ Matrix.Rotation(radians(90.0), 4, 'Z')
+        return world_matrix
 
-                    else:
-                        object_matrix = (parent_object[1].matrix_world @ Matrix.Rotation(radians(90.0), 4, 'Z')).inverted() @ obj_a.matrix_world @ Matrix.Rotation(radians(90.0), 4, 'Z')
+    def get_inverted_matrix(self, item, is_pose_bone=False):
+        inverted_matrix = self.inverted_matrices.get(item)
+        if inverted_matrix is None:
+            inverted_matrix = self.get_world_matrix(item, is_pose_bone).inverted()
+            self.inverted_matrices[item] = inverted_matrix
 
-    else:
+        return inverted_matrix
+
+    def get_parent(self, obj, default_parent):
+        parent_key = (obj, default_parent)
+        parent = self.parents.get(parent_key)
+        if parent is None:
+            parent = get_parent(self.armature, obj, self.joined_list, default_parent)
+            self.parents[parent_key] = parent
+
+        return parent
+
+    def get_matrix(self, obj_a, obj_b, is_local, is_node, constraint):
+        armature = self.armature
         if is_node:
             if armature:
-                pose_bone = armature.pose.bones['%s' % (obj_a.name)]
-                object_matrix = pose_bone.matrix
-                if pose_bone.parent and not version >= get_version_matrix_check(file_type):
-                    #Files at or above 8205 use absolute transform instead of local transform for nodes
-                    object_matrix = pose_bone.parent.matrix.inverted() @ pose_bone.matrix
+                pose_bone = armature.pose.bones[obj_a.name]
+                if pose_bone.parent and self.local_nodes:
+                    object_matrix = self.get_inverted_matrix(pose_bone.parent, True) @ self.get_world_matrix(pose_bone, True)
+
+                else:
+                    # Absolute nodes never reuse their own matrix, caching it would only add a dictionary write per node per frame
+                    object_matrix = pose_bone.matrix
+                    if self.fix_rotation:
+                        object_matrix = object_matrix @ FIX_ROTATION_MATRIX
 
             else:
-                object_matrix = obj_a.matrix_world
-                if obj_a.parent and not version >= get_version_matrix_check(file_type):
-                    #Files at or above 8205 use absolute transform instead of local transform for nodes
-                    object_matrix = obj_a.parent.matrix_world.inverted() @ obj_a.matrix_world
+                object_matrix = self.get_world_matrix(obj_a)
+                if obj_a.parent and self.local_nodes:
+                    object_matrix = self.get_inverted_matrix(obj_a.parent) @ object_matrix
 
         else:
+            object_matrix = self.get_world_matrix(obj_a)
             if armature:
-                object_matrix = obj_a.matrix_world
                 bone_test = armature.data.bones.get(obj_b.parent_bone)
                 if obj_b.parent_bone and is_local and bone_test:
-                    parent_object = get_parent(armature, obj_b, joined_list, -1)
-                    pose_bone = armature.pose.bones['%s' % (parent_object[1].name)]
+                    parent_object = self.get_parent(obj_b, -1)
+                    pose_bone = armature.pose.bones[parent_object[1].name]
                     if constraint:
-                        object_matrix = obj_a.matrix_world.inverted() @ pose_bone.matrix
+                        object_matrix = self.get_inverted_matrix(obj_a) @ self.get_world_matrix(pose_bone, True)
 
                     else:
-                        object_matrix = pose_bone.matrix.inverted() @ obj_a.matrix_world
+                        object_matrix = self.get_inverted_matrix(pose_bone, True) @ object_matrix
 
             else:
-                object_matrix = obj_a.matrix_world
                 if obj_b.parent and is_local:
-                    parent_object = get_parent(armature, obj_b, joined_list, -1)
+                    parent_object = self.get_parent(obj_b, -1)
                     if constraint:
-                        object_matrix = obj_a.matrix_world.inverted() @ parent_object[1].matrix_world
+                        object_matrix = self.get_inverted_matrix(obj_a) @ self.get_world_matrix(parent_object[1])
 
                     else:
-                        object_matrix = parent_object[1].matrix_world.inverted() @ obj_a.matrix_world
+                        object_matrix = self.get_inverted_matrix(parent_object[1]) @ object_matrix
+
+        return self.apply_custom_scale(object_matrix)
+
+    def apply_custom_scale(self, object_matrix):
+        loc, rot, sca = object_matrix.decompose()
+        custom_sca = sca
+        if self.file_type == 'JMS':
+            custom_sca = sca * self.custom_scale
 
-    loc, rot, sca = object_matrix.decompose()
-    custom_loc = loc * custom_scale
-    translation = Matrix.Translation(custom_loc)
-    rotation = rot.to_matrix().to_4x4()
-    custom_sca = sca
-    if file_type == 'JMS':
-        custom_sca = sca * custom_scale
-    scale_x = Matrix.Scale(custom_sca[0], 4, (1, 0, 0))
-    scale_y = Matrix.Scale(custom_sca[1], 4, (0, 1, 0))
-    scale_z = Matrix.Scale(custom_sca[2], 4, (0, 0, 1))
-    scale_matrix = scale_x @ scale_y @ scale_z
+        # Same result as Matrix.Scale() on each axis multiplied together, built directly
+        scale_matrix = Matrix(((custom_sca[0], 0.0, 0.0, 0.0), (0.0, custom_sca[1], 0.0, 0.0), (0.0, 0.0, custom_sca[2], 0.0), (0.0, 0.0, 0.0, 1.0)))
+        translation = Matrix.Translation(loc * self.custom_scale)
+        rotation = rot.to_matrix().to_4x4()
 
-    object_matrix = translation @ rotation @ scale_matrix
+        return translation @ rotation @ scale_matrix
 
-    return object_matrix
+def sample_frames(context, first_frame, last_frame, transform_caches=()):
+    """Yield every frame in the range after making it the current frame. The scene is evaluated once per frame and the given transform caches are cleared with it"""
+    for frame in range(first_frame, last_frame):
+        context.scene.frame_set(frame)
+        for transform_cache in transform_caches:
+            transform_cache.clear()
+
+        yield frame
+
+def get_matrix(obj_a, obj_b, is_local, armature, joined_list, is_node, version, file_type, constraint, custom_scale, fix_rotation):
+    return TransformCache(armature, joined_list, version, file_type, custom_scale, fix_rotation).get_matrix(obj_a, obj_b, is_local, is_node, constraint)
 
 def get_dimensions(mesh_matrix, original_geo, version, jms_vertex, is_vertex, is_bone, file_type, custom_scale):
     quaternion = (0.0, 0.0, 0.0, 1.0)
@@ -592,31 +662,12 @@ def get_version_matrix_check(filetype):
     return matrix_version
 
 def gather_materials(game_version, material, material_list, export_type):
-    assigned_materials_list = []
-    if material is not None:
-        if material not in assigned_materials_list:
-            assigned_materials_list.append(material)
-
-    else:
-        if game_version == 'haloce' and not None in material_list:
-            material_list.append(None)
-
     if game_version == 'haloce':
-        if material not in material_list:
-            material_list.append(material)
+        material_list.add(material)
 
     elif game_version == 'halo2' or game_version == 'halo3mcc':
-        if export_type == 'JMS':
-            if material not in material_list and material in assigned_materials_list:
-                material_list.append(material)
-
-        if export_type == 'ASS':
-            if material not in material_list and material in assigned_materials_list:
-                material_list.append(material)
-
-    else:
-        if game_version == 'haloce' and not None in material_list:
-            material_list.append(None)
+        if material is not None:
+            material_list.add(material)
 
     return material_list
 
@@ -664,37 +715,398 @@ class AssetParseError(Exception):
 class SceneParseError(Exception):
     pass
 
+class TokenIndex:
+    """Memory mapped list of asset elements that are only decoded when accessed. The mapping is released by close()"""
+
+    __element_regex = re.compile(b"[^\t\r\n]+")
+    __line_regex = re.compile(b"[^\r\n]*")
+    __special_line_regex = re.compile(b"(?<![^\r\n])(?:[^\r\n]*[;\x80-\xff][^\r\n]*|\t*[ \x0b\x0c\x1c-\x1f][^\r\n]*|[^\r\n]*[ \x0b\x0c\x1c-\x1f]\t*)(?![^\r\n])")
+
+    def __init__(self, filepath, encoding):
+        self.encoding = 'utf-8'
+        with open(filepath, "rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        typecode = 'I'
+        if len(self.buffer) > 0xFFFFFFFF:
+            typecode = 'Q'
+
+        # Plain lines map straight onto tab separated byte ranges. Lines with comments, non ASCII characters or
+        # whitespace that strip() would remove are the only ones that need to go through the text tokenizer.
+        self.offsets = array(typecode)
+        position = 0
+        try:
+            if encoding == 'utf-8-sig' and self.buffer[:3] == b'\xef\xbb\xbf':
+                first_line_match = self.__line_regex.match(self.buffer, 3)
+                self.__index_text_line(first_line_match.group(), 3)
+                position = first_line_match.end()
+
+            for line_match in self.__special_line_regex.finditer(self.buffer, position):
+                self.__index_elements(position, line_match.start())
+                self.__index_text_line(line_match.group(), line_match.start())
+                position = line_match.end()
+
+            self.__index_elements(position, len(self.buffer))
+
+        except:
+            # A line that fails to decode leaves no index to close the mapping through
+            self.close()
+            raise
+
+    def __index_elements(self, start, end):
+        for element_match in self.__element_regex.finditer(self.buffer, start, end):
+            self.offsets.extend(element_match.span())
+
+    def __index_text_line(self, line, line_start):
+        # Lines with comments or non ASCII characters are resolved through the regular tokenizer and mapped back to byte offsets
+        text = line.decode(self.encoding)
+        stripped_text = text.strip()
+        position = line_start + len(text[:len(text) - len(text.lstrip())].encode(self.encoding))
+        elements = HaloAsset.tokenize(stripped_text)
+        for element in stripped_text.split("\t"):
+            element_length = len(element.encode(self.encoding))
+            if element != '':
+                if not elements or not element == elements[0]:
+                    break
+
+                elements.pop(0)
+                self.offsets.append(position)
+                self.offsets.append(position + element_length)
+
+            position += element_length + 1
+
+    def __len__(self):
+        return len(self.offsets) // 2
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self[idx] for idx in range(*key.indices(len(self)))]
+
+        if key < 0:
+            key += len(self)
+
+        if key < 0 or key >= len(self):
+            raise IndexError("element index out of range")
+
+        if self.buffer is None:
+            raise ValueError("token index is closed")
+
+        return self.buffer[self.offsets[key * 2]:self.offsets[key * 2 + 1]].decode(self.encoding)
+
+    def close(self):
+        if not self.buffer is None:
+            self.buffer.close()
+            self.buffer = None
+
+class VertexBuffer:
+    """Columnar storage for imported vertices. Indexing returns a lightweight view over a single row"""
+
+    max_influences = 4
+
+    class Vertex:
+        __slots__ = ('buffer', 'index')
+
+        def __init__(self, buffer, index):
+            self.buffer = buffer
+            self.index = index
+
+        @property
+        def node_influence_count(self):
+            return int(self.buffer.node_influence_counts[self.index])
+
+        @property
+        def node_set(self):
+            node_count = self.buffer.node_counts[self.index]
+            node_indices = self.buffer.node_indices[self.index, :node_count].tolist()
+            node_weights = self.buffer.node_weights[self.index, :node_count].tolist()
+
+            return [[node_index, node_weight] for node_index, node_weight in zip(node_indices, node_weights)]
+
+        @property
+        def region(self):
+            if self.buffer.regions is None:
+                return None
+
+            return int(self.buffer.regions[self.index])
+
+        @property
+        def translation(self):
+            return Vector(self.buffer.translations[self.index])
+
+        @property
+        def normal(self):
+            return Vector(self.buffer.normals[self.index])
+
+        @property
+        def color(self):
+            if self.buffer.colors is None:
+                return None
+
+            return Vector(self.buffer.colors[self.index])
+
+        @property
+        def uv_set(self):
+            uv_set = self.buffer.uvs[self.index, :self.buffer.uv_counts[self.index]].tolist()
+            if self.buffer.uv_width == 3 and not self.buffer.has_uv_w:
+                for uv in uv_set:
+                    uv[2] = None
+
+            return uv_set
+
+    def __init__(self, uv_width=2, has_uv_w=True):
+        self.uv_width = uv_width
+        self.has_uv_w = has_uv_w
+        self.records = []
+        self.node_influence_counts = np.zeros(0, dtype=np.uint8)
+        self.node_counts = np.zeros(0, dtype=np.uint8)
+        self.node_indices = np.full((0, self.max_influences), -1, dtype=np.int32)
+        self.node_weights = np.zeros((0, self.max_influences), dtype=np.float32)
+        self.regions = None
+        self.translations = np.zeros((0, 3), dtype=np.float32)
+        self.normals = np.zeros((0, 3), dtype=np.float32)
+        self.colors = None
+        self.uv_counts = np.zeros(0, dtype=np.uint8)
+        self.uvs = np.zeros((0, 1, uv_width), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.translations) + len(self.records)
+
+    def __getitem__(self, index):
+        if self.records:
+            self.finalize()
+
+        if index < 0:
+            index += len(self.translations)
+
+        if index < 0 or index >= len(self.translations):
+            raise IndexError("vertex index out of range")
+
+        return VertexBuffer.Vertex(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, vertex):
+        """Queue a parsed vertex record, records are packed into the columns by finalize()"""
+        self.records.append(vertex)
+
+    def extend(self, node_influence_counts, node_counts, node_indices, node_weights, regions, translations, normals, colors, uv_counts, uvs):
+        """Append whole columns of vertices. Node and UV columns may be narrower than the current ones"""
+        if self.records:
+            self.finalize()
+
+        vertex_count = len(translations)
+        previous_count = len(self.translations)
+        node_width = max(self.node_indices.shape[1], node_indices.shape[1])
+        uv_slots = max(self.uvs.shape[1], uvs.shape[1])
+        self.node_indices = np.concatenate((pad_columns(self.node_indices, node_width, -1), pad_columns(node_indices, node_width, -1))).astype(np.int32)
+        self.node_weights = np.concatenate((pad_columns(self.node_weights, node_width, 0.0), pad_columns(node_weights, node_width, 0.0))).astype(np.float32)
+        self.uvs = np.concatenate((pad_columns(self.uvs, uv_slots, 0.0), pad_columns(uvs, uv_slots, 0.0))).astype(np.float32)
+        self.node_influence_counts = np.concatenate((self.node_influence_counts, node_influence_counts)).astype(np.uint8)
+        self.node_counts = np.concatenate((self.node_counts, node_counts)).astype(np.uint8)
+        self.uv_counts = np.concatenate((self.uv_counts, uv_counts)).astype(np.uint8)
+        self.translations = np.concatenate((self.translations, translations)).astype(np.float32)
+        self.normals = np.concatenate((self.normals, normals)).astype(np.float32)
+        if not regions is None or not self.regions is None:
+            self.regions = np.concatenate((fill_column(self.regions, previous_count, (), -1), fill_column(regions, vertex_count, (), -1))).astype(np.int32)
+
+        if not colors is None or not self.colors is None:
+            self.colors = np.concatenate((fill_column(self.colors, previous_count, (3,), 0.0), fill_column(colors, vertex_count, (3,), 0.0))).astype(np.float32)
+
+    def finalize(self):
+        """Pack queued vertex records into the columns"""
+        records = self.records
+        self.records = []
+        if not records:
+            return
+
+        vertex_count = len(records)
+        node_width = max([self.max_influences] + [len(record.node_set) for record in records])
+        uv_slots = max([1] + [len(record.uv_set) for record in records])
+        node_indices = np.full((vertex_count, node_width), -1, dtype=np.int32)
+        node_weights = np.zeros((vertex_count, node_width), dtype=np.float32)
+        uvs = np.zeros((vertex_count, uv_slots, self.uv_width), dtype=np.float32)
+        for vertex_idx, record in enumerate(records):
+            for node_idx, node in enumerate(record.node_set):
+                node_indices[vertex_idx, node_idx] = node[0]
+                node_weights[vertex_idx, node_idx] = node[1]
+
+            for uv_idx, uv in enumerate(record.uv_set):
+                uvs[vertex_idx, uv_idx] = [0.0 if value is None else value for value in uv[:self.uv_width]]
+
+        regions = None
+        if any(not getattr(record, 'region', None) is None for record in records):
+            regions = np.array([-1 if record.region is None else record.region for record in records], dtype=np.int32)
+
+        colors = None
+        if any(not record.color is None for record in records):
+            colors = np.array([(0.0, 0.0, 0.0) if record.color is None else tuple(record.color) for record in records], dtype=np.float32)
+
+        self.extend(np.array([record.node_influence_count for record in records]),
+                    np.array([len(record.node_set) for record in records]),
+                    node_indices,
+                    node_weights,
+                    regions,
+                    np.array([tuple(record.translation) for record in records], dtype=np.float32),
+                    np.array([tuple(record.normal) for record in records], dtype=np.float32),
+                    colors,
+                    np.array([len(record.uv_set) for record in records]),
+                    uvs)
+
+class TriangleBuffer:
+    """Columnar storage for imported triangles. Indexing returns a lightweight view over a single row"""
+
+    class Triangle:
+        __slots__ = ('buffer', 'index')
+
+        def __init__(self, buffer, index):
+            self.buffer = buffer
+            self.index = index
+
+        @property
+        def region(self):
+            if self.buffer.regions is None:
+                return None
+
+            return int(self.buffer.regions[self.index])
+
+        @property
+        def material_index(self):
+            return int(self.buffer.material_indices[self.index])
+
+        @property
+        def v0(self):
+            return int(self.buffer.vertex_indices[self.index, 0])
+
+        @property
+        def v1(self):
+            return int(self.buffer.vertex_indices[self.index, 1])
+
+        @property
+        def v2(self):
+            return int(self.buffer.vertex_indices[self.index, 2])
+
+    def __init__(self):
+        self.records = []
+        self.regions = None
+        self.material_indices = np.zeros(0, dtype=np.int32)
+        self.vertex_indices = np.zeros((0, 3), dtype=np.int32)
+
+    def __len__(self):
+        return len(self.material_indices) + len(self.records)
+
+    def __getitem__(self, index):
+        if self.records:
+            self.finalize()
+
+        if index < 0:
+            index += len(self.material_indices)
+
+        if index < 0 or index >= len(self.material_indices):
+            raise IndexError("triangle index out of range")
+
+        return TriangleBuffer.Triangle(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, triangle):
+        """Queue a parsed triangle record, records are packed into the columns by finalize()"""
+        self.records.append(triangle)
+
+    def extend(self, regions, material_indices, vertex_indices):
+        """Append whole columns of triangles"""
+        if self.records:
+            self.finalize()
+
+        if not regions is None or not self.regions is None:
+            self.regions = np.concatenate((fill_column(self.regions, len(self.material_indices), (), -1), fill_column(regions, len(material_indices), (), -1))).astype(np.int32)
+
+        self.material_indices = np.concatenate((self.material_indices, material_indices)).astype(np.int32)
+        self.vertex_indices = np.concatenate((self.vertex_indices, vertex_indices)).astype(np.int32)
+
+    def finalize(self):
+        """Pack queued triangle records into the columns"""
+        records = self.records
+        self.records = []
+        if not records:
+            return
+
+        regions = None
+        if any(not getattr(record, 'region', None) is None for record in records):
+            regions = np.array([-1 if record.region is None else record.region for record in records])
+
+        material_indices = np.array([record.material_index for record in records])
+        vertex_indices = np.array([(record.v0, record.v1, record.v2) for record in records]).reshape(len(records), 3)
+        self.extend(regions, material_indices, vertex_indices)
+
+def fill_column(column, count, shape, fill):
+    """Return the column, or a filled placeholder of the given length when the column is missing"""
+    if column is None:
+        return np.full((count,) + shape, fill)
+
+    return column
+
+def pad_columns(array, width, fill):
+    """Pad the second axis of an array to the given width"""
+    if array.shape[1] >= width:
+        return array
+
+    padding = np.full((array.shape[0], width - array.shape[1]) + array.shape[2:], fill, dtype=array.dtype)
+
+    return np.concatenate((array, padding), axis=1)
+
 class HaloAsset:
     """Helper class for reading in JMS/JMA/ASS files"""
 
-    __comment_regex = re.compile("[^\"]*;(?!.*\")")
-
-    def __init__(self, file):
+    def __init__(self, file, memory_map=None, elements=None):
+        """memory_map=None memory maps files of at least config.MEMORY_MAP_THRESHOLD bytes, True or False forces it on or off"""
         self._elements = []
         self._index = 0
-        if not isinstance(file, TextIOWrapper):
-            with open(file, "r", encoding=test_encoding(file)) as file:
-                self.__init_from_textio(file)
+        if not elements is None:
+            self._elements = elements
+
+        elif not isinstance(file, TextIOWrapper):
+            if memory_map is None:
+                memory_map = os.path.getsize(file) >= config.MEMORY_MAP_THRESHOLD
+
+            encoding = None
+            if memory_map:
+                encoding = test_encoding(file)
+
+            if encoding in ('utf-8', 'utf-8-sig') and os.path.getsize(file) > 0:
+                self._elements = TokenIndex(file, encoding)
+
+            else:
+                self._elements = HaloAsset.tokenize(asset_reader.read_asset_text(file))
+
         else:
             self.__init_from_textio(file)
 
     def __init_from_textio(self, io):
-        for line in io:
-            for element in line.strip().split("\t"):
-                if element != '':
-                    comment_match = re.search(self.__comment_regex, element)
-                    if comment_match is None:
-                        self._elements.append(element)
-                    else:
-                        processed_element = element[: comment_match.end() - 1]
-                        if processed_element != '':
-                            self._elements.append(element)
-                        break # ignore the rest of the line if we found a comment
+        self._elements = HaloAsset.tokenize(io.read())
+
+    def close(self):
+        """Release the memory mapped source file, needed when a parser stops before reading every element"""
+        if isinstance(self._elements, TokenIndex):
+            self._elements.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    tokenize = staticmethod(asset_reader.tokenize)
+
     def left(self):
-        """Returns the number of elements left"""
+        """Returns the number of elements left. Once every element has been read the memory mapped source file is released, an open mapping locks the file on Windows"""
         if self._index < len(self._elements):
             return len(self._elements) - self._index
         else:
+            self.close()
             return 0
 
     def skip(self, count):
@@ -0,0 +1,1199 @@
+# ##### BEGIN MIT LICENSE BLOCK #####
+#
+# MIT License
+#
+# Copyright (c) 2020 Steven Garcia
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# ##### END MIT LICENSE BLOCK #####
+
+import os
+import numpy as np
+
+from . import export_manifest
+
+# Nothing in this module may depend on Blender, JMSWriteQueue pickles the scene data into worker processes that can't load it
+
+WRITE_BLOCK_SIZE = 4096
+MAX_INFLUENCES = 4
+
+def pad_columns(array, width, fill):
+    """Pad the second axis of an array to the given width"""
+    if array.shape[1] >= width:
+        return array
+
+    padding = np.full((array.shape[0], width - array.shape[1]) + array.shape[2:], fill, dtype=array.dtype)
+
+    return np.concatenate((array, padding), axis=1)
+
+class VertexBuffer:
+    """Columnar storage for exported vertices. Meshes are appended as whole columns and packed together by finalize()"""
+    def __init__(self):
+        self.chunks = []
+        self.regions = np.zeros(0, dtype=np.int32)
+        self.translations = np.zeros((0, 3), dtype=np.float64)
+        self.normals = np.zeros((0, 3), dtype=np.float64)
+        self.node_counts = np.zeros(0, dtype=np.int32)
+        self.node_indices = np.full((0, MAX_INFLUENCES), -1, dtype=np.int32)
+        self.node_weights = np.zeros((0, MAX_INFLUENCES), dtype=np.float64)
+        self.uv_counts = np.zeros(0, dtype=np.int32)
+        self.uvs = np.zeros((0, 1, 2), dtype=np.float64)
+        self.colors = np.zeros((0, 3), dtype=np.float64)
+
+    def __len__(self):
+        return len(self.regions) + sum(len(chunk[0]) for chunk in self.chunks)
+
+    def append(self, regions, translations, normals, node_counts, node_indices, node_weights, uv_counts, uvs, colors):
+        """Queue the columns of a mesh. Node slots past node_counts hold -1 and 0.0, UV slots past uv_counts hold 0.0"""
+        self.chunks.append((regions, translations, normals, node_counts, node_indices, node_weights, uv_counts, uvs, colors))
+
+    def finalize(self):
+        """Pack queued columns into the buffer"""
+        if not self.chunks:
+            return
+
+        chunks = [(self.regions, self.translations, self.normals, self.node_counts, self.node_indices, self.node_weights, self.uv_counts, self.uvs, self.colors)] + self.chunks
+        self.chunks = []
+        node_width = max(chunk[4].shape[1] for chunk in chunks)
+        uv_slots = max(chunk[7].shape[1] for chunk in chunks)
+        self.regions = np.concatenate([chunk[0] for chunk in chunks]).astype(np.int32)
+        self.translations = np.concatenate([chunk[1] for chunk in chunks]).astype(np.float64)
+        self.normals = np.concatenate([chunk[2] for chunk in chunks]).astype(np.float64)
+        self.node_counts = np.concatenate([chunk[3] for chunk in chunks]).astype(np.int32)
+        self.node_indices = np.concatenate([pad_columns(chunk[4], node_width, -1) for chunk in chunks]).astype(np.int32)
+        self.node_weights = np.concatenate([pad_columns(chunk[5], node_width, 0.0) for chunk in chunks]).astype(np.float64)
+        self.uv_counts = np.concatenate([chunk[6] for chunk in chunks]).astype(np.int32)
+        self.uvs = np.concatenate([pad_columns(chunk[7], uv_slots, 0.0) for chunk in chunks]).astype(np.float64)
+        self.colors = np.concatenate([chunk[8] for chunk in chunks]).astype(np.float64)
+
+    def weld(self, decimal_places):
+        """Merge vertices that are identical at the precision the file is written at, keeping the first of each.
+        Returns the new index of every old vertex"""
+        self.finalize()
+        vertex_count = len(self.regions)
+        # Rounding and adding zero makes -0.0 and 0.0 the same key
+        key_columns = np.column_stack((
+            self.regions,
+            np.round(self.translations, decimal_places) + 0.0,
+            np.round(self.normals, decimal_places) + 0.0,
+            self.node_counts,
+            self.node_indices,
+            np.round(self.node_weights, decimal_places) + 0.0,
+            self.uv_counts,
+            np.round(self.uvs.reshape(vertex_count, -1), decimal_places) + 0.0,
+            np.round(self.colors, decimal_places) + 0.0
+            )).astype(np.float64)
+
+        keys = np.ascontiguousarray(key_columns).view(np.dtype((np.void, key_columns.dtype.itemsize * key_columns.shape[1]))).reshape(-1)
+        unique_keys, first_vertices, vertex_keys = np.unique(keys, return_index=True, return_inverse=True)
+        key_order = np.argsort(first_vertices, kind='stable')
+        key_ranks = np.empty_like(key_order)
+        key_ranks[key_order] = np.arange(len(key_order))
+        kept_vertices = first_vertices[key_order]
+
+        self.regions = self.regions[kept_vertices]
+        self.translations = self.translations[kept_vertices]
+        self.normals = self.normals[kept_vertices]
+        self.node_counts = self.node_counts[kept_vertices]
+        self.node_indices = self.node_indices[kept_vertices]
+        self.node_weights = self.node_weights[kept_vertices]
+        self.uv_counts = self.uv_counts[kept_vertices]
+        self.uvs = self.uvs[kept_vertices]
+        self.colors = self.colors[kept_vertices]
+
+        return key_ranks[vertex_keys.reshape(-1)]
+
+class TriangleBuffer:
+    """Columnar storage for exported triangles. Meshes are appended as whole columns and packed together by finalize()"""
+    def __init__(self):
+        self.chunks = []
+        self.regions = np.zeros(0, dtype=np.int32)
+        self.material_indices = np.zeros(0, dtype=np.int32)
+        self.vertex_indices = np.zeros((0, 3), dtype=np.int64)
+
+    def __len__(self):
+        return len(self.regions) + sum(len(chunk[0]) for chunk in self.chunks)
+
+    def append(self, regions, material_indices, vertex_indices):
+        self.chunks.append((regions, material_indices, vertex_indices))
+
+    def finalize(self):
+        if not self.chunks:
+            return
+
+        chunks = [(self.regions, self.material_indices, self.vertex_indices)] + self.chunks
+        self.chunks = []
+        self.regions = np.concatenate([chunk[0] for chunk in chunks]).astype(np.int32)
+        self.material_indices = np.concatenate([chunk[1] for chunk in chunks]).astype(np.int32)
+        self.vertex_indices = np.concatenate([chunk[2] for chunk in chunks]).astype(np.int64)
+
+    def remap_vertices(self, vertex_map):
+        self.finalize()
+        self.vertex_indices = vertex_map[self.vertex_indices]
+
+def get_vertex_rows(vertices, block_start, block_end, version):
+    """The values of a block of vertices as one row of numbers per vertex in the order the version writes them"""
+    regions = vertices.regions[block_start:block_end]
+    translations = vertices.translations[block_start:block_end]
+    normals = vertices.normals[block_start:block_end]
+    node_counts = vertices.node_counts[block_start:block_end]
+    node_indices = vertices.node_indices[block_start:block_end]
+    node_weights = vertices.node_weights[block_start:block_end]
+    uv_counts = vertices.uv_counts[block_start:block_end]
+    uvs = vertices.uvs[block_start:block_end]
+    colors = vertices.colors[block_start:block_end]
+    vertex_count = len(regions)
+    if version >= 8205:
+        nodes = np.stack((node_indices, node_weights), axis=2).reshape(vertex_count, -1)
+        columns = (np.arange(block_start, block_start + vertex_count), translations, normals, node_counts, nodes, uv_counts, uvs.reshape(vertex_count, -1), colors)
+
+    else:
+        node_indices = pad_columns(node_indices, MAX_INFLUENCES, -1)
+        node_weights = pad_columns(node_weights, MAX_INFLUENCES, 0.0)
+        node0_index = node_indices[:, 0]
+        node0_weight = node_weights[:, 0]
+        node1_index = node_indices[:, 1]
+        node1_weight = node_weights[:, 1]
+        if version < 8202:
+            node1_weight = np.where(node1_index == -1, node1_weight, 1.0 - node0_weight)
+            node0_index = np.where(node1_weight == 1, node1_index, node0_index)
+            node1_index = np.where((node1_weight == 0) | (node1_weight == 1), -1, node1_index)
+            node1_weight = np.where(node1_weight == 1, 0.0, node1_weight)
+
+        uv_count = 1
+        if version >= 8203 and version <= 8204:
+            uv_count = 4
+
+        uv_values = pad_columns(uvs, uv_count, 0.0)[:, :uv_count].reshape(vertex_count, -1)
+        if version >= 8204:
+            columns = (node0_index, node0_weight, translations, normals, node1_index, node1_weight, node_indices[:, 2], node_weights[:, 2], node_indices[:, 3], node_weights[:, 3], uv_values)
+
+        else:
+            columns = (node0_index, translations, normals, node1_index, node1_weight, uv_values)
+
+        if version < 8198:
+            columns = (regions,) + columns
+
+    return np.column_stack(columns).astype(np.float64)
+
+def get_vertex_formatter(version, decimal_1, decimal_2, decimal_3, node_width, uv_slots):
+    """Pick the vertex record layout for a JMS version once. The returned function formats a block of rows from
+    get_vertex_rows() with a single string operation. Integers are held as floats in the rows and written with %d,
+    which prints them the same as %s prints the integer"""
+    if version >= 8205:
+        vertex_format = '\n;VERTEX %d' + decimal_3 + decimal_3 + '\n%d'
+        node_format = '\n%d' + decimal_1
+        color_format = ''
+        if version >= 8211:
+            color_format = decimal_3
+
+        uv_count_column = 8 + node_width * 2
+        uv_column = uv_count_column + 1
+        color_column = uv_column + uv_slots * 2
+        column_indices = np.arange(color_column + 3)
+        record_formats = {}
+
+        def get_record_format(record_key):
+            record_format = record_formats.get(record_key)
+            if record_format is None:
+                node_count, uv_count = divmod(record_key, uv_slots + 1)
+                record_format = vertex_format + node_format * node_count + '\n%d' + decimal_2 * uv_count + color_format + '\n'
+                record_formats[record_key] = record_format
+
+            return record_format
+
+        def format_vertices(rows):
+            node_counts = rows[:, 7].astype(np.int64)
+            uv_counts = rows[:, uv_count_column].astype(np.int64)
+            # Node and UV slots past the counts of a vertex are padding and are not written
+            used_columns = (column_indices <= 7) | (column_indices == uv_count_column)
+            used_columns = used_columns | ((column_indices >= 8) & (column_indices < 8 + node_counts[:, None] * 2))
+            used_columns = used_columns | ((column_indices >= uv_column) & (column_indices < uv_column + uv_counts[:, None] * 2))
+            if color_format:
+                used_columns = used_columns | (column_indices >= color_column)
+
+            block_format = ''.join([get_record_format(record_key) for record_key in (node_counts * (uv_slots + 1) + uv_counts).tolist()])
+
+            return block_format % tuple(rows[used_columns].tolist())
+
+        return format_vertices
+
+    region_format = ''
+    if version < 8198:
+        region_format = '\n%d'
+
+    if version >= 8204:
+        vertex_format = region_format + '\n%d' + decimal_1 + decimal_3 + decimal_3 + '\n%d' + decimal_1 + '\n%d' + decimal_1 + '\n%d' + decimal_1
+
+    else:
+        vertex_format = region_format + '\n%d' + decimal_3 + decimal_3 + '\n%d' + decimal_1
+
+    if version >= 8203 and version <= 8204:
+        uv_format = decimal_2 * 4
+
+    elif version >= 8200:
+        uv_format = decimal_1 + decimal_1
+
+    else:
+        uv_format = decimal_2
+
+    flag_format = ''
+    if version >= 8199:
+        unused_flag = 0
+        flag_format = '\n%s' % (unused_flag)
+
+    record_format = vertex_format + uv_format + flag_format
+
+    def format_vertices(rows):
+        return (record_format * len(rows)) % tuple(rows.ravel().tolist())
+
+    return format_vertices
+
+def write_vertices(file, vertices, version, decimal_1, decimal_2, decimal_3):
+    """Format vertices in large blocks so a million vertex mesh is a few hundred writes instead of millions"""
+    vertices.finalize()
+    format_vertices = get_vertex_formatter(version, decimal_1, decimal_2, decimal_3, vertices.node_indices.shape[1], vertices.uvs.shape[1])
+    for block_start in range(0, len(vertices), WRITE_BLOCK_SIZE):
+        file.write(format_vertices(get_vertex_rows(vertices, block_start, block_start + WRITE_BLOCK_SIZE, version)))
+
+def write_triangles(file, triangles, version):
+    """Format triangles in large blocks, see write_vertices()"""
+    triangles.finalize()
+    if version >= 8205:
+        triangle_format = '\n;TRIANGLE %s\n%s\n%s\t%s\t%s\n'
+
+    elif version >= 8198:
+        triangle_format = '\n%s\n%s\n%s\t%s\t%s'
+
+    else:
+        triangle_format = '\n%s\n%s\t%s\t%s'
+
+    for block_start in range(0, len(triangles), WRITE_BLOCK_SIZE):
+        block_end = block_start + WRITE_BLOCK_SIZE
+        columns = (triangles.material_indices[block_start:block_end], triangles.vertex_indices[block_start:block_end])
+        if version >= 8205:
+            columns = (np.arange(block_start, block_start + len(columns[0])),) + columns
+
+        elif version >= 8198:
+            columns = (triangles.regions[block_start:block_end],) + columns
+
+        rows = np.column_stack(columns).astype(np.int64)
+        file.write((triangle_format * len(rows)) % tuple(rows.ravel().tolist()))
+
+class JMSSceneData:
+    """Everything write_scene_data() reads from a scene, the exporter's JMSScene extends it with the Blender side"""
+    class Node:
+        def __init__(self, name, children=None, child=-1, sibling=-1, parent=-1, rotation=None, translation=None):
+            self.name = name
+            self.children = children
+            self.child = child
+            self.sibling = sibling
+            self.parent = parent
+            self.rotation = rotation
+            self.translation = translation
+
+    class Material:
+        def __init__(self, name, texture_path=None, slot=None, lod=None, permutation=None, region=None):
+            self.name = name
+            self.texture_path = texture_path
+            self.slot = slot
+            self.lod = lod
+            self.permutation = permutation
+            self.region = region
+
+    class Marker:
+        def __init__(self, name, region=-1, parent=-1, rotation=None, translation=None, scale=0.0):
+            self.name = name
+            self.region = region
+            self.parent = parent
+            self.rotation = rotation
+            self.translation = translation
+            self.scale = scale
+
+    class XREF:
+        def __init__(self, path, name):
+            self.path = path
+            self.name = name
+
+    class XREF_Marker:
+        def __init__(self, name, unique_identifier=-1, index=-1, rotation=None, translation=None):
+            self.name = name
+            self.unique_identifier = unique_identifier
+            self.index = index
+            self.rotation = rotation
+            self.translation = translation
+
+    class Region:
+        def __init__(self, name):
+            self.name = name
+
+    class Vertex:
+        def __init__(self,
+                     node_influence_count=0,
+                     node_set=None,
+                     region=-1,
+                     translation=None,
+                     normal=None,
+                     color=None,
+                     uv_set=None
+                     ):
+
+            self.node_influence_count = node_influence_count
+            self.node_set = node_set
+            self.region = region
+            self.translation = translation
+            self.normal = normal
+            self.color = color
+            self.uv_set = uv_set
+
+    class Sphere:
+        def __init__(self, name, parent_index=-1, material_index=-1, rotation=None, translation=None, scale=0.0):
+            self.name = name
+            self.parent_index = parent_index
+            self.material_index = material_index
+            self.rotation = rotation
+            self.translation = translation
+            self.scale = scale
+
+    class Box:
+        def __init__(self, name, parent_index=-1, material_index=-1, rotation=None, translation=None, width=0.0, length=0.0, height=0.0):
+            self.name = name
+            self.parent_index = parent_index
+            self.material_index = material_index
+            self.rotation = rotation
+            self.translation = translation
+            self.width = width
+            self.length = length
+            self.height = height
+
+    class Capsule:
+        def __init__(self, name, parent_index=-1, material_index=-1, rotation=None, translation=None, height=0.0, radius=0.0):
+            self.name = name
+            self.parent_index = parent_index
+            self.material_index = material_index
+            self.rotation = rotation
+            self.translation = translation
+            self.height = height
+            self.radius = radius
+
+    class Convex_Shape:
+        def __init__(self, name, parent_index=-1, material_index=-1, rotation=None, translation=None, verts=None):
+            self.name = name
+            self.parent_index = parent_index
+            self.material_index = material_index
+            self.rotation = rotation
+            self.translation = translation
+            self.verts = verts
+
+    class Ragdoll:
+        def __init__(self,
+                     name,
+                     attached_index=-1,
+                     referenced_index=-1,
+                     attached_rotation=None,
+                     attached_translation=None,
+                     referenced_rotation=None,
+                     referenced_translation=None,
+                     min_twist=0.0,
+                     max_twist=0.0,
+                     min_cone=0.0,
+                     max_cone=0.0,
+                     min_plane=0.0,
+                     max_plane=0.0,
+                     friction_limit=0.0
+                     ):
+
+            self.name = name
+            self.attached_index = attached_index
+            self.referenced_index = referenced_index
+            self.attached_rotation = attached_rotation
+            self.attached_translation = attached_translation
+            self.referenced_rotation = referenced_rotation
+            self.referenced_translation = referenced_translation
+            self.min_twist = min_twist
+            self.max_twist = max_twist
+            self.min_cone = min_cone
+            self.max_cone = max_cone
+            self.min_plane = min_plane
+            self.max_plane = max_plane
+            self.friction_limit = friction_limit
+
+    class Hinge:
+        def __init__(self, name, body_a_index=-1, body_b_index=-1, body_a_rotation=None, body_a_translation=None, body_b_rotation=None, body_b_translation=None, is_limited=0, friction_limit=0.0, min_angle=0.0, max_angle=0.0):
+            self.name = name
+            self.body_a_index = body_a_index
+            self.body_b_index = body_b_index
+            self.body_a_rotation = body_a_rotation
+            self.body_a_translation = body_a_translation
+            self.body_b_rotation = body_b_rotation
+            self.body_b_translation = body_b_translation
+            self.is_limited = is_limited
+            self.friction_limit = friction_limit
+            self.min_angle = min_angle
+            self.max_angle = max_angle
+
+    class Car_Wheel:
+        def __init__(self, name, chassis_index=-1, wheel_index=-1, chassis_rotation=None, chassis_translation=None, wheel_rotation=None, wheel_translation=None, suspension_rotation=None, suspension_translation=None, suspension_min_limit=0.0, suspension_max_limit=0.0, friction_limit=0.0, velocity=0.0, gain=0.0):
+            self.name = name
+            self.chassis_index = chassis_index
+            self.wheel_index = wheel_index
+            self.chassis_rotation = chassis_rotation
+            self.chassis_translation = chassis_translation
+            self.wheel_rotation = wheel_rotation
+            self.wheel_translation = wheel_translation
+            self.suspension_rotation = suspension_rotation
+            self.suspension_translation = suspension_translation
+            self.suspension_min_limit = suspension_min_limit
+            self.suspension_max_limit = suspension_max_limit
+            self.friction_limit = friction_limit
+            self.velocity = velocity
+            self.gain = gain
+
+    class Point_to_Point:
+        def __init__(self, name, body_a_index=-1, body_b_index=-1, body_a_rotation=None, body_a_translation=None, body_b_rotation=None, body_b_translation=None, constraint_type=0, x_min_limit=0.0, x_max_limit=0.0, y_min_limit=0.0, y_max_limit=0.0, z_min_limit=0.0, z_max_limit=0.0, spring_length=0.0):
+            self.name = name
+            self.body_a_index = body_a_index
+            self.body_b_index = body_b_index
+            self.body_a_rotation = body_a_rotation
+            self.body_a_translation = body_a_translation
+            self.body_b_rotation = body_b_rotation
+            self.body_b_translation = body_b_translation
+            self.constraint_type = constraint_type
+            self.x_min_limit = x_min_limit
+            self.x_max_limit = x_max_limit
+            self.y_min_limit = y_min_limit
+            self.y_max_limit = y_max_limit
+            self.z_min_limit = z_min_limit
+            self.z_max_limit = z_max_limit
+            self.spring_length = spring_length
+
+    class Prismatic:
+        def __init__(self, name, body_a_index=-1, body_b_index=-1, body_a_rotation=None, body_a_translation=None, body_b_rotation=None, body_b_translation=None, is_limited=0, suspension_max_limit=0.0, friction_limit=0.0, min_limit=0.0, max_limit=0.0):
+            self.name = name
+            self.body_a_index = body_a_index
+            self.body_b_index = body_b_index
+            self.body_a_rotation = body_a_rotation
+            self.body_a_translation = body_a_translation
+            self.body_b_rotation = body_b_rotation
+            self.body_b_translation = body_b_translation
+            self.is_limited = is_limited
+            self.friction_limit = friction_limit
+            self.min_limit = min_limit
+            self.max_limit = max_limit
+
+    class Bounding_Sphere:
+        def __init__(self, translation=None, scale=0.0):
+            self.translation = translation
+            self.scale = scale
+
+    class Skylight:
+        def __init__(self, direction=None, radiant_intensity=None, solid_angle=0.0):
+            self.direction = direction
+            self.radiant_intensity = radiant_intensity
+            self.solid_angle = solid_angle
+
+    def __init__(self):
+        self.node_checksum = 0
+        self.nodes = []
+        self.materials = []
+        self.markers = []
+        self.xref_instances = []
+        self.xref_markers = []
+        self.regions = []
+        self.vertices = VertexBuffer()
+        self.triangles = TriangleBuffer()
+        self.spheres = []
+        self.boxes = []
+        self.capsules = []
+        self.convex_shapes = []
+        self.ragdolls = []
+        self.hinges = []
+        self.car_wheels = []
+        self.point_to_points = []
+        self.prismatics = []
+        self.bounding_spheres = []
+        self.skylights = []
+
+    def freeze(self):
+        """Copy the written data into a plain JMSSceneData, which pickles without the Blender references a subclass holds"""
+        scene_data = JMSSceneData()
+        for attribute in vars(scene_data):
+            setattr(scene_data, attribute, getattr(self, attribute))
+
+        return scene_data
+
+def write_scene_data(file, jms_scene, version, game_version):
+    if version > 8209:
+        decimal_1 = '\n%0.10f'
+        decimal_2 = '\n%0.10f\t%0.10f'
+        decimal_3 = '\n%0.10f\t%0.10f\t%0.10f'
+        decimal_4 = '\n%0.10f\t%0.10f\t%0.10f\t%0.10f'
+
+    else:
+        decimal_1 = '\n%0.6f'
+        decimal_2 = '\n%0.6f\t%0.6f'
+        decimal_3 = '\n%0.6f\t%0.6f\t%0.6f'
+        decimal_4 = '\n%0.6f\t%0.6f\t%0.6f\t%0.6f'
+
+    if version >= 8205:
+        version_bounds = '8197-8210'
+        if game_version == 'halo3mcc':
+            version_bounds = '8197-8213'
+
+        file.write(
+            ';### VERSION ###' +
+            '\n%s' % (version) +
+            '\n;\t<%s>\n' % (version_bounds)
+            )
+
+    else:
+        file.write(
+            '%s' % (version) +
+            '\n%s' % (jms_scene.node_checksum)
+            )
+
+        if version >= 8203 and version <= 8204:
+            file.write(
+                '\n;' +
+                '\n;###Frames###'
+                )
+
+        file.write(
+            '\n%s' % (len(jms_scene.nodes))
+            )
+
+    if version >= 8205:
+        file.write(
+            '\n;### NODES ###' +
+            '\n%s' % (len(jms_scene.nodes)) +
+            '\n;\t<name>' +
+            '\n;\t<parent node index>' +
+            '\n;\t<default rotation <i,j,k,w>>' +
+            '\n;\t<default translation <x,y,z>>\n'
+        )
+
+    for idx, node in enumerate(jms_scene.nodes):
+        if version >= 8205:
+            file.write(
+                '\n;NODE %s' % (idx) +
+                '\n%s' % (node.name) +
+                '\n%s' % (node.parent) +
+                decimal_4 % (node.rotation) +
+                decimal_3 % (node.translation) +
+                '\n'
+            )
+
+        else:
+            file.write(
+                '\n%s' % (node.name) +
+                '\n%s' % (node.child) +
+                '\n%s' % (node.sibling) +
+                decimal_4 % (node.rotation) +
+                decimal_3 % (node.translation)
+            )
+
+    if version >= 8205:
+        file.write(
+            '\n;### MATERIALS ###' +
+            '\n%s' % (len(jms_scene.materials)) +
+            '\n;\t<name>' +
+            '\n;\t<(Material Slot Index) LOD Permutation Region>\n'
+        )
+
+    else:
+        if version >= 8203 and version <= 8204:
+            file.write(
+                '\n;' +
+                '\n;###Materials###'
+                )
+
+        file.write(
+            '\n%s' % (len(jms_scene.materials))
+        )
+
+    for idx, material in enumerate(jms_scene.materials):
+        if game_version == 'haloce':
+            file.write(
+                '\n%s' % (material.name) +
+                '\n%s' % (material.texture_path)
+            )
+
+        else:
+            material_definition = '(%s)' % (material.slot)
+            if not material.lod == None:
+                material_definition += ' %s' % (material.lod)
+            if not material.permutation == '':
+                material_definition += ' %s' % (material.permutation)
+            if not material.region == '':
+                material_definition += ' %s' % (material.region)
+            if version >= 8205:
+                file.write(
+                    '\n;MATERIAL %s' % (idx) +
+                    '\n%s' % (material.name) +
+                    '\n%s\n' % (material_definition)
+                )
+
+            else:
+                file.write('\n%s' % (material.name))
+                if version >= 8203 and version <= 8204:
+                    file.write('\n%s' % (material.texture_path))
+                file.write('\n%s' % (material_definition))
+
+    if version >= 8205:
+        file.write(
+            '\n;### MARKERS ###' +
+            '\n%s' % (len(jms_scene.markers)) +
+            '\n;\t<name>' +
+            '\n;\t<node index>' +
+            '\n;\t<rotation <i,j,k,w>>' +
+            '\n;\t<translation <x,y,z>>' +
+            '\n;\t<radius>\n'
+        )
+
+    else:
+        if version >= 8203 and version <= 8204:
+            file.write(
+                '\n;' +
+                '\n;###Markers###'
+                )
+
+        file.write(
+            '\n%s' % (len(jms_scene.markers))
+        )
+
+    for idx, marker in enumerate(jms_scene.markers):
+        if version >= 8205:
+            file.write(
+                '\n;MARKER %s' % (idx)
+            )
+
+        file.write('\n%s' % (marker.name))
+
+        if version >= 8198 and version <= 8204:
+            file.write('\n%s' % (marker.region))
+
+        file.write(
+            '\n%s' % (marker.parent) +
+            decimal_4 % (marker.rotation) +
+            decimal_3 % (marker.translation)
+        )
+
+        if version >= 8200:
+            file.write(decimal_1 % (marker.scale))
+
+        if version >= 8205:
+            file.write('\n')
+
+    if version >= 8203 and version <= 8204:
+        file.write(
+            '\n;' +
+            '\n;###Instances###'
+            )
+
+    if version >= 8203:
+        if version >= 8206:
+            file.write(
+                '\n;### INSTANCE XREF PATHS ###' +
+                '\n%s' % (len(jms_scene.xref_instances)) +
+                '\n;\t<path to asset file>' +
+                '\n;\t<name>\n'
+            )
+
+        elif version == 8205:
+            file.write(
+                '\n;### INSTANCE XREF PATHS ###' +
+                '\n%s' % (len(jms_scene.xref_instances)) +
+                '\n;\t<name>\n'
+            )
+
+        elif version >= 8203 and version <= 8204:
+            file.write(
+                '\n;' +
+                '\n;###Instance xref paths###' +
+                '\n%s' % (len(jms_scene.xref_instances))
+                )
+
+        for idx, xref_instance in enumerate(jms_scene.xref_instances):
+            if version >= 8205:
+                file.write(
+                    '\n;XREF %s' % (idx) +
+                    '\n%s' % (xref_instance.path) +
+                    '\n%s\n' % (xref_instance.name)
+                )
+            else:
+                file.write(
+                    '\n%s' % (xref_instance.path) +
+                    '\n%s\n' % (xref_instance.name)
+                )
+
+        if version >= 8205:
+            file.write(
+                '\n;### INSTANCE MARKERS ###' +
+                '\n%s' % (len(jms_scene.xref_markers)) +
+                '\n;\t<name>' +
+                '\n;\t<unique identifier>' +
+                '\n;\t<path index>' +
+                '\n;\t<rotation <i,j,k,w>>' +
+                '\n;\t<translation <x,y,z>>\n'
+            )
+
+        elif version >= 8203 and version <= 8204:
+            file.write(
+                '\n;' +
+                '\n;###Instance markers###' +
+                '\n%s' % (len(jms_scene.xref_markers))
+                )
+
+        for idx, xref_marker in enumerate(jms_scene.xref_markers):
+            if version >= 8205:
+                file.write(
+                    '\n;XREF OBJECT %s' % (idx) +
+                    '\n%s' % (xref_marker.name) +
+                    '\n%s' % (xref_marker.unique_identifier) +
+                    '\n%s' % (xref_marker.index) +
+                    decimal_4 % (xref_marker.rotation) +
+                    decimal_3 % (xref_marker.translation) +
+                    '\n'
+                )
+            else:
+                file.write(
+                    '\n%s' % (xref_marker.name) +
+                    '\n%s' % (xref_marker.unique_identifier) +
+                    '\n%s' % (xref_marker.index) +
+                    decimal_4 % (xref_marker.rotation) +
+                    decimal_3 % (xref_marker.translation) +
+                    '\n'
+                )
+
+    if version >= 8203 and version <= 8204:
+        file.write(
+            '\n;' +
+            '\n;###Skin data###'
+            )
+
+    if version <= 8204:
+        if version >= 8203 and version <= 8204:
+            file.write(
+                '\n;' +
+                '\n;###Regions###'
+                )
+
+        file.write(
+            '\n%s' % (len(jms_scene.regions))
+        )
+
+        for region in jms_scene.regions:
+            file.write(
+                '\n%s' % (region.name)
+            )
+
+    if version >= 8205:
+        file.write(
+            '\n;### VERTICES ###' +
+            '\n%s' % (len(jms_scene.vertices)) +
+            '\n;\t<position>' +
+            '\n;\t<normal>' +
+            '\n;\t<node influences count>' +
+            '\n;\t\t<index>' +
+            '\n;\t\t<weight>' +
+            '\n;\t<texture coordinate count>' +
+            '\n;\t\t<texture coordinates <u,v>>\n'
+        )
+
+        if version >= 8211:
+            file.write(
+                ';\t<vertex color <r,g,b>>\n'
+            )
+    else:
+        if version >= 8203 and version <= 8204:
+            file.write(
+                '\n;' +
+                '\n;###Vertices###'
+                )
+
+        file.write(
+            '\n%s' % (len(jms_scene.vertices))
+        )
+
+    write_vertices(file, jms_scene.vertices, version, decimal_1, decimal_2, decimal_3)
+
+    if version >= 8205:
+        file.write(
+            '\n;### TRIANGLES ###' +
+            '\n%s' % (len(jms_scene.triangles)) +
+            '\n;\t<material index>' +
+            '\n;\t<vertex indices <v0,v1,v2>>\n'
+        )
+
+    else:
+        if version >= 8203 and version <= 8204:
+            file.write(
+                '\n;' +
+                '\n;###Faces###'
+                )
+
+        file.write(
+            '\n%s' % (len(jms_scene.triangles))
+        )
+
+    write_triangles(file, jms_scene.triangles, version)
+
+    if version <= 8204:
+        file.write('\n')
+
+    if version >= 8206:
+        file.write(
+            '\n;### SPHERES ###' +
+            '\n%s' % (len(jms_scene.spheres)) +
+            '\n;\t<name>' +
+            '\n;\t<parent>' +
+            '\n;\t<material>' +
+            '\n;\t<rotation <i,j,k,w>>' +
+            '\n;\t<translation <x,y,z>>' +
+            '\n;\t<radius>\n'
+        )
+
+        #write sphere
+        for idx, sphere in enumerate(jms_scene.spheres):
+            file.write(
+                '\n;SPHERE %s' % (idx) +
+                '\n%s' % (sphere.name) +
+                '\n%s' % (sphere.parent_index) +
+                '\n%s' % (sphere.material_index) +
+                decimal_4 % (sphere.rotation) +
+                decimal_3 % (sphere.translation) +
+                decimal_1 % (sphere.scale) +
+                '\n'
+            )
+
+        #write boxes
+        file.write(
+            '\n;### BOXES ###' +
+            '\n%s' % (len(jms_scene.boxes)) +
+            '\n;\t<name>' +
+            '\n;\t<parent>' +
+            '\n;\t<material>' +
+            '\n;\t<rotation <i,j,k,w>>' +
+            '\n;\t<translation <x,y,z>>' +
+            '\n;\t<width (x)>' +
+            '\n;\t<length (y)>' +
+            '\n;\t<height (z)>\n'
+        )
+
+        for idx, box in enumerate(jms_scene.boxes):
+            file.write(
+                '\n;BOXES %s' % (idx) +
+                '\n%s' % (box.name) +
+                '\n%s' % (box.parent_index) +
+                '\n%s' % (box.material_index) +
+                decimal_4 % (box.rotation) +
+                decimal_3 % (box.translation) +
+                decimal_1 % (box.width) +
+                decimal_1 % (box.length) +
+                decimal_1 % (box.height) +
+                '\n'
+            )
+
+        #write capsules
+        file.write(
+            '\n;### CAPSULES ###' +
+            '\n%s' % (len(jms_scene.capsules)) +
+            '\n;\t<name>' +
+            '\n;\t<parent>' +
+            '\n;\t<material>' +
+            '\n;\t<rotation <i,j,k,w>>' +
+            '\n;\t<translation <x,y,z>>' +
+            '\n;\t<height>' +
+            '\n;\t<radius>\n'
+             )
+
+        for idx, capsule in enumerate(jms_scene.capsules):
+            file.write(
+                '\n;CAPSULES %s' % (idx) +
+                '\n%s' % (capsule.name) +
+                '\n%s' % (capsule.parent_index) +
+                '\n%s' % (capsule.material_index) +
+                decimal_4 % (capsule.rotation) +
+                decimal_3 % (capsule.translation) +
+                decimal_1 % (capsule.height) +
+                decimal_1 % (capsule.radius) +
+                '\n'
+            )
+
+        #write convex shapes
+        file.write(
+            '\n;### CONVEX SHAPES ###' +
+            '\n%s' % (len(jms_scene.convex_shapes)) +
+            '\n;\t<name>' +
+            '\n;\t<parent>' +
+            '\n;\t<material>' +
+            '\n;\t<rotation <i,j,k,w>>' +
+            '\n;\t<translation <x,y,z>>' +
+            '\n;\t<vertex count>' +
+            '\n;\t<...vertices>\n'
+        )
+
+        for idx, convex_shape in enumerate(jms_scene.convex_shapes):
+            file.write(
+                '\n;CONVEX %s' % (idx) +
+                '\n%s' % (convex_shape.name) +
+                '\n%s' % (convex_shape.parent_index) +
+                '\n%s' % (convex_shape.material_index) +
+                decimal_4 % (convex_shape.rotation) +
+                decimal_3 % (convex_shape.translation) +
+                '\n%s' % (len(convex_shape.verts))
+            )
+
+            for vertex in convex_shape.verts:
+                file.write(decimal_3 % (vertex.translation))
+
+            file.write('\n')
+
+        #write rag dolls
+        file.write(
+            '\n;### RAGDOLLS ###' +
+            '\n%s' % (len(jms_scene.ragdolls)) +
+            '\n;\t<name>' +
+            '\n;\t<attached index>' +
+            '\n;\t<referenced index>' +
+            '\n;\t<attached transform>' +
+            '\n;\t<reference transform>' +
+            '\n;\t<min twist>' +
+            '\n;\t<max twist>' +
+            '\n;\t<min cone>' +
+            '\n;\t<max cone>' +
+            '\n;\t<min plane>' +
+            '\n;\t<max plane>\n'
+        )
+
+        if version == 8213:
+            file.write(';\t<friction limit>\n')
+        for idx, ragdoll in enumerate(jms_scene.ragdolls):
+            file.write(
+                '\n;RAGDOLL %s' % (idx) +
+                '\n%s' % (ragdoll.name) +
+                '\n%s' % (ragdoll.attached_index) +
+                '\n%s' % (ragdoll.referenced_index) +
+                decimal_4 % (ragdoll.attached_rotation) +
+                decimal_3 % (ragdoll.attached_translation) +
+                decimal_4 % (ragdoll.referenced_rotation) +
+                decimal_3 % (ragdoll.referenced_translation) +
+                decimal_1 % (ragdoll.min_twist) +
+                decimal_1 % (ragdoll.max_twist) +
+                decimal_1 % (ragdoll.min_cone) +
+                decimal_1 % (ragdoll.max_cone) +
+                decimal_1 % (ragdoll.min_plane) +
+                decimal_1 % (ragdoll.max_plane)
+            )
+
+            if version == 8213:
+                file.write(decimal_1 % (ragdoll.friction_limit))
+            file.write('\n')
+
+        #write hinges
+        file.write(
+            '\n;### HINGES ###' +
+            '\n%s' % (len(jms_scene.hinges)) +
+            '\n;\t<name>' +
+            '\n;\t<body A index>' +
+            '\n;\t<body B index>' +
+            '\n;\t<body A transform>' +
+            '\n;\t<body B transform>' +
+            '\n;\t<is limited>' +
+            '\n;\t<friction limit>' +
+            '\n;\t<min angle>' +
+            '\n;\t<max angle>\n'
+        )
+
+        for idx, hinge in enumerate(jms_scene.hinges):
+            file.write(
+                '\n;HINGE %s' % (idx) +
+                '\n%s' % (hinge.name) +
+                '\n%s' % (hinge.body_a_index) +
+                '\n%s' % (hinge.body_b_index) +
+                decimal_4 % (hinge.body_a_rotation) +
+                decimal_3 % (hinge.body_a_translation) +
+                decimal_4 % (hinge.body_b_rotation) +
+                decimal_3 % (hinge.body_b_translation) +
+                '\n%s' % (hinge.is_limited) +
+                decimal_1 % (hinge.friction_limit) +
+                decimal_1 % (hinge.min_angle) +
+                decimal_1 % (hinge.max_angle) +
+                '\n'
+            )
+
+        if version > 8209:
+            #write car wheel
+            file.write(
+                '\n;### CAR WHEEL ###' +
+                '\n%s' % (len(jms_scene.car_wheels)) +
+                '\n;\t<name>' +
+                '\n;\t<chassis index>' +
+                '\n;\t<wheel index>' +
+                '\n;\t<chassis transform>' +
+                '\n;\t<wheel transform>' +
+                '\n;\t<suspension transform>' +
+                '\n;\t<suspension min limit>' +
+                '\n;\t<suspension max limit>' +
+                '\n;\t<friction limit>' +
+                '\n;\t<velocity>' +
+                '\n;\t<gain>\n'
+            )
+
+            for idx, car_wheel in enumerate(jms_scene.car_wheels):
+                file.write(
+                    '\n;CAR WHEEL %s' % (idx) +
+                    '\n%s' % (car_wheel.name) +
+                    '\n%s' % (car_wheel.chassis_index) +
+                    '\n%s' % (car_wheel.wheel_index) +
+                    decimal_4 % (car_wheel.chassis_rotation) +
+                    decimal_3 % (car_wheel.chassis_translation) +
+                    decimal_4 % (car_wheel.wheel_rotation) +
+                    decimal_3 % (car_wheel.wheel_translation) +
+                    decimal_4 % (car_wheel.suspension_rotation) +
+                    decimal_3 % (car_wheel.suspension_translation) +
+                    decimal_1 % (car_wheel.suspension_min_limit) +
+                    decimal_1 % (car_wheel.suspension_max_limit) +
+                    decimal_1 % (car_wheel.friction_limit) +
+                    decimal_1 % (car_wheel.velocity) +
+                    decimal_1 % (car_wheel.gain) +
+                    '\n'
+                )
+
+            #write point to point
+            file.write(
+                '\n;### POINT TO POINT ###' +
+                '\n%s' % (len(jms_scene.point_to_points)) +
+                '\n;\t<name>' +
+                '\n;\t<body A index>' +
+                '\n;\t<body B index>' +
+                '\n;\t<body A transform>' +
+                '\n;\t<body B transform>' +
+                '\n;\t<constraint type>' +
+                '\n;\t<x min limit>' +
+                '\n;\t<x max limit>' +
+                '\n;\t<y min limit>' +
+                '\n;\t<y max limit>' +
+                '\n;\t<z min limit>' +
+                '\n;\t<z max limit>' +
+                '\n;\t<spring length>\n'
+            )
+
+            for idx, point_to_point in enumerate(jms_scene.point_to_points):
+                file.write(
+                    '\n;POINT_TO_POINT %s' % (idx) +
+                    '\n%s' % (point_to_point.name) +
+                    '\n%s' % (point_to_point.body_a_index) +
+                    '\n%s' % (point_to_point.body_b_index) +
+                    decimal_4 % (point_to_point.body_b_rotation) +
+                    decimal_3 % (point_to_point.body_b_translation) +
+                    decimal_4 % (point_to_point.body_a_rotation) +
+                    decimal_3 % (point_to_point.body_a_translation) +
+                    '\n%s' % (point_to_point.constraint_type) +
+                    decimal_1 % (point_to_point.x_min_limit) +
+                    decimal_1 % (point_to_point.x_max_limit) +
+                    decimal_1 % (point_to_point.y_min_limit) +
+                    decimal_1 % (point_to_point.y_max_limit) +
+                    decimal_1 % (point_to_point.z_min_limit) +
+                    decimal_1 % (point_to_point.z_max_limit) +
+                    decimal_1 % (point_to_point.spring_length) +
+                    '\n'
+                )
+
+            #write prismatic
+            file.write(
+                '\n;### PRISMATIC ###' +
+                '\n%s' % (len(jms_scene.prismatics)) +
+                '\n;\t<name>' +
+                '\n;\t<body A index>' +
+                '\n;\t<body B index>' +
+                '\n;\t<body A transform>' +
+                '\n;\t<body B transform>' +
+                '\n;\t<is limited>' +
+                '\n;\t<friction limit>' +
+                '\n;\t<min limit>' +
+                '\n;\t<max limit>\n'
+            )
+
+            for idx, prismatic in enumerate(jms_scene.prismatics):
+                file.write(
+                    '\n;PRISMATIC %s' % (idx) +
+                    '\n%s' % (prismatic.name) +
+                    '\n%s' % (prismatic.body_a_index) +
+                    '\n%s' % (prismatic.body_b_index) +
+                    decimal_4 % (prismatic.body_a_rotation) +
+                    decimal_3 % (prismatic.body_a_translation) +
+                    decimal_4 % (prismatic.body_b_rotation) +
+                    decimal_3 % (prismatic.body_b_translation) +
+                    '\n%s' % (prismatic.is_limited) +
+                    decimal_1 % (prismatic.friction_limit) +
+                    decimal_1 % (prismatic.min_limit) +
+                    decimal_1 % (prismatic.max_limit) +
+                    '\n'
+                )
+
+        if version >= 8209:
+            #write bounding sphere
+            file.write(
+                '\n;### BOUNDING SPHERE ###' +
+                '\n%s' % (len(jms_scene.bounding_spheres)) +
+                '\n;\t<translation <x,y,z>>' +
+                '\n;\t<radius>\n'
+            )
+
+            for idx, bounding_sphere in enumerate(jms_scene.bounding_spheres):
+                file.write(
+                    '\n;BOUNDING SPHERE %s' % (idx) +
+                    decimal_3 % (bounding_sphere.translation) +
+                    decimal_1 % (bounding_sphere.scale) +
+                    '\n'
+                )
+
+        if version >= 8212:
+            #write skylight
+            file.write(
+                '\n;### SKYLIGHT ###' +
+                '\n%s' % (len(jms_scene.skylights)) +
+                '\n;\t<direction <x,y,z>>' +
+                '\n;\t<radiant intensity <x,y,z>>' +
+                '\n;\t<solid angle>\n'
+            )
+
+            for idx, light in enumerate(jms_scene.skylights):
+                file.write(
+                    '\n;SKYLIGHT %s' % (idx) +
+                    decimal_3 % light.direction +
+                    decimal_3 % light.radiant_intensity +
+                    decimal_1 % light.solid_angle +
+                    '\n'
+                )
+
+def write_scene_file(scene_data, output_path, incremental_export, version, game_version):
+    """Write a frozen scene, run by the worker processes of JMSWriteQueue. An incremental export is left in a temporary file and its path and hash are returned for the parent process to commit through its manifest"""
+    if not incremental_export:
+        with open(output_path, 'w', encoding='utf_8') as file:
+            write_scene_data(file, scene_data, version, game_version)
+
+        return None
+
+    with export_manifest.ExportManifest.ExportFile(None, os.path.abspath(output_path)) as file:
+        write_scene_data(file, scene_data, version, game_version)
+
+    return file.temp_path, file.file_hash.hexdigest()
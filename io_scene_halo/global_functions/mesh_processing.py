@@ -26,8 +26,9 @@
 
 import bpy
 import bmesh
+import numpy as np
 
-from mathutils import Vector
+from mathutils import Vector, Matrix
 from ..global_functions import global_functions
 
 def unhide_object(mesh):
@@ -262,6 +263,78 @@ def add_modifier(context, obj, triangulate_faces, edge_split_class, armature):
 
     context.view_layer.update()
 
+class TemplateMeshes:
+    """Generates each primitive shape once per import. Objects with the same shape and mesh settings share one mesh"""
+    def __init__(self):
+        self.templates = {}
+        self.shared_meshes = {}
+
+    def get_template(self, shape):
+        mesh = self.templates.get(shape)
+        if mesh is None:
+            mesh = bpy.data.meshes.new('%s_template' % shape.lower())
+            bm = bmesh.new()
+            if shape == 'SPHERE':
+                bmesh.ops.create_uvsphere(bm, u_segments=32, v_segments=16, diameter=1)
+
+            elif shape == 'BOX':
+                bmesh.ops.create_cube(bm, size=1.0)
+
+            elif shape == 'CAPSULES':
+                bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=False, segments=12, diameter1=1, diameter2=1, depth=2)
+                bm.transform(Matrix.Translation((0, 0, 1)))
+
+            bm.to_mesh(mesh)
+            bm.free()
+            self.templates[shape] = mesh
+
+        return mesh
+
+    def copy(self, shape, name):
+        """Return a new mesh with the template geometry for objects that change their mesh"""
+        mesh = self.get_template(shape).copy()
+        mesh.name = name
+
+        return mesh
+
+    def get_shared(self, shape, name, key=None):
+        """Return the mesh shared by every object with this shape and key. The key names the kind of object, such as 'MARKER' or ('PHYSICS', material name), so objects with different mesh level settings never share"""
+        mesh = self.shared_meshes.get((shape, key))
+        if mesh is None:
+            mesh = self.copy(shape, name)
+            self.shared_meshes[(shape, key)] = mesh
+
+        return mesh
+
+    def remove_templates(self):
+        for mesh in self.templates.values():
+            bpy.data.meshes.remove(mesh)
+
+        self.templates = {}
+
+def apply_object_scale(obj):
+    """Bake the object scale into its mesh like transform_apply(scale=True) without going through bpy.ops"""
+    obj.data.transform(Matrix.Diagonal(obj.scale).to_4x4())
+    obj.scale = (1.0, 1.0, 1.0)
+
+def set_object_parent(obj, armature, bone_name=None):
+    """Parent an object to an armature or one of its bones the same way parent_set(keep_transform=True) does, without bpy.ops or mode switches"""
+    obj.parent = armature
+    if bone_name:
+        pose_bone = armature.pose.bones[bone_name]
+        obj.parent_type = 'BONE'
+        obj.parent_bone = bone_name
+        parent_matrix = armature.matrix_world @ pose_bone.matrix @ Matrix.Translation((0, pose_bone.length, 0))
+
+    else:
+        obj.parent_type = 'OBJECT'
+        parent_matrix = armature.matrix_world
+        if obj.type == 'MESH':
+            armature_modifier = obj.modifiers.new("Armature", type='ARMATURE')
+            armature_modifier.object = armature
+
+    obj.matrix_parent_inverse = parent_matrix.inverted()
+
 def get_color_version_check(file_type):
     version = 8211
     if file_type == 'ASS':
@@ -269,263 +342,390 @@ def get_color_version_check(file_type):
 
     return version
 
-def process_mesh_import_data(game_version, import_file, object_element, object_mesh, random_color_gen, file_type):
-    vert_normal_list = []
-    vertex_groups = []
-    active_region_permutations = []
-    bm = bmesh.new()
-    if file_type == 'JMS':
-        object_data = import_file
-
-    else:
-        object_data = object_element
-
-    for idx, triangle in enumerate(object_data.triangles):
-        triangle_material_index = triangle.material_index
-        mat = None
-        if not triangle_material_index == -1:
-            mat = import_file.materials[triangle_material_index]
-
-        if game_version == 'haloce':
-            if import_file.version >= 8198:
-                region = triangle.region
-
-                current_region_permutation = import_file.regions[region].name
+def get_first_use_order(keys):
+    """Return the distinct keys in the order they first appear and the position of each entry in that list"""
+    first_use, key_inverse = np.unique(keys, return_index=True, return_inverse=True)[1:]
+    key_order = np.argsort(first_use)
+    key_rank = np.empty_like(key_order)
+    key_rank[key_order] = np.arange(len(key_order))
 
-            else:
-                region = import_file.vertices[triangle.v0].region
-                current_region_permutation = import_file.regions[region].name
+    return keys[first_use[key_order]], key_rank[key_inverse.reshape(-1)]
 
-        elif game_version == 'halo2' or game_version == 'halo3':
-            current_region_permutation = global_functions.material_definition_helper(triangle_material_index, mat)
+def get_face_indices(game_version, import_file, object_data, object_mesh, random_color_gen):
+    """Resolve each distinct material and region/permutation once, then map them onto every triangle"""
+    triangles = object_data.triangles
+    triangle_count = len(triangles)
+    if triangle_count == 0:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
 
-        if not current_region_permutation in active_region_permutations:
-            active_region_permutations.append(current_region_permutation)
-            object_mesh.face_maps.new(name=current_region_permutation)
+    # Face maps come from the region on Halo CE and from the material name on Halo 2/3
+    if game_version == 'haloce':
+        if import_file.version >= 8198:
+            triangle_keys = triangles.regions
 
-        p1 = object_data.vertices[triangle.v0].translation
-        p2 = object_data.vertices[triangle.v1].translation
-        p3 = object_data.vertices[triangle.v2].translation
-        v1 = bm.verts.new((p1[0], p1[1], p1[2]))
-        v2 = bm.verts.new((p2[0], p2[1], p2[2]))
-        v3 = bm.verts.new((p3[0], p3[1], p3[2]))
-        bm.faces.new((v1, v2, v3))
-        vert_list = [triangle.v0, triangle.v1, triangle.v2]
-        for vert in vert_list:
-            vert_normals = []
-            file_vert = object_data.vertices[vert]
-            for normal in file_vert.normal:
-                vert_normals.append(normal)
-
-            vert_normal_list.append(vert_normals)
-            for node_values in file_vert.node_set:
-                node_index = node_values[0]
-                if not node_index == -1 and not node_index in vertex_groups:
-                    vertex_groups.append(node_index)
-                    object_mesh.vertex_groups.new(name = import_file.nodes[node_index].name)
-
-    bm.verts.ensure_lookup_table()
-    bm.faces.ensure_lookup_table()
-    if file_type == 'JMS':
-        vertex_groups_names = object_mesh.vertex_groups.keys()
+        else:
+            triangle_keys = import_file.vertices.regions[triangles.vertex_indices[:, 0]]
 
-    for idx, triangle in enumerate(object_data.triangles):
-        triangle_material_index = triangle.material_index
-        if not triangle_material_index == -1:
-            mat = import_file.materials[triangle_material_index]
+    else:
+        triangle_keys = triangles.material_indices
 
+    active_region_permutations = []
+    face_map_keys, triangle_key_indices = get_first_use_order(triangle_keys)
+    key_face_maps = np.zeros(len(face_map_keys), dtype=np.int32)
+    for key_idx, key in enumerate(face_map_keys.tolist()):
         if game_version == 'haloce':
-            if import_file.version >= 8198:
-                region = triangle.region
-
-                current_region_permutation = import_file.regions[region].name
+            current_region_permutation = import_file.regions[key].name
 
-            else:
-                region = import_file.vertices[triangle.v0].region
-                current_region_permutation = import_file.regions[region].name
+        else:
+            mat = None
+            if not key == -1:
+                mat = import_file.materials[key]
 
-        elif game_version == 'halo2' or game_version == 'halo3':
-            current_region_permutation = global_functions.material_definition_helper(triangle_material_index, mat)
+            current_region_permutation = global_functions.material_definition_helper(key, mat)
 
         if not current_region_permutation in active_region_permutations:
             active_region_permutations.append(current_region_permutation)
             object_mesh.face_maps.new(name=current_region_permutation)
 
+        key_face_maps[key_idx] = active_region_permutations.index(current_region_permutation)
+
+    material_list = [slot.material for slot in object_mesh.material_slots]
+    file_materials, triangle_material_indices = get_first_use_order(triangles.material_indices)
+    file_material_slots = np.zeros(len(file_materials), dtype=np.int32)
+    for file_material_idx, triangle_material_index in enumerate(file_materials.tolist()):
         if not triangle_material_index == -1:
-            material_list = []
-            material_name = mat.scene_name
+            material_name = import_file.materials[triangle_material_index].scene_name
             mat = bpy.data.materials.get(material_name)
             if mat is None:
                 mat = bpy.data.materials.new(name=material_name)
 
-            for slot in object_mesh.material_slots:
-                material_list.append(slot.material)
-
             if not mat in material_list:
                 material_list.append(mat)
                 object_mesh.data.materials.append(mat)
 
             mat.diffuse_color = random_color_gen.next()
-            material_index = material_list.index(mat)
-            bm.faces[idx].material_index = material_index
-
-        fm = bm.faces.layers.face_map.verify()
-        face_idx = bm.faces[idx]
-        face_idx[fm] = active_region_permutations.index(current_region_permutation)
-        vert_list = [triangle.v0, triangle.v1, triangle.v2]
-        for vert_idx, vert in enumerate(vert_list):
-            vertex_index = (3 * idx) + vert_idx
-            file_vert = object_data.vertices[vert]
-            bm.verts[vertex_index].normal = file_vert.normal
-            if not file_vert.color == None and game_version == 'halo3' and import_file.version >= get_color_version_check(file_type):
-                color_r = file_vert.color[0]
-                color_g = file_vert.color[1]
-                color_b = file_vert.color[2]
-                color_a = 1
-
-                layer_color = bm.loops.layers.color.get("color")
-                if layer_color is None:
-                    layer_color = bm.loops.layers.color.new("color")
-
-                loop = bm.faces[idx].loops[vert_idx]
-                loop[layer_color] = (color_r, color_g, color_b, color_a)
-
-            for uv_idx, uv in enumerate(file_vert.uv_set):
-                uv_name = 'UVMap_%s' % uv_idx
-                layer_uv = bm.loops.layers.uv.get(uv_name)
-                if layer_uv is None:
-                    layer_uv = bm.loops.layers.uv.new(uv_name)
-
-                loop = bm.faces[idx].loops[vert_idx]
-                loop[layer_uv].uv = (uv[0], uv[1])
-
-            for node_values in file_vert.node_set:
-                layer_deform = bm.verts.layers.deform.verify()
-
-                node_index = node_values[0]
-                node_weight = node_values[1]
-                if not node_index == -1:
-                    group_name = import_file.nodes[node_index].name
-                    group_index = vertex_groups_names.index(group_name)
-                    vert_idx = bm.verts[vertex_index]
-                    vert_idx[layer_deform][group_index] = node_weight
-
-    return bm, vert_normal_list
-
-def process_mesh_export_weights(vert, armature, original_geo, vertex_groups, joined_list, file_type):
-    node_index_list = []
-    if len(vert.groups) != 0 and len(vert.groups) <= len(vertex_groups):
-        object_vert_group_list = []
-        vertex_vert_group_list = []
-        for group_index in range(len(vert.groups)):
-            vert_group = vert.groups[group_index].group
-            object_vertex_group = vertex_groups[vert_group]
-            if armature:
-                if object_vertex_group in armature.data.bones:
-                    vertex_vert_group_list.append(group_index)
-                    if armature.data.bones[object_vertex_group] in joined_list:
-                        object_vert_group_list.append(vert_group)
-
-            else:
-                if object_vertex_group in bpy.data.objects:
-                    vertex_vert_group_list.append(group_index)
-                    if bpy.data.objects[object_vertex_group] in joined_list:
-                        object_vert_group_list.append(vert_group)
-
-        value = len(object_vert_group_list)
-        if value > 4:
-            value = 4
-
-        node_influence_count = int(value)
-        node_set = []
-        if len(object_vert_group_list) != 0:
-            for idx, group_index in enumerate(object_vert_group_list):
-                vert_index = int(vertex_vert_group_list[idx])
-                vert_group = vert.groups[vert_index].group
-                object_vertex_group = vertex_groups[vert_group]
-                if armature:
-                    node_obj = armature.data.bones[object_vertex_group]
-
-                else:
-                    node_obj = bpy.data.objects[object_vertex_group]
-
-                node_index = int(joined_list.index(node_obj))
-                if not node_index in node_index_list:
-                    node_index_list.append(node_index)
-
-                node_weight = float(vert.groups[vert_index].weight)
-                node_set.append([node_index, node_weight])
-
-        else:
-            node_set = []
-            node_influence_count = int(0)
-            if file_type == 'JMS':
-                parent_index = global_functions.get_parent(armature, original_geo, joined_list, 0)
-                node_influence_count = int(1)
-                node_index = int(parent_index[0])
-                node_weight = float(1.0000000000)
-                node_set.append([node_index, node_weight])
+            file_material_slots[file_material_idx] = material_list.index(mat)
+
+    return file_material_slots[triangle_material_indices], key_face_maps[triangle_key_indices]
+
+def get_vertex_keys(vertices, tolerance=0.0):
+    """Pack every attribute that ends up on a mesh vertex into one byte string per vertex. A tolerance above 0 packs
+    positions as cells of a grid that size so nearby positions share a key"""
+    vertex_count = len(vertices.translations)
+    translations = vertices.translations
+    if tolerance > 0.0:
+        translations = np.floor(translations / tolerance + 0.5).astype(np.int64)
+
+    node_mask = np.arange(vertices.node_indices.shape[1]) < vertices.node_counts[:, None]
+    uv_mask = np.arange(vertices.uvs.shape[1]) < vertices.uv_counts[:, None]
+    columns = [translations,
+               vertices.normals,
+               vertices.node_counts,
+               np.where(node_mask, vertices.node_indices, -1),
+               np.where(node_mask, vertices.node_weights, 0.0).astype(np.float32),
+               vertices.uv_counts,
+               np.where(uv_mask[:, :, None], vertices.uvs, 0.0).astype(np.float32)]
+    if not vertices.colors is None:
+        columns.append(vertices.colors)
+
+    key_bytes = np.concatenate([np.ascontiguousarray(column).reshape(vertex_count, -1).view(np.uint8) for column in columns], axis=1)
+
+    return np.ascontiguousarray(key_bytes).view(np.dtype((np.void, key_bytes.shape[1]))).reshape(-1)
+
+def get_welded_vertices(vertices, loop_vertices, tolerance=0.0):
+    """Merge corners whose vertices are bit-identical, positions are compared by grid cell when tolerance is above 0.
+    Returns the source vertex of each mesh vertex and the mesh vertex of each loop"""
+    used_vertices, loop_used_vertices = np.unique(loop_vertices, return_inverse=True)
+    vertex_keys = get_vertex_keys(vertices, tolerance)[used_vertices]
+    key_vertices = np.unique(vertex_keys, return_inverse=True)[1].reshape(-1)
+    loop_keys = key_vertices[loop_used_vertices.reshape(-1)]
+
+    # Number the welded vertices in the order the triangles first use them, any corner of a welded vertex can stand in for it
+    welded_keys, loop_mesh_vertices = get_first_use_order(loop_keys)
+    mesh_vertices = np.zeros(len(welded_keys), dtype=loop_vertices.dtype)
+    mesh_vertices[loop_mesh_vertices] = loop_vertices
+
+    # Triangles that would collapse onto a welded vertex keep unshared corners
+    triangle_vertices = loop_mesh_vertices.reshape(-1, 3)
+    degenerate = (triangle_vertices[:, 0] == triangle_vertices[:, 1]) | (triangle_vertices[:, 1] == triangle_vertices[:, 2]) | (triangle_vertices[:, 0] == triangle_vertices[:, 2])
+    degenerate_loops = np.flatnonzero(np.repeat(degenerate, 3))
+    loop_mesh_vertices[degenerate_loops] = np.arange(len(mesh_vertices), len(mesh_vertices) + len(degenerate_loops))
+    mesh_vertices = np.concatenate((mesh_vertices, loop_vertices[degenerate_loops]))
+
+    return mesh_vertices, loop_mesh_vertices
+
+def set_mesh_geometry(mesh, vertices, triangles, weld_vertices=False, weld_distance=0.0):
+    """Fill an empty mesh from the parsed columns, every triangle corner gets its own vertex unless weld_vertices is set"""
+    vertices.finalize()
+    triangles.finalize()
+    loop_vertices = triangles.vertex_indices.reshape(-1)
+    loop_count = len(loop_vertices)
+    triangle_count = len(triangles.vertex_indices)
+    if weld_vertices and loop_count > 0:
+        mesh_vertices, loop_mesh_vertices = get_welded_vertices(vertices, loop_vertices, weld_distance)
 
     else:
-        node_set = []
-        node_influence_count = int(0)
-        if file_type == 'JMS':
-            parent_index = global_functions.get_parent(armature, original_geo, joined_list, 0)
-            node_influence_count = int(1)
-            node_index = int(parent_index[0])
-            node_weight = float(1.0000000000)
-            node_set.append([node_index, node_weight])
-
-    return node_influence_count, node_set, node_index_list
-
-def process_mesh_export_color(evaluated_geo, loop_index):
-    color = (0.0, 0.0, 0.0)
-    if evaluated_geo.vertex_colors:
-        color_rgb = evaluated_geo.vertex_colors.active.data[loop_index].color
-        color = color_rgb
-
-    return color
+        mesh_vertices = loop_vertices
+        loop_mesh_vertices = np.arange(loop_count, dtype=np.int32)
+
+    mesh.vertices.add(len(mesh_vertices))
+    mesh.loops.add(loop_count)
+    mesh.polygons.add(triangle_count)
+    mesh.vertices.foreach_set("co", vertices.translations[mesh_vertices].reshape(-1))
+    mesh.loops.foreach_set("vertex_index", loop_mesh_vertices.astype(np.int32))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, loop_count, 3, dtype=np.int32))
+    mesh.polygons.foreach_set("loop_total", np.full(triangle_count, 3, dtype=np.int32))
+    mesh.update(calc_edges=True)
+
+    mesh.normals_split_custom_set(vertices.normals[loop_vertices].tolist())
+    mesh.use_auto_smooth = True
+
+    return loop_vertices, mesh_vertices
+
+def set_vertex_weights(node_list, object_mesh, vertices, mesh_vertices):
+    """Create the vertex groups in the order nodes are first used and assign weights in one call per node and weight"""
+    node_indices = vertices.node_indices[mesh_vertices]
+    node_weights = vertices.node_weights[mesh_vertices]
+    used_influences = node_indices != -1
+    loop_indices = np.nonzero(used_influences)[0]
+    influence_nodes = node_indices[used_influences]
+    influence_weights = node_weights[used_influences]
+    if len(influence_nodes) == 0:
+        return
+
+    vertex_groups = {}
+    for node_index in get_first_use_order(influence_nodes)[0].tolist():
+        vertex_groups[node_index] = object_mesh.vertex_groups.new(name = node_list[node_index].name)
+
+    # A node listed twice on one vertex keeps its last weight
+    influence_keys = loop_indices.astype(np.int64) * (int(influence_nodes.max()) + 1) + influence_nodes
+    last_use = len(influence_keys) - 1 - np.unique(influence_keys[::-1], return_index=True)[1]
+    loop_indices = loop_indices[last_use]
+    influence_nodes = influence_nodes[last_use]
+    influence_weights = influence_weights[last_use]
+
+    influence_order = np.lexsort((influence_weights, influence_nodes))
+    sorted_nodes = influence_nodes[influence_order]
+    sorted_weights = influence_weights[influence_order]
+    run_starts = np.flatnonzero(np.concatenate(([True], (sorted_nodes[1:] != sorted_nodes[:-1]) | (sorted_weights[1:] != sorted_weights[:-1]))))
+    run_ends = np.append(run_starts[1:], len(sorted_nodes))
+    for run_start, run_end in zip(run_starts.tolist(), run_ends.tolist()):
+        vertex_group = vertex_groups[int(sorted_nodes[run_start])]
+        vertex_group.add(loop_indices[influence_order[run_start:run_end]].tolist(), float(sorted_weights[run_start]), 'REPLACE')
+
+def build_mesh_import_data(game_version, import_file, object_element, object_mesh, random_color_gen, file_type, weld_vertices=False, weld_distance=0.0):
+    """Build the mesh of object_mesh from the parsed vertex and triangle columns with bulk foreach_set calls"""
+    if file_type == 'JMS':
+        object_data = import_file
 
-def process_mesh_export_uv(evaluated_geo, file_type, loop_index, version):
-    uv_set = []
-    for uv_index in range(len(evaluated_geo.uv_layers)):
-        evaluated_geo.uv_layers.active = evaluated_geo.uv_layers[uv_index]
-        uv = evaluated_geo.uv_layers.active.data[evaluated_geo.loops[loop_index].index].uv
-        uv_set.append(uv)
+    else:
+        object_data = object_element
 
+    mesh = object_mesh.data
+    vertices = object_data.vertices
+    loop_vertices, mesh_vertices = set_mesh_geometry(mesh, vertices, object_data.triangles, weld_vertices, weld_distance)
+    material_indices, face_map_indices = get_face_indices(game_version, import_file, object_data, object_mesh, random_color_gen)
+    mesh.polygons.foreach_set("material_index", material_indices)
+    if len(face_map_indices) > 0:
+        face_map_layer = mesh.face_maps.new()
+        face_map_layer.data.foreach_set("value", face_map_indices)
+
+    if not vertices.colors is None and game_version == 'halo3' and import_file.version >= get_color_version_check(file_type):
+        loop_colors = np.ones((len(loop_vertices), 4), dtype=np.float32)
+        loop_colors[:, :3] = vertices.colors[loop_vertices]
+        layer_color = mesh.vertex_colors.new(name="color")
+        layer_color.data.foreach_set("color", loop_colors.reshape(-1))
+
+    uv_count = 0
+    loop_uv_counts = vertices.uv_counts[loop_vertices]
+    if len(loop_vertices) > 0:
+        uv_count = int(loop_uv_counts.max())
+
+    for uv_idx in range(uv_count):
+        loop_uvs = vertices.uvs[loop_vertices, uv_idx, :2]
+        loop_uvs[loop_uv_counts <= uv_idx] = 0.0
+        layer_uv = mesh.uv_layers.new(name='UVMap_%s' % uv_idx)
+        layer_uv.data.foreach_set("uv", loop_uvs.reshape(-1))
+
+    # Vertex groups are named after nodes, ASS files have no node list to name them from
     if file_type == 'JMS':
-        if not uv_set and version <= 8204:
-            uv_set = [(0.0, 0.0)]
+        set_vertex_weights(import_file.nodes, object_mesh, vertices, mesh_vertices)
 
-    return uv_set
+def get_vertex_group_nodes(armature, original_geo, joined_list):
+    """Node index for every vertex group of an object, -1 for groups that do not belong to an exported node"""
+    group_nodes = []
+    for vertex_group in original_geo.vertex_groups:
+        node_index = -1
+        if armature:
+            node_obj = armature.data.bones.get(vertex_group.name)
 
-def process_mesh_export_vert(vert, file_type, original_geo_matrix, version, custom_scale):
+        else:
+            node_obj = bpy.data.objects.get(vertex_group.name)
+
+        if node_obj and node_obj in joined_list:
+            node_index = joined_list.index(node_obj)
+
+        group_nodes.append(node_index)
+
+    return np.array(group_nodes + [-1], dtype=np.int32)
+
+def get_export_vertex_weights(mesh, armature, original_geo, joined_list, file_type):
+    """Node influences for every vertex of a mesh as count, index and weight columns four slots wide. Vertices with more
+    than four influences keep the four strongest, renormalized. JMS vertices without influences go to the object parent"""
+    group_nodes = get_vertex_group_nodes(armature, original_geo, joined_list)
+    group_count = len(original_geo.vertex_groups)
+    influence_vertices = []
+    influence_groups = []
+    influence_weights = []
+    # Vertex group membership has no foreach_get accessor on the mesh, so this pass over vert.groups stays in Python.
+    # It is the only per influence Python work, everything after it runs on whole arrays.
+    for vert in mesh.vertices:
+        vertex_groups = vert.groups
+        if len(vertex_groups) <= group_count:
+            for vertex_group in vertex_groups:
+                influence_vertices.append(vert.index)
+                influence_groups.append(vertex_group.group)
+                influence_weights.append(vertex_group.weight)
+
+    vertex_count = len(mesh.vertices)
+    influence_vertices = np.array(influence_vertices, dtype=np.int32)
+    influence_nodes = group_nodes[np.minimum(np.array(influence_groups, dtype=np.int32), group_count)]
+    influence_weights = np.array(influence_weights, dtype=np.float64)
+
+    valid_influences = influence_nodes != -1
+    influence_vertices = influence_vertices[valid_influences]
+    influence_nodes = influence_nodes[valid_influences]
+    influence_weights = influence_weights[valid_influences]
+
+    # Rank the influences of each vertex by weight, ties keep their group order
+    influence_order = np.lexsort((-influence_weights, influence_vertices))
+    influence_counts = np.bincount(influence_vertices, minlength=vertex_count)
+    vertex_starts = np.cumsum(influence_counts) - influence_counts
+    influence_ranks = np.empty(len(influence_order), dtype=np.int64)
+    influence_ranks[influence_order] = np.arange(len(influence_order)) - np.repeat(vertex_starts, influence_counts)
+
+    kept_influences = influence_ranks < 4
+    influence_vertices = influence_vertices[kept_influences]
+    influence_nodes = influence_nodes[kept_influences]
+    influence_weights = influence_weights[kept_influences]
+    weight_totals = np.bincount(influence_vertices, weights=influence_weights, minlength=vertex_count)
+    renormalize = (influence_counts > 4)[influence_vertices] & (weight_totals[influence_vertices] > 0.0)
+    influence_weights[renormalize] /= weight_totals[influence_vertices[renormalize]]
+
+    # Kept influences stay in vertex group order, so their slot is their position among the kept influences of the vertex
+    kept_counts = np.bincount(influence_vertices, minlength=vertex_count)
+    influence_slots = np.arange(len(influence_vertices)) - np.repeat(np.cumsum(kept_counts) - kept_counts, kept_counts)
+    node_counts = kept_counts.astype(np.int32)
+    node_indices = np.full((vertex_count, 4), -1, dtype=np.int32)
+    node_weights = np.zeros((vertex_count, 4), dtype=np.float64)
+    node_indices[influence_vertices, influence_slots] = influence_nodes
+    node_weights[influence_vertices, influence_slots] = influence_weights
     if file_type == 'JMS':
-        translation = original_geo_matrix @ vert.co
-
-    else:
-        translation = custom_scale * vert.co
+        parent_index = global_functions.get_parent(armature, original_geo, joined_list, 0)
+        unweighted_vertices = node_counts == 0
+        node_counts[unweighted_vertices] = 1
+        node_indices[unweighted_vertices, 0] = int(parent_index[0])
+        node_weights[unweighted_vertices, 0] = 1.0
+
+    return node_counts, node_indices, node_weights
+
+def get_vertex_node_sets(node_counts, node_indices, node_weights):
+    """Per vertex (influence count, node set, node indices) records for exporters that write vertices one at a time"""
+    vertex_node_sets = []
+    for node_count, vertex_node_indices, vertex_node_weights in zip(node_counts.tolist(), node_indices.tolist(), node_weights.tolist()):
+        node_set = [[node_index, node_weight] for node_index, node_weight in zip(vertex_node_indices[:node_count], vertex_node_weights[:node_count])]
+        vertex_node_sets.append((node_count, node_set, vertex_node_indices[:node_count]))
+
+    return vertex_node_sets
+
+class MeshExportData:
+    """Reads an evaluated mesh with foreach_get and transforms it for export in one pass. Positions and normals are per
+    vertex, UVs and colors per loop and the rest per face. Everything stays in NumPy arrays"""
+    def __init__(self, mesh, file_type, original_geo_matrix, version, custom_scale):
+        vertex_count = len(mesh.vertices)
+        loop_count = len(mesh.loops)
+        polygon_count = len(mesh.polygons)
+
+        vertex_co = np.empty(vertex_count * 3, dtype=np.float32)
+        vertex_normals = np.empty(vertex_count * 3, dtype=np.float32)
+        loop_vertices = np.empty(loop_count, dtype=np.int32)
+        material_indices = np.empty(polygon_count, dtype=np.int32)
+        loop_starts = np.empty(polygon_count, dtype=np.int32)
+        loop_totals = np.empty(polygon_count, dtype=np.int32)
+        mesh.vertices.foreach_get("co", vertex_co)
+        mesh.vertices.foreach_get("normal", vertex_normals)
+        mesh.loops.foreach_get("vertex_index", loop_vertices)
+        mesh.polygons.foreach_get("material_index", material_indices)
+        mesh.polygons.foreach_get("loop_start", loop_starts)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        vertex_co = vertex_co.reshape(-1, 3).astype(np.float64)
+        vertex_normals = vertex_normals.reshape(-1, 3).astype(np.float64)
 
-    mesh_dimensions = global_functions.get_dimensions(None, None, version, translation, True, False, file_type, custom_scale)
-    scaled_translation = (mesh_dimensions.position[0], mesh_dimensions.position[1], mesh_dimensions.position[2])
+        if file_type == 'JMS':
+            object_matrix = np.array(original_geo_matrix, dtype=np.float64)
+            rotation = object_matrix[:3, :3].T
+            location = object_matrix[:3, 3]
+            translations = vertex_co @ rotation + location
+            normals = (vertex_co + vertex_normals) @ rotation + location - translations
+            if original_geo_matrix.determinant() < 0.0:
+                translations = -translations
+                normals = -normals
 
-    if file_type == 'JMS':
-        normal = (original_geo_matrix @ (vert.co + vert.normal) - translation).normalized()
+        else:
+            translations = vertex_co * custom_scale
+            normals = vertex_normals
+
+        normal_lengths = np.linalg.norm(normals, axis=1)
+        normals = np.divide(normals, normal_lengths[:, None], out=np.zeros_like(normals), where=normal_lengths[:, None] > 0.0)
+
+        uv_layers = []
+        for uv_layer in mesh.uv_layers:
+            uvs = np.empty(loop_count * 2, dtype=np.float32)
+            uv_layer.data.foreach_get("uv", uvs)
+            uv_layers.append(uvs.reshape(-1, 2))
+
+        self.loop_vertices = loop_vertices
+        self.translations = translations
+        self.normals = normals
+        self.material_indices = material_indices
+        # Loops in face order, which is the order the exporters write them in, and the face of each of them
+        self.face_loop_starts = np.cumsum(loop_totals) - loop_totals
+        self.face_loops = np.repeat(loop_starts - self.face_loop_starts, loop_totals) + np.arange(loop_totals.sum())
+        self.loop_faces = np.repeat(np.arange(polygon_count), loop_totals)
+        if uv_layers:
+            self.uvs = np.stack(uv_layers, axis=1).astype(np.float64)
 
-    else:
-        normal = (vert.normal).normalized()
-
-    if original_geo_matrix.determinant() < 0.0 and file_type == 'JMS':
-        invert_translation_x = scaled_translation[0] * -1
-        invert_translation_y = scaled_translation[1] * -1
-        invert_translation_z = scaled_translation[2] * -1
-        invert_normal_x = normal[0] * -1
-        invert_normal_y = normal[1] * -1
-        invert_normal_z = normal[2] * -1
-        scaled_translation = (invert_translation_x, invert_translation_y, invert_translation_z)
-        normal = (invert_normal_x, invert_normal_y, invert_normal_z)
-
-    return scaled_translation, normal
+        else:
+            uv_slots = 0
+            if file_type == 'JMS' and version <= 8204:
+                uv_slots = 1
+
+            self.uvs = np.zeros((loop_count, uv_slots, 2), dtype=np.float64)
+
+        self.colors = np.zeros((loop_count, 3), dtype=np.float64)
+        if mesh.vertex_colors:
+            colors = np.empty(loop_count * 4, dtype=np.float32)
+            mesh.vertex_colors.active.data.foreach_get("color", colors)
+            self.colors = colors.reshape(-1, 4)[:, :3].astype(np.float64)
+
+        self.face_map_indices = None
+        face_map_indices = np.full(polygon_count, -1, dtype=np.int32)
+        if mesh.face_maps.active:
+            mesh.face_maps.active.data.foreach_get("value", face_map_indices)
+            self.face_map_indices = face_map_indices
+
+        # Faces that share a material slot and face map share their region, permutation and material, so each
+        # distinct pair only has to be classified once. Classes are ordered by the first face that uses them.
+        face_keys = (material_indices.astype(np.int64) << 32) | (face_map_indices.astype(np.int64) + 1)
+        class_keys, first_faces, face_classes = np.unique(face_keys, return_index=True, return_inverse=True)
+        class_order = np.argsort(first_faces, kind='stable')
+        class_ranks = np.empty_like(class_order)
+        class_ranks[class_order] = np.arange(len(class_order))
+        self.face_class_indices = class_ranks[face_classes.reshape(-1)]
+        self.face_classes = []
+        for class_idx in class_order:
+            first_face = int(first_faces[class_idx])
+            self.face_classes.append((first_face, int(material_indices[first_face]), int(face_map_indices[first_face])))
 
 def process_mesh_export_face_set(default_permutation, default_region, game_version, original_geo, face_map_idx):
     if game_version == 'haloce':
@@ -0,0 +1,164 @@
+# ##### BEGIN MIT LICENSE BLOCK #####
+#
+# MIT License
+#
+# Copyright (c) 2020 Steven Garcia
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# ##### END MIT LICENSE BLOCK #####
+
+import bpy
+
+from bpy.app.handlers import persistent
+from ..global_functions import global_functions
+
+class SkeletonIndex:
+    """Caches a fingerprint per armature so finding an armature to reuse for an imported skeleton is a dictionary lookup"""
+    class Entry:
+        def __init__(self, names, checksum, bone_count):
+            self.names = names
+            self.checksum = checksum
+            self.bone_count = bone_count
+
+    class HierarchyNode:
+        def __init__(self, name):
+            self.name = name
+            self.child = -1
+            self.sibling = -1
+
+    def __init__(self):
+        self.entries = {}
+
+    def get_entry(self, armature):
+        key = armature.data.as_pointer()
+        bones = armature.data.bones
+        entry = self.entries.get(key)
+        if entry is None or not entry.bone_count == len(bones):
+            names = [bone.name for bone in bones]
+            parents = [None if bone.parent is None else bone.parent.name for bone in bones]
+            entry = SkeletonIndex.Entry(frozenset(names), get_hierarchy_checksum(names, parents), len(bones))
+            self.entries[key] = entry
+
+        return entry
+
+    def find_armature(self, armatures, nodes):
+        """Return the armature to reuse for nodes and the armature sharing the most node names when none contains them all"""
+        node_names = [node.name for node in nodes]
+        node_name_set = frozenset(node_names)
+        node_checksum = get_hierarchy_checksum(node_names, get_node_parents(nodes))
+
+        fingerprints = {}
+        entries = []
+        for armature in armatures:
+            entry = self.get_entry(armature)
+            fingerprints.setdefault((entry.names, entry.checksum), armature)
+            entries.append((armature, entry))
+
+        armature = None
+        if not node_checksum is None:
+            armature = fingerprints.get((node_name_set, node_checksum))
+
+        if armature:
+            return armature, None
+
+        # Armatures that hold every node but have extra bones or a different hierarchy are still reusable
+        partial_match = None
+        partial_match_count = 0
+        for armature, entry in entries:
+            match_count = len(node_name_set & entry.names)
+            if match_count == len(node_name_set):
+                return armature, None
+
+            if match_count > partial_match_count:
+                partial_match = armature
+                partial_match_count = match_count
+
+        return None, partial_match
+
+def get_node_parents(nodes):
+    """Return the parent name of every node in a JMS/JMA node list, or None if the file does not store a hierarchy"""
+    parents = [None] * len(nodes)
+    for node_idx, node in enumerate(nodes):
+        if not node.parent is None:
+            if not node.parent == -1:
+                parents[node_idx] = nodes[node.parent].name
+
+        elif not node.child is None:
+            child_idx = node.child
+            while not child_idx == -1:
+                parents[child_idx] = node.name
+                child_idx = nodes[child_idx].sibling
+
+        else:
+            return None
+
+    return parents
+
+def get_hierarchy_checksum(names, parents):
+    """Checksum the hierarchy with children in name order so armatures and files with the same skeleton always agree"""
+    if parents is None:
+        return None
+
+    order = sorted(range(len(names)), key=lambda idx: names[idx])
+    hierarchy_nodes = [SkeletonIndex.HierarchyNode(names[idx]) for idx in order]
+    node_indices = {hierarchy_node.name: idx for idx, hierarchy_node in enumerate(hierarchy_nodes)}
+    roots = []
+    last_children = {}
+    for hierarchy_idx, original_idx in enumerate(order):
+        parent_name = parents[original_idx]
+        if parent_name is None or not parent_name in node_indices:
+            roots.append(hierarchy_idx)
+            continue
+
+        parent_idx = node_indices[parent_name]
+        if parent_idx in last_children:
+            hierarchy_nodes[last_children[parent_idx]].sibling = hierarchy_idx
+
+        else:
+            hierarchy_nodes[parent_idx].child = hierarchy_idx
+
+        last_children[parent_idx] = hierarchy_idx
+
+    checksum = 0
+    for root_idx in roots:
+        checksum = global_functions.node_hierarchy_checksum(hierarchy_nodes, hierarchy_nodes[root_idx], checksum)
+
+    return checksum
+
+skeleton_index = SkeletonIndex()
+
+@persistent
+def armature_update_handler(scene, depsgraph):
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Armature):
+            skeleton_index.entries.pop(update.id.original.as_pointer(), None)
+
+@persistent
+def load_handler(dummy):
+    skeleton_index.entries.clear()
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(armature_update_handler)
+    bpy.app.handlers.load_post.append(load_handler)
+
+def unregister():
+    bpy.app.handlers.load_post.remove(load_handler)
+    bpy.app.handlers.depsgraph_update_post.remove(armature_update_handler)
+    skeleton_index.entries.clear()
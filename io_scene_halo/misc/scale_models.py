@@ -167,29 +167,7 @@ def generate_mesh(file, array_item, gane_version):
 
     mesh = bpy.data.meshes.new(item_name)
     if not len(jms_file.vertices) == 0:
-        vert_normal_list = []
-        bm = bmesh.new()
-        for triangle in jms_file.triangles:
-            p1 = jms_file.vertices[triangle.v0].translation
-            p2 = jms_file.vertices[triangle.v1].translation
-            p3 = jms_file.vertices[triangle.v2].translation
-            v1 = bm.verts.new((p1[0], p1[1], p1[2]))
-            v2 = bm.verts.new((p2[0], p2[1], p2[2]))
-            v3 = bm.verts.new((p3[0], p3[1], p3[2]))
-            bm.faces.new((v1, v2, v3))
-            vert_list = [triangle.v0, triangle.v1, triangle.v2]
-            for vert in vert_list:
-                vert_normals = []
-                jms_vert = jms_file.vertices[vert]
-                for normal in jms_vert.normal:
-                    vert_normals.append(normal)
-
-                vert_normal_list.append(vert_normals)
-
-        bm.to_mesh(mesh)
-        bm.free()
-        mesh.normals_split_custom_set(vert_normal_list)
-        mesh.use_auto_smooth = True
+        mesh_processing.set_mesh_geometry(mesh, jms_file.vertices, jms_file.triangles)
 
     return mesh
 
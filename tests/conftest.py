@@ -0,0 +1,49 @@
+"""
+Shared fixtures for the test suite
+
+Tests that only touch the Blender independent modules run under any Python. Tests that
+need Blender request the blender fixture and are skipped when bpy can't be imported, run
+them with Blender's bundled Python or the bpy module to cover them.
+
+SPDX-License-Identifier: MIT
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESOURCE_DIRECTORY = os.path.join(ROOT_DIRECTORY, "io_scene_halo", "resources")
+
+sys.path.insert(0, ROOT_DIRECTORY)
+
+class Reports:
+    """Collects what an operator function reports so tests can check it"""
+    def __init__(self):
+        self.messages = []
+
+    def __call__(self, report_type, message):
+        self.messages.append((set(report_type), message))
+
+    def find(self, text):
+        return [message for report_type, message in self.messages if text in message]
+
+@pytest.fixture(scope="session")
+def blender():
+    bpy = pytest.importorskip("bpy")
+    import io_scene_halo
+
+    io_scene_halo.register()
+    yield bpy
+    io_scene_halo.unregister()
+
+@pytest.fixture
+def empty_scene(blender):
+    blender.ops.wm.read_homefile(use_empty=True)
+
+    return blender.context.scene
+
+@pytest.fixture
+def reports():
+    return Reports()
@@ -0,0 +1,253 @@
+"""
+Benchmark for the JMS vertex and triangle serializer
+
+Times the original per record writer against the column formatters in jms_writer on
+seeded random records. Byte for byte equality with the original exporter is checked by
+tests/test_jms_golden.py, this script only measures.
+
+jms_writer doesn't need Blender, run it with any Python that has NumPy from the
+repository root:
+
+    python tests/jms_serializer_benchmark.py --vertices 1000000
+
+SPDX-License-Identifier: MIT
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from io_scene_halo.global_functions import jms_writer
+
+SEED = 8197
+
+class Vertex:
+    def __init__(self, node_set, region, translation, normal, color, uv_set):
+        self.node_set = node_set
+        self.region = region
+        self.translation = translation
+        self.normal = normal
+        self.color = color
+        self.uv_set = uv_set
+
+class Triangle:
+    def __init__(self, region, material_index, v0, v1, v2):
+        self.region = region
+        self.material_index = material_index
+        self.v0 = v0
+        self.v1 = v1
+        self.v2 = v2
+
+def get_decimal_formats(version):
+    if version > 8209:
+        return '\n%0.10f', '\n%0.10f\t%0.10f', '\n%0.10f\t%0.10f\t%0.10f'
+
+    return '\n%0.6f', '\n%0.6f\t%0.6f', '\n%0.6f\t%0.6f\t%0.6f'
+
+def get_records(vertex_count, triangle_count, seed=SEED):
+    """Random records plus the edge cases the pre 8202 weight fixup and the UV padding care about"""
+    rng = random.Random(seed)
+    vertices = [
+        Vertex([], 0, (0.0, 0.0, 0.0), (0.0, 0.0, 1.0), (1.0, 1.0, 1.0), [(0.0, 0.0)]),
+        Vertex([[3, 1.0]], 1, (-1.5, 2.25, 1e-07), (0.0, 1.0, 0.0), (0.0, 0.0, 0.0), [(0.5, 0.5), (0.25, 0.75)]),
+        Vertex([[2, 1.0], [5, 0.0]], 2, (123456.789, -0.0, 3.0), (1.0, 0.0, 0.0), (0.5, 0.5, 0.5), [(1.0, 1.0)]),
+        Vertex([[2, 0.0], [5, 1.0]], 3, (1.0, 2.0, 3.0), (0.0, 0.0, -1.0), (0.1, 0.2, 0.3), [(0.1, 0.9), (0.2, 0.8), (0.3, 0.7), (0.4, 0.6)]),
+        Vertex([[0, 0.1], [1, 0.2], [2, 0.3], [3, 0.4]], 4, (-9.0, -8.0, -7.0), (0.6, 0.0, 0.8), (0.9, 0.8, 0.7), [(0.0, 1.0), (1.0, 0.0), (0.5, 0.5)]),
+        ]
+
+    for idx in range(len(vertices), vertex_count):
+        node_count = rng.choice((0, 1, 1, 2, 3, 4))
+        node_set = [[rng.randrange(40), rng.choice((0.0, 1.0, rng.random()))] for node_idx in range(node_count)]
+        uv_set = [(rng.random(), rng.random()) for uv_idx in range(rng.choice((1, 1, 2, 3, 4)))]
+        translation = (rng.uniform(-100.0, 100.0), rng.uniform(-100.0, 100.0), rng.uniform(-100.0, 100.0))
+        normal = (rng.uniform(-1.0, 1.0), rng.uniform(-1.0, 1.0), rng.uniform(-1.0, 1.0))
+        color = (rng.random(), rng.random(), rng.random())
+        vertices.append(Vertex(node_set, rng.randrange(5), translation, normal, color, uv_set))
+
+    triangles = [Triangle(rng.randrange(5), rng.randrange(10), rng.randrange(vertex_count), rng.randrange(vertex_count), rng.randrange(vertex_count)) for idx in range(triangle_count)]
+
+    return vertices, triangles
+
+def write_per_record(file, vertices, triangles, version):
+    """The vertex and triangle loops of write_scene before the block formatters replaced them"""
+    decimal_1, decimal_2, decimal_3 = get_decimal_formats(version)
+    for idx, vertex in enumerate(vertices):
+        if version >= 8205:
+            file.write(
+                '\n;VERTEX %s' % (idx) +
+                decimal_3 % (vertex.translation[0], vertex.translation[1], vertex.translation[2]) +
+                decimal_3 % (vertex.normal[0], vertex.normal[1], vertex.normal[2]) +
+                '\n%s' % (len(vertex.node_set))
+            )
+            for node in vertex.node_set:
+                file.write(
+                    '\n%s' % (node[0]) +
+                    decimal_1 % (node[1])
+                )
+
+            file.write('\n%s' % (len(vertex.uv_set)))
+            for uv in vertex.uv_set:
+                file.write(decimal_2 % (uv[0], uv[1]))
+
+            if version >= 8211:
+                file.write(decimal_3 % (vertex.color[0], vertex.color[1], vertex.color[2]))
+
+            file.write('\n')
+
+        else:
+            uv_list = [(0.0, 0.0)] * 4
+            for uv_idx, uv in enumerate(vertex.uv_set[:4]):
+                uv_list[uv_idx] = (uv[0], uv[1])
+
+            if version < 8198:
+                file.write('\n%s' % (vertex.region))
+
+            node_list = [(int(-1), float(0.0))] * 4
+            for node_idx, node in enumerate(vertex.node_set[:4]):
+                node_list[node_idx] = node
+
+            node0_index, node0_weight = node_list[0][0], node_list[0][1]
+            node1_index, node1_weight = node_list[1][0], node_list[1][1]
+            if version < 8202:
+                if not node1_index == -1:
+                    node1_weight = 1.0 - node0_weight
+
+                if node1_weight == 0:
+                    node1_index = -1
+
+                if node1_weight == 1:
+                    node0_index = node_list[1][0]
+                    node1_index = -1
+                    node1_weight = 0.0
+
+            if version >= 8204:
+                file.write(
+                    '\n%s' % (node0_index) +
+                    decimal_1 % (node0_weight) +
+                    decimal_3 % (vertex.translation[0], vertex.translation[1], vertex.translation[2]) +
+                    decimal_3 % (vertex.normal[0], vertex.normal[1], vertex.normal[2]) +
+                    '\n%s' % (node1_index) +
+                    decimal_1 % (node1_weight) +
+                    '\n%s' % (node_list[2][0]) +
+                    decimal_1 % (node_list[2][1]) +
+                    '\n%s' % (node_list[3][0]) +
+                    decimal_1 % (node_list[3][1])
+                )
+
+            else:
+                file.write(
+                    '\n%s' % (node0_index) +
+                    decimal_3 % (vertex.translation[0], vertex.translation[1], vertex.translation[2]) +
+                    decimal_3 % (vertex.normal[0], vertex.normal[1], vertex.normal[2]) +
+                    '\n%s' % (node1_index) +
+                    decimal_1 % (node1_weight)
+                )
+
+            if version >= 8203 and version <= 8204:
+                for uv in uv_list:
+                    file.write(decimal_2 % (uv[0], uv[1]))
+
+            elif version >= 8200:
+                file.write(decimal_1 % (uv_list[0][0]) + decimal_1 % (uv_list[0][1]))
+
+            else:
+                file.write(decimal_2 % (uv_list[0][0], uv_list[0][1]))
+
+            if version >= 8199:
+                file.write('\n%s' % (0))
+
+    for idx, triangle in enumerate(triangles):
+        if version >= 8205:
+            file.write(
+                '\n;TRIANGLE %s' % (idx) +
+                '\n%s' % (triangle.material_index) +
+                '\n%s\t%s\t%s\n' % (triangle.v0, triangle.v1, triangle.v2)
+            )
+
+        else:
+            if version >= 8198:
+                file.write('\n%s' % (triangle.region))
+
+            file.write(
+                '\n%s' % (triangle.material_index) +
+                '\n%s\t%s\t%s' % (triangle.v0, triangle.v1, triangle.v2)
+            )
+
+def get_buffers(vertices, triangles):
+    """The records as the columns export_jms hands to jms_writer"""
+    vertex_buffer = jms_writer.VertexBuffer()
+    vertex_count = len(vertices)
+    node_indices = np.full((vertex_count, jms_writer.MAX_INFLUENCES), -1, dtype=np.int32)
+    node_weights = np.zeros((vertex_count, jms_writer.MAX_INFLUENCES))
+    uv_slots = max(len(vertex.uv_set) for vertex in vertices)
+    uvs = np.zeros((vertex_count, uv_slots, 2))
+    for idx, vertex in enumerate(vertices):
+        for node_idx, node in enumerate(vertex.node_set):
+            node_indices[idx, node_idx] = node[0]
+            node_weights[idx, node_idx] = node[1]
+
+        for uv_idx, uv in enumerate(vertex.uv_set):
+            uvs[idx, uv_idx] = uv
+
+    vertex_buffer.append(np.array([vertex.region for vertex in vertices]),
+                         np.array([vertex.translation for vertex in vertices]),
+                         np.array([vertex.normal for vertex in vertices]),
+                         np.array([len(vertex.node_set) for vertex in vertices]),
+                         node_indices,
+                         node_weights,
+                         np.array([len(vertex.uv_set) for vertex in vertices]),
+                         uvs,
+                         np.array([vertex.color for vertex in vertices]))
+
+    triangle_buffer = jms_writer.TriangleBuffer()
+    triangle_buffer.append(np.array([triangle.region for triangle in triangles]),
+                           np.array([triangle.material_index for triangle in triangles]),
+                           np.array([(triangle.v0, triangle.v1, triangle.v2) for triangle in triangles]))
+
+    return vertex_buffer, triangle_buffer
+
+def write_blocks(file, vertices, triangles, version):
+    decimal_1, decimal_2, decimal_3 = get_decimal_formats(version)
+    jms_writer.write_vertices(file, vertices, version, decimal_1, decimal_2, decimal_3)
+    jms_writer.write_triangles(file, triangles, version)
+
+def get_output(write, vertices, triangles, version):
+    file = io.StringIO()
+    write(file, vertices, triangles, version)
+    return file.getvalue()
+
+def run_benchmark(vertex_count, versions):
+    vertices, triangles = get_records(vertex_count, vertex_count)
+    vertex_buffer, triangle_buffer = get_buffers(vertices, triangles)
+    for version in versions:
+        outputs = []
+        for name, write, records in (('per record', write_per_record, (vertices, triangles)), ('blocks', write_blocks, (vertex_buffer, triangle_buffer))):
+            start = time.perf_counter()
+            output = get_output(write, records[0], records[1], version)
+            elapsed = time.perf_counter() - start
+            outputs.append(output)
+            print("%s %-10s %7.3fs %8.1f MB/s" % (version, name, elapsed, len(output.encode('utf-8')) / elapsed / 1000000))
+
+        if not outputs[0] == outputs[1]:
+            print("%s: the writers disagree" % (version))
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Time the JMS block formatters against the original per record writer')
+    parser.add_argument('--vertices', type=int, default=1000000, help='Vertex and triangle count')
+    parser.add_argument('--versions', default='8200,8204,8210,8213', help='Comma separated JMS versions to write')
+    args = parser.parse_args(argv)
+
+    run_benchmark(args.vertices, [int(version) for version in args.versions.split(',')])
+
+    return 0
+
+if __name__ == '__main__':
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    sys.exit(main(argv))
@@ -0,0 +1,294 @@
+"""
+Time the import and export pipeline on the JMS fixtures bundled in io_scene_halo/resources
+
+Every stage runs over all fixtures and prints the total time and throughput, so two
+checkouts can be compared by running the script in each. The addon imports bpy, so
+run this through Blender from the repository root:
+
+    blender --background --factory-startup --python tests/resource_timings.py -- --frames 30
+
+SPDX-License-Identifier: MIT
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESOURCE_DIRECTORY = os.path.join(ROOT_DIRECTORY, "io_scene_halo", "resources")
+
+sys.path.insert(0, ROOT_DIRECTORY)
+
+# The process pools of the batch importer and the JMS write queue load this script again as __mp_main__, where Blender isn't available
+if not __name__ == '__mp_main__':
+    import bpy
+    import io_scene_halo
+
+    from io_scene_halo.global_functions import global_functions, asset_reader
+    from io_scene_halo.file_jms import import_jms, export_jms
+    from io_scene_halo.file_jma import export_jma
+
+EXPORT_GAME_VERSIONS = {'haloce': 'haloce', 'halo2': 'halo2', 'halo3': 'halo3mcc'}
+
+class StageResult:
+    def __init__(self, name):
+        self.name = name
+        self.elapsed = 0.0
+        self.byte_count = 0
+        self.file_count = 0
+        self.failures = []
+
+    def add(self, elapsed, byte_count):
+        self.elapsed += elapsed
+        self.byte_count += byte_count
+        self.file_count += 1
+
+    def report(self):
+        throughput = ''
+        if self.elapsed > 0.0 and self.byte_count > 0:
+            throughput = '%8.1f MB/s' % (self.byte_count / self.elapsed / 1000000)
+
+        print("%-10s %4s files %8.3fs %s" % (self.name, self.file_count, self.elapsed, throughput))
+        for filepath, error in self.failures:
+            print("    failed %s: %s" % (os.path.relpath(filepath, RESOURCE_DIRECTORY), error))
+
+def get_fixtures():
+    return sorted(glob.glob(os.path.join(RESOURCE_DIRECTORY, "**", "*.[jJ][mM][sS]"), recursive=True))
+
+def time_parse(fixtures, args):
+    """Tokenizing and parsing only, no Blender data is touched"""
+    tokenize_result = StageResult("tokenize")
+    parse_result = StageResult("parse")
+    for filepath in fixtures:
+        byte_count = os.path.getsize(filepath)
+        start = time.perf_counter()
+        global_functions.HaloAsset.tokenize(asset_reader.read_asset_text(filepath))
+        tokenize_result.add(time.perf_counter() - start, byte_count)
+
+        start = time.perf_counter()
+        try:
+            import_jms.JMSAsset(filepath, 'auto')
+
+        except Exception as error:
+            parse_result.failures.append((filepath, error))
+            continue
+
+        parse_result.add(time.perf_counter() - start, byte_count)
+
+    return [tokenize_result, parse_result]
+
+def time_batch_parse(fixtures, args):
+    """Tokenizing and parsing every fixture one after the other, then with the tokenizing done by read_elements_batch()"""
+    byte_count = sum(os.path.getsize(filepath) for filepath in fixtures)
+    serial_result = StageResult("serial")
+    start = time.perf_counter()
+    for filepath in fixtures:
+        import_jms.JMSAsset(filepath, 'auto', elements=asset_reader.read_elements(filepath))
+
+    serial_result.add(time.perf_counter() - start, byte_count)
+    serial_result.file_count = len(fixtures)
+
+    batch_result = StageResult("batch")
+    start = time.perf_counter()
+    elements_list, pool_error = asset_reader.read_elements_batch(fixtures)
+    for filepath, elements in zip(fixtures, elements_list):
+        import_jms.JMSAsset(filepath, 'auto', elements=elements)
+
+    batch_result.add(time.perf_counter() - start, byte_count)
+    batch_result.file_count = len(fixtures)
+    if pool_error is None:
+        print("batch tokenized in worker processes")
+
+    else:
+        print("batch tokenized in process: %s" % (pool_error))
+
+    return [serial_result, batch_result]
+
+def clear_scene():
+    for data_collection in (bpy.data.objects, bpy.data.meshes, bpy.data.armatures, bpy.data.materials):
+        for datablock in list(data_collection):
+            data_collection.remove(datablock)
+
+def import_fixture(filepath):
+    """Parse a fixture and build it into an empty scene, returning the game version it was detected as"""
+    clear_scene()
+    jms_file = import_jms.JMSAsset(filepath, 'auto')
+    start = time.perf_counter()
+    import_jms.build_scene(bpy.context, jms_file, filepath, True, False, False)
+
+    return time.perf_counter() - start, jms_file.game_version
+
+def time_import(fixtures, args):
+    """Building the Blender objects from an already parsed file"""
+    import_result = StageResult("import")
+    for filepath in fixtures:
+        try:
+            elapsed = import_fixture(filepath)[0]
+
+        except Exception as error:
+            import_result.failures.append((filepath, error))
+            continue
+
+        import_result.add(elapsed, os.path.getsize(filepath))
+
+    clear_scene()
+
+    return [import_result]
+
+def ignore_report(report_type, message):
+    pass
+
+def get_directory_size(directory):
+    return sum(os.path.getsize(os.path.join(directory, filename)) for filename in os.listdir(directory))
+
+def time_export(fixtures, args):
+    """Exporting the imported fixture again with the export operator defaults for its game"""
+    export_result = StageResult("export")
+    for filepath in fixtures:
+        with tempfile.TemporaryDirectory() as output_directory:
+            try:
+                game_version = EXPORT_GAME_VERSIONS[import_fixture(filepath)[1]]
+                output_path = os.path.join(output_directory, os.path.basename(filepath))
+                start = time.perf_counter()
+                export_jms.command_queue(bpy.context, output_path, ignore_report, '8200', '8200', '8210', '8213', True, False, '0', True, True, False, True, False, True, 0.523599, True, '0', 1.0, False, '', '0', True, True, True, True, game_version, None)
+                elapsed = time.perf_counter() - start
+
+            except Exception as error:
+                export_result.failures.append((filepath, error))
+                continue
+
+            export_result.add(elapsed, get_directory_size(output_directory))
+
+    clear_scene()
+
+    return [export_result]
+
+def time_animation(fixtures, args):
+    """Sampling node transforms over a frame range and writing them as a JMA for every fixture with an armature"""
+    animation_result = StageResult("animation")
+    scene = bpy.context.scene
+    for filepath in fixtures:
+        with tempfile.TemporaryDirectory() as output_directory:
+            try:
+                game_version = EXPORT_GAME_VERSIONS[import_fixture(filepath)[1]]
+                if not any(obj.type == 'ARMATURE' for obj in scene.objects):
+                    continue
+
+                scene.frame_start = 1
+                scene.frame_end = args.frames
+                output_path = os.path.join(output_directory, os.path.basename(filepath).rsplit('.', 1)[0])
+                start = time.perf_counter()
+                export_jma.write_file(bpy.context, output_path, ignore_report, '.JMA', '.JMA', '.JMA', '.JMA', '16392', '16392', '16395', '16395', True, '30', 30, False, False, '0', 1.0, False, game_version, False)
+                elapsed = time.perf_counter() - start
+
+            except Exception as error:
+                animation_result.failures.append((filepath, error))
+                continue
+
+            animation_result.add(elapsed, get_directory_size(output_directory))
+
+    clear_scene()
+
+    return [animation_result]
+
+def build_dense_scene(loop_count):
+    """A triangulated grid with about loop_count loops, skinned to four bones with up to four weights per vertex"""
+    clear_scene()
+    side = round((loop_count / 6) ** 0.5) + 1
+    bpy.ops.mesh.primitive_grid_add(x_subdivisions=side, y_subdivisions=side, size=10.0)
+    grid = bpy.context.active_object
+    grid.data.materials.append(bpy.data.materials.new("dense"))
+    bpy.ops.object.armature_add()
+    armature = bpy.context.active_object
+    bpy.ops.object.mode_set(mode='EDIT')
+    for idx in range(1, 4):
+        bone = armature.data.edit_bones.new("bone%s" % (idx))
+        bone.head = (idx, 0.0, 0.0)
+        bone.tail = (idx, 0.0, 1.0)
+        bone.parent = armature.data.edit_bones[0]
+
+    bpy.ops.object.mode_set(mode='OBJECT')
+    grid.parent = armature
+    grid.modifiers.new("Armature", 'ARMATURE').object = armature
+    vertex_count = len(grid.data.vertices)
+    for idx, bone in enumerate(armature.data.bones):
+        vertex_group = grid.vertex_groups.new(name=bone.name)
+        for weight_idx, weight in enumerate((0.2, 0.5, 0.8)):
+            vertex_group.add([vertex_idx for vertex_idx in range(vertex_count) if (vertex_idx + idx) % 4 == weight_idx], weight, 'REPLACE')
+
+    return len(grid.data.polygons) * 6
+
+def time_dense_export(fixtures, args):
+    """Exporting a synthetic skinned mesh of --loops loops after triangulation, with and without welding"""
+    results = []
+    loop_count = build_dense_scene(args.loops)
+    print("dense scene: %s loops" % (loop_count))
+    for weld_vertices in (False, True):
+        dense_result = StageResult("dense weld" if weld_vertices else "dense")
+        with tempfile.TemporaryDirectory() as output_directory:
+            output_path = os.path.join(output_directory, "dense.jms")
+            start = time.perf_counter()
+            export_jms.command_queue(bpy.context, output_path, ignore_report, '8213', '8200', '8210', '8213', True, False, '0', True, True, False, True, False, True, 0.523599, True, '0', 1.0, False, '', '0', True, True, True, True, 'halo3mcc', None, weld_vertices)
+            dense_result.add(time.perf_counter() - start, get_directory_size(output_directory))
+
+        results.append(dense_result)
+
+    clear_scene()
+
+    return results
+
+def time_concurrent_export(fixtures, args):
+    """Exporting the dense scene as render and collision files, one after the other and through the write queue's worker processes"""
+    results = []
+    loop_count = build_dense_scene(args.loops)
+    grid = next(obj for obj in bpy.data.objects if obj.type == 'MESH')
+    collision = grid.copy()
+    collision.name = "@dense"
+    bpy.context.collection.objects.link(collision)
+    print("concurrent scene: 2 meshes of %s loops" % (loop_count))
+    for write_concurrently in (False, True):
+        concurrent_result = StageResult("concurrent" if write_concurrently else "sequential")
+        with tempfile.TemporaryDirectory() as output_directory:
+            output_path = os.path.join(output_directory, "dense.jms")
+            start = time.perf_counter()
+            export_jms.command_queue(bpy.context, output_path, print, '8213', '8200', '8210', '8213', True, False, '0', True, True, False, True, False, True, 0.523599, True, '0', 1.0, False, '', '0', True, True, True, True, 'halo3mcc', None, False, write_concurrently)
+            concurrent_result.add(time.perf_counter() - start, get_directory_size(output_directory))
+
+        results.append(concurrent_result)
+
+    clear_scene()
+
+    return results
+
+STAGES = {
+    'parse': time_parse,
+    'batch': time_batch_parse,
+    'import': time_import,
+    'export': time_export,
+    'dense': time_dense_export,
+    'concurrent': time_concurrent_export,
+    'animation': time_animation,
+    }
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Time the import and export pipeline on the bundled JMS fixtures')
+    parser.add_argument('--stages', default=','.join(STAGES), help='Comma separated stages to run out of %s' % (', '.join(STAGES)))
+    parser.add_argument('--frames', type=int, default=30, help='Frame count for the animation stage')
+    parser.add_argument('--loops', type=int, default=500000, help='Loop count of the mesh for the dense and concurrent stages')
+    args = parser.parse_args(argv)
+
+    io_scene_halo.register()
+    fixtures = get_fixtures()
+    print("%s fixtures, %.1f MB" % (len(fixtures), sum(os.path.getsize(filepath) for filepath in fixtures) / 1000000))
+    for stage in args.stages.split(','):
+        for stage_result in STAGES[stage](fixtures, args):
+            stage_result.report()
+
+    return 0
+
+if __name__ == '__main__':
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    sys.exit(main(argv))
@@ -0,0 +1,39 @@
+"""
+Batch tokenizing of asset files for the batch JMS importer
+
+SPDX-License-Identifier: MIT
+"""
+
+import os
+
+import pytest
+
+from conftest import RESOURCE_DIRECTORY
+from io_scene_halo.global_functions import asset_reader
+
+FIXTURES = [os.path.join(RESOURCE_DIRECTORY, "haloce", "flood_infection.jms"), os.path.join(RESOURCE_DIRECTORY, "halo3", "sentinel_constructor.jms")]
+
+def test_joined_elements_split_back(tmp_path):
+    for filepath in FIXTURES:
+        assert asset_reader.split_elements(asset_reader.read_joined_elements(filepath)) == asset_reader.read_elements(filepath)
+
+    empty_path = str(tmp_path / "empty.jms")
+    open(empty_path, 'w').close()
+    assert asset_reader.split_elements(asset_reader.read_joined_elements(empty_path)) == []
+
+def test_batch_in_worker_processes(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    elements_list, pool_error = asset_reader.read_elements_batch(FIXTURES)
+    if not os.path.basename(asset_reader.sys.executable).lower().startswith('python'):
+        pytest.skip(pool_error)
+
+    assert pool_error is None
+    assert elements_list == [asset_reader.read_elements(filepath) for filepath in FIXTURES]
+
+@pytest.mark.parametrize("cpu_count, filepaths, expected_error", [(1, FIXTURES, "only one CPU"), (2, FIXTURES[:1], "only one file")])
+def test_batch_in_process_says_why(monkeypatch, cpu_count, filepaths, expected_error):
+    monkeypatch.setattr(os, "cpu_count", lambda: cpu_count)
+    elements_list, pool_error = asset_reader.read_elements_batch(filepaths)
+
+    assert pool_error == expected_error
+    assert elements_list == [asset_reader.read_elements(filepath) for filepath in filepaths]
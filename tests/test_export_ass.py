@@ -0,0 +1,58 @@
+"""
+ASS export through write_file, with and without the incremental export manifest
+
+SPDX-License-Identifier: MIT
+"""
+
+import os
+
+import pytest
+
+def build_level(bpy):
+    """A single cube with one material inside a collection, the smallest scene the ASS exporter accepts"""
+    collection = bpy.data.collections.new("level")
+    bpy.context.scene.collection.children.link(collection)
+    bpy.context.view_layer.active_layer_collection = bpy.context.view_layer.layer_collection.children["level"]
+    bpy.ops.mesh.primitive_cube_add()
+    cube = bpy.context.active_object
+    cube.data.materials.append(bpy.data.materials.new("stone"))
+
+    return cube
+
+def export_level(bpy, output_path, reports, incremental_export=False):
+    from io_scene_halo.file_ass import export_ass
+
+    return export_ass.write_file(bpy.context, output_path, reports, '2', '2', '7', True, False, True, True, True, False, True, 0.523599, True, '0', 1.0, False, 'halo2', incremental_export)
+
+def read_text(path):
+    with open(path, 'r', encoding='utf_8') as file:
+        return file.read()
+
+@pytest.mark.parametrize("incremental_export", [False, True])
+def test_export_writes_level(empty_scene, blender, reports, tmp_path, incremental_export):
+    build_level(blender)
+    output_path = str(tmp_path / "level.ASS")
+
+    assert export_level(blender, output_path, reports, incremental_export) == {'FINISHED'}
+    text = read_text(output_path)
+    assert text.startswith(';### HEADER ###\n2\n"BLENDER"\n')
+    assert '\n;### MATERIALS ###\n1\n' in text
+    assert '\n"stone"\n' in text
+    assert not [filename for filename in os.listdir(tmp_path) if filename.endswith('.tmp')]
+
+def test_incremental_export_skips_unchanged_level(empty_scene, blender, reports, tmp_path):
+    cube = build_level(blender)
+    output_path = str(tmp_path / "level.ASS")
+    export_level(blender, output_path, reports, True)
+    first_text = read_text(output_path)
+    first_mtime = os.stat(output_path).st_mtime_ns
+
+    export_level(blender, output_path, reports, True)
+    assert reports.find("0 files written, 1 unchanged files skipped")
+    assert os.stat(output_path).st_mtime_ns == first_mtime
+
+    cube.data.vertices[0].co.x += 1.0
+    export_level(blender, output_path, reports, True)
+    assert reports.find("1 files written, 0 unchanged files skipped")
+    assert not read_text(output_path) == first_text
+    assert not [filename for filename in os.listdir(tmp_path) if filename.endswith('.tmp')]
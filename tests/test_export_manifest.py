@@ -0,0 +1,65 @@
+"""
+Incremental export manifest: skipping unchanged files and cleaning up after failed exports
+
+SPDX-License-Identifier: MIT
+"""
+
+import os
+
+import pytest
+
+from io_scene_halo.global_functions import export_manifest
+
+def export(output_path, chunks):
+    manifest = export_manifest.ExportManifest()
+    with export_manifest.open_export_file(output_path, manifest) as file:
+        for chunk in chunks:
+            file.write(chunk)
+
+    manifest.save()
+
+    return manifest
+
+def test_unchanged_export_is_skipped(tmp_path):
+    output_path = str(tmp_path / "model.JMS")
+    assert export(output_path, ["8200\n", "3251\n"]).written == 1
+    mtime = os.stat(output_path).st_mtime_ns
+
+    manifest = export(output_path, ["8200\n", "3251\n"])
+    assert (manifest.written, manifest.skipped) == (0, 1)
+    assert os.stat(output_path).st_mtime_ns == mtime
+    assert sorted(os.listdir(tmp_path)) == [export_manifest.MANIFEST_FILENAME, "model.JMS"]
+
+def test_changed_export_replaces_file(tmp_path):
+    output_path = str(tmp_path / "model.JMS")
+    export(output_path, ["8200\n", "3251\n"])
+
+    manifest = export(output_path, ["8200\n", "3252\n"])
+    assert (manifest.written, manifest.skipped) == (1, 0)
+    with open(output_path, 'r', encoding='utf_8') as file:
+        assert file.read() == "8200\n3252\n"
+
+def test_file_edited_on_disk_is_rewritten(tmp_path):
+    output_path = str(tmp_path / "model.JMS")
+    export(output_path, ["8200\n"])
+    with open(output_path, 'w', encoding='utf_8') as file:
+        file.write("edited")
+
+    assert export(output_path, ["8200\n"]).written == 1
+    with open(output_path, 'r', encoding='utf_8') as file:
+        assert file.read() == "8200\n"
+
+def test_failed_export_removes_temp_file(tmp_path):
+    output_path = str(tmp_path / "model.JMS")
+    export(output_path, ["8200\n"])
+
+    manifest = export_manifest.ExportManifest()
+    with pytest.raises(ZeroDivisionError):
+        with export_manifest.open_export_file(output_path, manifest) as file:
+            file.write("8210\n")
+            1 / 0
+
+    assert sorted(os.listdir(tmp_path)) == [export_manifest.MANIFEST_FILENAME, "model.JMS"]
+    assert (manifest.written, manifest.skipped) == (0, 0)
+    with open(output_path, 'r', encoding='utf_8') as file:
+        assert file.read() == "8200\n"
@@ -0,0 +1,67 @@
+"""
+Vertex weights as the exporters gather them from vertex groups
+
+SPDX-License-Identifier: MIT
+"""
+
+import pytest
+
+BONE_NAMES = ("b0", "b1", "b2", "b3", "b4", "b5")
+
+def build_skinned_mesh(bpy):
+    """Four vertices: six influences, an influence plus a group that isn't a bone, no influences and exactly four"""
+    armature_data = bpy.data.armatures.new("armature")
+    armature = bpy.data.objects.new("armature", armature_data)
+    bpy.context.scene.collection.objects.link(armature)
+    bpy.context.view_layer.objects.active = armature
+    bpy.ops.object.mode_set(mode='EDIT')
+    for idx, bone_name in enumerate(BONE_NAMES):
+        bone = armature_data.edit_bones.new(bone_name)
+        bone.head = (idx, 0.0, 0.0)
+        bone.tail = (idx, 0.0, 1.0)
+
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    mesh = bpy.data.meshes.new("skin")
+    mesh.from_pydata([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (1.0, 1.0, 0.0), (0.0, 1.0, 0.0)], [], [(0, 1, 2, 3)])
+    skin = bpy.data.objects.new("skin", mesh)
+    bpy.context.scene.collection.objects.link(skin)
+    vertex_groups = {bone_name: skin.vertex_groups.new(name=bone_name) for bone_name in BONE_NAMES}
+    unrelated_group = skin.vertex_groups.new(name="unrelated")
+    for bone_name, weight in zip(BONE_NAMES, (0.1, 0.6, 0.2, 0.05, 0.3, 0.4)):
+        vertex_groups[bone_name].add([0], weight, 'REPLACE')
+
+    vertex_groups["b0"].add([1], 0.75, 'REPLACE')
+    unrelated_group.add([1], 1.0, 'REPLACE')
+    for bone_name, weight in zip(("b2", "b3", "b4", "b5"), (0.1, 0.2, 0.3, 0.4)):
+        vertex_groups[bone_name].add([3], weight, 'REPLACE')
+
+    return armature, skin
+
+def get_node_sets(file_type, armature, skin):
+    from io_scene_halo.global_functions import mesh_processing
+
+    joined_list = list(armature.data.bones)
+    node_counts, node_indices, node_weights = mesh_processing.get_export_vertex_weights(skin.data, armature, skin, joined_list, file_type)
+    assert node_indices.shape == (4, 4)
+
+    return [node_set for node_count, node_set, node_index_list in mesh_processing.get_vertex_node_sets(node_counts, node_indices, node_weights)]
+
+def check_node_set(node_set, expected):
+    assert [node[0] for node in node_set] == [node[0] for node in expected]
+    assert [node[1] for node in node_set] == pytest.approx([node[1] for node in expected], abs=1e-6)
+
+def test_strongest_four_influences_are_kept_and_renormalized(empty_scene, blender):
+    armature, skin = build_skinned_mesh(blender)
+    node_sets = get_node_sets("JMS", armature, skin)
+
+    # b0 and b3 are the weakest, the rest keep their vertex group order
+    check_node_set(node_sets[0], [[1, 0.6 / 1.5], [2, 0.2 / 1.5], [4, 0.3 / 1.5], [5, 0.4 / 1.5]])
+    check_node_set(node_sets[1], [[0, 0.75]])
+    check_node_set(node_sets[3], [[2, 0.1], [3, 0.2], [4, 0.3], [5, 0.4]])
+
+def test_unweighted_vertices_use_the_parent_node_for_jms_only(empty_scene, blender):
+    armature, skin = build_skinned_mesh(blender)
+
+    check_node_set(get_node_sets("JMS", armature, skin)[2], [[0, 1.0]])
+    assert get_node_sets("ASS", armature, skin)[2] == []
@@ -0,0 +1,115 @@
+"""
+JMS import of markers and physics primitives, which are built from shared template meshes,
+of welded meshes, and of damaged files read through a memory map
+
+SPDX-License-Identifier: MIT
+"""
+
+import os
+import types
+
+import pytest
+
+from conftest import RESOURCE_DIRECTORY
+from test_jms_golden import get_scene
+
+FIXTURE = "halo3/sentinel_constructor.jms"
+
+def write_fixture(blender, output_path):
+    """The fixture with a sphere, box and capsule using its first material and a sphere without one added"""
+    from io_scene_halo.global_functions import jms_writer
+
+    scene = get_scene(blender, FIXTURE)
+    rotation = (0.0, 0.0, 0.0, 1.0)
+    scene.spheres.append(jms_writer.JMSSceneData.Sphere("sphere_material", 0, 0, rotation, (1.0, 0.0, 0.0), 2.0))
+    scene.spheres.append(jms_writer.JMSSceneData.Sphere("sphere_bare", 0, -1, rotation, (2.0, 0.0, 0.0), 3.0))
+    scene.boxes.append(jms_writer.JMSSceneData.Box("box_material", 0, 0, rotation, (3.0, 0.0, 0.0), 1.0, 2.0, 3.0))
+    scene.capsules.append(jms_writer.JMSSceneData.Capsule("capsule_material", 0, 0, rotation, (4.0, 0.0, 0.0), 2.0, 1.0))
+    with open(output_path, 'w', encoding='utf_8') as file:
+        jms_writer.write_scene_data(file, scene, 8213, 'halo3mcc')
+
+    return scene.materials[0].name
+
+def test_markers_and_primitives_keep_their_own_materials(empty_scene, blender, reports, tmp_path):
+    from io_scene_halo.file_jms import import_jms
+
+    output_path = str(tmp_path / "primitives.jms")
+    material_name = write_fixture(blender, output_path)
+    import_jms.load_file(blender.context, output_path, reports, 'auto', False, False, False)
+
+    markers = [obj for obj in empty_scene.objects if obj.name.startswith('#')]
+    primitives = {obj.name: obj for obj in empty_scene.objects if obj.name.startswith('$')}
+    assert markers
+    assert sorted(primitives) == ["$box_material", "$capsule_material", "$sphere_bare", "$sphere_material"]
+
+    for marker in markers:
+        assert len(marker.data.materials) == 0
+        assert not any(primitive.data == marker.data for primitive in primitives.values())
+
+    assert len(primitives["$sphere_bare"].data.materials) == 0
+    for name in ("$sphere_material", "$box_material", "$capsule_material"):
+        assert [material.name for material in primitives[name].data.materials] == [material_name]
+
+    # Each shape keeps its own mesh even with the same material
+    assert len({primitive.data.name for primitive in primitives.values()}) == 4
+
+def get_vertices(translations):
+    """Vertex columns for unweighted, untextured vertices at the given positions"""
+    import numpy as np
+
+    vertex_count = len(translations)
+    return types.SimpleNamespace(translations=np.array(translations, dtype=np.float64),
+                                 normals=np.tile(np.array([0.0, 0.0, 1.0]), (vertex_count, 1)),
+                                 node_counts=np.zeros(vertex_count, dtype=np.int32),
+                                 node_indices=np.full((vertex_count, 4), -1, dtype=np.int32),
+                                 node_weights=np.zeros((vertex_count, 4), dtype=np.float64),
+                                 uv_counts=np.zeros(vertex_count, dtype=np.int32),
+                                 uvs=np.zeros((vertex_count, 1, 2), dtype=np.float64),
+                                 colors=None)
+
+def test_weld_distance_merges_nearby_corners(blender):
+    import numpy as np
+    from io_scene_halo.global_functions import mesh_processing
+
+    # Two triangles sharing an edge, the second one's copies of the edge are 0.0001 off
+    vertices = get_vertices([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0),
+                             (1.0001, 0.0, 0.0), (0.0, 1.0001, 0.0), (1.0, 1.0, 0.0)])
+    loop_vertices = np.arange(6, dtype=np.int32)
+
+    mesh_vertices = mesh_processing.get_welded_vertices(vertices, loop_vertices)[0]
+    assert len(mesh_vertices) == 6
+
+    mesh_vertices, loop_mesh_vertices = mesh_processing.get_welded_vertices(vertices, loop_vertices, 0.001)
+    assert len(mesh_vertices) == 4
+    assert loop_mesh_vertices.tolist() == [0, 1, 2, 1, 2, 3]
+
+@pytest.mark.parametrize("damage", ["truncated", "trailing"])
+def test_memory_map_released_on_parse_error(blender, monkeypatch, tmp_path, damage):
+    from io_scene_halo.file_jms import import_jms
+    from io_scene_halo.global_functions import global_functions
+
+    token_indices = []
+    class RecordedTokenIndex(global_functions.TokenIndex):
+        def __init__(self, filepath, encoding):
+            super().__init__(filepath, encoding)
+            token_indices.append(self)
+
+    monkeypatch.setattr(global_functions, "TokenIndex", RecordedTokenIndex)
+    with open(os.path.join(RESOURCE_DIRECTORY, FIXTURE), encoding='utf_8') as file:
+        lines = file.read().splitlines()
+
+    if damage == "truncated":
+        lines = lines[:len(lines) // 2]
+
+    else:
+        lines.append("1.0\t2.0")
+
+    output_path = str(tmp_path / "damaged.jms")
+    with open(output_path, 'w', encoding='utf_8') as file:
+        file.write("\n".join(lines))
+
+    with pytest.raises(Exception):
+        import_jms.JMSAsset(output_path, 'auto', True)
+
+    assert len(token_indices) == 1
+    assert token_indices[0].buffer is None
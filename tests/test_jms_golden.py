@@ -0,0 +1,165 @@
+"""
+Byte for byte check of the JMS writer against files written by the original exporter
+
+The files in tests/golden/jms were written by write_file as it was before the block
+formatters, from the records get_scene() builds out of the bundled fixtures, once for
+every JMS version from 8197 to 8213. Any change to how the writer formats a scene has
+to keep producing the same bytes.
+
+SPDX-License-Identifier: MIT
+"""
+
+import io
+import os
+
+import pytest
+
+from conftest import ROOT_DIRECTORY, RESOURCE_DIRECTORY
+
+GOLDEN_DIRECTORY = os.path.join(ROOT_DIRECTORY, "tests", "golden", "jms")
+VERSIONS = range(8197, 8214)
+FIXTURES = ("haloce/flood_infection.jms", "halo3/sentinel_constructor.jms")
+
+def get_game_version(version):
+    if version <= 8200:
+        return 'haloce'
+
+    elif version <= 8210:
+        return 'halo2'
+
+    return 'halo3mcc'
+
+def get_golden_path(fixture, version):
+    game_directory, filename = fixture.split('/')
+    return os.path.join(GOLDEN_DIRECTORY, "%s_%s_%s.jms" % (game_directory, filename.rsplit('.', 1)[0], version))
+
+def get_rotation(quaternion):
+    return (quaternion.x, quaternion.y, quaternion.z, quaternion.w)
+
+def get_node_hierarchy(jms_file):
+    """Parent, child and sibling indices for every node whichever set of them the file stored"""
+    node_count = len(jms_file.nodes)
+    parents = [-1] * node_count
+    children = [-1] * node_count
+    siblings = [-1] * node_count
+    if jms_file.version >= 8205:
+        parents = [node.parent for node in jms_file.nodes]
+        last_child = {}
+        for idx, parent in enumerate(parents):
+            if parent in last_child:
+                siblings[last_child[parent]] = idx
+
+            elif parent >= 0:
+                children[parent] = idx
+
+            last_child[parent] = idx
+
+    else:
+        children = [node.child for node in jms_file.nodes]
+        siblings = [node.sibling for node in jms_file.nodes]
+        for idx, child in enumerate(children):
+            while child >= 0:
+                parents[child] = idx
+                child = siblings[child]
+
+    return parents, children, siblings
+
+def get_scene(blender, fixture):
+    """Export records for a parsed fixture, built the same way whatever version they will be written as"""
+    import numpy as np
+
+    from io_scene_halo.global_functions import jms_writer
+    from io_scene_halo.file_jms import import_jms
+
+    jms_file = import_jms.JMSAsset(os.path.join(RESOURCE_DIRECTORY, *fixture.split('/')), 'auto')
+    scene = jms_writer.JMSSceneData()
+    parents, children, siblings = get_node_hierarchy(jms_file)
+    for idx, node in enumerate(jms_file.nodes):
+        transform = jms_file.transforms[0][idx]
+        scene.nodes.append(jms_writer.JMSSceneData.Node(node.name, None, children[idx], siblings[idx], parents[idx], get_rotation(transform.rotation), tuple(transform.vector)))
+
+    for idx, material in enumerate(jms_file.materials):
+        texture_path = '<none>' if material.texture_path is None else material.texture_path
+        scene.materials.append(jms_writer.JMSSceneData.Material(material.scene_name, texture_path, idx + 1, material.lod, material.permutation or '', material.region or ''))
+
+    for marker in jms_file.markers:
+        scene.markers.append(jms_writer.JMSSceneData.Marker(marker.name, marker.region, marker.parent, get_rotation(marker.rotation), tuple(marker.translation), float(marker.scale)))
+
+    for region in jms_file.regions:
+        scene.regions.append(jms_writer.JMSSceneData.Region(region.name))
+
+    vertices = jms_file.vertices
+    vertices.finalize()
+    vertex_count = len(vertices)
+    node_slots = np.arange(vertices.node_indices.shape[1]) < vertices.node_counts[:, None]
+    # The exporter always writes at least one UV and the pre 8205 layouts read the first one
+    uv_counts = np.maximum(vertices.uv_counts, 1)
+    uv_slots = np.arange(vertices.uvs.shape[1]) < vertices.uv_counts[:, None]
+    regions = np.zeros(vertex_count) if vertices.regions is None else vertices.regions
+    colors = np.zeros((vertex_count, 3)) if vertices.colors is None else vertices.colors
+    scene.vertices.append(regions,
+                          vertices.translations,
+                          vertices.normals,
+                          vertices.node_counts,
+                          np.where(node_slots, vertices.node_indices, -1),
+                          np.where(node_slots, vertices.node_weights, 0.0),
+                          uv_counts,
+                          np.where(uv_slots[:, :, None], vertices.uvs[:, :, :2], 0.0),
+                          colors)
+
+    triangles = jms_file.triangles
+    triangles.finalize()
+    regions = np.zeros(len(triangles)) if triangles.regions is None else triangles.regions
+    scene.triangles.append(regions, triangles.material_indices, triangles.vertex_indices)
+
+    return scene
+
+@pytest.fixture(scope="module", params=FIXTURES)
+def fixture_scene(request, blender):
+    return request.param, get_scene(blender, request.param)
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_writer_matches_golden(fixture_scene, version):
+    from io_scene_halo.global_functions import jms_writer
+
+    fixture, scene = fixture_scene
+    file = io.StringIO()
+    jms_writer.write_scene_data(file, scene, version, get_game_version(version))
+    with open(get_golden_path(fixture, version), 'r', encoding='utf_8') as golden_file:
+        expected = golden_file.read()
+
+    result = file.getvalue()
+    if not result == expected:
+        offset = next((idx for idx, (char_a, char_b) in enumerate(zip(expected, result)) if not char_a == char_b), min(len(expected), len(result)))
+        pytest.fail("%s at version %s differs from the golden file at character %s:\n    expected: %r\n    result:   %r" % (fixture, version, offset, expected[max(0, offset - 40):offset + 40], result[max(0, offset - 40):offset + 40]))
+
+@pytest.mark.parametrize("incremental_export", [False, True])
+def test_write_queue_matches_golden(fixture_scene, reports, tmp_path, incremental_export):
+    from io_scene_halo.file_jms import export_jms
+    from io_scene_halo.global_functions import export_manifest
+
+    fixture, scene = fixture_scene
+    manifest = None
+    if incremental_export:
+        manifest = export_manifest.ExportManifest()
+
+    write_queue = export_jms.JMSWriteQueue()
+    try:
+        for version in (8200, 8210, 8213):
+            write_queue.submit(scene, str(tmp_path / ("%s.jms" % version)), version, get_game_version(version), manifest)
+
+        assert write_queue.join() == 3
+
+    finally:
+        write_queue.close()
+
+    write_queue.report_stats(reports)
+    assert reports.find("Wrote 3 files in worker processes")
+    for version in (8200, 8210, 8213):
+        with open(get_golden_path(fixture, version), 'r', encoding='utf_8') as golden_file:
+            with open(str(tmp_path / ("%s.jms" % version)), 'r', encoding='utf_8') as file:
+                assert file.read() == golden_file.read()
+
+    assert not [filename for filename in os.listdir(tmp_path) if filename.endswith('.tmp')]
+    if incremental_export:
+        assert manifest.written == 3
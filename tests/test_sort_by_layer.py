@@ -0,0 +1,134 @@
+"""
+Node order of sort_by_layer against the original implementation on every rig in io_scene_halo/resources
+
+SPDX-License-Identifier: MIT
+"""
+
+import glob
+import os
+
+import pytest
+
+from conftest import RESOURCE_DIRECTORY
+from test_jms_golden import get_node_hierarchy
+
+RIGS = sorted(os.path.relpath(filepath, RESOURCE_DIRECTORY) for filepath in glob.glob(os.path.join(RESOURCE_DIRECTORY, "**", "*.[jJ][mM][sS]"), recursive=True))
+
+class Node:
+    """Stand-in for a bone or an object, the sort only reads the name and the parent"""
+    def __init__(self, name):
+        self.name = name
+        self.parent = None
+
+class Bones(list):
+    """Stand-in for armature.data.bones, indexed by position or by name"""
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return next(bone for bone in self if bone.name == key)
+
+        return list.__getitem__(self, key)
+
+class Armature:
+    class Data:
+        def __init__(self, bones):
+            self.bones = bones
+
+    def __init__(self, bones):
+        self.data = Armature.Data(Bones(bones))
+
+def baseline_sort_by_layer(node_list, armature, objects):
+    """sort_by_layer as it was before the breadth first rewrite, with objects standing in for bpy.data.objects"""
+    layer_count = []
+    layer_root = []
+    root_list = []
+    children_list = []
+    reversed_children_list = []
+    joined_list = []
+    reversed_joined_list = []
+    sort_list = []
+    reversed_sort_list = []
+    for node in node_list:
+        if node.parent == None and not node.name[0:1] == '!' or node.parent.name[0:1] == '!' and node.parent.parent == None:
+            layer_count.append(None)
+            layer_root.append(node)
+
+        else:
+            if not node.parent in layer_count:
+                layer_count.append(node.parent)
+
+    for layer in layer_count:
+        joined_list = root_list + children_list
+        reversed_joined_list = root_list + reversed_children_list
+        layer_index = layer_count.index(layer)
+        if layer_index == 0:
+            if armature:
+                root_list.append(armature.data.bones[0])
+
+            else:
+                root_list.append(layer_root[0])
+
+        else:
+            for node in node_list:
+                if armature:
+                    if node.parent != None:
+                        if armature.data.bones['%s' % node.parent.name] in joined_list and not node in children_list:
+                            sort_list.append(node.name)
+                            reversed_sort_list.append(node.name)
+
+                else:
+                    if node.parent != None:
+                        if node.parent in joined_list and not node in children_list:
+                            sort_list.append(node.name)
+                            reversed_sort_list.append(node.name)
+
+            sort_list.sort()
+            reversed_sort_list.sort()
+            reversed_sort_list.reverse()
+            for sort in sort_list:
+                if armature:
+                    if not armature.data.bones['%s' % sort] in children_list:
+                        children_list.append(armature.data.bones['%s' % sort])
+
+                else:
+                    if not objects[sort] in children_list:
+                        children_list.append(objects[sort])
+
+            for sort in reversed_sort_list:
+                if armature:
+                    if not armature.data.bones['%s' % sort] in reversed_children_list:
+                        reversed_children_list.append(armature.data.bones['%s' % sort])
+
+                else:
+                    if not objects[sort] in reversed_children_list:
+                        reversed_children_list.append(objects[sort])
+
+        joined_list = root_list + children_list
+        reversed_joined_list = root_list + reversed_children_list
+
+    return (joined_list, reversed_joined_list)
+
+def get_rig(rig):
+    from io_scene_halo.file_jms import import_jms
+
+    jms_file = import_jms.JMSAsset(os.path.join(RESOURCE_DIRECTORY, rig), 'auto')
+    node_list = [Node(node.name) for node in jms_file.nodes]
+    parents = get_node_hierarchy(jms_file)[0]
+    for node, parent in zip(node_list, parents):
+        if parent >= 0:
+            node.parent = node_list[parent]
+
+    return node_list
+
+def get_names(sorted_lists):
+    return [[node.name for node in sorted_list] for sorted_list in sorted_lists]
+
+@pytest.mark.parametrize("rig", RIGS)
+def test_sort_matches_baseline(blender, rig):
+    from io_scene_halo.global_functions import global_functions
+
+    node_list = get_rig(rig)
+    armature = Armature(node_list)
+    objects = {node.name: node for node in node_list}
+
+    assert get_names(global_functions.sort_by_layer(node_list, armature)) == get_names(baseline_sort_by_layer(node_list, armature, objects))
+    assert get_names(global_functions.sort_by_layer(node_list, None)) == get_names(baseline_sort_by_layer(node_list, None, objects))
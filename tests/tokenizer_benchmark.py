@@ -0,0 +1,90 @@
+"""
+Benchmark for the asset tokenizer
+
+Times asset_reader.read_asset_text() and tokenize() against the original line by line
+tokenizer of HaloAsset, copied below, on the fixtures bundled in io_scene_halo/resources
+or on the given files, and checks that both produce the same elements. asset_reader
+doesn't need Blender, run it with any Python from the repository root:
+
+    python tests/tokenizer_benchmark.py --repeat 3
+
+SPDX-License-Identifier: MIT
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESOURCE_DIRECTORY = os.path.join(ROOT_DIRECTORY, "io_scene_halo", "resources")
+
+sys.path.insert(0, ROOT_DIRECTORY)
+
+from io_scene_halo.global_functions import asset_reader
+
+baseline_comment_regex = re.compile("[^\"]*;(?!.*\")")
+
+def baseline_read_elements(filepath):
+    """HaloAsset as it was before asset_reader, opening the file in text mode and tokenizing it a line at a time"""
+    elements = []
+    with open(filepath, 'rb') as file:
+        encoding = asset_reader.detect_encoding(file.read(0x200), os.path.getsize(filepath))
+
+    with open(filepath, "r", encoding=encoding) as file:
+        for line in file:
+            for element in line.strip().split("\t"):
+                if element != '':
+                    comment_match = re.search(baseline_comment_regex, element)
+                    if comment_match is None:
+                        elements.append(element)
+                    else:
+                        processed_element = element[: comment_match.end() - 1]
+                        if processed_element != '':
+                            elements.append(element)
+                        break # ignore the rest of the line if we found a comment
+
+    return elements
+
+def time_reader(read_elements, filepaths, repeat):
+    """Best of repeat runs over every file, returns the time and the elements of the last run"""
+    best_elapsed = None
+    for run in range(repeat):
+        start = time.perf_counter()
+        elements_list = [read_elements(filepath) for filepath in filepaths]
+        elapsed = time.perf_counter() - start
+        if best_elapsed is None or elapsed < best_elapsed:
+            best_elapsed = elapsed
+
+    return best_elapsed, elements_list
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Time the asset tokenizer against the original line by line tokenizer')
+    parser.add_argument('filepaths', nargs='*', help='Asset files to read, every JMS fixture in io_scene_halo/resources by default')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per reader, the fastest one is reported')
+    args = parser.parse_args(argv)
+
+    filepaths = args.filepaths
+    if not filepaths:
+        filepaths = sorted(glob.glob(os.path.join(RESOURCE_DIRECTORY, "**", "*.[jJ][mM][sS]"), recursive=True))
+
+    byte_count = sum(os.path.getsize(filepath) for filepath in filepaths)
+    print("%s files, %.1f MB" % (len(filepaths), byte_count / 1000000))
+    results = []
+    for name, read_elements in (('baseline', baseline_read_elements), ('tokenize', asset_reader.read_elements)):
+        elapsed, elements_list = time_reader(read_elements, filepaths, args.repeat)
+        token_count = sum(len(elements) for elements in elements_list)
+        results.append(elements_list)
+        print("%-10s %8.3fs %12.0f tokens/s %8.1f MB/s" % (name, elapsed, token_count / elapsed, byte_count / elapsed / 1000000))
+
+    for filepath, baseline_elements, elements in zip(filepaths, results[0], results[1]):
+        if not baseline_elements == elements:
+            print("%s: the tokenizers disagree" % (os.path.relpath(filepath, ROOT_DIRECTORY)))
+
+    return 0
+
+if __name__ == '__main__':
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    sys.exit(main(argv))
@@ -0,0 +1,153 @@
+"""
+Benchmark for sampling node transforms through TransformCache
+
+Builds a synthetic armature of --bones bones, every bone rotating over --frames frames,
+and samples every node matrix on every frame the way the JMA exporter does. The cache is
+timed against the per call get_matrix() it replaced, copied below, and the results of
+the two are compared. Scene evaluation is timed on its own so it can be told apart from
+the matrix work. Blender is needed, run it from the repository root:
+
+    blender --background --factory-startup --python tests/transform_cache_benchmark.py -- --bones 255 --frames 2000
+
+SPDX-License-Identifier: MIT
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from math import radians
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bpy
+
+from mathutils import Matrix
+from io_scene_halo.global_functions import global_functions
+
+def baseline_get_matrix(obj_a, armature, version, file_type, custom_scale, fix_rotation):
+    """The node branch of get_matrix() as it was before TransformCache"""
+    if fix_rotation:
+        pose_bone = armature.pose.bones['%s' % (obj_a.name)]
+        object_matrix = pose_bone.matrix @ Matrix.Rotation(radians(90.0), 4, 'Z')
+        if pose_bone.parent and not version >= global_functions.get_version_matrix_check(file_type):
+            object_matrix = (pose_bone.parent.matrix @ Matrix.Rotation(radians(90.0), 4, 'Z')).inverted() @ pose_bone.matrix @ Matrix.Rotation(radians(90.0), 4, 'Z')
+
+    else:
+        pose_bone = armature.pose.bones['%s' % (obj_a.name)]
+        object_matrix = pose_bone.matrix
+        if pose_bone.parent and not version >= global_functions.get_version_matrix_check(file_type):
+            object_matrix = pose_bone.parent.matrix.inverted() @ pose_bone.matrix
+
+    loc, rot, sca = object_matrix.decompose()
+    custom_loc = loc * custom_scale
+    translation = Matrix.Translation(custom_loc)
+    rotation = rot.to_matrix().to_4x4()
+    custom_sca = sca
+    if file_type == 'JMS':
+        custom_sca = sca * custom_scale
+    scale_x = Matrix.Scale(custom_sca[0], 4, (1, 0, 0))
+    scale_y = Matrix.Scale(custom_sca[1], 4, (0, 1, 0))
+    scale_z = Matrix.Scale(custom_sca[2], 4, (0, 0, 1))
+    scale_matrix = scale_x @ scale_y @ scale_z
+
+    object_matrix = translation @ rotation @ scale_matrix
+
+    return object_matrix
+
+def build_rig(bone_count, frame_count):
+    """An armature where bone n hangs off bone (n - 1) // 4, every bone keyed at the first and last frame"""
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+
+    armature_data = bpy.data.armatures.new("rig")
+    armature = bpy.data.objects.new("rig", armature_data)
+    bpy.context.scene.collection.objects.link(armature)
+    bpy.context.view_layer.objects.active = armature
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = []
+    for idx in range(bone_count):
+        edit_bone = armature_data.edit_bones.new("bone%03d" % (idx))
+        edit_bone.head = (idx * 0.01, 0.0, idx * 0.1)
+        edit_bone.tail = (idx * 0.01, 0.0, idx * 0.1 + 0.1)
+        if idx > 0:
+            edit_bone.parent = edit_bones[(idx - 1) // 4]
+
+        edit_bones.append(edit_bone)
+
+    bpy.ops.object.mode_set(mode='OBJECT')
+    for idx, pose_bone in enumerate(armature.pose.bones):
+        pose_bone.rotation_mode = 'XYZ'
+        for frame, angle in ((1, 0.0), (frame_count, radians(90.0 + idx))):
+            pose_bone.rotation_euler = (angle, angle * 0.5, 0.0)
+            pose_bone.keyframe_insert("rotation_euler", frame=frame)
+
+    bpy.context.scene.frame_start = 1
+    bpy.context.scene.frame_end = frame_count
+
+    return armature
+
+def sample_evaluation(armature, joined_list, frame_count, args):
+    for frame in global_functions.sample_frames(bpy.context, 1, frame_count + 1):
+        pass
+
+def sample_baseline(armature, joined_list, frame_count, args):
+    samples = []
+    for frame in global_functions.sample_frames(bpy.context, 1, frame_count + 1):
+        matrices = [baseline_get_matrix(node, armature, args.version, 'JMA', 1.0, args.fix_rotations) for node in joined_list]
+        if frame % args.check_every == 1:
+            samples.append(matrices)
+
+    return samples
+
+def sample_cache(armature, joined_list, frame_count, args):
+    samples = []
+    transform_cache = global_functions.TransformCache(armature, joined_list, args.version, 'JMA', 1.0, args.fix_rotations)
+    for frame in global_functions.sample_frames(bpy.context, 1, frame_count + 1, (transform_cache,)):
+        matrices = [transform_cache.get_matrix(node, node, True, True, False) for node in joined_list]
+        if frame % args.check_every == 1:
+            samples.append(matrices)
+
+    return samples
+
+def get_largest_difference(samples_a, samples_b):
+    difference = 0.0
+    for matrices_a, matrices_b in zip(samples_a, samples_b):
+        for matrix_a, matrix_b in zip(matrices_a, matrices_b):
+            for row_a, row_b in zip(matrix_a, matrix_b):
+                difference = max(difference, max(abs(value_a - value_b) for value_a, value_b in zip(row_a, row_b)))
+
+    return difference
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Time per frame node transform sampling with and without TransformCache')
+    parser.add_argument('--bones', type=int, default=255, help='Bone count of the synthetic rig')
+    parser.add_argument('--frames', type=int, default=2000, help='Frame count to sample')
+    parser.add_argument('--version', type=int, default=16392, help='JMA version, below 16394 nodes are sampled relative to their parent')
+    parser.add_argument('--fix_rotations', action='store_true', help='Apply the 90 degree fix rotation like the exporters can')
+    parser.add_argument('--check_every', type=int, default=100, help='Compare the two results every n frames')
+    args = parser.parse_args(argv)
+
+    armature = build_rig(args.bones, args.frames)
+    joined_list = global_functions.get_node_hierarchy(list(armature.data.bones), armature, 'halo2', args.version, True)
+    print("%s bones, %s frames, version %s, fix rotations %s" % (args.bones, args.frames, args.version, args.fix_rotations))
+    results = {}
+    for name, sample in (('evaluation', sample_evaluation), ('baseline', sample_baseline), ('cache', sample_cache)):
+        start = time.perf_counter()
+        results[name] = sample(armature, joined_list, args.frames, args)
+        elapsed = time.perf_counter() - start
+        if name == 'evaluation':
+            evaluation_time = elapsed
+            print("%-10s %8.3fs" % (name, elapsed))
+
+        else:
+            print("%-10s %8.3fs %8.3fs without evaluation" % (name, elapsed, elapsed - evaluation_time))
+
+    print("largest difference %.3g" % (get_largest_difference(results['baseline'], results['cache'])))
+
+    return 0
+
+if __name__ == '__main__':
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    sys.exit(main(argv))